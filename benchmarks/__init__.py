@@ -0,0 +1 @@
+"""Benchmarks dos caminhos quentes contra o banco em memória (``python -m benchmarks``)."""
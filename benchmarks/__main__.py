@@ -0,0 +1,50 @@
+"""
+Executa os benchmarks dos caminhos quentes.
+
+Uso:
+    python -m benchmarks                      # guildas de 1k, 10k e 100k membros
+    python -m benchmarks --sizes 1000 --iterations 500
+
+Sai com código 1 se algum caminho enviar mais comandos ao banco do que o seu orçamento.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List
+
+from benchmarks.harness import BenchmarkResult, build_context, format_results, measure
+from benchmarks.hot_paths import HOT_PATHS
+
+
+async def run(sizes: List[int], iterations: int) -> List[BenchmarkResult]:
+    results = []
+    for size in sizes:
+        started = time.perf_counter()
+        # Cada iteração (inclusive o aquecimento) consome uma missão nova
+        context = await build_context(size, missions=iterations + max(1, iterations // 10))
+        print(f'Guilda sintética com {size} membros criada em {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+        for case in HOT_PATHS:
+            results.append(await measure(case, context, iterations))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos quentes do bot.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help='Quantidade de membros das guildas sintéticas.')
+    parser.add_argument('--iterations', type=int, default=200, help='Chamadas medidas por caso.')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.sizes, args.iterations))
+    print(format_results(results))
+
+    over_budget = [r for r in results if not r.within_budget]
+    for r in over_budget:
+        print(f'{r.name} ({r.users} membros): {r.max_commands} comandos, orçamento {r.budget}', file=sys.stderr)
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
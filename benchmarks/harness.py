@@ -0,0 +1,301 @@
+"""
+Infraestrutura dos benchmarks: guilda sintética, medição e orçamento de idas ao banco.
+
+Os benchmarks rodam contra o ``FakeDatabase`` (tests/fakes/mongo.py), então a
+latência medida é o custo em Python do caminho (serviços, modelos e o banco em
+memória). O número que importa para regressões é a quantidade de comandos
+enviados ao banco por chamada, comparada com o orçamento declarado em cada caso.
+"""
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.database.models.mission import EvaluationRank
+from src.database.models.user import UserModel
+from src.repositories.item_repository import ItemRepository
+from src.repositories.level_rewards_repository import LevelRewardsRepository
+from src.repositories.missions_repository import MissionRepository
+from src.repositories.user_repository import UserRepository
+from src.services.economy_service import EconomyService
+from src.services.leveling_service import LevelingService
+from src.services.mission_service import MissionService
+from src.utils.guild_scope import scoped_guild
+from tests.fakes import FakeDatabase
+
+# Dono das missões sintéticas (nunca é avaliado)
+MISSION_CREATOR_ID = 1
+
+# Faixas de IDs das missões pré-criadas para cada caso
+EVALUATE_MISSION_BASE = 10_000_000
+ADJUST_MISSION_BASE = 20_000_000
+
+# Itens que todo membro sintético tem no inventário
+INVENTORY_ITEMS = (1, 2, 3)
+# Consumível (+10 XP por unidade) com estoque para todas as iterações do /usar
+CONSUMABLE_ITEM = 11
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.name = f'role-{role_id}'
+
+
+class FakeMember:
+    """Membro mínimo para ``sync_roles``: só guarda os cargos em memória."""
+
+    def __init__(self, member_id: int):
+        self.id = member_id
+        self.name = self.display_name = f'member-{member_id}'
+        self.roles: List[FakeRole] = []
+        self.bot = False
+
+    async def add_roles(self, *roles: FakeRole, **kwargs: Any) -> None:
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles: FakeRole, **kwargs: Any) -> None:
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+class FakeGuild:
+    """Guilda sintética: membros e cargos são criados sob demanda."""
+
+    def __init__(self, guild_id: int = 1):
+        self.id = guild_id
+        self._members: Dict[int, FakeMember] = {}
+        self._roles: Dict[int, FakeRole] = {}
+
+    def get_member(self, member_id: int) -> FakeMember:
+        if member_id not in self._members:
+            self._members[member_id] = FakeMember(member_id)
+        return self._members[member_id]
+
+    def get_role(self, role_id: int) -> FakeRole:
+        if role_id not in self._roles:
+            self._roles[role_id] = FakeRole(role_id)
+        return self._roles[role_id]
+
+
+class FakeInteraction:
+    """Interação mínima para chamar o callback dos comandos dos cogs."""
+
+    def __init__(self, user_id: int, guild: FakeGuild):
+        self.user = SimpleNamespace(id=user_id)
+        self.guild = guild
+        self.response = SimpleNamespace(defer=self._noop)
+        self.followup = SimpleNamespace(send=self._noop)
+
+    @staticmethod
+    async def _noop(*args: Any, **kwargs: Any) -> None:
+        return None
+
+
+@dataclass
+class BenchmarkContext:
+    """Banco, repositórios e serviços montados sobre uma guilda sintética."""
+    users: int
+    db: FakeDatabase
+    guild: FakeGuild
+    user_repo: UserRepository
+    item_repo: ItemRepository
+    mission_repo: MissionRepository
+    rewards_repo: LevelRewardsRepository
+    leveling_service: LevelingService
+    economy_service: EconomyService
+    mission_service: MissionService
+    bot: SimpleNamespace
+    # Usuários já carregados, para casos que recebem um UserModel como entrada
+    sample_users: List[UserModel] = field(default_factory=list)
+
+    def user_id(self, i: int) -> int:
+        """ID de um membro comum (distribui as iterações por toda a guilda)."""
+        return 2 + (i * 7919) % (self.users - 1)
+
+
+async def build_context(users: int, missions: int, seed: int = 42) -> BenchmarkContext:
+    """Cria a guilda sintética e os serviços ligados ao banco em memória.
+
+    Args:
+        users (int): Quantidade de membros cadastrados.
+        missions (int): Quantidade de missões pré-criadas para cada caso que precisa de missão.
+        seed (int): Semente do gerador (guildas reprodutíveis).
+
+    Returns:
+        BenchmarkContext: Contexto pronto para os casos.
+    """
+    if users < 2:
+        raise ValueError('A guilda sintética precisa de pelo menos 2 membros')
+
+    rng = random.Random(seed)
+    db = FakeDatabase()
+    guild = FakeGuild()
+    joined_at = datetime(2025, 1, 1)
+
+    await db.items.insert_many([
+        {'_id': item_id, 'name': f'Item {item_id}', 'description': 'Item sintético', 'price': 10,
+         'item_type': 'equipável', 'effect': None,
+         'passive_effects': [{'type': 'xp_boost' if item_id % 2 else 'coin_boost', 'multiplier': 0.05}]}
+        for item_id in range(1, 11)
+    ])
+    await db.items.insert_one({'_id': CONSUMABLE_ITEM, 'name': 'Poção sintética', 'description': 'Item sintético',
+                               'price': 10, 'item_type': 'consumível', 'effect': {'type': 'add_xp', 'amount': 10},
+                               'passive_effects': []})
+
+    await db.level_rewards.insert_many([
+        {'guild_id': guild.id, 'level_required': level, 'role_id': 900 + level, 'role_name': f'Nível {level}'}
+        for level in (1, 5, 10, 20, 40)
+    ])
+
+    batch = []
+    for user_id in range(1, users + 1):
+        batch.append({
+            'guild_id': guild.id,
+            'user_id': user_id,
+            'username': f'user{user_id}',
+            'joined_at': joined_at,
+            'xp': rng.randint(0, 200_000),
+            'coins': 1_000_000,
+            'inventory': {**{str(item_id): 1 for item_id in INVENTORY_ITEMS}, str(CONSUMABLE_ITEM): 1_000},
+            'equipped_item_id': INVENTORY_ITEMS[user_id % len(INVENTORY_ITEMS)] if user_id % 2 else None,
+            'role_ids': [],
+            'status': 'ativo',
+        })
+        if len(batch) >= 10_000:
+            await db.users.insert_many(batch)
+            batch = []
+    if batch:
+        await db.users.insert_many(batch)
+
+    user_repo = UserRepository(db)
+    item_repo = ItemRepository(db)
+    mission_repo = MissionRepository(db)
+    rewards_repo = LevelRewardsRepository(db)
+    await user_repo.ensure_indexes()
+    await rewards_repo.ensure_indexes()
+    await mission_repo.ensure_indexes()
+
+    leveling_service = LevelingService(user_repo, rewards_repo)
+    economy_service = EconomyService(user_repo, item_repo, leveling_service)
+    mission_service = MissionService(mission_repo, leveling_service, user_repo)
+
+    context = BenchmarkContext(
+        users=users, db=db, guild=guild, user_repo=user_repo, item_repo=item_repo,
+        mission_repo=mission_repo, rewards_repo=rewards_repo, leveling_service=leveling_service,
+        economy_service=economy_service, mission_service=mission_service,
+        bot=SimpleNamespace(user_repo=user_repo, item_repo=item_repo, leveling_service=leveling_service,
+                            economy_service=economy_service, mission_service=mission_service),
+    )
+
+    # Missões abertas para /avaliar e missões já avaliadas (rank C) para o ajuste
+    mission_docs, evaluation_docs = [], []
+    for i in range(missions):
+        for base in (EVALUATE_MISSION_BASE, ADJUST_MISSION_BASE):
+            mission_docs.append({'_id': base + i, 'guild_id': guild.id, 'title': f'Missão {i}', 'creator_id': MISSION_CREATOR_ID,
+                                 'created_at': joined_at, 'status': 'aberta', 'evaluators': []})
+        evaluation_docs.append({'mission_id': ADJUST_MISSION_BASE + i, 'guild_id': guild.id, 'user_id': context.user_id(i),
+                                'username': f'user{context.user_id(i)}', 'user_level_at_time': 1,
+                                'rank': EvaluationRank.C.value, 'xp_earned': 20, 'coins_earned': 50,
+                                'xp_multiplier': 1.0, 'coin_multiplier': 1.0,
+                                'evaluate_at': joined_at + timedelta(minutes=i)})
+    await db.missions.insert_many(mission_docs)
+    await db.evaluations.insert_many(evaluation_docs)
+
+    with scoped_guild(guild.id):
+        for i in range(64):
+            user = await user_repo.get_by_id(context.user_id(i))
+            if user:
+                context.sample_users.append(user)
+
+    db.reset_commands()
+    return context
+
+
+@dataclass
+class BenchmarkCase:
+    """Um caminho quente e seu orçamento de comandos por chamada."""
+    name: str
+    budget: int
+    run: Callable[[BenchmarkContext, int], Awaitable[Any]]
+    description: str = ''
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    users: int
+    iterations: int
+    p50_ms: float
+    p99_ms: float
+    max_commands: int
+    budget: int
+    commands: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def within_budget(self) -> bool:
+        return self.max_commands <= self.budget
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (sem interpolação)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def measure(case: BenchmarkCase, context: BenchmarkContext, iterations: int,
+                  warmup: Optional[int] = None) -> BenchmarkResult:
+    """Executa o caso ``iterations`` vezes, medindo latência e comandos de cada chamada.
+
+    Args:
+        case (BenchmarkCase): Caso a medir.
+        context (BenchmarkContext): Guilda sintética.
+        iterations (int): Quantidade de chamadas medidas.
+        warmup (Optional[int]): Chamadas descartadas antes da medição (padrão: 10% das iterações).
+
+    Returns:
+        BenchmarkResult: Percentis de latência, maior número de comandos e comandos por operação da pior chamada.
+    """
+    warmup = max(1, iterations // 10) if warmup is None else warmup
+
+    latencies: List[float] = []
+    max_commands = 0
+    worst: Dict[str, int] = {}
+
+    for i in range(warmup + iterations):
+        context.db.reset_commands()
+        start = time.perf_counter()
+        # Como um Cog faria: as chamadas do caso rodam no servidor da guilda sintética
+        with scoped_guild(context.guild.id):
+            await case.run(context, i)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if i < warmup:
+            continue
+
+        latencies.append(elapsed_ms)
+        total = context.db.total_commands
+        if total >= max_commands:
+            max_commands = total
+            worst = dict(context.db.commands)
+
+    return BenchmarkResult(name=case.name, users=context.users, iterations=iterations,
+                           p50_ms=percentile(latencies, 50), p99_ms=percentile(latencies, 99),
+                           max_commands=max_commands, budget=case.budget, commands=worst)
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Monta a tabela de resultados para o terminal."""
+    header = f'{"caso":<36}{"membros":>9}{"p50 ms":>10}{"p99 ms":>10}{"cmds":>6}{"orç.":>6}  comandos'
+    lines = [header, '-' * len(header)]
+    for r in results:
+        status = '' if r.within_budget else '  << ACIMA DO ORÇAMENTO'
+        ops = ', '.join(f'{op}={n}' for op, n in sorted(r.commands.items()))
+        lines.append(f'{r.name:<36}{r.users:>9}{r.p50_ms:>10.3f}{r.p99_ms:>10.3f}'
+                     f'{r.max_commands:>6}{r.budget:>6}  {ops}{status}')
+    return '\n'.join(lines)
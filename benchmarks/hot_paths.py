@@ -0,0 +1,87 @@
+"""
+Casos dos caminhos quentes e seus orçamentos de comandos por chamada.
+
+O orçamento é o número máximo de comandos que uma chamada pode enviar ao
+banco. Ao alterar um caminho de forma consciente (ex: nova consulta necessária),
+atualize o orçamento aqui junto com a mudança.
+"""
+from typing import List
+
+from benchmarks.harness import (
+    ADJUST_MISSION_BASE,
+    CONSUMABLE_ITEM,
+    EVALUATE_MISSION_BASE,
+    INVENTORY_ITEMS,
+    MISSION_CREATOR_ID,
+    BenchmarkCase,
+    BenchmarkContext,
+    FakeInteraction,
+)
+from src.cogs.inventory_cog import InventoryCog
+from src.cogs.user_cog import UserCog
+
+_RANKS = ('S', 'A', 'B', 'C', 'D')
+
+
+async def evaluate_user(ctx: BenchmarkContext, i: int) -> None:
+    success, _ = await ctx.mission_service.evaluate_user(
+        EVALUATE_MISSION_BASE + i, MISSION_CREATOR_ID, ctx.user_id(i), _RANKS[i % len(_RANKS)], ctx.guild
+    )
+    assert success
+
+
+async def adjust_evaluation(ctx: BenchmarkContext, i: int) -> None:
+    success, _ = await ctx.mission_service.adjust_evaluation(ADJUST_MISSION_BASE + i, ctx.user_id(i), 'S', ctx.guild)
+    assert success
+
+
+async def buy_item(ctx: BenchmarkContext, i: int) -> None:
+    success, _ = await ctx.economy_service.buy_item(ctx.user_id(i), INVENTORY_ITEMS[i % len(INVENTORY_ITEMS)], 1)
+    assert success
+
+
+async def equip_item(ctx: BenchmarkContext, i: int) -> None:
+    success, _ = await ctx.economy_service.equip_item(ctx.user_id(i), INVENTORY_ITEMS[i % len(INVENTORY_ITEMS)])
+    assert success
+
+
+async def use_item(ctx: BenchmarkContext, i: int) -> None:
+    success, _ = await ctx.economy_service.use_item(ctx.user_id(i), CONSUMABLE_ITEM, 5, ctx.guild)
+    assert success
+
+
+async def calculate_bonus(ctx: BenchmarkContext, i: int) -> None:
+    user = ctx.sample_users[i % len(ctx.sample_users)]
+    ctx.leveling_service.calculate_bonus(40, 100, user.xp_multiplier, user.coin_multiplier)
+
+
+async def get_user_progress(ctx: BenchmarkContext, i: int) -> None:
+    ctx.leveling_service.get_user_progress(i * 37)
+
+
+async def inventory_cog(ctx: BenchmarkContext, i: int) -> None:
+    cog = InventoryCog(ctx.bot)
+    await cog.view_inventory.callback(cog, FakeInteraction(ctx.user_id(i), ctx.guild))
+
+
+async def profile_cog(ctx: BenchmarkContext, i: int) -> None:
+    cog = UserCog(ctx.bot)
+    await cog.view_profile.callback(cog, FakeInteraction(ctx.user_id(i), ctx.guild))
+
+
+HOT_PATHS: List[BenchmarkCase] = [
+    BenchmarkCase('MissionService.evaluate_user', 8, evaluate_user,
+                  'usuário, missão, avaliação existente, saldo, 2x cargos de nível, participante (2)'),
+    BenchmarkCase('MissionService.adjust_evaluation', 6, adjust_evaluation,
+                  'missão, avaliação, saldo, 2x cargos de nível, avaliação'),
+    BenchmarkCase('EconomyService.buy_item', 4, buy_item, 'item, usuário, saldo, inventário'),
+    BenchmarkCase('EconomyService.equip_item', 3, equip_item, 'usuário, item, equipar'),
+    BenchmarkCase('EconomyService.use_item', 4, use_item,
+                  'item, consumo + efeitos, 2x cargos de nível (só quando o nível muda)'),
+    BenchmarkCase('LevelingService.calculate_bonus', 0, calculate_bonus, 'cálculo puro (multiplicadores no usuário)'),
+    BenchmarkCase('LevelingService.get_user_progress', 0, get_user_progress, 'cálculo puro'),
+    BenchmarkCase('InventoryCog.view_inventory', 3 + len(INVENTORY_ITEMS), inventory_cog,
+                  'usuário, item equipado, um item por entrada do inventário (+ consumível)'),
+    BenchmarkCase('UserCog.view_profile', 4, profile_cog, 'usuário, 2x cargos de nível, item equipado'),
+]
+
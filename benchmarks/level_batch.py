@@ -0,0 +1,75 @@
+"""
+Compara o cálculo de nível/progresso usuário a usuário com o cálculo em lote.
+
+Gera uma coluna sintética de XP (distribuição parecida com a real: muitos
+usuários nos primeiros níveis e uma cauda longa) e mede:
+
+- ``get_user_progress`` chamado uma vez por usuário (o caminho do /perfil);
+- ``calculate_levels`` com ``array('q')``;
+- ``calculate_levels`` com ``numpy.ndarray``, se o NumPy estiver instalado.
+
+Uso:
+    python -m benchmarks.level_batch                    # 1M de usuários
+    python -m benchmarks.level_batch --users 100000 --repeat 5
+"""
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Callable, List, Tuple
+
+from src.services.leveling_service import LevelingService
+
+
+def xp_column(users: int, seed: int = 42) -> array:
+    """XP sintético: exponencial com média ~20k e alguns veteranos com XP muito alto."""
+    rng = random.Random(seed)
+    column = array('q', (int(rng.expovariate(1 / 20_000)) for _ in range(users)))
+    for i in range(0, users, 1000):
+        column[i] = rng.randrange(10**9, 10**12)
+    return column
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Menor tempo (s) entre ``repeat`` execuções."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Nível/progresso: usuário a usuário x em lote.')
+    parser.add_argument('--users', type=int, default=1_000_000, help='Tamanho da coluna de XP.')
+    parser.add_argument('--repeat', type=int, default=3, help='Execuções por caso (vale a melhor).')
+    args = parser.parse_args()
+
+    leveling = LevelingService(user_repo=None, rewards_repo=None)
+    column = xp_column(args.users)
+
+    cases: List[Tuple[str, Callable[[], object]]] = [
+        ('get_user_progress (escalar)', lambda: [leveling.get_user_progress(xp) for xp in column]),
+        ("calculate_levels (array('q'))", lambda: leveling.calculate_levels(column)),
+    ]
+    try:
+        import numpy as np
+        numpy_column = np.frombuffer(column, dtype=np.int64)
+        cases.append(('calculate_levels (numpy)', lambda: leveling.calculate_levels(numpy_column)))
+    except ImportError:
+        print('NumPy não instalado: caso numpy ignorado', file=sys.stderr)
+
+    baseline = None
+    print(f"{'caso':<32} {'usuários':>10} {'tempo s':>9} {'ns/usuário':>11} {'speedup':>8}")
+    for name, func in cases:
+        elapsed = best_of(args.repeat, func)
+        baseline = baseline or elapsed
+        print(f'{name:<32} {args.users:>10} {elapsed:>9.3f} {elapsed / args.users * 1e9:>11.1f} '
+              f'{baseline / elapsed:>7.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Compara a memória (RSS) do cache de membros completo com o mínimo.
+
+Cada política roda em um processo separado, que monta uma guilda sintética com
+objetos reais do discord.py (Member/User) e mede o RSS antes e depois de
+receber todos os membros como viriam no chunk do gateway.
+
+Uso:
+    python -m benchmarks.member_cache                   # guilda de 50k membros
+    python -m benchmarks.member_cache --members 100000
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+from typing import Dict, List
+
+import discord
+
+from src.bot.members import MEMBER_CACHE_FULL, MEMBER_CACHE_MINIMAL, build_intents, build_member_cache_flags
+
+GUILD_ID = 1
+ROLE_IDS = [str(role_id) for role_id in range(10, 20)]
+
+
+def rss_kb() -> int:
+    """RSS atual do processo em KB (``ru_maxrss`` onde não há /proc)."""
+    try:
+        with open('/proc/self/status', encoding='utf-8') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def guild_payload(members: int) -> Dict:
+    roles = [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0,
+              'hoist': False, 'managed': False, 'mentionable': False}]
+    roles += [{'id': role_id, 'name': f'Nível {role_id}', 'permissions': '0', 'position': i + 1, 'color': 0,
+               'hoist': False, 'managed': False, 'mentionable': False} for i, role_id in enumerate(ROLE_IDS)]
+    return {'id': str(GUILD_ID), 'name': 'Guilda sintética', 'member_count': members, 'roles': roles,
+            'channels': [], 'threads': [], 'members': [], 'emojis': [], 'stickers': [], 'features': []}
+
+
+def member_payload(i: int) -> Dict:
+    return {'user': {'id': str(1_000_000 + i), 'username': f'aventureiro{i}', 'discriminator': '0',
+                     'global_name': f'Aventureiro {i}', 'avatar': None},
+            'roles': ROLE_IDS[:i % 4], 'joined_at': '2025-01-01T00:00:00+00:00',
+            'deaf': False, 'mute': False, 'flags': 0}
+
+
+def measure_policy(policy: str, members: int, lru_size: int) -> Dict:
+    """Monta a guilda com a política dada e retorna o RSS medido (roda no processo filho)."""
+    intents = build_intents('default,members,message_content')
+    client = discord.Client(intents=intents, member_cache_flags=build_member_cache_flags(policy, intents))
+    state = client._connection
+    guild = discord.Guild(data=guild_payload(members), state=state)
+
+    gc.collect()
+    before = rss_kb()
+
+    # Com o cache completo o chunk guarda todos; no mínimo só o LRU do MemberResolver fica com alguns
+    lru: List[discord.Member] = []
+    cache_joined = state.member_cache_flags.joined
+    for i in range(members):
+        member = discord.Member(data=member_payload(i), guild=guild, state=state)
+        if cache_joined:
+            guild._add_member(member)
+        else:
+            lru.append(member)
+            if len(lru) > lru_size:
+                lru.pop(0)
+
+    gc.collect()
+    after = rss_kb()
+    return {'policy': policy, 'members': members, 'cached': len(guild.members) + len(lru),
+            'rss_before_kb': before, 'rss_after_kb': after, 'delta_kb': after - before}
+
+
+def run_isolated(policy: str, members: int, lru_size: int) -> Dict:
+    """Executa ``measure_policy`` em um processo novo para o RSS de uma não afetar a outra."""
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.member_cache', '--policy', policy,
+                             '--members', str(members), '--lru-size', str(lru_size)],
+                            capture_output=True, text=True, check=True, env=os.environ)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Memória do cache de membros: completo x mínimo.')
+    parser.add_argument('--members', type=int, default=50_000, help='Membros da guilda sintética.')
+    parser.add_argument('--lru-size', type=int, default=1024, help='Tamanho do LRU do MemberResolver.')
+    parser.add_argument('--policy', choices=[MEMBER_CACHE_FULL, MEMBER_CACHE_MINIMAL],
+                        help='Mede só uma política no processo atual (uso interno).')
+    args = parser.parse_args()
+
+    if args.policy:
+        print(json.dumps(measure_policy(args.policy, args.members, args.lru_size)))
+        return 0
+
+    rows = [run_isolated(policy, args.members, args.lru_size) for policy in (MEMBER_CACHE_FULL, MEMBER_CACHE_MINIMAL)]
+    print(f"{'política':<10} {'membros':>8} {'em cache':>9} {'RSS antes':>11} {'RSS depois':>11} {'delta':>10}")
+    for row in rows:
+        print(f"{row['policy']:<10} {row['members']:>8} {row['cached']:>9} {row['rss_before_kb'] / 1024:>9.1f}MB "
+              f"{row['rss_after_kb'] / 1024:>9.1f}MB {row['delta_kb'] / 1024:>8.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
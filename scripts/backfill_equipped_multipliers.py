@@ -0,0 +1,36 @@
+import asyncio
+import logging
+
+from src.database.connection import connect_to_database
+from src.repositories.item_repository import ItemRepository
+from src.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_equipped_multipliers():
+    """Grava em ``users`` os multiplicadores do item equipado (todos os servidores).
+
+    Usuários que já estavam com um item equipado antes de os multiplicadores
+    serem guardados no perfil ficam com 1.0 (sem bônus) até isto rodar. A
+    migração é idempotente: cada item regrava os multiplicadores compilados
+    dos seus efeitos passivos em quem está com ele equipado.
+    """
+    logger.info("Iniciando a gravação dos multiplicadores dos itens equipados")
+    db = await connect_to_database()
+
+    item_repo = ItemRepository(db)
+    user_repo = UserRepository(db)
+
+    total = 0
+    for item in await item_repo.get_all():
+        updated = await user_repo.sync_equipped_multipliers(item.item_id, item.multipliers)
+        if updated:
+            logger.info(f"Item {item.name}: multiplicadores {item.multipliers} gravados em {updated} usuários")
+        total += updated
+
+    logger.info(f"{total} usuários com os multiplicadores do item equipado atualizados")
+
+if __name__ == "__main__":
+    # Roda o loop async
+    asyncio.run(backfill_equipped_multipliers())
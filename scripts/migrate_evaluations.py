@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from src.database.connection import connect_to_database
+from src.database.models.mission import EvaluationModel
+from src.repositories.missions_repository import MissionRepository
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de avaliações enviadas por bulk_write
+BATCH_SIZE = 500
+
+
+async def migrate_evaluations():
+    """Copia os avaliadores embutidos em ``missions.evaluators`` para a coleção ``evaluations``.
+
+    A migração é idempotente: cada avaliação é gravada com upsert + ``$setOnInsert``
+    pela chave (mission_id, user_id), então rodar de novo não duplica nem sobrescreve
+    avaliações já migradas. Após copiar, o array legado é removido da missão.
+    """
+    logger.info("Iniciando migração das avaliações")
+    db = await connect_to_database()
+
+    mission_repo = MissionRepository(db)
+    await mission_repo.ensure_indexes()
+
+    cursor = db.missions.find(
+        {'evaluators.0': {'$exists': True}},
+        {'evaluators': 1}
+    )
+
+    operations = []
+    migrated_missions = []
+    total = 0
+
+    async for mission in cursor:
+        for evaluator in mission['evaluators']:
+            # Documentos antigos podem ter o nível salvo como level_at_time
+            evaluator.setdefault('user_level_at_time', evaluator.pop('level_at_time', 0))
+            evaluation = EvaluationModel(mission_id=mission['_id'], **evaluator)
+
+            operations.append(UpdateOne(
+                {'mission_id': evaluation.mission_id, 'user_id': evaluation.user_id},
+                {'$setOnInsert': evaluation.model_dump()},
+                upsert=True
+            ))
+
+        migrated_missions.append(mission['_id'])
+
+        if len(operations) >= BATCH_SIZE:
+            await db.evaluations.bulk_write(operations, ordered=False)
+            total += len(operations)
+            operations = []
+
+    if operations:
+        await db.evaluations.bulk_write(operations, ordered=False)
+        total += len(operations)
+
+    # Remove o array legado somente depois que tudo foi copiado
+    if migrated_missions:
+        await db.missions.update_many(
+            {'_id': {'$in': migrated_missions}},
+            {'$unset': {'evaluators': ''}}
+        )
+
+    logger.info(f"{total} avaliações de {len(migrated_missions)} missões migradas")
+
+if __name__ == "__main__":
+    # Roda o loop async
+    asyncio.run(migrate_evaluations())
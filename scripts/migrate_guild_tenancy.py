@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from src.app.config import GUILD_ID, MISSION_CHANNEL_ID, MOD_LOG_CHANNEL_ID
+from src.database.connection import connect_to_database
+from src.database.models.guild_config import GuildConfigModel
+from src.repositories.guild_config_repository import GuildConfigRepository
+from src.repositories.ledger_repository import LedgerRepository
+from src.repositories.level_rewards_repository import LevelRewardsRepository
+from src.repositories.missions_repository import MissionRepository
+from src.repositories.stats_repository import StatsRepository
+from src.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de usuários atualizados por bulk_write
+BATCH_SIZE = 500
+
+# Coleções que só ganham o campo guild_id
+GUILD_SCOPED_COLLECTIONS = ['missions', 'evaluations', 'ledger', 'level_rewards']
+
+# Índices antigos, sem o servidor, substituídos pelos novos
+LEGACY_INDEXES = [('evaluations', 'user_evaluate_at'), ('ledger', 'user_position')]
+
+
+async def migrate_guild_tenancy(guild_id: int):
+    """Converte um banco de servidor único para o modelo multi-servidor.
+
+    - ``users``: documentos antigos (``_id`` = ID do usuário) recebem ``user_id`` e
+      ``guild_id``; o ``_id`` antigo é mantido, pois não pode ser alterado.
+    - missões, avaliações, ledger e recompensas de nível recebem ``guild_id``.
+    - snapshots do ledger e buckets diários, que eram por usuário/dia, são
+      descartados e recalculados no próximo snapshot/rollup.
+    - a configuração de canais do .env vira o documento do servidor em ``guild_configs``.
+
+    A migração é idempotente: só altera documentos que ainda não têm os campos novos.
+
+    Args:
+        guild_id (int): Servidor dono dos dados existentes.
+    """
+    logger.info(f"Iniciando migração multi-servidor para o servidor {guild_id}")
+    db = await connect_to_database()
+
+    # Usuários: o ID do usuário sai do _id e vai para o campo user_id
+    operations = []
+    total = 0
+    async for user in db.users.find({'user_id': {'$exists': False}}, {'_id': 1}):
+        operations.append(UpdateOne({'_id': user['_id']},
+                                    {'$set': {'user_id': user['_id'], 'guild_id': guild_id}}))
+
+        if len(operations) >= BATCH_SIZE:
+            await db.users.bulk_write(operations, ordered=False)
+            total += len(operations)
+            operations = []
+
+    if operations:
+        await db.users.bulk_write(operations, ordered=False)
+        total += len(operations)
+    logger.info(f"{total} usuários migrados")
+
+    for name in GUILD_SCOPED_COLLECTIONS:
+        result = await db[name].update_many({'guild_id': {'$exists': False}}, {'$set': {'guild_id': guild_id}})
+        logger.info(f"{result.modified_count} documentos de {name} migrados")
+
+    for collection, index in LEGACY_INDEXES:
+        try:
+            await db[collection].drop_index(index)
+            logger.info(f"Índice antigo {collection}.{index} removido")
+        except Exception:
+            # Já removido em uma execução anterior
+            pass
+
+    # Snapshots e buckets são recalculados com a chave nova
+    await db.ledger_snapshots.drop()
+    await db.ledger_state.delete_one({'_id': LedgerRepository.SNAPSHOT_STATE_ID})
+    await db.stats_daily.drop()
+    await db.rollup_state.delete_one({'_id': StatsRepository.ROLLUP_NAME})
+    logger.info("Snapshots do ledger e buckets diários descartados para recálculo")
+
+    config_repo = GuildConfigRepository(db)
+    if await config_repo.get(guild_id) is None:
+        await config_repo.save(GuildConfigModel(guild_id=guild_id,
+                                                mission_channel_id=MISSION_CHANNEL_ID,
+                                                mod_log_channel_id=MOD_LOG_CHANNEL_ID))
+
+    await UserRepository(db).ensure_indexes()
+    await LevelRewardsRepository(db).ensure_indexes()
+    await MissionRepository(db).ensure_indexes()
+    await LedgerRepository(db).ensure_indexes()
+    await StatsRepository(db).ensure_indexes()
+
+    logger.info("Migração multi-servidor concluída")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Migra os dados de servidor único para o modelo multi-servidor.')
+    parser.add_argument('--guild-id', type=int, default=GUILD_ID,
+                        help='Servidor dono dos dados existentes (padrão: GUILD_ID do .env).')
+    args = parser.parse_args()
+
+    if args.guild_id is None:
+        parser.error('informe --guild-id ou defina GUILD_ID no .env')
+
+    # Roda o loop async
+    asyncio.run(migrate_guild_tenancy(args.guild_id))
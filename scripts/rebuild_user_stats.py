@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from src.database.connection import connect_to_database
+from src.repositories.missions_repository import MissionRepository
+from src.repositories.user_repository import UserRepository
+from src.utils.guild_scope import scoped_guild
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_user_stats():
+    """Reconstrói os contadores de contribuição (``users.stats``) a partir da coleção de avaliações.
+
+    Os contadores são mantidos incrementalmente pelo bot; este job existe para
+    corrigir divergências ou inicializar os contadores após a migração. Cada
+    servidor é reconstruído separadamente.
+    """
+    logger.info("Iniciando reconstrução dos contadores de contribuição")
+    db = await connect_to_database()
+
+    mission_repo = MissionRepository(db)
+    user_repo = UserRepository(db)
+
+    for guild_id in await db.users.distinct('guild_id'):
+        with scoped_guild(guild_id):
+            stats_by_user = await mission_repo.aggregate_user_stats()
+            logger.info(f"Servidor {guild_id}: contadores calculados para {len(stats_by_user)} usuários")
+
+            await user_repo.replace_stats(stats_by_user)
+
+if __name__ == "__main__":
+    # Roda o loop async
+    asyncio.run(rebuild_user_stats())
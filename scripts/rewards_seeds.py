@@ -4,6 +4,7 @@ import logging
 from src.database.connection import connect_to_database
 from src.repositories.level_rewards_repository import LevelRewardsRepository
 from src.database.models.level_rewards import LevelRewardsModel
+from src.utils.guild_scope import main_guild_scope
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +55,11 @@ async def seed_rewards():
         )
     ]
 
-    for reward in rewards_data:
-        logger.info(f"Criando recompensa {reward.role_name}")
-        await rewards_repo.create(reward)
+    # Os cargos são do servidor principal (GUILD_ID)
+    with main_guild_scope():
+        for reward in rewards_data:
+            logger.info(f"Criando recompensa {reward.role_name}")
+            await rewards_repo.create(reward)
 
 if __name__ == "__main__":
     # Roda o loop async
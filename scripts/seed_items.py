@@ -2,9 +2,10 @@ import asyncio
 import logging
 
 from src.database.models.item import ItemModel, ItemType
-from src.database.models.effects import AddXpEffect, CoinBoostPassive, AddCoinsEffect, XpBoostPassive, GiveRoleEffect
+from src.database.models.effects import AddXpEffect, CoinBoostPassive, AddCoinsEffect, XpBoostPassive, GiveRoleEffect, TimedBoostEffect
 from src.database.connection import connect_to_database
 from src.repositories.item_repository import ItemRepository
+from src.repositories.user_repository import UserRepository
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ async def seed_items():
     db = await connect_to_database()
 
     item_repo = ItemRepository(db)
+    user_repo = UserRepository(db)
 
     items_data = [
         # --- TIER 1: O Aventureiro Júnior (Iniciante) ---
@@ -112,6 +114,41 @@ async def seed_items():
             item_type=ItemType.EQUIPPABLE,
             effect=None,
             passive_effects=[XpBoostPassive(type='xp_boost', multiplier=0.50)]
+        ),
+
+        # --- CONSUMÍVEIS: usados com /usar ---
+
+        ItemModel(
+            _id=11,
+            name='Café Expresso do Deploy',
+            description='[+100 XP] Uma dose concentrada de cafeína para sobreviver ao deploy de sexta-feira.',
+            price=300,
+            item_type=ItemType.CONSUMABLE,
+            effect=AddXpEffect(type='add_xp', amount=100)
+        ),
+        ItemModel(
+            _id=12,
+            name='Pergaminho da Documentação Perdida',
+            description='[+500 XP] Dizem que alguém, um dia, escreveu a documentação. Ler concede sabedoria imediata.',
+            price=1400,
+            item_type=ItemType.CONSUMABLE,
+            effect=AddXpEffect(type='add_xp', amount=500)
+        ),
+        ItemModel(
+            _id=13,
+            name='Poção de Hotfix',
+            description='[+50% XP por 1h] Efeito rápido e temporário, como todo hotfix que vai para produção.',
+            price=900,
+            item_type=ItemType.CONSUMABLE,
+            effect=TimedBoostEffect(type='timed_boost', boost='xp_boost', multiplier=0.50, duration_minutes=60)
+        ),
+        ItemModel(
+            _id=14,
+            name='Amuleto da Sexta-Feira',
+            description='[+25% MOEDAS por 2h] Sorte em dobro para quem faz deploy na sexta.',
+            price=700,
+            item_type=ItemType.CONSUMABLE,
+            effect=TimedBoostEffect(type='timed_boost', boost='coin_boost', multiplier=0.25, duration_minutes=120)
         )
     ]
 
@@ -119,6 +156,11 @@ async def seed_items():
         logger.info(f"Criando item {item.name}")
         await item_repo.upsert(item)
 
+        # Quem já está com o item equipado recebe os multiplicadores atualizados
+        updated = await user_repo.sync_equipped_multipliers(item.item_id, item.multipliers)
+        if updated:
+            logger.info(f"Multiplicadores do item {item.name} atualizados em {updated} usuários")
+
 if __name__ == "__main__":
     # Roda o loop async
     asyncio.run(seed_items())
\ No newline at end of file
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from src.database.connection import connect_to_database
+from src.database.models.level_curve import LevelCurveKind, LevelCurveModel
+from src.repositories.level_curve_repository import LevelCurveRepository
+from src.services.level_curve import LevelTable, build_curve
+
+logger = logging.getLogger(__name__)
+
+
+async def set_level_curve(curve: LevelCurveModel):
+    """Valida e grava a curva de XP em uso.
+
+    Os processos do bot relêem a curva periodicamente, então a troca vale
+    sem reiniciar. A curva é validada (tabela de limiares crescente) antes
+    de gravar; uma curva inválida não chega ao banco.
+
+    Args:
+        curve (LevelCurveModel): Nova curva.
+    """
+    table = LevelTable(build_curve(curve), curve.max_level)
+    logger.info(f"Curva {curve.kind.value}: nível 10 em {table.threshold(10)} XP, "
+                f"nível {curve.max_level} em {table.threshold(curve.max_level)} XP")
+
+    db = await connect_to_database()
+    await LevelCurveRepository(db).save(curve)
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Define a curva de XP dos níveis (vale para todos os processos).')
+    parser.add_argument('--kind', choices=[kind.value for kind in LevelCurveKind],
+                        default=LevelCurveKind.QUADRATIC.value, help='Formato da curva.')
+    parser.add_argument('--factor', type=int, default=150, help='XP do nível 1 (curvas quadráticas).')
+    parser.add_argument('--points', type=json.loads, default=[],
+                        help='Pontos [[nível, xp], ...] da curva por trechos, começando em [0, 0].')
+    parser.add_argument('--tail-start', type=int, help='Último nível quadrático da cauda exponencial.')
+    parser.add_argument('--tail-growth', type=float, help='Crescimento do custo de cada nível da cauda (> 1).')
+    parser.add_argument('--max-level', type=int, default=1000, help='Nível máximo da tabela.')
+    parser.add_argument('--season', help='Rótulo da temporada.')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    model = LevelCurveModel(kind=args.kind, factor=args.factor, points=args.points,
+                            tail_start=args.tail_start, tail_growth=args.tail_growth,
+                            max_level=args.max_level, season=args.season, updated_at=datetime.now())
+    try:
+        asyncio.run(set_level_curve(model))
+    except ValueError as e:
+        parser.error(f'curva inválida: {e}')
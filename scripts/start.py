@@ -3,13 +3,21 @@ from pymongo import AsyncMongoClient
 
 from src.database.connection import connect_to_database
 from src.repositories.user_repository import UserRepository
+from src.repositories.ledger_repository import LedgerRepository
+from src.services.ledger_service import LedgerService
+from src.database.models.ledger import LedgerReason
+from src.utils.guild_scope import main_guild_scope
 
 
 async def start():
     db = await connect_to_database()
 
-    item_repo = UserRepository(db)
+    # Registra o ajuste manual no ledger
+    ledger = LedgerService(LedgerRepository(db))
+    item_repo = UserRepository(db, ledger=ledger)
 
-    await item_repo.add_xp_coins(user_id=593837748566097931, xp=0, coins=1000)
+    with main_guild_scope():
+        await item_repo.add_xp_coins(user_id=593837748566097931, xp=0, coins=1000, reason=LedgerReason.ADMIN)
+    await ledger.flush()
 
-asyncio.run(start())
\ No newline at end of file
+asyncio.run(start())
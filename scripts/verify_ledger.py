@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import logging
+
+from src.database.connection import connect_to_database
+from src.database.models.ledger import LedgerEntryModel, LedgerReason
+from src.repositories.ledger_repository import LedgerRepository
+from src.services.ledger_service import LedgerService
+
+logger = logging.getLogger(__name__)
+
+
+async def verify_ledger(snapshot: bool, bootstrap: bool):
+    """Reconcilia o ledger com os saldos de ``users``.
+
+    Args:
+        snapshot (bool): Atualiza os snapshots antes de verificar.
+        bootstrap (bool): Registra as divergências como entradas de saldo inicial.
+            Use uma única vez, com o bot parado, para saldos anteriores ao ledger.
+    """
+    db = await connect_to_database()
+
+    ledger_repo = LedgerRepository(db)
+    await ledger_repo.ensure_indexes()
+    ledger = LedgerService(ledger_repo)
+
+    if snapshot:
+        await ledger.take_snapshots()
+
+    report = await ledger.verify(db.users)
+
+    for mismatch in report['mismatches'][:50]:
+        logger.warning(
+            f"Usuário {mismatch['user_id']} (servidor {mismatch['guild_id']}): saldo {mismatch['xp']} XP / {mismatch['coins']} moedas, "
+            f"ledger {mismatch['ledger_xp']} XP / {mismatch['ledger_coins']} moedas"
+        )
+
+    if bootstrap and report['mismatches']:
+        for mismatch in report['mismatches']:
+            ledger.record(LedgerEntryModel(
+                user_id=mismatch['user_id'],
+                guild_id=mismatch['guild_id'],
+                xp=mismatch['xp'] - mismatch['ledger_xp'],
+                coins=mismatch['coins'] - mismatch['ledger_coins'],
+                reason=LedgerReason.OPENING_BALANCE
+            ))
+        await ledger.flush()
+        logger.info(f"{len(report['mismatches'])} entradas de saldo inicial registradas")
+
+    logger.info(f"{report['checked']} usuários verificados, {len(report['mismatches'])} divergências")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reconcilia o ledger de economia com os saldos dos usuários.')
+    parser.add_argument('--snapshot', action='store_true', help='Atualiza os snapshots antes de verificar.')
+    parser.add_argument('--bootstrap', action='store_true', help='Registra as divergências como saldo inicial.')
+    args = parser.parse_args()
+
+    # Roda o loop async
+    asyncio.run(verify_ledger(args.snapshot, args.bootstrap))
@@ -39,9 +39,43 @@ def get_mongo_uri():
     return None
 
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
-GUILD_ID = os.getenv('GUILD_ID')
+# Servidor principal: destino do sync dos slash commands, dono dos dados anteriores ao
+# multi-servidor e servidor dos scripts que usam main_guild_scope()
+GUILD_ID = int(os.getenv('GUILD_ID')) if os.getenv('GUILD_ID') else None
 DATABASE_NAME = os.getenv('DATABASE_NAME')
 MONGO_URI = get_mongo_uri()
-MISSION_CHANNEL_ID = int(os.getenv('MISSION_CHANNEL_ID'))
-MOD_LOG_CHANNEL_ID = int(os.getenv('MOD_LOG_CHANNEL_ID'))
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
\ No newline at end of file
+# Canais do servidor principal; os demais servidores usam a coleção guild_configs
+# (comando /configurar_canais). Também servem de semente para o GUILD_ID.
+MISSION_CHANNEL_ID = int(os.getenv('MISSION_CHANNEL_ID')) if os.getenv('MISSION_CHANNEL_ID') else None
+MOD_LOG_CHANNEL_ID = int(os.getenv('MOD_LOG_CHANNEL_ID')) if os.getenv('MOD_LOG_CHANNEL_ID') else None
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+
+# Comandos do MongoDB acima deste tempo (ms) são logados como consultas lentas
+MONGO_SLOW_QUERY_MS = int(os.getenv('MONGO_SLOW_QUERY_MS', '100'))
+
+# Fração do prazo de 3s do Discord a partir da qual uma interação gera aviso no log
+INTERACTION_WARN_RATIO = float(os.getenv('INTERACTION_WARN_RATIO', '0.7'))
+
+# Logging: arquivo em JSON lines, tamanho da fila do QueueHandler e limite de
+# mensagens INFO por logger por segundo (0 desliga a amostragem)
+LOG_JSON = os.getenv('LOG_JSON', 'false').lower() in ('1', 'true', 'yes')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_PER_SECOND = int(os.getenv('LOG_SAMPLE_PER_SECOND', '20'))
+
+
+# Intents do gateway (lista separada por vírgulas; ver src.bot.members.build_intents),
+# política do cache de membros ('full' ou 'minimal') e se o bot baixa todos os
+# membros ao conectar. Em servidores grandes, 'minimal' sem chunk reduz bastante a memória,
+# mas quem sai do servidor sem ter sido visto desde o boot perde os cargos guardados.
+# Sem CHUNK_GUILDS_AT_STARTUP, o chunk acompanha o cache 'full' (ver src.bot.members.should_chunk_guilds).
+DISCORD_INTENTS = os.getenv('DISCORD_INTENTS', 'default,members,message_content')
+MEMBER_CACHE = os.getenv('MEMBER_CACHE', 'full')
+CHUNK_GUILDS_AT_STARTUP = (os.getenv('CHUNK_GUILDS_AT_STARTUP').lower() in ('1', 'true', 'yes')
+                           if os.getenv('CHUNK_GUILDS_AT_STARTUP') else None)
+MEMBER_LRU_SIZE = int(os.getenv('MEMBER_LRU_SIZE', '1024'))
+
+# Leases no MongoDB para rodar vários processos do bot: tarefas únicas (rollup,
+# snapshots, encerramento de missões) só rodam no processo que detém a lease.
+# INSTANCE_ID identifica o processo nos logs/leases (padrão: host:pid).
+LEASE_TTL_SECONDS = float(os.getenv('LEASE_TTL_SECONDS', '30'))
+INSTANCE_ID = os.getenv('INSTANCE_ID')
@@ -1,11 +1,195 @@
+import atexit
+import json
 import logging
-import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Optional
 import logging.handlers
 
+from src.app.config import LOG_JSON, LOG_QUEUE_SIZE, LOG_SAMPLE_PER_SECOND
+from src.utils.origin import get_origin
 
-def setup_logging():
-    """Configura o sistema de logging"""
+# Formatos padrões dos logs
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+DATE_FORMAT = '%d-%m-%Y %H:%M:%S'
+
+# Intervalo (s) entre os avisos de mensagens suprimidas/descartadas
+OVERLOAD_REPORT_INTERVAL = 60.0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON por linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'origin': getattr(record, 'origin', None),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateSampler(logging.Filter):
+    """Limita quantas mensagens INFO/DEBUG cada logger pode emitir por segundo.
+
+    Avisos e erros nunca são suprimidos. O filtro roda no loop, antes do
+    registro entrar na fila, então mensagens descartadas não custam formatação.
+    """
+
+    def __init__(self, max_per_second: int, overrides: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_per_second (int): Limite padrão por logger (0 desliga a amostragem).
+            overrides (Optional[Dict[str, int]]): Limites específicos por nome de logger.
+        """
+        super().__init__()
+        self.max_per_second = max_per_second
+        self.overrides = overrides or {}
+        self.suppressed: Counter = Counter()
+        self._windows: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+
+        limit = self.overrides.get(record.name, self.max_per_second)
+        if limit <= 0:
+            return True
+
+        second = int(record.created)
+        with self._lock:
+            window = self._windows.get(record.name)
+            if window is None or window[0] != second:
+                window = self._windows[record.name] = [second, 0]
+            window[1] += 1
+            if window[1] <= limit:
+                return True
+            self.suppressed[record.name] += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler com fila limitada que descarta (e conta) quando a fila enche.
+
+    Só a mensagem é montada no loop; data, JSON, traceback e escrita em disco
+    ficam para a thread do QueueListener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Junta msg + args agora: os objetos referenciados podem mudar depois
+        record.msg = record.getMessage()
+        record.args = None
+        # Origem (comando/evento) da task que gerou o log, lida enquanto ainda estamos nela
+        record.origin = get_origin()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class ReportingQueueListener(logging.handlers.QueueListener):
+    """QueueListener que, de tempos em tempos, avisa sobre registros perdidos."""
+
+    pipeline: Optional['LoggingPipeline'] = None
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        if self.pipeline is not None:
+            self.pipeline.report_overload()
+
+
+class LoggingPipeline:
+    """Handlers reais (arquivo/console) alimentados por uma fila em outra thread."""
+
+    def __init__(self, handler: NonBlockingQueueHandler, listener: ReportingQueueListener,
+                 sampler: Optional[RateSampler]):
+        self.handler = handler
+        self.listener = listener
+        listener.pipeline = self
+        self.sampler = sampler
+        self._last_report = time.monotonic()
+        self._reported_dropped = 0
+        self._reported_suppressed: Counter = Counter()
+
+    def stats(self) -> Dict[str, object]:
+        """Contadores de sobrecarga: descartes por fila cheia e supressões por logger."""
+        return {
+            'queue_size': self.handler.queue.qsize(),
+            'queue_max': self.handler.queue.maxsize,
+            'dropped': self.handler.dropped,
+            'suppressed': dict(self.sampler.suppressed) if self.sampler else {},
+        }
+
+    def report_overload(self, force: bool = False) -> None:
+        """Loga (com WARNING) o que foi descartado/suprimido desde o último aviso."""
+        now = time.monotonic()
+        if not force and now - self._last_report < OVERLOAD_REPORT_INTERVAL:
+            return
+        self._last_report = now
+
+        dropped = self.handler.dropped - self._reported_dropped
+        self._reported_dropped = self.handler.dropped
+
+        suppressed = Counter()
+        if self.sampler:
+            current = Counter(self.sampler.suppressed)
+            suppressed = current - self._reported_suppressed
+            self._reported_suppressed = current
+
+        if dropped or suppressed:
+            top = ', '.join(f'{name}={count}' for name, count in suppressed.most_common(5))
+            logging.getLogger(__name__).warning(
+                'Logging sobrecarregado: %d registros descartados (fila cheia), %d suprimidos pela amostragem [%s]',
+                dropped, sum(suppressed.values()), top)
+
+    def stop(self) -> None:
+        """Esvazia a fila e encerra a thread do listener."""
+        self.report_overload(force=True)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def setup_logging(json_lines: Optional[bool] = None,
+                  queue_size: Optional[int] = None,
+                  sample_per_second: Optional[int] = None) -> LoggingPipeline:
+    """Configura o sistema de logging.
+
+    O logger raiz recebe só um QueueHandler; os handlers de arquivo e console
+    rodam na thread de um QueueListener, fora do event loop.
+
+    Args:
+        json_lines (Optional[bool]): Grava o arquivo em JSON lines (padrão: LOG_JSON).
+        queue_size (Optional[int]): Tamanho máximo da fila (padrão: LOG_QUEUE_SIZE).
+        sample_per_second (Optional[int]): Limite de INFO/DEBUG por logger por segundo
+            (padrão: LOG_SAMPLE_PER_SECOND; 0 desliga).
+
+    Returns:
+        LoggingPipeline: Pipeline configurado (use ``stop()`` ao encerrar).
+    """
+    json_lines = LOG_JSON if json_lines is None else json_lines
+    queue_size = LOG_QUEUE_SIZE if queue_size is None else queue_size
+    sample_per_second = LOG_SAMPLE_PER_SECOND if sample_per_second is None else sample_per_second
 
     # Garante a existência da pasta logs
     root_dir = Path(__file__).resolve().parent.parent.parent
@@ -17,29 +201,43 @@ def setup_logging():
     if not log_dir.exists():
         log_dir.mkdir(parents=True, exist_ok=True)
 
-    # Define os formatos padrões dos logs
-    log_format = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
-    date_format = '%d-%m-%Y %H:%M:%S'
-    formatter = logging.Formatter(log_format,date_format)
-
-    # Obtem o logger raiz
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
 
     # Handler para o arquivo
     # Com RotatingFileHandler é criado um novo arquivo com base no máximo de bytes dele
     file_handler = logging.handlers.RotatingFileHandler(
-        filename=f'{log_dir}/app.log',
+        filename=f'{log_dir}/{"app.jsonl" if json_lines else "app.log"}',
         maxBytes=5*1024*1024,
         backupCount=2,
         encoding='utf-8'
     )
     file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
 
     # Cria o Handler para o console
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+
+    # Fila entre o loop (produtor) e a thread de escrita (consumidor)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.setLevel(logging.INFO)
+
+    sampler = None
+    if sample_per_second > 0:
+        sampler = RateSampler(sample_per_second)
+        queue_handler.addFilter(sampler)
+
+    listener = ReportingQueueListener(queue_handler.queue, file_handler, console_handler,
+                                      respect_handler_level=True)
+    pipeline = LoggingPipeline(queue_handler, listener, sampler)
+
+    # Obtem o logger raiz. Nenhum handler aceita DEBUG, então o nível INFO evita
+    # criar registros que seriam descartados logo em seguida.
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(queue_handler)
+
+    listener.start()
+    atexit.register(pipeline.stop)
+    return pipeline
@@ -1,12 +1,21 @@
+import argparse
+
 from src.bot.client import TheCodeSageBot
 from src.app.config import DISCORD_TOKEN
 from src.app.logging_ import setup_logging
 
-setup_logging()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inicia o bot Code Sage.')
+    parser.add_argument('--force-sync', action='store_true',
+                        help='Sincroniza os slash commands mesmo sem mudanças na árvore.')
+    args = parser.parse_args(argv)
 
-def main():
-    bot = TheCodeSageBot()
-    bot.run(DISCORD_TOKEN)
+    # Configurado aqui (e não no import) para que importar o módulo não tenha efeitos colaterais
+    logging_pipeline = setup_logging()
+    bot = TheCodeSageBot(force_sync=args.force_sync)
+    # Os logs do discord.py usam o pipeline em fila (sem handler próprio no loop)
+    bot.run(DISCORD_TOKEN, log_handler=None)
+    logging_pipeline.stop()
 
 if __name__ == '__main__':
     main()
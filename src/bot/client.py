@@ -3,18 +3,37 @@ import pathlib
 import discord
 from discord.ext import commands
 import logging
-from src.app.config import GUILD_ID
+from src.app.config import GUILD_ID, DISCORD_INTENTS, MEMBER_CACHE, CHUNK_GUILDS_AT_STARTUP, MEMBER_LRU_SIZE
 
 
-from src.database.connection import connect_to_database
+from src.database.connection import connect_to_database, mongo_telemetry
+from src.bot.tree import InstrumentedCommandTree
+from src.bot.rest import RestScheduler
+from src.bot.members import MemberResolver, build_intents, build_member_cache_flags, should_chunk_guilds
+from src.bot.jobs import JobRegistry
 from src.repositories.user_repository import UserRepository
 from src.repositories.item_repository import ItemRepository
 from src.repositories.missions_repository import MissionRepository
 from src.repositories.level_rewards_repository import LevelRewardsRepository
+from src.repositories.stats_repository import StatsRepository
+from src.repositories.ledger_repository import LedgerRepository
+from src.repositories.bot_state_repository import BotStateRepository
+from src.repositories.guild_config_repository import GuildConfigRepository
+from src.repositories.lease_repository import LeaseRepository
+from src.repositories.idempotency_repository import IdempotencyRepository
+from src.repositories.storefront_repository import StorefrontRepository
+from src.repositories.level_curve_repository import LevelCurveRepository
 from src.services.mission_service import MissionService
 from src.services.leveling_service import LevelingService
 from src.services.economy_service import EconomyService
 from src.services.sage_service import SageService
+from src.services.analytics_service import AnalyticsService
+from src.services.ledger_service import LedgerService, SNAPSHOT_INTERVAL
+from src.services.guild_config_service import GuildConfigService
+from src.services.idempotency_service import IdempotencyService
+from src.services.shop_service import ShopService
+from src.services.level_curve_service import LevelCurveService
+from src.services.onboarding_service import OnboardingService
 
 
 logger = logging.getLogger(__name__)
@@ -26,25 +45,58 @@ class TheCodeSageBot(commands.Bot):
     Responsável por inicializar repositórios, serviços, carregar cogs e
     sincronizar slash commands com o Discord.
     """
-    def __init__(self):
+    def __init__(self, force_sync: bool = False):
         """Inicializa a instância do bot.
 
         Configura o prefixo de comandos e as intents necessárias. As
         dependências (repositórios/serviços) são configuradas no setup_hook.
+
+        Args:
+            force_sync (bool): Sincroniza os slash commands mesmo sem mudanças na árvore.
         """
+        intents = build_intents(DISCORD_INTENTS)
+
         # Herda da classe pai
         super().__init__(command_prefix='/', # Define o comando padrão
-                         intents=discord.Intents.all() # Define as intents do bot
+                         intents=intents, # Define as intents do bot (DISCORD_INTENTS)
+                         member_cache_flags=build_member_cache_flags(MEMBER_CACHE, intents),
+                         # Sem chunk, membros são buscados sob demanda (e os cargos de quem sai fora do cache se perdem)
+                         chunk_guilds_at_startup=should_chunk_guilds(MEMBER_CACHE, intents, CHUNK_GUILDS_AT_STARTUP),
+                         tree_cls=InstrumentedCommandTree # Mede a latência de comandos e autocompletes
                          )
+        self.force_sync = force_sync
         self.rewards_repo = None
+        self.bot_state_repo = None
+        # Canais de cada servidor, em memória (lidos por helpers e Cogs)
+        self.guild_configs = None
+        self.stats_repo = None
+        self.ledger_repo = None
         self.mission_repo = None
         self.item_repo = None
         self.user_repo = None
         self.db = None
+        # Tarefas em segundo plano coordenadas por leases no MongoDB (Cogs registram as suas)
+        self.jobs = None
+        # Métricas dos comandos enviados ao MongoDB (lidas pelo /telemetria_banco)
+        self.mongo_telemetry = mongo_telemetry
+        # Orçamento e métricas das chamadas REST feitas pelo bot (lidas pelo /limites_discord)
+        self.rest_scheduler = RestScheduler()
+        self.rest_scheduler.install_log_filter()
+        # Membros fora do cache do discord.py são buscados via REST (com LRU)
+        self.member_resolver = MemberResolver(self.rest_scheduler, maxsize=MEMBER_LRU_SIZE)
         self.mission_service = None
         self.leveling_service = None
         self.economy_service = None
+        self.shop_service = None
         self.sage_service = None
+        self.analytics_service = None
+        self.ledger_service = None
+        # Tabela da curva de XP em uso, relida periodicamente do banco
+        self.level_curves = None
+        # Fila de entrada de membros (cadastro em lote, DMs e cargos restaurados)
+        self.onboarding = None
+        # Deduplicação de interações com efeitos colaterais (/avaliar, compras na loja)
+        self.idempotency = None
 
 
     async def setup_hook(self):
@@ -59,17 +111,51 @@ class TheCodeSageBot(commands.Bot):
         # Conecta ao banco de dados e armazena a conexão na instância do bot
         self.db = await connect_to_database()
 
+        # Tarefas únicas/por shard: só rodam no processo que detém a lease
+        lease_repo = LeaseRepository(self.db)
+        await lease_repo.ensure_indexes()
+        self.jobs = JobRegistry(lease_repo)
+
+        # O ledger recebe toda alteração de saldo feita pelo repositório de usuários
+        self.ledger_repo = LedgerRepository(self.db)
+        self.ledger_service = LedgerService(self.ledger_repo)
+        self.ledger_service.start()
+        self.jobs.singleton('ledger_snapshots', SNAPSHOT_INTERVAL.total_seconds(),
+                            lambda lease: self.ledger_service.take_snapshots(fence=lease.token))
+
         # Inicializa cada repositório explicitamente
-        self.user_repo = UserRepository(self.db)
+        self.user_repo = UserRepository(self.db, ledger=self.ledger_service)
         self.item_repo = ItemRepository(self.db)
         self.mission_repo = MissionRepository(self.db)
         self.rewards_repo = LevelRewardsRepository(self.db)
+        self.stats_repo = StatsRepository(self.db)
+        self.bot_state_repo = BotStateRepository(self.db)
+        self.guild_configs = GuildConfigService(GuildConfigRepository(self.db))
+        await self.guild_configs.load()
+        self.level_curves = LevelCurveService(LevelCurveRepository(self.db))
+        await self.level_curves.reload()
+        self.level_curves.start()
+
+        # Garante os índices das coleções que dependem deles
+        await self.user_repo.ensure_indexes()
+        await self.rewards_repo.ensure_indexes()
+        await self.mission_repo.ensure_indexes()
+        await self.stats_repo.ensure_indexes()
+        await self.ledger_repo.ensure_indexes()
+        idempotency_repo = IdempotencyRepository(self.db)
+        await idempotency_repo.ensure_indexes()
 
         # inicializa os services
-        self.leveling_service = LevelingService(self.user_repo, self.rewards_repo, self.item_repo)
+        self.leveling_service = LevelingService(self.user_repo, self.rewards_repo,
+                                                self.rest_scheduler, self.member_resolver, self.level_curves)
         self.mission_service = MissionService(self.mission_repo, self.leveling_service,self.user_repo)
-        self.economy_service = EconomyService(self.user_repo, self.item_repo)
+        self.economy_service = EconomyService(self.user_repo, self.item_repo, self.leveling_service)
+        self.shop_service = ShopService(self.item_repo, StorefrontRepository(self.db))
         self.sage_service = SageService()
+        self.analytics_service = AnalyticsService(self.stats_repo)
+        self.idempotency = IdempotencyService(idempotency_repo)
+        self.onboarding = OnboardingService(self.user_repo, self.rest_scheduler)
+        self.onboarding.start()
 
         logger.info("Services e Repositories inicializados com sucesso!")
 
@@ -89,6 +175,10 @@ class TheCodeSageBot(commands.Bot):
                 except Exception as e:
                     logger.warning(f'Falha ao carregar o cog {filename[:-3]}: {e}')
 
+        # Com os Cogs carregados, todas as tarefas já estão registradas
+        self.jobs.start()
+        logger.info(f'Registro de tarefas iniciado como {self.jobs.owner}')
+
         # Sincronizamos os slaah commands com o discord
 
         """
@@ -97,10 +187,11 @@ class TheCodeSageBot(commands.Bot):
         await self.tree.sync()
         """
 
-        # sincronizar no servidor de testes
-        guild_obj = discord.Object(id=GUILD_ID)
-        self.tree.copy_global_to(guild=guild_obj)
-        await self.tree.sync(guild=guild_obj)
+        # sincronizar em cada servidor configurado (só quando a árvore mudou desde o último sync)
+        for guild_id in self.guild_configs.guild_ids() or [GUILD_ID]:
+            guild_obj = discord.Object(id=guild_id)
+            self.tree.copy_global_to(guild=guild_obj)
+            await self.tree.sync_if_changed(guild_obj, self.bot_state_repo, force=self.force_sync)
 
         logger.info(f'Hook criado com sucesso!')
 
@@ -113,6 +204,21 @@ class TheCodeSageBot(commands.Bot):
         """
         logger.info('Encerrando o bot...')
 
+        # Libera as leases para outro processo assumir as tarefas sem esperar o TTL
+        if self.jobs is not None:
+            await self.jobs.stop()
+
+        if self.level_curves is not None:
+            await self.level_curves.close()
+
+        # Cadastra quem entrou e ainda estava na fila
+        if self.onboarding is not None:
+            await self.onboarding.close()
+
+        # Grava as entradas do ledger que ainda estão no buffer
+        if self.ledger_service is not None:
+            await self.ledger_service.close()
+
         if self.db is not None:
             self.db.close()
             logger.info('Conexão com MongoDB encerrada.')
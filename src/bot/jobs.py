@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.app.config import INSTANCE_ID, LEASE_TTL_SECONDS
+from src.repositories.lease_repository import LeaseRepository
+from src.utils.origin import set_origin
+
+logger = logging.getLogger(__name__)
+
+# Prefixo das leases de presença: cada processo vivo renova a sua
+PROCESS_LEASE_PREFIX = 'process:'
+
+
+def default_owner() -> str:
+    """Identificador deste processo nas leases (INSTANCE_ID ou host:pid)."""
+    return INSTANCE_ID or f'{socket.gethostname()}:{os.getpid()}'
+
+
+@dataclass
+class Lease:
+    """Posse local de uma lease do MongoDB."""
+    name: str
+    token: int
+    valid_until: float  # time.monotonic()
+
+    def is_valid(self) -> bool:
+        """True enquanto a última renovação ainda garante a posse (pelo relógio local)."""
+        return time.monotonic() < self.valid_until
+
+
+@dataclass
+class Job:
+    """Tarefa registrada: única (``shards == 0``) ou dividida em shards por chave."""
+    name: str
+    interval: float
+    func: Callable[[Any], Awaitable[Any]]
+    shards: int = 0
+    leases: Dict[int, Lease] = field(default_factory=dict)
+    last_run: Optional[float] = None
+    runs: int = 0
+    failures: int = 0
+    running: Optional[asyncio.Task] = None
+
+    def lease_name(self, shard: int) -> str:
+        return f'{self.name}:{shard}' if self.shards else self.name
+
+
+class JobRegistry:
+    """Agenda as tarefas em segundo plano de forma segura com vários processos do bot.
+
+    - ``singleton``: roda em um único processo, o dono da lease da tarefa.
+    - ``sharded``: as chaves são divididas em ``shards`` (ex: ``mission_id % shards``)
+      e cada processo adquire uma parte justa das leases dos shards, então
+      adicionar processos divide o trabalho.
+
+    A cada batida (``ttl / 3``) o registro renova a própria presença e as
+    leases que detém, adquire as livres e dispara as tarefas vencidas. Se um
+    processo morre, as leases dele expiram em até ``ttl`` segundos e outro
+    processo assume; o fencing token da nova posse é maior que o da anterior.
+    """
+
+    def __init__(self, lease_repo: LeaseRepository, owner: Optional[str] = None, ttl: float = LEASE_TTL_SECONDS):
+        """
+        Args:
+            lease_repo (LeaseRepository): Repositório das leases.
+            owner (Optional[str]): Identificador deste processo (padrão: INSTANCE_ID ou host:pid).
+            ttl (float): Validade (s) de uma lease sem renovação.
+        """
+        self.lease_repo = lease_repo
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.heartbeat_interval = ttl / 3
+        self.jobs: Dict[str, Job] = {}
+        self._presence: Optional[Lease] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def singleton(self, name: str, interval: float, func: Callable[[Lease], Awaitable[Any]]) -> None:
+        """Registra uma tarefa que roda em um único processo.
+
+        Args:
+            name (str): Nome da tarefa (e da lease).
+            interval (float): Intervalo (s) entre execuções; a primeira roda ao adquirir a lease.
+            func (Callable[[Lease], Awaitable]): Tarefa; recebe a lease (``token`` para escritas protegidas).
+        """
+        self.jobs[name] = Job(name=name, interval=interval, func=func)
+
+    def sharded(self, name: str, shards: int, interval: float, func: Callable[[List[int]], Awaitable[Any]]) -> None:
+        """Registra uma tarefa dividida em shards entre os processos.
+
+        Args:
+            name (str): Nome da tarefa (as leases são '<name>:<shard>').
+            shards (int): Quantidade de shards.
+            interval (float): Intervalo (s) entre execuções.
+            func (Callable[[List[int]], Awaitable]): Tarefa; recebe os shards detidos por este processo.
+        """
+        self.jobs[name] = Job(name=name, interval=interval, func=func, shards=shards)
+
+    async def unregister(self, name: str) -> None:
+        """Remove a tarefa e libera as leases dela (ex: Cog descarregado)."""
+        job = self.jobs.pop(name, None)
+        if job is not None:
+            await self._release_all(job)
+
+    def start(self) -> None:
+        """Inicia o loop de batidas em segundo plano."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Para o loop e libera todas as leases, para outro processo assumir sem esperar o TTL."""
+        if self._loop_task:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+        for job in self.jobs.values():
+            if job.running and not job.running.done():
+                job.running.cancel()
+            await self._release_all(job)
+
+        if self._presence:
+            await self.lease_repo.release(self._presence.name, self.owner, self._presence.token)
+            self._presence = None
+
+    async def _run(self) -> None:
+        set_origin('tarefa:leases')
+        while True:
+            try:
+                await self.heartbeat()
+                self.run_pending()
+            except Exception as e:
+                logger.error(f'Erro no registro de tarefas: {e}', exc_info=True)
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def heartbeat(self) -> None:
+        """Renova a presença e as leases deste processo e adquire as que estiverem livres."""
+        self._presence = await self._hold(PROCESS_LEASE_PREFIX + self.owner, self._presence)
+
+        for job in list(self.jobs.values()):
+            if job.shards:
+                await self._balance_shards(job)
+            else:
+                lease = await self._hold(job.name, job.leases.get(0))
+                self._set_lease(job, 0, lease)
+
+    def run_pending(self) -> List[asyncio.Task]:
+        """Dispara, em tasks próprias, as tarefas cujo intervalo venceu e cujas leases são válidas.
+
+        Returns:
+            List[asyncio.Task]: Execuções iniciadas nesta chamada.
+        """
+        started = []
+        now = time.monotonic()
+        for job in self.jobs.values():
+            if job.running and not job.running.done():
+                continue
+            if job.last_run is not None and now - job.last_run < job.interval:
+                continue
+
+            held = sorted(shard for shard, lease in job.leases.items() if lease.is_valid())
+            if not held:
+                continue
+
+            job.last_run = now
+            argument = held if job.shards else job.leases[0]
+            job.running = asyncio.get_running_loop().create_task(self._execute(job, argument))
+            started.append(job.running)
+        return started
+
+    async def _execute(self, job: Job, argument: Any) -> None:
+        set_origin(f'tarefa:{job.name}')
+        try:
+            await job.func(argument)
+            job.runs += 1
+        except Exception as e:
+            job.failures += 1
+            logger.error(f'Erro na tarefa {job.name}: {e}', exc_info=True)
+
+    async def _hold(self, name: str, lease: Optional[Lease]) -> Optional[Lease]:
+        """Renova a lease detida ou tenta adquiri-la; retorna a posse atual (None se não detém)."""
+        now = time.monotonic()
+        if lease is not None:
+            if await self.lease_repo.renew(name, self.owner, lease.token, self.ttl):
+                lease.valid_until = now + self.ttl - self.heartbeat_interval
+                return lease
+            logger.warning(f'Lease {name} perdida (token {lease.token})')
+
+        token = await self.lease_repo.acquire(name, self.owner, self.ttl)
+        if token is None:
+            return None
+        return Lease(name=name, token=token, valid_until=now + self.ttl - self.heartbeat_interval)
+
+    def _set_lease(self, job: Job, shard: int, lease: Optional[Lease]) -> None:
+        previous = job.leases.get(shard)
+        if lease is None:
+            job.leases.pop(shard, None)
+            return
+
+        job.leases[shard] = lease
+        if previous is None or previous.token != lease.token:
+            logger.info(f'Lease {lease.name} adquirida por {self.owner} (token {lease.token})')
+            # Nova posse: roda logo, sem esperar o intervalo do dono anterior
+            job.last_run = None
+
+    async def _balance_shards(self, job: Job) -> None:
+        """Mantém com este processo uma parte justa dos shards (total / processos vivos)."""
+        processes = max(len(await self.lease_repo.list_active(PROCESS_LEASE_PREFIX)), 1)
+        fair_share = math.ceil(job.shards / processes)
+
+        for shard in sorted(job.leases):
+            lease = job.leases[shard]
+            if await self.lease_repo.renew(lease.name, self.owner, lease.token, self.ttl):
+                lease.valid_until = time.monotonic() + self.ttl - self.heartbeat_interval
+            else:
+                logger.warning(f'Lease {lease.name} perdida (token {lease.token})')
+                job.leases.pop(shard)
+
+        # Um processo novo entrou: devolve o excedente para ele adquirir
+        while len(job.leases) > fair_share:
+            shard = max(job.leases)
+            lease = job.leases.pop(shard)
+            await self.lease_repo.release(lease.name, self.owner, lease.token)
+
+        if len(job.leases) >= fair_share:
+            return
+
+        taken = {lease.name for lease in await self.lease_repo.list_active(f'{job.name}:')}
+        for shard in range(job.shards):
+            if len(job.leases) >= fair_share:
+                break
+            name = job.lease_name(shard)
+            if shard in job.leases or name in taken:
+                continue
+            self._set_lease(job, shard, await self._hold(name, None))
+
+    async def _release_all(self, job: Job) -> None:
+        for lease in job.leases.values():
+            await self.lease_repo.release(lease.name, self.owner, lease.token)
+        job.leases.clear()
@@ -0,0 +1,172 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import discord
+
+from src.bot.rest import RestScheduler, run_rest
+
+logger = logging.getLogger(__name__)
+
+# Políticas de cache de membros aceitas em MEMBER_CACHE
+MEMBER_CACHE_FULL = 'full'  # padrão do discord.py: todo membro visto fica em memória
+MEMBER_CACHE_MINIMAL = 'minimal'  # só o próprio bot; o resto vem do MemberResolver
+
+# Quanto tempo um membro buscado via REST continua válido no LRU
+DEFAULT_MEMBER_TTL = 300.0
+
+
+def build_intents(spec: str) -> discord.Intents:
+    """Monta as intents a partir de uma lista separada por vírgulas.
+
+    Aceita 'all', 'default' e 'none' como base e nomes de flags do discord.py
+    (ex: 'default,members,message_content'); um '-' na frente remove a flag.
+
+    Args:
+        spec (str): Especificação das intents.
+
+    Returns:
+        discord.Intents: Intents configuradas.
+
+    Raises:
+        ValueError: Se algum nome não for uma intent válida.
+    """
+    intents = discord.Intents.none()
+    for raw in (part.strip() for part in spec.split(',')):
+        if not raw:
+            continue
+        if raw in ('all', 'default', 'none'):
+            intents.value |= getattr(discord.Intents, raw)().value
+            continue
+
+        enabled = not raw.startswith('-')
+        name = raw.lstrip('-')
+        if name not in discord.Intents.VALID_FLAGS:
+            raise ValueError(f'Intent desconhecida: {name}')
+        setattr(intents, name, enabled)
+    return intents
+
+
+def build_member_cache_flags(policy: str, intents: discord.Intents) -> discord.MemberCacheFlags:
+    """Converte a política de cache (MEMBER_CACHE) em MemberCacheFlags.
+
+    Args:
+        policy (str): 'full' ou 'minimal'.
+        intents (discord.Intents): Intents em uso (o cache completo depende delas).
+
+    Returns:
+        discord.MemberCacheFlags: Flags para o ``commands.Bot``.
+    """
+    if policy == MEMBER_CACHE_FULL:
+        return discord.MemberCacheFlags.from_intents(intents)
+    if policy == MEMBER_CACHE_MINIMAL:
+        return discord.MemberCacheFlags.none()
+    raise ValueError(f"Política de cache de membros desconhecida: {policy} (use 'full' ou 'minimal')")
+
+
+def should_chunk_guilds(policy: str, intents: discord.Intents, configured: Optional[bool] = None) -> bool:
+    """Decide se o bot baixa todos os membros dos servidores ao conectar.
+
+    Sem configuração explícita, o chunk acompanha o cache completo (como no
+    discord.py): a saída de um membro só traz os cargos dele se ele estiver em
+    cache, então desligar o chunk é uma troca explícita (memória x cargos guardados).
+
+    Args:
+        policy (str): 'full' ou 'minimal' (MEMBER_CACHE).
+        intents (discord.Intents): Intents em uso (o chunk exige a intent de membros).
+        configured (Optional[bool]): CHUNK_GUILDS_AT_STARTUP, se definido.
+
+    Returns:
+        bool: True para baixar os membros ao conectar.
+    """
+    if configured is not None:
+        return configured
+    return policy == MEMBER_CACHE_FULL and intents.members
+
+
+class MemberResolver:
+    """Busca membros no cache do discord.py e, se não estiverem lá, via REST com um LRU pequeno.
+
+    Com o cache de membros reduzido, ``guild.get_member`` retorna None para
+    quem não interagiu desde o boot; o ``fetch_member`` cobre esses casos e o
+    LRU evita repetir a chamada em sequências curtas (avaliação + sync de cargos).
+
+    Cada servidor tem o próprio LRU (``maxsize`` por servidor), para que um
+    servidor movimentado não expulse os membros recentes dos outros.
+    """
+
+    def __init__(self,
+                 rest_scheduler: Optional[RestScheduler] = None,
+                 maxsize: int = 1024,
+                 ttl: float = DEFAULT_MEMBER_TTL):
+        """
+        Args:
+            rest_scheduler (Optional[RestScheduler]): Scheduler usado no ``fetch_member``.
+            maxsize (int): Quantidade máxima de membros no LRU de cada servidor.
+            ttl (float): Validade (s) de um membro buscado via REST.
+        """
+        self.rest_scheduler = rest_scheduler
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._partitions: Dict[int, 'OrderedDict[int, Tuple[float, discord.Member]]'] = {}
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    async def resolve(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Retorna o membro do servidor, ou None se ele não estiver mais lá.
+
+        Args:
+            guild (discord.Guild): Servidor.
+            user_id (int): ID do usuário.
+
+        Returns:
+            Optional[discord.Member]: O membro ou None se não existir (ou em caso de erro).
+        """
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.hits += 1
+            return member
+
+        partition = self._partitions.setdefault(guild.id, OrderedDict())
+        cached = partition.get(user_id)
+        if cached is not None:
+            fetched_at, member = cached
+            if time.monotonic() - fetched_at < self.ttl:
+                partition.move_to_end(user_id)
+                self.hits += 1
+                return member
+            del partition[user_id]
+
+        self.misses += 1
+        try:
+            self.fetches += 1
+            member = await run_rest(self.rest_scheduler, 'fetch_member', lambda: guild.fetch_member(user_id))
+        except discord.NotFound:
+            return None
+        except discord.HTTPException as e:
+            logger.warning('Falha ao buscar o membro %s no servidor %s: %s', user_id, guild.id, e)
+            return None
+
+        partition[user_id] = (time.monotonic(), member)
+        if len(partition) > self.maxsize:
+            partition.popitem(last=False)
+        return member
+
+    def forget(self, guild_id: int, user_id: int) -> None:
+        """Remove o membro do LRU (após sair do servidor ou ter os cargos alterados)."""
+        partition = self._partitions.get(guild_id)
+        if partition is not None:
+            partition.pop(user_id, None)
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Descarta o LRU inteiro de um servidor (ex: o bot foi removido dele)."""
+        self._partitions.pop(guild_id, None)
+
+    def partition_sizes(self) -> Dict[int, int]:
+        """Quantidade de membros no LRU de cada servidor."""
+        return {guild_id: len(partition) for guild_id, partition in self._partitions.items()}
+
+    def __len__(self) -> int:
+        return sum(len(partition) for partition in self._partitions.values())
@@ -0,0 +1,417 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import discord
+
+from src.utils.context import get_origin
+from src.utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class Priority(IntEnum):
+    """Prioridade de uma chamada REST (menor = atendida antes)."""
+    INTERACTION = 0  # efeitos colaterais de um comando/componente em andamento
+    EVENT = 1  # reação a eventos do gateway (boas-vindas, threads novas)
+    BACKGROUND = 2  # tarefas agendadas (encerramento automático de missões)
+    BULK = 3  # jobs em lote (restauração/sincronização de cargos)
+
+
+# Fração do orçamento da rota que precisa estar livre para cada prioridade
+# começar: jobs em segundo plano deixam folga para o tráfego interativo.
+RESERVED_HEADROOM: Dict[Priority, float] = {Priority.BACKGROUND: 0.25, Priority.BULK: 0.5}
+
+# Orçamentos por rota lógica: (requisições, janela em segundos).
+# São conservadores em relação aos limites do Discord, que variam por canal/servidor.
+DEFAULT_ROUTE_BUDGETS: Dict[str, Tuple[int, float]] = {
+    'member_roles': (10, 10.0),
+    'dm': (5, 5.0),
+    'channel_message': (5, 5.0),
+    'thread_edit': (5, 10.0),
+    'fetch_message': (10, 5.0),
+}
+DEFAULT_BUDGET: Tuple[int, float] = (5, 5.0)
+
+# Limite global do Discord: 50 requisições por segundo por bot
+GLOBAL_BUDGET: Tuple[int, float] = (50, 1.0)
+
+# Após um 429 a taxa da rota cai pela metade e volta aos poucos a cada sucesso
+PENALTY_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+MIN_RATE_RATIO = 0.1
+
+# Buckets (ms) do tempo de espera na fila e da duração das chamadas
+REST_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Rota lógica da chamada em andamento, usada para atribuir os 429 logados pelo discord.py
+current_route: ContextVar[Optional[str]] = ContextVar('current_route', default=None)
+# Retry-after dos 429 já registrados na chamada em andamento (evita contar o mesmo 429 no log e na exceção)
+_call_rate_limits: ContextVar[Optional[List[float]]] = ContextVar('_call_rate_limits', default=None)
+
+_RATE_LIMIT_PATTERN = re.compile(r'We are being rate limited\.')
+
+
+def priority_for_origin(origin: str) -> Priority:
+    """Deduz a prioridade a partir da origem da task atual.
+
+    Args:
+        origin (str): Origem registrada (ex: '/avaliar', 'evento:on_member_join', 'tarefa:...').
+
+    Returns:
+        Priority: INTERACTION para comandos/componentes, EVENT para eventos e BACKGROUND no resto.
+    """
+    if origin.startswith('/') or origin.startswith('componente:'):
+        return Priority.INTERACTION
+    if origin.startswith('evento:'):
+        return Priority.EVENT
+    return Priority.BACKGROUND
+
+
+class RouteBucket:
+    """Token bucket de uma rota com fila de espera ordenada por prioridade."""
+
+    def __init__(self, capacity: int, per: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity (int): Requisições permitidas por janela.
+            per (float): Tamanho da janela em segundos.
+            clock (Callable[[], float]): Relógio monotônico (substituível nos testes).
+        """
+        self.capacity = capacity
+        self.base_rate = capacity / per
+        self.rate = self.base_rate
+        self.tokens = float(capacity)
+        self.blocked_until = 0.0
+        self._clock = clock
+        self._updated = clock()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+    def headroom(self) -> float:
+        """Fração do orçamento disponível agora (0 enquanto a rota estiver bloqueada por 429)."""
+        now = self._refill()
+        if now < self.blocked_until:
+            return 0.0
+        return (self.tokens / self.capacity) * (self.rate / self.base_rate)
+
+    def seconds_until(self, fraction: float) -> float:
+        """Tempo estimado até o bucket ter ``fraction`` do orçamento livre."""
+        now = self._refill()
+        blocked = max(0.0, self.blocked_until - now)
+        needed = fraction * self.capacity * self.base_rate / self.rate - self.tokens
+        return blocked + max(0.0, needed / self.rate)
+
+    async def acquire(self, priority: int) -> None:
+        """Consome um token, esperando na fila de prioridade se necessário."""
+        now = self._refill()
+        if not self._waiters and now >= self.blocked_until and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._schedule(loop)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # O token já tinha sido entregue: devolve para o próximo da fila
+            if future.done() and not future.cancelled():
+                self.refund()
+            raise
+
+    def refund(self) -> None:
+        """Devolve um token que foi consumido sem chamada (ex: task cancelada logo depois de recebê-lo)."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+        if self._waiters:
+            self._schedule(asyncio.get_running_loop())
+
+    def penalize(self, retry_after: float) -> None:
+        """Bloqueia a rota por ``retry_after`` segundos e reduz a taxa (após um 429)."""
+        now = self._refill()
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.rate = max(self.base_rate * MIN_RATE_RATIO, self.rate * PENALTY_FACTOR)
+        self.tokens = min(self.tokens, 0.0)
+        self._reschedule()
+
+    def reward(self) -> None:
+        """Recupera parte da taxa após uma chamada bem-sucedida."""
+        if self.rate < self.base_rate:
+            self._refill()
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+
+    def _reschedule(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if self._waiters:
+            self._schedule(asyncio.get_running_loop())
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._wakeup is not None or not self._waiters:
+            return
+        now = self._refill()
+        delay = max(0.0, self.blocked_until - now, (1 - self.tokens) / self.rate)
+        self._wakeup = loop.call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._wakeup = None
+        now = self._refill()
+
+        while self._waiters and now >= self.blocked_until and self.tokens >= 1:
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+
+        # Descarta quem desistiu (cancelado) do topo da fila
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters:
+            self._schedule(asyncio.get_running_loop())
+
+
+@dataclass
+class RouteStats:
+    """Métricas acumuladas de uma rota lógica."""
+    route: str
+    failures: int = 0
+    rate_limited: int = 0
+    retry_after_total: float = 0.0
+    retry_after_max: float = 0.0
+    by_priority: Dict[str, int] = field(default_factory=dict)
+    queued: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(REST_BUCKETS_MS))
+    latency: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(REST_BUCKETS_MS))
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    def observe_rate_limit(self, retry_after: float) -> None:
+        self.rate_limited += 1
+        self.retry_after_total += retry_after
+        self.retry_after_max = max(self.retry_after_max, retry_after)
+
+    def copy(self) -> 'RouteStats':
+        return RouteStats(self.route, self.failures, self.rate_limited, self.retry_after_total,
+                          self.retry_after_max, dict(self.by_priority), self.queued.copy(), self.latency.copy())
+
+
+class RateLimitLogFilter(logging.Filter):
+    """Filtro do logger ``discord.http`` que repassa os 429 ao scheduler.
+
+    O discord.py trata os 429 internamente (espera o retry-after e tenta de
+    novo) e só avisa pelo log; o aviso é emitido na mesma task que fez a
+    chamada, então ``current_route`` indica a rota lógica responsável.
+    """
+
+    def __init__(self, scheduler: 'RestScheduler'):
+        super().__init__()
+        self.scheduler = scheduler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING and _RATE_LIMIT_PATTERN.match(str(record.msg)):
+            args = record.args if isinstance(record.args, tuple) else ()
+            retry_after = args[2] if len(args) >= 3 and isinstance(args[2], (int, float)) else 0.0
+            self.scheduler.record_rate_limit(current_route.get(), float(retry_after))
+        return True
+
+
+class RestScheduler:
+    """Agenda as chamadas REST iniciadas pelo bot (fora da resposta de interações).
+
+    Cada rota lógica tem um orçamento próprio (token bucket) e todas dividem o
+    limite global. Quando falta orçamento, as chamadas esperam em ordem de
+    prioridade; jobs em segundo plano ainda aguardam uma folga mínima da rota
+    antes de começar, para não consumir o orçamento do tráfego interativo.
+    """
+
+    def __init__(self,
+                 budgets: Optional[Dict[str, Tuple[int, float]]] = None,
+                 default_budget: Tuple[int, float] = DEFAULT_BUDGET,
+                 global_budget: Tuple[int, float] = GLOBAL_BUDGET,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            budgets (Optional[Dict[str, Tuple[int, float]]]): Orçamento por rota (requisições, segundos).
+            default_budget (Tuple[int, float]): Orçamento das rotas não configuradas.
+            global_budget (Tuple[int, float]): Orçamento compartilhado por todas as rotas.
+            clock (Callable[[], float]): Relógio monotônico (substituível nos testes).
+        """
+        self.budgets = dict(DEFAULT_ROUTE_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self._clock = clock
+        self.global_bucket = RouteBucket(*global_budget, clock=clock)
+        self._buckets: Dict[str, RouteBucket] = {}
+        self._stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def bucket(self, route: str) -> RouteBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            capacity, per = self.budgets.get(route, self.default_budget)
+            bucket = self._buckets[route] = RouteBucket(capacity, per, clock=self._clock)
+        return bucket
+
+    def _route_stats(self, route: str) -> RouteStats:
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = RouteStats(route)
+        return stats
+
+    def headroom(self, route: str) -> float:
+        """Fração livre do orçamento da rota (limitada pela folga global)."""
+        return min(self.bucket(route).headroom(), self.global_bucket.headroom())
+
+    async def pace(self, route: str, min_headroom: float) -> None:
+        """Espera até a rota ter pelo menos ``min_headroom`` do orçamento livre.
+
+        Args:
+            route (str): Rota lógica.
+            min_headroom (float): Fração mínima (0 a 1) do orçamento que precisa estar livre.
+        """
+        bucket = self.bucket(route)
+        while bucket.headroom() < min_headroom:
+            await asyncio.sleep(max(bucket.seconds_until(min_headroom), 0.01))
+
+    async def submit(self,
+                     route: str,
+                     call: Callable[[], Awaitable[T]],
+                     priority: Optional[Priority] = None) -> T:
+        """Executa uma chamada REST respeitando o orçamento da rota.
+
+        A chamada roda na task de quem a submeteu, então exceções e a origem
+        (contextvar) seguem normalmente.
+
+        Args:
+            route (str): Rota lógica (ex: 'member_roles', 'dm').
+            call (Callable[[], Awaitable[T]]): Função que cria a corrotina da chamada.
+            priority (Optional[Priority]): Prioridade; se None, é deduzida da origem atual.
+
+        Returns:
+            T: O retorno da chamada.
+        """
+        if priority is None:
+            priority = priority_for_origin(get_origin())
+
+        queued_at = time.perf_counter()
+        reserved = RESERVED_HEADROOM.get(priority)
+        if reserved:
+            await self.pace(route, reserved)
+
+        bucket = self.bucket(route)
+        await bucket.acquire(priority)
+        try:
+            await self.global_bucket.acquire(priority)
+        except BaseException:
+            # Cancelada na fila global: o token da rota não foi usado
+            bucket.refund()
+            raise
+
+        started = time.perf_counter()
+        failed = False
+        limits: List[float] = []
+        token = current_route.set(route)
+        limits_token = _call_rate_limits.set(limits)
+        try:
+            result = await call()
+        except discord.RateLimited as e:
+            failed = True
+            # O discord.py loga o 429 antes de desistir (já contado pelo filtro); o bloqueio preventivo não
+            if not limits or limits[-1] != e.retry_after:
+                self.record_rate_limit(route, e.retry_after)
+            raise
+        except discord.HTTPException as e:
+            failed = True
+            if e.status == 429:
+                self.record_rate_limit(route, float(getattr(e, 'retry_after', 0.0) or 0.0))
+            raise
+        except Exception:
+            failed = True
+            raise
+        else:
+            # Um 429 tratado internamente pelo discord.py não conta como sucesso para a recuperação
+            if not limits:
+                bucket.reward()
+            return result
+        finally:
+            _call_rate_limits.reset(limits_token)
+            current_route.reset(token)
+            finished = time.perf_counter()
+            with self._lock:
+                stats = self._route_stats(route)
+                stats.failures += int(failed)
+                stats.by_priority[priority.name] = stats.by_priority.get(priority.name, 0) + 1
+                stats.queued.observe((started - queued_at) * 1000)
+                stats.latency.observe((finished - started) * 1000)
+
+    def record_rate_limit(self, route: Optional[str], retry_after: float) -> None:
+        """Registra um 429 e reduz o ritmo da rota.
+
+        Args:
+            route (Optional[str]): Rota lógica; None quando a chamada não passou pelo scheduler.
+            retry_after (float): Segundos informados pelo Discord.
+        """
+        name = route or 'fora_do_scheduler'
+        with self._lock:
+            self._route_stats(name).observe_rate_limit(retry_after)
+
+        limits = _call_rate_limits.get()
+        if limits is not None:
+            limits.append(retry_after)
+
+        if route is not None:
+            self.bucket(route).penalize(retry_after)
+
+        logger.warning('Rate limit do Discord na rota %s (retry-after %.2fs).', name, retry_after)
+
+    def install_log_filter(self, logger_name: str = 'discord.http') -> RateLimitLogFilter:
+        """Passa a contabilizar os 429 avisados pelo cliente HTTP do discord.py."""
+        log_filter = RateLimitLogFilter(self)
+        logging.getLogger(logger_name).addFilter(log_filter)
+        return log_filter
+
+    def snapshot(self) -> List[Tuple[RouteStats, float]]:
+        """Cópia das métricas por rota com a folga atual, dos mais limitados para os menos."""
+        with self._lock:
+            rows = [stats.copy() for stats in self._stats.values()]
+        result = [(stats, self.bucket(stats.route).headroom() if stats.route in self._buckets else 1.0)
+                  for stats in rows]
+        return sorted(result, key=lambda row: (row[0].rate_limited, row[0].count), reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+async def run_rest(scheduler: Optional[RestScheduler],
+                   route: str,
+                   call: Callable[[], Awaitable[Any]],
+                   priority: Optional[Priority] = None) -> Any:
+    """Submete a chamada ao scheduler, ou executa direto quando não há um."""
+    if scheduler is None:
+        return await call()
+    return await scheduler.submit(route, call, priority)
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+from discord.interactions import InteractionResponse
+
+from src.app.config import INTERACTION_WARN_RATIO
+from src.database.models.bot_state import CommandSyncStateModel
+from src.repositories.bot_state_repository import BotStateRepository
+from src.utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Prazo do Discord para responder (ou dar defer) em uma interação
+INTERACTION_DEADLINE_MS = 3000
+
+# Buckets das latências de interação (ms), concentrados perto do prazo de 3s
+INTERACTION_BUCKETS_MS: Tuple[float, ...] = (25, 50, 100, 250, 500, 1000, 1500, 2000, 2500, 3000, 5000, 10000, 30000)
+
+# Resultados possíveis de uma invocação
+OUTCOME_OK = 'ok'
+OUTCOME_FAILED = 'falha'  # check/erro tratado pelo discord.py (command_failed)
+OUTCOME_ERROR = 'erro'  # exceção que escapou do handler
+OUTCOME_NO_RESPONSE = 'sem_resposta'  # terminou sem responder nem dar defer
+
+
+class TimedInteractionResponse(InteractionResponse):
+    """InteractionResponse que registra o instante da primeira resposta.
+
+    Toda forma de resposta (defer, send_message, autocomplete, send_modal,
+    edit_message...) define ``_response_type`` antes de chamar a API, então o
+    setter marca o momento em que o handler respondeu.
+
+    Depende de internos do discord.py (``_response_type``, ``_cs_response`` e
+    ``CommandTree._call``): a versão é limitada no pyproject.toml e
+    tests/bot/test_tree.py falha se esses nomes mudarem.
+    """
+
+    __slots__ = ('_timed_response_type', 'first_response_at')
+
+    def __init__(self, parent: discord.Interaction):
+        self.first_response_at: Optional[float] = None
+        super().__init__(parent)
+
+    @property
+    def _response_type(self):
+        return self._timed_response_type
+
+    @_response_type.setter
+    def _response_type(self, value) -> None:
+        if value is not None and self.first_response_at is None:
+            self.first_response_at = time.perf_counter()
+        self._timed_response_type = value
+
+
+@dataclass
+class CommandTimings:
+    """Métricas acumuladas de um comando (ou do seu autocomplete)."""
+    name: str
+    kind: str
+    first_response: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(INTERACTION_BUCKETS_MS))
+    handler: LatencyHistogram = field(default_factory=lambda: LatencyHistogram(INTERACTION_BUCKETS_MS))
+    outcomes: Counter = field(default_factory=Counter)
+    near_deadline: int = 0
+
+    @property
+    def count(self) -> int:
+        return self.handler.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'count': self.count,
+            'near_deadline': self.near_deadline,
+            'outcomes': dict(self.outcomes),
+            'first_response': self.first_response.to_dict(),
+            'handler': self.handler.to_dict(),
+        }
+
+
+class InteractionMetrics:
+    """Agrega, em memória, as latências das interações por comando."""
+
+    def __init__(self, warn_ratio: float = 0.7, deadline_ms: float = INTERACTION_DEADLINE_MS):
+        """
+        Args:
+            warn_ratio (float): Fração do prazo a partir da qual a invocação gera um aviso (0.7 = 2,1s).
+            deadline_ms (float): Prazo do Discord para a primeira resposta.
+        """
+        self.warn_ratio = warn_ratio
+        self.deadline_ms = deadline_ms
+        self._timings: Dict[Tuple[str, str], CommandTimings] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @property
+    def warn_threshold_ms(self) -> float:
+        return self.deadline_ms * self.warn_ratio
+
+    def observe(self, name: str, kind: str, first_response_ms: Optional[float], handler_ms: float, outcome: str) -> None:
+        """Registra uma invocação.
+
+        Args:
+            name (str): Nome do comando (ex: '/avaliar').
+            kind (str): 'comando', 'autocomplete' ou 'menu'.
+            first_response_ms (Optional[float]): Tempo até a primeira resposta; None se não respondeu.
+            handler_ms (float): Tempo total do handler.
+            outcome (str): Resultado da invocação.
+        """
+        # Sem resposta, o que conta contra o prazo é o handler inteiro
+        elapsed_ms = first_response_ms if first_response_ms is not None else handler_ms
+        near_deadline = elapsed_ms >= self.warn_threshold_ms
+
+        with self._lock:
+            timings = self._timings.get((name, kind))
+            if timings is None:
+                timings = self._timings[(name, kind)] = CommandTimings(name, kind)
+
+            if first_response_ms is not None:
+                timings.first_response.observe(first_response_ms)
+            timings.handler.observe(handler_ms)
+            timings.outcomes[outcome] += 1
+            timings.near_deadline += int(near_deadline)
+
+        if near_deadline:
+            logger.warning('%s (%s) levou %.0f ms para responder (limite de aviso %.0f ms, prazo %.0f ms) — %s',
+                           name, kind, elapsed_ms, self.warn_threshold_ms, self.deadline_ms, outcome)
+
+    def snapshot(self) -> List[CommandTimings]:
+        """Cópia das métricas, da maior para a menor p99 de primeira resposta."""
+        with self._lock:
+            rows = [CommandTimings(t.name, t.kind, t.first_response.copy(), t.handler.copy(),
+                                   Counter(t.outcomes), t.near_deadline) for t in self._timings.values()]
+        return sorted(rows, key=lambda t: t.first_response.percentile(99), reverse=True)
+
+    def export(self) -> Dict[str, Any]:
+        """Métricas em formato serializável (JSON)."""
+        return {
+            'started_at': self.started_at,
+            'exported_at': time.time(),
+            'deadline_ms': self.deadline_ms,
+            'warn_threshold_ms': self.warn_threshold_ms,
+            'commands': [timings.to_dict() for timings in self.snapshot()],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self.started_at = time.time()
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """CommandTree que mede cada comando e autocomplete antes de delegar ao discord.py."""
+
+    def __init__(self, client: discord.Client, *, metrics: Optional[InteractionMetrics] = None, **kwargs: Any):
+        super().__init__(client, **kwargs)
+        self.metrics = metrics or InteractionMetrics(warn_ratio=INTERACTION_WARN_RATIO)
+
+    @staticmethod
+    def _metric_key(interaction: discord.Interaction) -> Tuple[str, str]:
+        data = interaction.data or {}
+        if interaction.type is discord.InteractionType.autocomplete:
+            kind = 'autocomplete'
+        elif data.get('type', 1) != 1:
+            kind = 'menu'
+        else:
+            kind = 'comando'
+
+        command = interaction.command
+        name = command.qualified_name if command is not None else data.get('name', '?')
+        return f'/{name}', kind
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        # Precisa ser instalado antes de qualquer acesso a interaction.response
+        response = TimedInteractionResponse(interaction)
+        interaction._cs_response = response
+
+        started = time.perf_counter()
+        outcome = OUTCOME_OK
+        try:
+            await super()._call(interaction)
+        except Exception:
+            outcome = OUTCOME_ERROR
+            raise
+        finally:
+            handler_ms = (time.perf_counter() - started) * 1000
+            first_response_ms = None
+            if response.first_response_at is not None:
+                first_response_ms = (response.first_response_at - started) * 1000
+
+            if outcome == OUTCOME_OK:
+                if interaction.command_failed:
+                    outcome = OUTCOME_FAILED
+                elif first_response_ms is None:
+                    outcome = OUTCOME_NO_RESPONSE
+
+            try:
+                name, kind = self._metric_key(interaction)
+                self.metrics.observe(name, kind, first_response_ms, handler_ms, outcome)
+            except Exception as e:
+                logger.error(f'Erro ao registrar a latência da interação: {e}', exc_info=True)
+
+    async def fingerprint(self, guild: Optional[discord.abc.Snowflake] = None) -> Tuple[str, int]:
+        """Calcula um hash estável da árvore de comandos como ela seria enviada no sync.
+
+        Usa o mesmo payload do ``sync`` (nomes, opções, permissões e traduções),
+        então qualquer mudança visível para o Discord altera o hash.
+
+        Args:
+            guild (Optional[discord.abc.Snowflake]): Servidor dos comandos (None para os globais).
+
+        Returns:
+            Tuple[str, int]: (hash SHA-256 em hexadecimal, quantidade de comandos de topo).
+        """
+        commands = self.get_commands(guild=guild)
+        translator = self.translator
+        if translator:
+            payload = [await command.get_translated_payload(self, translator) for command in commands]
+        else:
+            payload = [command.to_dict(self) for command in commands]
+
+        # A ordem de registro dos comandos de topo não importa para o Discord
+        payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest(), len(payload)
+
+    async def sync_if_changed(self,
+                              guild: discord.abc.Snowflake,
+                              state_repo: BotStateRepository,
+                              force: bool = False) -> bool:
+        """Sincroniza os comandos do servidor só quando a árvore mudou desde o último sync.
+
+        Args:
+            guild (discord.abc.Snowflake): Servidor que recebe os comandos.
+            state_repo (BotStateRepository): Onde fica o hash do último sync.
+            force (bool): Sincroniza mesmo com o hash igual (``--force-sync``).
+
+        Returns:
+            bool: True se o sync foi feito, False se foi ignorado.
+        """
+        fingerprint, count = await self.fingerprint(guild)
+        key = f'command_tree:{self.client.application_id}:{guild.id}'
+        previous = await state_repo.get_command_sync(key)
+
+        if not force and previous is not None and previous.fingerprint == fingerprint:
+            logger.info('Sync de comandos ignorado: árvore inalterada (%d comandos, hash %s). '
+                        'Economia estimada de %.0f ms (último sync em %s).',
+                        count, fingerprint[:12], previous.sync_ms, previous.synced_at)
+            return False
+
+        if force:
+            reason = 'forçado (--force-sync)'
+        elif previous is None:
+            reason = 'primeiro sync'
+        else:
+            reason = f'árvore alterada ({previous.fingerprint[:12]} -> {fingerprint[:12]})'
+
+        started = time.perf_counter()
+        await self.sync(guild=guild)
+        sync_ms = (time.perf_counter() - started) * 1000
+
+        await state_repo.save_command_sync(CommandSyncStateModel(key=key,
+                                                                 fingerprint=fingerprint,
+                                                                 command_count=count,
+                                                                 sync_ms=sync_ms,
+                                                                 synced_at=datetime.now()))
+        logger.info('Comandos sincronizados: %s, %d comandos em %.0f ms.', reason, count, sync_ms)
+        return True
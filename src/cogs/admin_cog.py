@@ -1,3 +1,5 @@
+import io
+import json
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -5,13 +7,14 @@ from discord.ext import commands
 import logging
 
 from src.database.models.user import UserStatus, UserModel
-from src.utils.helpers import is_mission_channel
-from src.utils.embeds import MissionEmbeds, create_error_embed, create_info_embed
+from src.utils.helpers import is_mission_channel, is_bot_operator
+from src.utils.embeds import MissionEmbeds, TelemetryEmbeds, create_error_embed, create_info_embed
+from src.utils.context import TrackedCog
 
 logger = logging.getLogger(__name__)
 
-class AdminCog(commands.Cog):
-    """Comandos administrativos (sync e ajustes de avaliação)."""
+class AdminCog(TrackedCog):
+    """Comandos administrativos (sync, ajustes de avaliação e telemetria)."""
     def __init__(self, bot):
         """Inicializa o Cog de Administração.
 
@@ -36,13 +39,19 @@ class AdminCog(commands.Cog):
         count = 0
         ignored = 0
 
+        # Sem chunk no boot o cache pode estar incompleto: pedimos a lista ao gateway
+        # sob demanda, sem guardar os membros no cache (cache=False)
+        guild = interaction.guild
+        members = guild.members if guild.chunked else await guild.chunk(cache=False)
+
         # Varre todos os membros do servidor
-        for member in interaction.guild.members:
+        for member in members:
             # se for um bot ignoramos
             if member.bot:
                 continue
 
-            user = UserModel(_id=member.id,
+            user = UserModel(user_id=member.id,
+                    guild_id=guild.id,
                     username=member.name,
                     xp=0,
                     coins=0,
@@ -66,6 +75,42 @@ class AdminCog(commands.Cog):
 
 
 
+    @app_commands.command(name="configurar_canais",
+                          description="[ADM] Define os canais de missões e da moderação deste servidor.")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(canal_missoes='Canal onde as threads viram missões',
+                           canal_moderacao='Canal que recebe revisões e alertas')
+    async def configure_channels(self,
+                                 interaction: discord.Interaction,
+                                 canal_missoes: discord.abc.GuildChannel = None,
+                                 canal_moderacao: discord.TextChannel = None):
+        """Grava a configuração de canais do servidor atual (apenas Admin).
+
+        Args:
+            interaction (discord.Interaction): Interação do comando.
+            canal_missoes (discord.abc.GuildChannel): Novo canal de missões (opcional).
+            canal_moderacao (discord.TextChannel): Novo canal da moderação (opcional).
+        """
+        await interaction.response.defer(ephemeral=True)
+
+        config = await self.bot.guild_configs.update(
+            interaction.guild_id,
+            mission_channel_id=canal_missoes.id if canal_missoes else None,
+            mod_log_channel_id=canal_moderacao.id if canal_moderacao else None
+        )
+
+        if config is None:
+            await interaction.followup.send(embed=create_error_embed(title='Erro ao configurar',
+                                                                     message='Não foi possível salvar a configuração.'))
+            return
+
+        mission = f'<#{config.mission_channel_id}>' if config.mission_channel_id else 'não definido'
+        moderation = f'<#{config.mod_log_channel_id}>' if config.mod_log_channel_id else 'não definido'
+        await interaction.followup.send(embed=create_info_embed(
+            title='Canais configurados',
+            message=f'Missões: {mission}\nModeração: {moderation}'
+        ))
+
     @app_commands.command(name="ajustar_avaliacao",
                           description="[ADM] Ajusta o rank de uma missão.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -108,6 +153,100 @@ class AdminCog(commands.Cog):
             logger.error(f'Erro ao ajustar o rank da missão com id {interaction.channel.id}')
             await interaction.followup.send(embed=create_error_embed(title='Erro ao ajustar rank', message=data), ephemeral=True)
 
+    @app_commands.command(name="telemetria_banco",
+                          description="[ADM] Mostra os comandos/eventos que mais pesam no banco.")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(ordenar='Métrica usada para ordenar', limite='Quantidade de linhas (1 a 25)',
+                           zerar='Zera as métricas depois de exibir')
+    @app_commands.choices(ordenar=[
+        app_commands.Choice(name='Tempo total', value='total_ms'),
+        app_commands.Choice(name='Quantidade de chamadas', value='count'),
+        app_commands.Choice(name='Falhas', value='failures'),
+        app_commands.Choice(name='p99', value='p99'),
+        app_commands.Choice(name='Pior caso', value='max_ms'),
+    ])
+    async def mongo_telemetry(self,
+                              interaction: discord.Interaction,
+                              ordenar: str = 'total_ms',
+                              limite: app_commands.Range[int, 1, 25] = 10,
+                              zerar: bool = False):
+        """Exibe os maiores ofensores de tempo no MongoDB por origem (apenas Admin).
+
+        Args:
+            interaction (discord.Interaction): Interação do comando.
+            ordenar (str): Métrica de ordenação.
+            limite (int): Quantidade de linhas exibidas.
+            zerar (bool): Se True, zera as métricas após exibir.
+        """
+        if not await is_bot_operator(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        telemetry = self.bot.mongo_telemetry
+        rows = telemetry.top(limit=limite, by=ordenar)
+        embed = TelemetryEmbeds.mongo_top(rows, list(telemetry.slow_queries), ordenar)
+
+        if zerar:
+            telemetry.reset()
+
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="latencia_comandos",
+                          description="[ADM] Mostra o tempo de resposta dos comandos frente ao prazo do Discord.")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(exportar='Anexa as métricas completas em JSON', zerar='Zera as métricas depois de exibir')
+    async def interaction_latency(self, interaction: discord.Interaction, exportar: bool = False, zerar: bool = False):
+        """Exibe os percentis de latência por comando/autocomplete (apenas Admin).
+
+        Args:
+            interaction (discord.Interaction): Interação do comando.
+            exportar (bool): Se True, anexa o export em JSON.
+            zerar (bool): Se True, zera as métricas após exibir.
+        """
+        if not await is_bot_operator(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        metrics = self.bot.tree.metrics
+        embed = TelemetryEmbeds.interaction_latency(metrics.snapshot(), metrics.warn_threshold_ms, metrics.deadline_ms)
+
+        kwargs = {}
+        if exportar:
+            payload = json.dumps(metrics.export(), ensure_ascii=False, indent=2).encode('utf-8')
+            kwargs['file'] = discord.File(io.BytesIO(payload), filename='latencia_comandos.json')
+
+        if zerar:
+            metrics.reset()
+
+        await interaction.followup.send(embed=embed, **kwargs)
+
+    @app_commands.command(name="limites_discord",
+                          description="[ADM] Mostra o uso das rotas REST do Discord e os rate limits (429).")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(zerar='Zera as métricas depois de exibir')
+    async def rest_limits(self, interaction: discord.Interaction, zerar: bool = False):
+        """Exibe chamadas, folga e 429 por rota REST do bot (apenas Admin).
+
+        Args:
+            interaction (discord.Interaction): Interação do comando.
+            zerar (bool): Se True, zera as métricas após exibir.
+        """
+        if not await is_bot_operator(interaction):
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        scheduler = self.bot.rest_scheduler
+        onboarding = self.bot.onboarding.backlog() if self.bot.onboarding is not None else None
+        embed = TelemetryEmbeds.rest_routes(scheduler.snapshot(), onboarding)
+
+        if zerar:
+            scheduler.reset()
+
+        await interaction.followup.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(AdminCog(bot))
\ No newline at end of file
@@ -2,14 +2,11 @@ import asyncio
 import logging
 from discord.ext import commands
 import discord
-from datetime import datetime
 
 from src.services.sage_service import SageService
 from src.services.mission_service import MissionService
-from src.app.config import MISSION_CHANNEL_ID
-from src.database.models.user import UserModel, UserStatus
-from src.utils.embeds import MissionEmbeds, CodeSageEmbeds
-from src.views.youtube_view import YoutubeView
+from src.utils.embeds import MissionEmbeds
+from src.utils.context import set_origin, event_origin, set_guild
 
 logger = logging.getLogger(__name__)
 
@@ -31,55 +28,23 @@ class EventsCog(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         logger.info(f'Bot Ligado!')
+        # O cliente de IA é importado fora do loop, antes da primeira missão precisar dele
+        await self.sage_service.warm_up()
 
     @commands.Cog.listener()
     async def on_member_join(self, member:discord.Member):
         """Registra um novo membro no servidor ou reativa quem retornou.
-        Insere novos membros no banco de dados e envia um embed de boas-vindas.
+        Coloca o membro na fila de entrada (``OnboardingService``), que o cadastra
+        no banco, envia o embed de boas-vindas e restaura os cargos guardados.
 
         Args:
             member (discord.Member): Membro que entrou no servidor.
         """
-        try:
-            user_repo = self.mission_service.user_repo
-
-            user = UserModel(_id=member.id,
-                             username=member.name,
-                             xp=0,
-                             coins=0,
-                             inventory={},
-                             equipped_item_id=None,
-                             status=UserStatus.ACTIVE,
-                             joined_at=datetime.now(),
-                             role_ids=[]
-                             )
-
-            # Verifica se já existe
-            exists = await user_repo.get_by_id(member.id)
-            if not exists:
-                await user_repo.create(user)
-                welcome_embed = CodeSageEmbeds.welcome_message(member=member)
-                await member.send(embed=welcome_embed,
-                                  view=YoutubeView())
-            else:
-                # Se o usuário já existia só atualiza o status para ativo
-                await user_repo.update_status(member.id, UserStatus.ACTIVE)
-                welcome_back_embed = CodeSageEmbeds.welcome_back_message(member=member)
-                await member.send(embed=welcome_back_embed,
-                                  view=YoutubeView())
-
-                # Adiciona os cargos antigos do servidor
-                for role_id in exists.role_ids:
-                    role_obj = member.guild.get_role(role_id)
-
-                    if role_obj:
-                        try:
-                            await member.add_roles(role_obj, reason="Restaurando cargos antigos")
-                        except discord.Forbidden:
-                            print(f"Sem permissão para dar o cargo {role_id}")
-
-        except Exception as e:
-            logger.warning(f'Não foi possível registrar ou atualizar o usuário {member.id}: {e}', exc_info=True)
+        set_origin(event_origin('on_member_join'))
+        set_guild(member.guild.id)
+
+        # Cadastro em lote, DM e cargos ficam com a fila de entrada: o evento retorna na hora
+        self.bot.onboarding.enqueue(member)
 
 
     @commands.Cog.listener()
@@ -90,12 +55,14 @@ class EventsCog(commands.Cog):
         Args:
             thread (discord.Thread): Representa uma thread criada no servidor.
         """
+        set_origin(event_origin('on_thread_create'))
+        set_guild(thread.guild.id)
 
         # A imagem inicia vazia
         image_bytes = None
 
         # Lógica de criar uma sessão com os dados do criar e a quantidade de pessoas avaliadas
-        if thread.parent_id == MISSION_CHANNEL_ID:
+        if thread.parent_id == self.bot.guild_configs.get(thread.guild.id).mission_channel_id:
             description = ''
 
             # Tentamos pegar o conteúdo da mensagem inicial
@@ -103,7 +70,8 @@ class EventsCog(commands.Cog):
                 # Aguardamos um pouco para que a mensagem seja criada
                 await asyncio.sleep(1)
 
-                starter_message = await thread.fetch_message(thread.id)
+                starter_message = await self.bot.rest_scheduler.submit('fetch_message',
+                                                                       lambda: thread.fetch_message(thread.id))
                 description = starter_message.content
 
                 # Se não estiver no cache busca no histórico
@@ -142,32 +110,69 @@ class EventsCog(commands.Cog):
                         image_bytes=image_bytes
                     )
                     embeb = MissionEmbeds.mission_start(riddle_text=riddle_text)
-                    await thread.send(embed=embeb)
+                    await self.bot.rest_scheduler.submit('channel_message', lambda: thread.send(embed=embeb))
                     logger.info(f'Missão {thread.id} registrada no banco.')
                 else:
                     logger.warning(f'Erro ao registrar missão {thread.id} no banco.')
         else:
-            logger.warning('Não foi possível localizar o canal.')
+            logger.debug('Thread %s fora do canal de missões do servidor %s', thread.id, thread.guild.id)
 
 
 
     @commands.Cog.listener()
-    async def on_member_remove(self, member:discord.Member):
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
         """
         Evento que captura quando um membro sai do servidor.
-        Atualiza seu status no banco de dados e adciona os cargos antigos.
+        Coloca a saída na fila (``OnboardingService``), que inativa o usuário e
+        guarda os cargos antigos em um único update, gravado em lote.
+
+        Usa o evento raw porque o on_member_remove só é disparado para membros
+        que estão no cache, o que não vale com MEMBER_CACHE=minimal.
+        Args:
+            payload (discord.RawMemberRemoveEvent): Dados da saída (``user`` é um Member se estava em cache).
+        """
+        set_origin(event_origin('on_member_remove'))
+        set_guild(payload.guild_id)
+        member = payload.user
+        self.bot.member_resolver.forget(payload.guild_id, member.id)
+
+        # Fora do cache não sabemos os cargos que ele tinha
+        if isinstance(member, discord.Member):
+            # Salvamos os cargos atuais caso o usário volte
+            role_ids = [role.id for role in member.roles if not role.is_default() and not role.is_bot_managed()]
+        else:
+            role_ids = []
+            logger.warning('%s saiu do servidor fora do cache de membros; cargos não foram guardados '
+                           '(ver CHUNK_GUILDS_AT_STARTUP)', member.id)
+
+        # Status e cargos vão na mesma escrita, gravada em lote pela fila de entrada/saída
+        self.bot.onboarding.enqueue_departure(payload.guild_id, member.id, role_ids)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        """Sincroniza os slash commands em um servidor parceiro que acabou de adicionar o bot.
+
+        Sem isso o servidor só veria os comandos (inclusive o /configurar_canais)
+        depois de um reinício.
+
+        Args:
+            guild (discord.Guild): Servidor que adicionou o bot.
+        """
+        set_origin(event_origin('on_guild_join'))
+        set_guild(guild.id)
+        self.bot.tree.copy_global_to(guild=guild)
+        await self.bot.tree.sync_if_changed(guild, self.bot.bot_state_repo)
+        logger.info('Bot adicionado ao servidor %s (%s)', guild.name, guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Descarta os membros em memória de um servidor do qual o bot foi removido.
+
         Args:
-            member (discord.Member): Membro que saiu do servidor.
+            guild (discord.Guild): Servidor removido.
         """
-        # Logica de inativar o usuário que saiu do servidor
-        user_repo = self.mission_service.user_repo
-        await user_repo.update_status(member.id, UserStatus.INACTIVE)
-
-        # Salvamos os cargos atuais caso o usário volte
-        for role in member.roles:
-            if not role.is_default() and not role.is_bot_managed():
-                await user_repo.add_role(member.id, role.id)
-                logger.info(f'{member.name} Saiu do servidor e guardamos os seus cargos')
+        self.bot.member_resolver.forget_guild(guild.id)
+        logger.info('Bot removido do servidor %s; cache de membros descartado', guild.id)
 
 
 
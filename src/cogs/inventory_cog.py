@@ -1,11 +1,26 @@
 import discord
+import logging
 from discord.ext import commands
 from discord import app_commands
 
+from src.bot.jobs import Lease
 from src.services.economy_service import EconomyService
+from src.services.idempotency_service import idempotency_key
+from src.database.models.item import ItemType
 from src.utils.embeds import create_error_embed, create_info_embed, InventoryEmbeds
+from src.utils.context import TrackedCog, track_interaction
 
-class InventoryCog(commands.Cog):
+logger = logging.getLogger(__name__)
+
+# Janela (s) em que um /usar repetido (retentativa do Discord) não consome de novo
+USE_DEDUP_WINDOW = 10
+
+# Varredura dos buffs vencidos de usuários inativos (os ativos são limpos na própria escrita)
+BUFF_SWEEP_JOB = 'buff_sweep'
+BUFF_SWEEP_INTERVAL_MINUTES = 30
+BUFF_SWEEP_BATCH = 500
+
+class InventoryCog(TrackedCog):
     """Comandos relacionados ao inventário (equipar, desequipar, listar)."""
     def __init__(self, bot):
         """Inicializa o Cog de Inventário.
@@ -16,7 +31,32 @@ class InventoryCog(commands.Cog):
         self.bot = bot
         self.economy_service:EconomyService = bot.economy_service
 
+    async def cog_load(self):
+        """Registra a varredura de buffs no JobRegistry (roda só no processo dono da lease)."""
+        self.bot.jobs.singleton(BUFF_SWEEP_JOB, BUFF_SWEEP_INTERVAL_MINUTES * 60, self.sweep_buffs_task)
+
+    async def cog_unload(self):
+        """Remove a varredura quando o Cog é descarregado."""
+        await self.bot.jobs.unregister(BUFF_SWEEP_JOB)
+
+    async def sweep_buffs_task(self, lease: Lease):
+        """Remove os buffs vencidos em lotes, enquanto a lease continuar válida.
+
+        Args:
+            lease (Lease): Lease da tarefa (a limpeza é idempotente).
+        """
+        total = 0
+        while lease.is_valid():
+            cleaned = await self.economy_service.user_repo.sweep_expired_buffs(limit=BUFF_SWEEP_BATCH)
+            total += cleaned
+            if cleaned < BUFF_SWEEP_BATCH:
+                break
+        if total:
+            logger.info(f'Varredura de buffs: {total} usuários limpos')
+
     async def equip_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        # Autocomplete não passa pelo interaction_check do Cog
+        track_interaction(interaction)
 
         user_id = interaction.user.id
 
@@ -56,6 +96,47 @@ class InventoryCog(commands.Cog):
 
         await interaction.followup.send(embed=embed)
 
+    async def use_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        # Autocomplete não passa pelo interaction_check do Cog
+        track_interaction(interaction)
+
+        user_data = await self.economy_service.user_repo.get_by_id(interaction.user.id)
+        if not user_data or not user_data.inventory:
+            return []
+
+        # Sugere só os itens com efeito ativo que o usuário possui
+        sugestoes = []
+        for item_id, quantity in user_data.inventory.items():
+            item = await self.economy_service.item_repo.get_by_id(item_id)
+
+            if item and item.effect and item.item_type != ItemType.EQUIPPABLE and current.lower() in item.name.lower():
+                sugestoes.append(
+                    app_commands.Choice(name=f'{item.name} ({quantity}x)', value=str(item.item_id))
+                )
+
+        return sugestoes[:25]
+
+    @app_commands.command(name='usar', description='Usa um item consumível do seu inventário')
+    @app_commands.describe(item='Item a ser usado', quantidade='Quantas unidades usar de uma vez')
+    @app_commands.autocomplete(item=use_autocomplete)
+    async def use_item(self, interaction: discord.Interaction, item: int,
+                       quantidade: app_commands.Range[int, 1, 100] = 1):
+        await interaction.response.defer(ephemeral=True)
+
+        # Retentativas da mesma interação não consomem o item de novo
+        key = idempotency_key('usar', interaction.guild_id, interaction.user.id, interaction.id)
+        sucess, data = await self.bot.idempotency.run(key, lambda: self.economy_service.use_item(
+            user_id=interaction.user.id,
+            item_id=item,
+            quantity=quantidade,
+            guild=interaction.guild
+        ), ttl=USE_DEDUP_WINDOW)
+
+        embed = InventoryEmbeds.item_used(data) if sucess \
+            else create_error_embed(title='Falha ao usar o item', message=data)
+
+        await interaction.followup.send(embed=embed)
+
     @app_commands.command(name='desequipar', description='Desequipa o item atual e manda para inventário')
     async def unequip_item(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
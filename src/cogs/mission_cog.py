@@ -1,18 +1,27 @@
 import discord
-from src.app.config import MOD_LOG_CHANNEL_ID
 from discord.ext import commands
 from discord import app_commands
-import asyncio
 import logging
+from typing import List
 
 from src.database.models.mission import EvaluationRank
 from src.services.mission_service import MissionService
+from src.services.idempotency_service import idempotency_key
 from src.utils.embeds import MissionEmbeds, create_error_embed, create_info_embed
 from src.utils.helpers import is_mission_channel
+from src.utils.context import TrackedCog
+from src.bot.rest import Priority
 
 logger = logging.getLogger(__name__)
 
-class MissionCog(commands.Cog):
+# Encerramento automático: as missões são divididas em shards pelo ID da thread
+# (mission_id % AUTO_CLOSE_SHARDS) entre os processos do bot
+AUTO_CLOSE_JOB = 'mission_auto_close'
+AUTO_CLOSE_SHARDS = 8
+AUTO_CLOSE_INTERVAL = 15
+
+
+class MissionCog(TrackedCog):
     """Comandos relacionados às missões (avaliar, revisar, encerrar)."""
     def __init__(self, bot):
         """Inicializa o Cog de Missões.
@@ -23,6 +32,13 @@ class MissionCog(commands.Cog):
         self.bot = bot
         self.mission_service:MissionService = bot.mission_service
 
+    async def cog_load(self):
+        """Registra o encerramento automático das missões no JobRegistry."""
+        self.bot.jobs.sharded(AUTO_CLOSE_JOB, AUTO_CLOSE_SHARDS, AUTO_CLOSE_INTERVAL, self.close_due_missions)
+
+    async def cog_unload(self):
+        """Remove a tarefa e libera as leases dos shards."""
+        await self.bot.jobs.unregister(AUTO_CLOSE_JOB)
 
     @app_commands.command(name="avaliar", description='Avalia quem te ajudou na missão.')
     @app_commands.describe(aventureiro='Quem te ajudou?', rank='Rank de S a E')
@@ -40,18 +56,24 @@ class MissionCog(commands.Cog):
 
         await interaction.response.defer()
 
-        success, data = await self.mission_service.evaluate_user(
+        # Retentativas e envios repetidos recebem o resultado da primeira avaliação
+        key = idempotency_key('avaliar', interaction.guild_id, interaction.channel.id, aventureiro.id)
+        success, data = await self.bot.idempotency.run(key, lambda: self.mission_service.evaluate_user(
             mission_id=interaction.channel.id,
             author_id=interaction.user.id,
             user_id=aventureiro.id,
             rank=rank,
             guild=interaction.guild
-            )
+            ))
+
+        # A chave não inclui o rank: uma duplicata com outro rank é uma segunda avaliação, não uma retentativa
+        if success and EvaluationRank.get_or_none(data['rank']) != EvaluationRank.get_or_none(rank):
+            success, data = False, 'Este usuário já foi avaliado'
 
         if success:
             succes_embed = MissionEmbeds.evaluation_success(
                 target_user=aventureiro,
-                rank=EvaluationRank.get_or_none(rank),
+                rank=EvaluationRank.get_or_none(data['rank']),
                 xp=data['xp'],
                 coins=data['coins']
 
@@ -64,49 +86,59 @@ class MissionCog(commands.Cog):
 
             await interaction.followup.send(embed=succes_embed)
             await interaction.followup.send(embed=mission_closed_embed)
-            self.bot.loop.create_task(
-                self.close_thread_task(interaction.channel, 120)
-            )
+            await self.mission_service.schedule_close(interaction.channel.id, 120)
 
         else:
             await interaction.followup.send(embed=create_error_embed(title='Erro ao avaliar', message=data), ephemeral=True)
 
 
-    async def close_thread_task(self, thread: discord.Thread, delay: int):
-        """Fecha a thread após um atraso se ela ainda estiver aberta.
+    async def close_due_missions(self, shards: List[int]):
+        """Encerra as missões vencidas dos shards detidos por este processo.
 
         Args:
-            thread (discord.Thread): A thread da missão.
-            delay (int): Tempo em segundos antes do encerramento automático.
+            shards (List[int]): Shards da tarefa 'mission_auto_close' com lease neste processo.
         """
-        # Espera o tempo de delay
-        await asyncio.sleep(delay)
+        await self.bot.wait_until_ready()
 
-        # Verifica se a thread ainda existe visualmente
-        try:
-            if thread.archived or thread.locked:
-                return
+        for mission_id in await self.mission_service.get_due_closures(AUTO_CLOSE_SHARDS, shards):
+            await self.close_thread(mission_id)
 
-        except Exception:
-            return
-
-        # Verificamos se a thread está fechada no banco de dados
-        just_closed = await self.mission_service.close_mission(thread.id)
+    async def close_thread(self, mission_id: int):
+        """Fecha a missão no banco e, se ainda estiver aberta no Discord, tranca a thread.
 
+        Args:
+            mission_id (int): ID da missão (thread).
+        """
         # Se retornou False, é porque alguém já fechou manualmente
+        just_closed = await self.mission_service.close_mission(mission_id)
         if not just_closed:
             return
 
-        # Manda a mensagem que encerrou a thread
+        rest = self.bot.rest_scheduler
         try:
+            # A thread pode ser de um servidor atendido por outro shard do gateway
+            thread = self.bot.get_channel(mission_id)
+            if thread is None:
+                thread = await rest.submit('fetch_channel', lambda: self.bot.fetch_channel(mission_id),
+                                           Priority.BACKGROUND)
+
+            # Verifica se a thread ainda existe visualmente
+            if not isinstance(thread, discord.Thread) or thread.archived or thread.locked:
+                return
+
+            # Manda a mensagem que encerrou a thread
             embed = create_info_embed(title='Missão Encerrada!', message="🔒 A Missão foi encerrada e arquivada!")
-            await thread.send(embed=embed)
+            await rest.submit('channel_message', lambda: thread.send(embed=embed), Priority.BACKGROUND)
 
             # Tranca a thread no Discord
-            await thread.edit(locked=True, archived=True, reason="Missão Concluída (Auto)")
+            await rest.submit('thread_edit',
+                              lambda: thread.edit(locked=True, archived=True, reason="Missão Concluída (Auto)"),
+                              Priority.BACKGROUND)
 
+        except discord.NotFound:
+            return
         except Exception as e:
-            print(f"Erro ao fechar thread visualmente: {e}")
+            logger.warning(f"Erro ao fechar a thread {mission_id} visualmente: {e}")
 
     @app_commands.command(name="solicitar_revisao",
                           description="Reporta a insatisfação do Rank da missão do Aventureiro")
@@ -130,7 +162,8 @@ class MissionCog(commands.Cog):
 
         if success:
             # Passamos o canal de logs da moderação
-            mod_channel = interaction.guild.get_channel(MOD_LOG_CHANNEL_ID)
+            mod_log_channel_id = self.bot.guild_configs.get(interaction.guild_id).mod_log_channel_id
+            mod_channel = interaction.guild.get_channel(mod_log_channel_id) if mod_log_channel_id else None
 
             if mod_channel:
                 embed_report = MissionEmbeds.mission_report(mission_id=interaction.channel.id,
@@ -140,16 +173,17 @@ class MissionCog(commands.Cog):
                                                             current_rank=data['current_rank'],
                                                             reason=motivo
                                                             )
-                await mod_channel.send(embed=embed_report)
+                await self.bot.rest_scheduler.submit('channel_message', lambda: mod_channel.send(embed=embed_report))
 
             confirmation_report_embed = MissionEmbeds.report_confirmation()
 
             await interaction.followup.send(embed=confirmation_report_embed)
             logger.info(f'Sucesso ao reportar a missão {interaction.channel.id}.')
+            if not mod_channel:
+                logger.error(f'Canal de moderações não encontrado no servidor {interaction.guild_id}: {mod_log_channel_id}')
         else:
             await interaction.followup.send(embed=create_error_embed(title='Erro ao reportar', message=data),
                                             ephemeral=True)
-            logger.error(f'Canal de moderações não encontrado: {MOD_LOG_CHANNEL_ID}')
 
     @app_commands.command(name="encerrar_missao",
                           description="Encerra a missão e arquiva o canal (Use caso tenha resolvido sozinho).")
@@ -179,7 +213,7 @@ class MissionCog(commands.Cog):
             )
         )
         logger.info(f"O usuário {interaction.user.id} encerrou a missão {interaction.channel.id} manualmente.")
-        self.bot.loop.create_task(self.close_thread_task(interaction.channel, 5))
+        await self.mission_service.schedule_close(interaction.channel.id, 5)
 
 
 async def setup(bot):
@@ -1,14 +1,24 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
+import logging
 
+from src.bot.jobs import Lease
+from src.bot.rest import Priority
 from src.services.economy_service import EconomyService
+from src.services.shop_service import ShopService, SHOP_ROTATION_INTERVAL
 from src.utils.embeds import ShopEmbeds
-from src.views.shop_view import ShopView, create_error_embed
-from src.app.config import MOD_LOG_CHANNEL_ID
+from src.views.shop_view import ShopView, build_options, create_error_embed
+from src.utils.context import TrackedCog
 
-class ShopCog(commands.Cog):
+logger = logging.getLogger(__name__)
+
+# Rotação das vitrines: tarefa única entre os processos, que verifica as vitrines vencidas
+ROTATION_JOB = 'shop_rotation'
+ROTATION_CHECK_MINUTES = 10
+
+
+class ShopCog(TrackedCog):
     """Comandos da loja (vitrine e compra de itens)."""
     def __init__(self, bot):
         """Inicializa o Cog da loja.
@@ -18,39 +28,85 @@ class ShopCog(commands.Cog):
         """
         self.bot = bot
         self.economy_service:EconomyService = bot.economy_service
+        self.shop_service: ShopService = bot.shop_service
 
+    async def cog_load(self):
+        """Reconecta o menu das vitrines já publicadas e agenda a rotação."""
+        self.bot.add_view(ShopView(self.economy_service))
+        self.bot.jobs.singleton(ROTATION_JOB, ROTATION_CHECK_MINUTES * 60, self.rotate_storefronts)
+
+    async def cog_unload(self):
+        """Remove a rotação das vitrines."""
+        await self.bot.jobs.unregister(ROTATION_JOB)
 
     @app_commands.command(name="abrir_loja", description="[Admin] Cria a vitrine de itens neste canal")
     @app_commands.checks.has_permissions(administrator=True)
     async def open_shop(self, interaction: discord.Interaction):
-        """Abre a vitrine da loja no canal atual.
+        """Publica a vitrine da loja no canal atual (substitui a vitrine anterior do servidor).
 
         Args:
             interaction (discord.Interaction): Interação do comando.
         """
         await interaction.response.defer()
 
-        # Buscamos 100 itens
-        all_items = await self.economy_service.item_repo.get_all()
+        # Sorteia a rotação a partir do catálogo em memória
+        shop_items = await self.shop_service.pick_rotation()
 
-        if not all_items:
-            mod_channel = interaction.guild.get_channel(MOD_LOG_CHANNEL_ID)
+        if not shop_items:
+            mod_log_channel_id = self.bot.guild_configs.get(interaction.guild_id).mod_log_channel_id
+            mod_channel = interaction.guild.get_channel(mod_log_channel_id) if mod_log_channel_id else None
             error_embed = create_error_embed('Erro ao abrir a loja',
                                              'Nada encontrado no banco de dados.'
             )
-            await mod_channel.send(embed=error_embed)
+            if mod_channel:
+                await self.bot.rest_scheduler.submit('channel_message', lambda: mod_channel.send(embed=error_embed))
             return
 
-        # Selecionamos 5 itens
-        shop_items = random.sample(all_items, min(len(all_items), 5))
+        previous = await self.shop_service.get_storefront(interaction.guild_id)
 
         # criamos a vitrine
         showcase_embed = ShopEmbeds.create_showcase()
+        view = ShopView(self.economy_service, build_options(shop_items))
+        message = await interaction.followup.send(embed=showcase_embed, view=view, wait=True)
+
+        await self.shop_service.open_storefront(interaction.guild_id, interaction.channel_id, message.id, shop_items)
+
+        # Só uma vitrine por servidor: a anterior é apagada
+        if previous is not None and previous.message_id != message.id:
+            old_message = self.bot.get_partial_messageable(previous.channel_id).get_partial_message(previous.message_id)
+            try:
+                await self.bot.rest_scheduler.submit('message_delete', old_message.delete, Priority.BACKGROUND)
+            except discord.HTTPException:
+                pass
+
+    async def rotate_storefronts(self, lease: Lease):
+        """Edita no lugar as vitrines com a rotação vencida.
+
+        Args:
+            lease (Lease): Lease da tarefa.
+        """
+        for storefront in await self.shop_service.due_storefronts(SHOP_ROTATION_INTERVAL):
+            shop_items = await self.shop_service.pick_rotation()
+            if not shop_items:
+                return
+
+            message = self.bot.get_partial_messageable(storefront.channel_id).get_partial_message(storefront.message_id)
+            view = ShopView(self.economy_service, build_options(shop_items))
+            try:
+                await self.bot.rest_scheduler.submit('message_edit', lambda: message.edit(view=view),
+                                                     Priority.BACKGROUND)
+            except discord.NotFound:
+                # A mensagem foi apagada: a vitrine deixa de existir até um novo /abrir_loja
+                logger.info(f'Vitrine do servidor {storefront.guild_id} não existe mais')
+                await self.shop_service.remove_storefront(storefront.guild_id)
+                continue
+            except discord.HTTPException as e:
+                # Tenta de novo na próxima verificação
+                logger.warning(f'Falha ao rotacionar a vitrine do servidor {storefront.guild_id}: {e}')
+                continue
 
-        # gera o view
-        view = ShopView(shop_items, self.economy_service)
+            await self.shop_service.record_rotation(storefront, shop_items)
 
-        await interaction.followup.send(embed=showcase_embed, view=view)
 
 async def setup(bot):
-    await bot.add_cog(ShopCog(bot))
\ No newline at end of file
+    await bot.add_cog(ShopCog(bot))
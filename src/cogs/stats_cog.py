@@ -0,0 +1,63 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+import logging
+
+from src.bot.jobs import Lease
+from src.services.analytics_service import AnalyticsService
+from src.utils.embeds import StatsEmbeds
+from src.utils.context import TrackedCog
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre execuções do rollup diário (tarefa única entre os processos)
+ROLLUP_JOB = 'stats_rollup'
+ROLLUP_INTERVAL_MINUTES = 15
+
+
+class StatsCog(TrackedCog):
+    """Estatísticas do servidor (rollup em segundo plano e consulta administrativa)."""
+    def __init__(self, bot):
+        """Inicializa o Cog de estatísticas.
+
+        Args:
+            bot (commands.Bot): Instância principal do bot.
+        """
+        self.bot = bot
+        self.analytics_service: AnalyticsService = bot.analytics_service
+
+    async def cog_load(self):
+        """Registra o rollup no JobRegistry (roda só no processo dono da lease)."""
+        self.bot.jobs.singleton(ROLLUP_JOB, ROLLUP_INTERVAL_MINUTES * 60, self.rollup_task)
+
+    async def cog_unload(self):
+        """Remove o rollup quando o Cog é descarregado."""
+        await self.bot.jobs.unregister(ROLLUP_JOB)
+
+    async def rollup_task(self, lease: Lease):
+        """Processa as mudanças desde o último watermark em segundo plano.
+
+        Args:
+            lease (Lease): Lease da tarefa (o rollup recalcula buckets inteiros, então é idempotente).
+        """
+        await self.analytics_service.run_rollup()
+
+    @app_commands.command(name="estatisticas", description="[ADM] Mostra as métricas diárias do servidor.")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(dias='Quantidade de dias (1 a 30)')
+    async def daily_stats(self, interaction: discord.Interaction, dias: app_commands.Range[int, 1, 30] = 7):
+        """Exibe os buckets diários pré-agregados.
+
+        Args:
+            interaction (discord.Interaction): Interação do comando.
+            dias (int): Quantidade de dias a exibir.
+        """
+        await interaction.response.defer(ephemeral=True)
+
+        buckets = await self.analytics_service.get_daily_stats(dias)
+
+        await interaction.followup.send(embed=StatsEmbeds.daily_summary(buckets, dias))
+
+
+async def setup(bot):
+    await bot.add_cog(StatsCog(bot))
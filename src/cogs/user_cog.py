@@ -8,13 +8,14 @@ from src.services.leveling_service import LevelingService
 from src.repositories.user_repository import UserRepository
 from src.repositories.item_repository import ItemRepository
 from src.utils.embeds import UserEmbeds
+from src.utils.context import TrackedCog
 
 logger = logging.getLogger(__name__)
 
 
 
 
-class UserCog(commands.Cog):
+class UserCog(TrackedCog):
     """Comandos de usuário (perfil e progresso)."""
     def __init__(self, bot):
         """Inicializa o Cog de usuários.
@@ -61,7 +62,8 @@ class UserCog(commands.Cog):
                                         xp_next_level=user_progress['needed_xp'],
                                         progress_percent=user_progress['percentage'],
                                         coin_balance=user_data.coins,
-                                        equipped_item_name=equipped_item_name
+                                        equipped_item_name=equipped_item_name,
+                                        stats=user_data.stats
 
         )
         await interaction.followup.send(embed=profile_embed)
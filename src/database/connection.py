@@ -1,19 +1,25 @@
 from pymongo import AsyncMongoClient
 import logging
-from src.app.config import DATABASE_NAME,get_mongo_uri
+from src.app.config import DATABASE_NAME, MONGO_SLOW_QUERY_MS, get_mongo_uri
+from src.database.telemetry import MongoTelemetry
 
 logger = logging.getLogger('__name__')
 
+# Listener único do processo: métricas por comando/evento de origem de todas as operações
+mongo_telemetry = MongoTelemetry(slow_query_ms=MONGO_SLOW_QUERY_MS)
+
 async def connect_to_database():
     """
-    Cria e retorna uma conexão com o banco de dados MongoDB usando o AsyncMongoClient
+    Cria e retorna uma conexão com o banco de dados MongoDB usando o AsyncMongoClient.
+
+    O cliente é criado com o ``mongo_telemetry`` registrado como listener de comandos.
     """
     try:
         mongo_uri = get_mongo_uri()
 
         if mongo_uri:
 
-            client = AsyncMongoClient(mongo_uri)
+            client = AsyncMongoClient(mongo_uri, event_listeners=[mongo_telemetry])
 
             await client.admin.command('ping')
             logger.info(f'Conectado com sucesso em: {mongo_uri}')
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class CommandSyncStateModel(BaseModel):
+    """
+    Último sync da árvore de slash commands (coleção ``bot_state``).
+
+    Attributes:
+        key: Aplicação e servidor sincronizados ('command_tree:<app_id>:<guild_id>'). Alias: _id.
+        fingerprint: Hash SHA-256 do payload enviado ao Discord no último sync.
+        command_count: Quantidade de comandos de topo sincronizados.
+        sync_ms: Duração do último sync (usada para estimar o tempo economizado).
+        synced_at: Momento do último sync.
+    """
+    key: str = Field(alias='_id')
+    fingerprint: str
+    command_count: int = 0
+    sync_ms: float = 0.0
+    synced_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Literal, Union, Annotated
+from datetime import datetime, timedelta
+from typing import Iterable, Literal, Optional, Tuple, Union, Annotated
 
 
 class AddXpEffect(BaseModel):
@@ -22,6 +23,20 @@ class GiveRoleEffect(BaseModel):
     type: Literal['role_effect']
     role_id: int
 
+class TimedBoostEffect(BaseModel):
+    """Efeito ativo que concede um bônus temporário (poções, eventos)."""
+    type: Literal['timed_boost']
+    boost: Literal['xp_boost', 'coin_boost']
+    multiplier: float
+    duration_minutes: int
+
+class TimedBuff(BaseModel):
+    """Bônus temporário ativo no usuário; ignorado depois de ``expires_at``."""
+    type: Literal['xp_boost', 'coin_boost']
+    multiplier: float
+    expires_at: datetime
+    item_id: Optional[int] = None
+
 
 
 # Com Union AnyPassiveEffect e Effect pode receber mais tipos de objeto
@@ -33,6 +48,95 @@ AnyPassiveEffect = Annotated[Union[
 AnyEffect = Annotated[Union[
     GiveRoleEffect,
     AddXpEffect,
-    AddCoinsEffect],
+    AddCoinsEffect,
+    TimedBoostEffect],
     Field(discriminator='type')
 ]
+
+
+def compile_passive_effects(effects: Iterable[Union[CoinBoostPassive, XpBoostPassive]]) -> Tuple[float, float]:
+    """Reduz os efeitos passivos de um item a um par de multiplicadores.
+
+    Args:
+        effects: Efeitos passivos do item.
+
+    Returns:
+        Tuple[float, float]: (multiplicador de XP, multiplicador de moedas); 1.0 = sem bônus.
+    """
+    xp_multiplier = 1.0
+    coin_multiplier = 1.0
+    for effect in effects:
+        if effect.type == 'xp_boost':
+            xp_multiplier += effect.multiplier
+        elif effect.type == 'coin_boost':
+            coin_multiplier += effect.multiplier
+    return xp_multiplier, coin_multiplier
+
+
+def apply_timed_buffs(multipliers: Tuple[float, float],
+                      buffs: Iterable[TimedBuff],
+                      now: Optional[datetime] = None) -> Tuple[float, float]:
+    """Soma os bônus temporários ainda válidos aos multiplicadores do item equipado.
+
+    Bônus vencidos são apenas ignorados aqui; a remoção física acontece na
+    próxima escrita do usuário ou na varredura em segundo plano.
+
+    Args:
+        multipliers (Tuple[float, float]): (XP, moedas) do item equipado.
+        buffs: Bônus temporários do usuário.
+        now (Optional[datetime]): Momento da leitura (padrão: agora).
+
+    Returns:
+        Tuple[float, float]: (multiplicador de XP, multiplicador de moedas) efetivos.
+    """
+    now = now or datetime.now()
+    xp_multiplier, coin_multiplier = multipliers
+    for buff in buffs:
+        if buff.expires_at <= now:
+            continue
+        if buff.type == 'xp_boost':
+            xp_multiplier += buff.multiplier
+        else:
+            coin_multiplier += buff.multiplier
+    return xp_multiplier, coin_multiplier
+
+
+def compile_timed_boost(effect: TimedBoostEffect, quantity: int, item_id: Optional[int] = None,
+                        now: Optional[datetime] = None) -> TimedBuff:
+    """Converte ``quantity`` unidades de um bônus temporário em um único buff (a duração acumula).
+
+    Args:
+        effect (TimedBoostEffect): Efeito do item.
+        quantity (int): Unidades usadas de uma vez.
+        item_id (Optional[int]): Item de origem.
+        now (Optional[datetime]): Início do bônus (padrão: agora).
+
+    Returns:
+        TimedBuff: O buff a gravar no usuário.
+    """
+    now = now or datetime.now()
+    return TimedBuff(type=effect.boost,
+                     multiplier=effect.multiplier,
+                     expires_at=now + timedelta(minutes=effect.duration_minutes * quantity),
+                     item_id=item_id)
+
+
+def compile_use_effect(effect: Union[GiveRoleEffect, AddXpEffect, AddCoinsEffect, TimedBoostEffect],
+                       quantity: int) -> Tuple[int, int, Optional[int]]:
+    """Soma o efeito ativo de ``quantity`` unidades de um item em uma única alteração.
+
+    Args:
+        effect: Efeito ativo do item.
+        quantity (int): Unidades usadas de uma vez.
+
+    Returns:
+        Tuple[int, int, Optional[int]]: (XP, moedas, cargo concedido); o cargo não acumula.
+            Bônus temporários não alteram saldo (ver ``compile_timed_boost``).
+    """
+    if effect.type == 'add_xp':
+        return effect.amount * quantity, 0, None
+    if effect.type == 'add_coins':
+        return 0, effect.amount * quantity, None
+    if effect.type == 'role_effect':
+        return 0, 0, effect.role_id
+    return 0, 0, None
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class GuildConfigModel(BaseModel):
+    """
+    Configuração de um servidor atendido pelo bot (coleção ``guild_configs``).
+
+    Attributes:
+        guild_id: ID do servidor. Alias: _id.
+        mission_channel_id: Canal (fórum/texto) onde as threads viram missões.
+        mod_log_channel_id: Canal que recebe os pedidos de revisão e alertas da moderação.
+        updated_at: Momento da última alteração.
+    """
+    guild_id: int = Field(alias='_id')
+    mission_channel_id: Optional[int] = None
+    mod_log_channel_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+
+
+class IdempotencyStatus(str, Enum):
+    """Estado de uma chave de idempotência."""
+    PENDING = 'pendente'  # ação em execução em algum processo
+    DONE = 'concluida'  # ação concluída; o resultado fica guardado até expirar
+
+
+class IdempotencyRecordModel(BaseModel):
+    """
+    Resultado de uma ação com efeitos colaterais (coleção ``idempotency_keys``).
+
+    Attributes:
+        key: Chave da ação ('avaliar:<guild>:<missão>:<usuário>', 'interacao:<id>', ...). Alias: _id.
+        status: Em execução ou concluída.
+        success: Primeiro item da tupla (sucesso, dados) retornada pelo serviço.
+        data: Segundo item da tupla (dados da resposta ou mensagem de erro).
+        created_at: Momento da primeira execução.
+        expires_at: Fim da janela de deduplicação (UTC); o índice TTL apaga o documento depois.
+    """
+    key: str = Field(alias='_id')
+    status: IdempotencyStatus = IdempotencyStatus.PENDING
+    success: Optional[bool] = None
+    data: Any = None
+    created_at: Optional[datetime] = None
+    expires_at: datetime
+
+    class Config:
+        populate_by_name = True
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Optional, List, Tuple
 from enum import Enum
-from src.database.models.effects import AnyEffect, AnyPassiveEffect
+from src.database.models.effects import AnyEffect, AnyPassiveEffect, compile_passive_effects
 
 
 class ItemType(str, Enum):
@@ -24,6 +24,7 @@ class ItemModel(BaseModel):
         item_type (ItemType): Tipo do item (consumível, equipável ou cargo).
         effect (Optional[AnyEffect]): Efeito ativo aplicado ao usar o item.
         passive_effects (List[AnyPassiveEffect]): Efeitos passivos aplicados enquanto equipado.
+        multipliers (Tuple[float, float]): Efeitos passivos compilados em (XP, moedas) ao carregar o item.
     """
     item_id: int = Field(alias='_id')
     name: str
@@ -33,6 +34,16 @@ class ItemModel(BaseModel):
     effect: Optional[AnyEffect] = None
     passive_effects: List[AnyPassiveEffect] = []
 
+    _multipliers: Tuple[float, float] = PrivateAttr(default=(1.0, 1.0))
+
     class Config:
         populate_by_name = True
 
+    def model_post_init(self, __context: Any) -> None:
+        self._multipliers = compile_passive_effects(self.passive_effects)
+
+    @property
+    def multipliers(self) -> Tuple[float, float]:
+        """(multiplicador de XP, multiplicador de moedas) dos efeitos passivos."""
+        return self._multipliers
+
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class LeaseModel(BaseModel):
+    """
+    Lease de uma tarefa em segundo plano (coleção ``leases``).
+
+    Só o dono de uma lease válida executa a tarefa; os outros processos
+    tentam adquiri-la quando ela expira sem ser renovada.
+
+    Attributes:
+        name: Nome da lease ('stats_rollup', 'mission_auto_close:3', ...). Alias: _id.
+        owner: Processo que detém a lease.
+        token: Fencing token, crescente a cada aquisição; escritas de um dono antigo são recusadas.
+        expires_at: Fim da validade (UTC) se não houver renovação.
+        renewed_at: Última renovação (UTC).
+    """
+    name: str = Field(alias='_id')
+    owner: str
+    token: int = 0
+    expires_at: datetime
+    renewed_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
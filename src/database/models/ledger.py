@@ -0,0 +1,79 @@
+from pydantic import BaseModel, Field
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+
+class LedgerReason(str, Enum):
+    """Motivos possíveis para uma alteração de saldo (XP/moedas)."""
+    MISSION_REWARD = 'recompensa_missao'  # recompensa de uma avaliação
+    EVALUATION_ADJUSTMENT = 'ajuste_avaliacao'  # diferença aplicada por um ajuste de rank
+    PURCHASE = 'compra'  # compra de item na loja
+    ITEM_USE = 'uso_item'  # efeito de um item consumível (/usar)
+    ADMIN = 'admin'  # alteração manual (scripts, comandos de administração)
+    OPENING_BALANCE = 'saldo_inicial'  # saldo anterior à existência do ledger
+
+
+class LedgerEntryModel(BaseModel):
+    """
+    Registro imutável de uma alteração de XP/moedas (coleção ``ledger``).
+
+    O ``_id`` é gerado no registro, não na inserção: reenviar um lote que já
+    foi gravado (parcialmente ou após um timeout) esbarra na chave duplicada
+    em vez de contar a alteração duas vezes.
+
+    Attributes:
+        entry_id: ID (ObjectId) da entrada e posição no ledger. Alias: _id.
+        user_id: ID do usuário que teve o saldo alterado.
+        guild_id: Servidor do perfil alterado.
+        xp: Diferença de XP aplicada (pode ser negativa).
+        coins: Diferença de moedas aplicada (pode ser negativa).
+        reason: Motivo da alteração.
+        mission_id: Missão de origem, quando houver.
+        item_id: Item de origem, quando houver.
+        admin_id: Administrador responsável, quando houver.
+        quantity: Quantidade de itens envolvida (compras).
+        created_at: Momento em que a alteração foi aplicada.
+    """
+    entry_id: ObjectId = Field(default_factory=ObjectId, alias='_id')
+    user_id: int
+    guild_id: Optional[int] = None
+    xp: int = 0
+    coins: int = 0
+    reason: LedgerReason
+    mission_id: Optional[int] = None
+    item_id: Optional[int] = None
+    admin_id: Optional[int] = None
+    quantity: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+
+
+class LedgerSnapshotModel(BaseModel):
+    """
+    Saldo acumulado do ledger de um usuário até um ponto de corte (coleção ``ledger_snapshots``).
+
+    A reconciliação soma o snapshot com as entradas posteriores ao corte, sem
+    precisar reler o histórico inteiro. O ``_id`` é o par {guild_id, user_id}.
+
+    Attributes:
+        user_id: ID do usuário.
+        guild_id: Servidor do perfil.
+        xp: Soma de XP das entradas até o corte.
+        coins: Soma de moedas das entradas até o corte.
+        until_id: ID (ObjectId) da última posição do ledger incluída no snapshot.
+        taken_at: Momento em que o snapshot foi atualizado.
+    """
+    user_id: int
+    guild_id: Optional[int] = None
+    xp: int = 0
+    coins: int = 0
+    until_id: ObjectId
+    taken_at: datetime
+
+    class Config:
+        arbitrary_types_allowed = True
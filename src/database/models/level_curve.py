@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional, Tuple
+from enum import Enum
+
+# Documento da curva em uso
+ACTIVE_CURVE_ID = 'ativa'
+
+
+class LevelCurveKind(str, Enum):
+    """Formatos de curva de XP suportados."""
+    QUADRATIC = 'quadratica'  # factor * nível²
+    PIECEWISE = 'por_trechos'  # interpolação linear entre pontos (nível, XP)
+    EXPONENTIAL_TAIL = 'cauda_exponencial'  # quadrática até tail_start, depois o custo do nível cresce geometricamente
+
+
+class LevelCurveModel(BaseModel):
+    """
+    Curva de XP dos níveis (coleção ``level_curves``).
+
+    O documento ``ACTIVE_CURVE_ID`` é a curva em uso; cada processo relê o
+    documento periodicamente, então uma troca de temporada não exige deploy.
+
+    Attributes:
+        curve_id: Identificador da curva. Alias: _id.
+        kind: Formato da curva.
+        factor: XP do nível 1 nas curvas quadráticas (nível L custa factor * L²).
+        points: Pontos (nível, XP total) da curva por trechos, começando em (0, 0).
+        tail_start: Último nível quadrático da cauda exponencial.
+        tail_growth: Fator de crescimento do custo de cada nível da cauda (> 1).
+        max_level: Nível máximo da tabela pré-calculada (curvas não quadráticas param nele).
+        season: Temporada/rótulo da curva, para exibição.
+        updated_at: Momento da última alteração (a recarga só reconstrói a tabela quando muda).
+    """
+    curve_id: str = Field(default=ACTIVE_CURVE_ID, alias='_id')
+    kind: LevelCurveKind = LevelCurveKind.QUADRATIC
+    factor: int = Field(default=150, gt=0)
+    points: List[Tuple[int, int]] = []
+    tail_start: Optional[int] = None
+    tail_growth: Optional[float] = None
+    max_level: int = Field(default=1000, gt=0)
+    season: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
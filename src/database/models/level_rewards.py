@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class LevelRewardsModel(BaseModel):
     """
@@ -8,11 +9,13 @@ class LevelRewardsModel(BaseModel):
         level_required: Nível requerido apra o cargo.
         role_id: ID do cargo.
         role_name: Nome do cargo.
+        guild_id: Servidor ao qual o cargo pertence.
     """
 
     level_required:int
     role_id:int
     role_name:str
+    guild_id: Optional[int] = None
 
     class Config:
         populate_by_name = True
\ No newline at end of file
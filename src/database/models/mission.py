@@ -121,6 +121,10 @@ class EvaluatorModel(BaseModel):
         xp_earned: Quantidade de experiência que o usuário recebeu na missão.
         coins_earned: Quantidade de moedas que o usuário recebeu na missão.
         evaluate_at: Horário em que o usuário foi avalaido.
+        updated_at: Horário do último ajuste da avaliação (None se nunca foi ajustada).
+        xp_multiplier: Multiplicador de XP do item equipado no momento da avaliação.
+        coin_multiplier: Multiplicador de moedas do item equipado no momento da avaliação.
+            Avaliações antigas não têm os multiplicadores (None).
     """
     # dados do usuário
     user_id: int
@@ -133,6 +137,24 @@ class EvaluatorModel(BaseModel):
     xp_earned: int = 0
     coins_earned: int = 0
     evaluate_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    xp_multiplier: Optional[float] = None
+    coin_multiplier: Optional[float] = None
+
+class EvaluationModel(EvaluatorModel):
+    """
+    Avaliação armazenada na coleção própria ``evaluations``.
+
+    Cada documento é único pelo par (mission_id, user_id), permitindo consultar
+    o histórico de um membro sem varrer todas as missões.
+
+    Attributes:
+        mission_id: ID da missão (thread) em que o usuário foi avaliado.
+        guild_id: Servidor da missão.
+    """
+    mission_id: int
+    guild_id: Optional[int] = None
+
 
 class MissionModel(BaseModel):
     """
@@ -144,15 +166,19 @@ class MissionModel(BaseModel):
         creator_id: Criador da missão(thread)
         created_at: Data da criação da missão(thread)
         status: Estado atual da missão(thread).
-        evaluators: Lista de Pessoas que foram avaliadas.
+        evaluators: Legado, as avaliações agora ficam na coleção ``evaluations``.
+        guild_id: Servidor onde a thread foi criada.
+        close_at: Momento (UTC) do encerramento automático agendado; None se não há.
     """
     mission_id: int = Field(alias='_id')
+    guild_id: Optional[int] = None
     title: str
     creator_id: int
     created_at: datetime
     status: MissionStatus = Field(default=MissionStatus.OPEN)
     evaluators: List[EvaluatorModel] = []
     completed_at: Optional[datetime] = None
+    close_at: Optional[datetime] = None
 
     class Config:
         populate_by_name = True
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+
+
+class StatsDailyModel(BaseModel):
+    """
+    Bucket diário pré-agregado de métricas do servidor (coleção ``stats_daily``).
+
+    O ``_id`` é o par {guild_id, day}; cada servidor tem os próprios buckets.
+
+    Attributes:
+        day: Dia do bucket no formato AAAA-MM-DD.
+        guild_id: Servidor do bucket.
+        missions_opened: Missões criadas no dia.
+        missions_closed: Missões encerradas no dia.
+        rank_counts: Quantidade de avaliações por rank no dia.
+        xp_minted: XP distribuído em avaliações no dia.
+        coins_minted: Moedas distribuídas em avaliações no dia.
+        purchases: Quantidade comprada por item no dia (item_id em texto -> quantidade).
+        updated_at: Momento em que o bucket foi recalculado pela última vez.
+    """
+    day: str
+    guild_id: Optional[int] = None
+    missions_opened: int = 0
+    missions_closed: int = 0
+    rank_counts: Dict[str, int] = {}
+    xp_minted: int = 0
+    coins_minted: int = 0
+    purchases: Dict[str, int] = {}
+    updated_at: Optional[datetime] = None
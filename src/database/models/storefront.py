@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+
+class StorefrontModel(BaseModel):
+    """
+    Vitrine da loja publicada em um servidor (coleção ``storefronts``).
+
+    Cada servidor tem uma única mensagem de vitrine, editada no lugar a cada
+    rotação; o menu usa um custom_id fixo e é reconectado no boot.
+
+    Attributes:
+        guild_id: ID do servidor. Alias: _id.
+        channel_id: Canal da mensagem da vitrine.
+        message_id: Mensagem da vitrine.
+        item_ids: Itens da rotação atual, na ordem do menu.
+        rotated_at: Momento da última rotação.
+    """
+    guild_id: int = Field(alias='_id')
+    channel_id: int
+    message_id: int
+    item_ids: List[int] = []
+    rotated_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from enum import Enum
 
+from src.database.models.effects import TimedBuff, apply_timed_buffs
+
 class UserStatus(str, Enum):
     ACTIVE = 'ativo'
     INACTIVE = 'inativo'
@@ -10,33 +12,78 @@ class UserStatus(str, Enum):
     MUTED = 'silenciado'
 
 
+class UserStatsModel(BaseModel):
+    """Contadores de contribuição do usuário nas missões.
+
+    Mantidos incrementalmente com ``$inc`` a cada avaliação (e corrigidos por
+    diferença nos ajustes), para que o perfil seja lido sem agregações.
+
+    Attributes:
+        missions_helped (int): Quantidade de missões em que o usuário foi avaliado.
+        rank_counts (Dict[str, int]): Quantidade de avaliações recebidas por rank (S a E).
+        score_sum (int): Soma das notas numéricas dos ranks recebidos.
+        mission_xp (int): XP total recebido em missões.
+        mission_coins (int): Moedas totais recebidas em missões.
+    """
+    missions_helped: int = 0
+    rank_counts: Dict[str, int] = {}
+    score_sum: int = 0
+    mission_xp: int = 0
+    mission_coins: int = 0
+
+
 class UserModel(BaseModel):
     """Modelo de usuário do Discord armazenado no banco.
 
     Mantém o estado do jogador: experiência, moedas, inventário, item equipado
-    e status de atividade no servidor.
+    e status de atividade no servidor. Cada documento é único pelo par
+    (guild_id, user_id): o mesmo usuário tem um perfil por servidor.
 
     Attributes:
-        user_id (int): ID único do usuário no Discord. Alias: _id.
+        user_id (int): ID do usuário no Discord. Documentos anteriores ao
+            multi-servidor usavam o ``_id`` como ID do usuário.
+        guild_id (Optional[int]): ID do servidor do perfil.
         username (str): Nome de exibição atual do usuário.
         xp (int): Total de experiência acumulada. Default: 0.
         coins (int): Saldo de moedas do usuário.
         inventory (Dict[int, int]): Mapa item_id -> quantidade no inventário.
         equipped_item_id (Optional[int]): ID do item atualmente equipado, se houver.
+        xp_multiplier (float): Multiplicador de XP do item equipado, gravado ao equipar. Default: 1.0.
+        coin_multiplier (float): Multiplicador de moedas do item equipado, gravado ao equipar. Default: 1.0.
+        buffs (List[TimedBuff]): Bônus temporários; os vencidos podem continuar aqui até a próxima escrita.
+        buffs_expire_at (Optional[datetime]): Menor vencimento entre os buffs (índice da varredura).
         status (UserStatus): Status do usuário (ativo, inativo, banido, silenciado).
         joined_at (datetime): Data/hora da primeira entrada no servidor.
         role_ids (List[int]): IDs de cargos do servidor armazenados para restauração.
+        stats (UserStatsModel): Contadores de contribuição em missões.
     """
-    user_id: int = Field(alias='_id')
+    user_id: int = Field(validation_alias=AliasChoices('user_id', '_id'))
+    guild_id: Optional[int] = None
     username: str
     xp: int = 0
     coins: int
     inventory: Dict[int, int] = {}
     equipped_item_id: Optional[int] = None
+    xp_multiplier: float = 1.0
+    coin_multiplier: float = 1.0
+    buffs: List[TimedBuff] = []
+    buffs_expire_at: Optional[datetime] = None
     status: UserStatus = Field(default=UserStatus.ACTIVE)
     joined_at: datetime
     role_ids: List[int] = []
+    stats: UserStatsModel = Field(default_factory=UserStatsModel)
 
     class Config:
         populate_by_name = True
 
+    def effective_multipliers(self, now: Optional[datetime] = None) -> Tuple[float, float]:
+        """Multiplicadores do item equipado somados aos buffs ainda válidos.
+
+        Args:
+            now (Optional[datetime]): Momento da leitura (padrão: agora).
+
+        Returns:
+            Tuple[float, float]: (multiplicador de XP, multiplicador de moedas).
+        """
+        return apply_timed_buffs((self.xp_multiplier, self.coin_multiplier), self.buffs, now)
+
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from src.utils.origin import get_origin
+from src.utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Comandos internos do driver que não interessam para a telemetria
+IGNORED_COMMANDS = frozenset({'hello', 'ismaster', 'isMaster', 'ping', 'saslStart', 'saslContinue',
+                              'endSessions', 'buildInfo', 'getLastError', 'killCursors'})
+
+# Onde cada comando leva o filtro da consulta
+_FILTER_FIELDS = {'find': 'filter', 'findAndModify': 'query', 'count': 'query', 'distinct': 'query'}
+_STATEMENT_FIELDS = {'update': 'updates', 'delete': 'deletes'}
+
+
+def redact(value: Any) -> Any:
+    """Remove os valores de um filtro mantendo só o formato (campos e operadores).
+
+    Ex: ``{'_id': 123, 'inventory.5': {'$gt': 0}}`` -> ``{'_id': '?', 'inventory.5': {'$gt': '?'}}``
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [redact(item) for item in value]
+    return '?'
+
+
+def filter_shape(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extrai o filtro de um comando e retorna o formato sem valores (None se não houver)."""
+    query = None
+
+    if command_name in _FILTER_FIELDS:
+        query = command.get(_FILTER_FIELDS[command_name])
+    elif command_name in _STATEMENT_FIELDS:
+        statements = command.get(_STATEMENT_FIELDS[command_name]) or []
+        query = statements[0].get('q') if statements else None
+    elif command_name == 'aggregate':
+        pipeline = command.get('pipeline') or []
+        query = pipeline[0].get('$match') if pipeline else None
+
+    return redact(query) if query is not None else None
+
+
+@dataclass
+class OperationStats:
+    """Métricas acumuladas de uma combinação (origem, coleção, operação)."""
+    origin: str
+    collection: str
+    operation: str
+    failures: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def observe(self, duration_ms: float, failed: bool) -> None:
+        self.failures += int(failed)
+        self.latency.observe(duration_ms)
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    @property
+    def total_ms(self) -> float:
+        return self.latency.total_ms
+
+    @property
+    def max_ms(self) -> float:
+        return self.latency.max_ms
+
+    def percentile(self, pct: float) -> float:
+        return self.latency.percentile(pct)
+
+
+@dataclass
+class SlowQuery:
+    origin: str
+    collection: str
+    operation: str
+    duration_ms: float
+    shape: Optional[Dict[str, Any]]
+    failed: bool
+    at: float
+
+
+class MongoTelemetry(monitoring.CommandListener):
+    """Listener de comandos do pymongo com métricas por origem, coleção e operação.
+
+    A origem é lida do contextvar ``command_origin`` no ``started``, que roda na
+    mesma task que aguardou a operação; o ``succeeded``/``failed`` apenas fecha
+    a medição pendente.
+    """
+
+    def __init__(self, slow_query_ms: float = 100, slow_query_history: int = 50):
+        """
+        Args:
+            slow_query_ms (float): A partir de quantos milissegundos um comando é logado como lento.
+            slow_query_history (int): Quantidade de consultas lentas mantidas para o comando de admin.
+        """
+        self.slow_query_ms = slow_query_ms
+        self.slow_queries: Deque[SlowQuery] = deque(maxlen=slow_query_history)
+        self._stats: Dict[Tuple[str, str, str], OperationStats] = {}
+        self._pending: Dict[Tuple[int, Any], Tuple[str, str, Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    # -- CommandListener ------------------------------------------------------
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+
+        command = event.command
+        collection = command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = command.get('collection') if isinstance(command.get('collection'), str) else '-'
+
+        shape = filter_shape(event.command_name, command)
+        with self._lock:
+            self._pending[(event.request_id, event.connection_id)] = (get_origin(), collection, shape)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    # -- Métricas -------------------------------------------------------------
+
+    def _finish(self, event: Any, failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.request_id, event.connection_id), None)
+            if pending is None:
+                return
+
+            origin, collection, shape = pending
+            duration_ms = event.duration_micros / 1000
+            key = (origin, collection, event.command_name)
+
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats(origin, collection, event.command_name)
+            stats.observe(duration_ms, failed)
+
+            slow = duration_ms >= self.slow_query_ms
+            if slow:
+                self.slow_queries.append(SlowQuery(origin, collection, event.command_name,
+                                                   duration_ms, shape, failed, time.time()))
+
+        if slow:
+            logger.warning('Consulta lenta (%.1f ms) %s.%s origem=%s filtro=%s',
+                           duration_ms, collection, event.command_name, origin, shape)
+        if failed:
+            logger.warning('Comando %s em %s falhou (origem=%s): %s',
+                           event.command_name, collection, origin, getattr(event, 'failure', None))
+
+    def snapshot(self) -> List[OperationStats]:
+        """Cópia das métricas acumuladas (uma entrada por origem/coleção/operação)."""
+        with self._lock:
+            return [OperationStats(s.origin, s.collection, s.operation, s.failures, s.latency.copy())
+                    for s in self._stats.values()]
+
+    def top(self, limit: int = 10, by: str = 'total_ms') -> List[OperationStats]:
+        """Maiores ofensores pela métrica escolhida.
+
+        Args:
+            limit (int): Quantidade de entradas retornadas.
+            by (str): 'total_ms', 'count', 'failures', 'p99' ou 'max_ms'.
+
+        Returns:
+            List[OperationStats]: Entradas ordenadas da maior para a menor.
+        """
+        if by == 'p99':
+            key = lambda s: s.percentile(99)
+        else:
+            key = lambda s: getattr(s, by)
+        return sorted(self.snapshot(), key=key, reverse=True)[:limit]
+
+    def reset(self) -> None:
+        """Zera as métricas e o histórico de consultas lentas."""
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+            self.started_at = time.time()
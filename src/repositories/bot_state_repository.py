@@ -0,0 +1,50 @@
+from pymongo.database import Database
+from typing import Optional
+import logging
+
+from src.database.models.bot_state import CommandSyncStateModel
+
+logger = logging.getLogger(__name__)
+
+
+class BotStateRepository:
+    """Estado interno do bot que precisa sobreviver a reinícios (coleção ``bot_state``)."""
+
+    def __init__(self, db: Database):
+        self.collection = db.bot_state
+
+    async def get_command_sync(self, key: str) -> Optional[CommandSyncStateModel]:
+        """Busca o registro do último sync da árvore de comandos.
+
+        Args:
+            key (str): Chave do sync ('command_tree:<app_id>:<guild_id>').
+
+        Returns:
+            Optional[CommandSyncStateModel]: O registro ou None se nunca houve sync (ou em caso de erro).
+        """
+        try:
+            data = await self.collection.find_one({'_id': key})
+            return CommandSyncStateModel(**data) if data else None
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar o estado do sync de comandos {key}: {e}', exc_info=True)
+            return None
+
+    async def save_command_sync(self, state: CommandSyncStateModel) -> bool:
+        """Grava (upsert) o registro do último sync da árvore de comandos.
+
+        Args:
+            state (CommandSyncStateModel): Estado a ser gravado.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        try:
+            await self.collection.replace_one({'_id': state.key},
+                                              state.model_dump(by_alias=True),
+                                              upsert=True)
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar o estado do sync de comandos {state.key}: {e}', exc_info=True)
+            return False
@@ -0,0 +1,65 @@
+from pymongo.database import Database
+from typing import List, Optional
+import logging
+
+from src.database.models.guild_config import GuildConfigModel
+
+logger = logging.getLogger(__name__)
+
+
+class GuildConfigRepository:
+    """Configuração por servidor (coleção ``guild_configs``)."""
+
+    def __init__(self, db: Database):
+        self.collection = db.guild_configs
+
+    async def get(self, guild_id: int) -> Optional[GuildConfigModel]:
+        """Busca a configuração de um servidor.
+
+        Args:
+            guild_id (int): ID do servidor.
+
+        Returns:
+            Optional[GuildConfigModel]: A configuração ou None se não existir (ou em caso de erro).
+        """
+        try:
+            data = await self.collection.find_one({'_id': guild_id})
+            return GuildConfigModel(**data) if data else None
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar a configuração do servidor {guild_id}: {e}', exc_info=True)
+            return None
+
+    async def get_all(self) -> List[GuildConfigModel]:
+        """Lista a configuração de todos os servidores.
+
+        Returns:
+            List[GuildConfigModel]: Configurações encontradas (lista vazia em caso de erro).
+        """
+        try:
+            docs = await self.collection.find({}).to_list(length=None)
+            return [GuildConfigModel(**doc) for doc in docs]
+
+        except Exception as e:
+            logger.error(f'Erro ao listar as configurações dos servidores: {e}', exc_info=True)
+            return []
+
+    async def save(self, config: GuildConfigModel) -> bool:
+        """Grava (upsert) a configuração de um servidor.
+
+        Args:
+            config (GuildConfigModel): Configuração a ser gravada.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        try:
+            await self.collection.replace_one({'_id': config.guild_id},
+                                              config.model_dump(by_alias=True),
+                                              upsert=True)
+            logger.info('Configuração do servidor %s gravada', config.guild_id)
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar a configuração do servidor {config.guild_id}: {e}', exc_info=True)
+            return False
@@ -0,0 +1,113 @@
+from pymongo.database import Database
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+import logging
+
+from src.database.models.idempotency import IdempotencyRecordModel, IdempotencyStatus
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyRepository:
+    """Chaves de idempotência das interações com efeitos colaterais (coleção ``idempotency_keys``).
+
+    A chave é reservada com um insert (o ``_id`` único garante um vencedor
+    entre processos); quem perde recebe o documento existente. O índice TTL
+    só apaga documentos a cada ~60s, então a validade é sempre conferida por
+    ``expires_at`` e uma chave vencida pode ser reservada de novo.
+
+    A reserva pendente vale só por uma lease curta; a janela de deduplicação
+    inteira começa em ``complete``. Assim, se o processo cair entre a reserva
+    e o resultado, a chave volta a ficar livre em segundos, não em um dia.
+    """
+
+    def __init__(self, db: Database):
+        self.collection = db.idempotency_keys
+
+    async def ensure_indexes(self) -> None:
+        """Cria o índice TTL em ``expires_at`` (operação idempotente)."""
+        try:
+            await self.collection.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0, name='expires_at_ttl')
+            logger.info('Índices da coleção idempotency_keys garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices de idempotência: {e}', exc_info=True)
+
+    async def claim(self, key: str, lease: float) -> Tuple[bool, Optional[IdempotencyRecordModel]]:
+        """Reserva a chave para executar a ação.
+
+        Args:
+            key (str): Chave da ação.
+            lease (float): Validade da reserva pendente (segundos); vencida, outra execução pode assumir a chave.
+
+        Returns:
+            Tuple[bool, Optional[IdempotencyRecordModel]]: (True, None) se a chave foi reservada
+            agora; (False, registro) se outra execução já a reservou dentro da janela.
+        """
+        now = datetime.now(timezone.utc)
+        record = {'status': IdempotencyStatus.PENDING.value, 'success': None, 'data': None,
+                  'created_at': now, 'expires_at': now + timedelta(seconds=lease)}
+        try:
+            await self.collection.insert_one({'_id': key, **record})
+            return True, None
+
+        except DuplicateKeyError:
+            pass
+
+        except Exception as e:
+            # Sem o banco a ação segue sem deduplicação entre processos, como antes
+            logger.error(f'Erro ao reservar a chave {key}: {e}', exc_info=True)
+            return True, None
+
+        try:
+            # A chave existe: se venceu (janela encerrada ou reserva abandonada), reserva de novo
+            existing = await self.collection.find_one_and_update(
+                {'_id': key, 'expires_at': {'$lte': now}},
+                {'$set': record}
+            )
+            if existing is not None:
+                return True, None
+
+            data = await self.collection.find_one({'_id': key})
+
+        except Exception as e:
+            logger.error(f'Erro ao ler a chave {key}: {e}', exc_info=True)
+            return True, None
+
+        if data is None:
+            # Apagada entre as duas leituras: trata como reservada por outra execução
+            return False, None
+        return False, IdempotencyRecordModel(**data)
+
+    async def complete(self, key: str, success: bool, data: Any, ttl: float) -> bool:
+        """Grava o resultado da ação para as próximas duplicatas e abre a janela de deduplicação.
+
+        Args:
+            key (str): Chave da ação.
+            success (bool): Sucesso da ação.
+            data (Any): Dados retornados pelo serviço (precisam ser serializáveis em BSON).
+            ttl (float): Janela de deduplicação (segundos), contada a partir de agora.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        try:
+            await self.collection.update_one({'_id': key},
+                                             {'$set': {'status': IdempotencyStatus.DONE.value,
+                                                       'success': success, 'data': data,
+                                                       'expires_at': datetime.now(timezone.utc) + timedelta(seconds=ttl)}})
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar o resultado da chave {key}: {e}', exc_info=True)
+            return False
+
+    async def release(self, key: str) -> None:
+        """Remove a reserva (a ação falhou e pode ser tentada de novo)."""
+        try:
+            await self.collection.delete_one({'_id': key, 'status': IdempotencyStatus.PENDING.value})
+
+        except Exception as e:
+            logger.error(f'Erro ao liberar a chave {key}: {e}', exc_info=True)
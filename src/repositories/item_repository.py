@@ -82,7 +82,7 @@ class ItemRepository:
             )
 
             if result.matched_count >  0:
-                logger.info(f'Preço do item {item_id} alterado para {new_price}')
+                logger.info('Preço do item %s alterado para %s', item_id, new_price)
                 return True
 
             logger.warning(f'Tentativa de atualizar o preço de item inexistente: {item_id}')
@@ -108,7 +108,7 @@ class ItemRepository:
             result = await self.collection.delete_one({'_id': item_id})
 
             if result.deleted_count >0:
-                logger.info(f'item com id{item_id} excluído com sucesso.')
+                logger.info('item com id%s excluído com sucesso.', item_id)
                 return True
 
             logger.warning(f'Item {item_id} não encontrado para deletar')
@@ -126,7 +126,7 @@ class ItemRepository:
             list[ItemModel]: Lista com todos os itens cadastrados
         """
         try:
-            logger.info(f'Buscando todos os itens cadastrados')
+            logger.info('Buscando todos os itens cadastrados')
             result= self.collection.find({})
             items_data = await result.to_list(length=100)
 
@@ -155,7 +155,7 @@ class ItemRepository:
                 {'_id': item_model.item_id},
                 item_data,
                 upsert=True)
-            logger.info(f'Sucesso no upsert do item {item_model.name}!')
+            logger.info('Sucesso no upsert do item %s!', item_model.name)
             return True
 
         except Exception as e:
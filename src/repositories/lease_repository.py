@@ -0,0 +1,170 @@
+from pymongo.database import Database
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import logging
+import re
+
+from src.database.models.lease import LeaseModel
+
+logger = logging.getLogger(__name__)
+
+# Leases expiradas há mais que isso são removidas pelo índice TTL do MongoDB
+LEASE_PURGE_AFTER_SECONDS = 24 * 60 * 60
+
+
+class LeaseRepository:
+    """Leases das tarefas em segundo plano (coleção ``leases``).
+
+    A aquisição é um upsert condicionado à lease estar expirada: se outro
+    processo ainda a detém, o upsert tenta inserir o mesmo ``_id`` e falha com
+    DuplicateKeyError. O fencing token vem de um contador único da coleção
+    (documento ``FENCE_ID``), que não é apagado pelo TTL, então continua
+    crescendo mesmo depois que uma lease abandonada é removida.
+    """
+
+    # Documento do contador de fencing tokens
+    FENCE_ID = '__fence__'
+
+    def __init__(self, db: Database):
+        self.collection = db.leases
+
+    async def ensure_indexes(self) -> None:
+        """Cria o índice TTL que apaga as leases abandonadas (operação idempotente)."""
+        try:
+            await self.collection.create_index([('expires_at', ASCENDING)],
+                                               expireAfterSeconds=LEASE_PURGE_AFTER_SECONDS,
+                                               name='expires_at_ttl')
+            logger.info('Índices da coleção leases garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices de leases: {e}', exc_info=True)
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> Optional[int]:
+        """Tenta adquirir a lease (somente se estiver livre ou expirada).
+
+        Args:
+            name (str): Nome da lease.
+            owner (str): Processo que está adquirindo.
+            ttl (float): Validade (segundos) sem renovação.
+
+        Returns:
+            Optional[int]: O fencing token da nova posse, ou None se outro processo detém a lease (ou em caso de erro).
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            await self.collection.find_one_and_update(
+                {'_id': name, 'expires_at': {'$lte': now}},
+                {'$set': {'owner': owner, 'expires_at': now + timedelta(seconds=ttl), 'renewed_at': now},
+                 '$unset': {'token': ''}},
+                upsert=True,
+                projection={'_id': 1}
+            )
+        except DuplicateKeyError:
+            # Lease válida de outro processo
+            return None
+        except Exception as e:
+            logger.error(f'Erro ao adquirir a lease {name}: {e}', exc_info=True)
+            return None
+
+        try:
+            counter = await self.collection.find_one_and_update({'_id': self.FENCE_ID},
+                                                                {'$inc': {'value': 1}},
+                                                                upsert=True,
+                                                                return_document=ReturnDocument.AFTER)
+            token = counter['value']
+            # Se o processo travou além do ttl, outro dono pode ter assumido (e gravado um token menor)
+            # entre as duas escritas: sem casar o dono, a posse já não é nossa
+            result = await self.collection.update_one({'_id': name, 'owner': owner, 'token': {'$exists': False}},
+                                                      {'$set': {'token': token}})
+            if result.matched_count == 0:
+                logger.warning(f'Lease {name} assumida por outro processo antes do fencing token; aquisição descartada')
+                return None
+            return token
+
+        except Exception as e:
+            logger.error(f'Erro ao gerar o fencing token da lease {name}: {e}', exc_info=True)
+            await self.release(name, owner, None)
+            return None
+
+    async def renew(self, name: str, owner: str, token: int, ttl: float) -> bool:
+        """Estende a validade de uma lease que ainda pertence a este dono/token.
+
+        Args:
+            name (str): Nome da lease.
+            owner (str): Processo dono.
+            token (int): Fencing token recebido na aquisição.
+            ttl (float): Nova validade (segundos) a partir de agora.
+
+        Returns:
+            bool: True se renovou; False se a lease foi adquirida por outro processo (ou em caso de erro).
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            result = await self.collection.update_one(
+                {'_id': name, 'owner': owner, 'token': token},
+                {'$set': {'expires_at': now + timedelta(seconds=ttl), 'renewed_at': now}}
+            )
+            return result.matched_count > 0
+
+        except Exception as e:
+            logger.error(f'Erro ao renovar a lease {name}: {e}', exc_info=True)
+            return False
+
+    async def release(self, name: str, owner: str, token: Optional[int]) -> bool:
+        """Libera a lease para que outro processo a adquira sem esperar a expiração.
+
+        Args:
+            name (str): Nome da lease.
+            owner (str): Processo dono.
+            token (Optional[int]): Fencing token da posse (None libera qualquer posse do dono).
+
+        Returns:
+            bool: True se a lease era deste dono e foi liberada.
+        """
+        query = {'_id': name, 'owner': owner}
+        if token is not None:
+            query['token'] = token
+        try:
+            result = await self.collection.delete_one(query)
+            return result.deleted_count > 0
+
+        except Exception as e:
+            logger.error(f'Erro ao liberar a lease {name}: {e}', exc_info=True)
+            return False
+
+    async def get(self, name: str) -> Optional[LeaseModel]:
+        """Busca uma lease pelo nome.
+
+        Args:
+            name (str): Nome da lease.
+
+        Returns:
+            Optional[LeaseModel]: A lease ou None se não existir (ou em caso de erro).
+        """
+        try:
+            data = await self.collection.find_one({'_id': name})
+            return LeaseModel(**data) if data else None
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar a lease {name}: {e}', exc_info=True)
+            return None
+
+    async def list_active(self, prefix: str) -> List[LeaseModel]:
+        """Lista as leases ainda válidas cujo nome começa com ``prefix``.
+
+        Args:
+            prefix (str): Prefixo do nome (ex: 'process:').
+
+        Returns:
+            List[LeaseModel]: Leases válidas (lista vazia em caso de erro).
+        """
+        try:
+            cursor = self.collection.find({'_id': {'$regex': f'^{re.escape(prefix)}'},
+                                           'expires_at': {'$gt': datetime.now(timezone.utc)}})
+            return [LeaseModel(**doc) async for doc in cursor]
+
+        except Exception as e:
+            logger.error(f'Erro ao listar as leases {prefix}*: {e}', exc_info=True)
+            return []
@@ -0,0 +1,218 @@
+from pymongo.database import Database
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from bson import ObjectId
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+from src.database.models.ledger import LedgerEntryModel
+from src.utils.guild_scope import current_guild_id
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerRepository:
+    """
+    Repositório do ledger de economia (entradas, snapshots e estado dos snapshots).
+
+    As entradas nunca são alteradas: correções entram como novas entradas.
+    A posição no ledger é dada pelo ``_id`` (ObjectId), gerado quando a entrada
+    é registrada; os cortes dos snapshots ficam atrás do buffer (ver
+    ``SNAPSHOT_LAG``) para não passar de entradas ainda não gravadas.
+    Snapshots e somas são por (guild_id, user_id); as leituras usam o servidor atual.
+    """
+    # Documento de estado com o corte global dos snapshots
+    SNAPSHOT_STATE_ID = 'snapshots'
+
+    def __init__(self, db: Database):
+        """
+        Inicializa o repositório com a instância do banco de dados.
+
+        Args:
+            db (Database): Instância do banco de dados MongoDB.
+        """
+        self.collection = db.ledger
+        self.snapshots = db.ledger_snapshots
+        self.state = db.ledger_state
+
+    async def ensure_indexes(self) -> None:
+        """Cria os índices do ledger (histórico por usuário no servidor e por período)."""
+        try:
+            await self.collection.create_index([('guild_id', ASCENDING), ('user_id', ASCENDING), ('_id', ASCENDING)],
+                                               name='guild_user_position')
+            await self.collection.create_index([('created_at', ASCENDING)], name='created_at')
+            await self.snapshots.create_index([('guild_id', ASCENDING), ('user_id', ASCENDING)], name='guild_user')
+            logger.info('Índices do ledger garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices do ledger: {e}', exc_info=True)
+
+    async def insert_many(self, entries: List[LedgerEntryModel]) -> bool:
+        """
+        Grava um lote de entradas com um único insert_many.
+
+        O lote pode ser reenviado inteiro depois de uma falha: entradas que já
+        tinham sido gravadas esbarram na chave duplicada (mesmo ``_id``) e contam
+        como gravadas.
+
+        Args:
+            entries (List[LedgerEntryModel]): Entradas a gravar.
+
+        Returns:
+            bool: True se todas as entradas estão gravadas, False em caso de erro.
+        """
+        if not entries:
+            return True
+
+        try:
+            await self.collection.insert_many(
+                [entry.model_dump(by_alias=True, exclude_none=True) for entry in entries],
+                ordered=False
+            )
+            logger.debug('%d entradas gravadas no ledger', len(entries))
+            return True
+
+        except BulkWriteError as e:
+            details = e.details or {}
+            failed = [error for error in details.get('writeErrors', []) if error.get('code') != 11000]
+            if not failed and not details.get('writeConcernErrors'):
+                logger.debug('%d entradas do ledger já estavam gravadas', len(entries) - details.get('nInserted', 0))
+                return True
+            logger.error(f'Erro ao gravar {len(failed)} de {len(entries)} entradas no ledger: {e}')
+            return False
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar {len(entries)} entradas no ledger: {e}', exc_info=True)
+            return False
+
+    async def get_snapshot_state(self) -> Tuple[Optional[ObjectId], Optional[ObjectId]]:
+        """
+        Busca o corte global dos snapshots.
+
+        Returns:
+            Tuple[Optional[ObjectId], Optional[ObjectId]]: (corte_concluído, corte_pendente).
+        """
+        state = await self.state.find_one({'_id': self.SNAPSHOT_STATE_ID}) or {}
+        return state.get('cutoff_id'), state.get('pending_id')
+
+    def _state_query(self, fence: Optional[int]) -> Dict:
+        """Filtro do documento de estado; com fencing token, só casa se nenhum dono mais novo já o gravou."""
+        query: Dict = {'_id': self.SNAPSHOT_STATE_ID}
+        if fence is not None:
+            query['$or'] = [{'fence': {'$exists': False}}, {'fence': {'$lte': fence}}]
+        return query
+
+    async def set_pending_cutoff(self, pending_id: ObjectId, fence: Optional[int] = None) -> bool:
+        """Registra o corte que está sendo aplicado (permite retomar um snapshot interrompido).
+
+        Args:
+            pending_id (ObjectId): Corte em aplicação.
+            fence (Optional[int]): Fencing token da lease dos snapshots (None não verifica).
+
+        Returns:
+            bool: False se um dono mais novo da lease já gravou o estado.
+        """
+        update = {'pending_id': pending_id}
+        if fence is not None:
+            update['fence'] = fence
+        try:
+            await self.state.update_one(self._state_query(fence), {'$set': update}, upsert=True)
+            return True
+        except DuplicateKeyError:
+            logger.warning(f'Corte pendente recusado: fencing token {fence} antigo')
+            return False
+
+    async def commit_cutoff(self, cutoff_id: ObjectId, fence: Optional[int] = None) -> bool:
+        """Marca o corte como concluído.
+
+        Args:
+            cutoff_id (ObjectId): Corte aplicado.
+            fence (Optional[int]): Fencing token da lease dos snapshots (None não verifica).
+
+        Returns:
+            bool: False se um dono mais novo da lease já gravou o estado.
+        """
+        update = {'cutoff_id': cutoff_id, 'updated_at': datetime.now()}
+        if fence is not None:
+            update['fence'] = fence
+        try:
+            await self.state.update_one(self._state_query(fence),
+                                        {'$set': update, '$unset': {'pending_id': ''}},
+                                        upsert=True)
+            return True
+        except DuplicateKeyError:
+            logger.warning(f'Corte recusado: fencing token {fence} antigo')
+            return False
+
+    async def merge_into_snapshots(self, after_id: Optional[ObjectId], cutoff_id: ObjectId) -> None:
+        """
+        Soma as entradas do intervalo (after_id, cutoff_id] nos snapshots de cada usuário, em todos os servidores.
+
+        O merge só altera snapshots com ``until_id`` anterior ao corte, então
+        reaplicar o mesmo corte não conta as entradas duas vezes.
+
+        Args:
+            after_id (Optional[ObjectId]): Corte anterior (exclusivo); None desde o início.
+            cutoff_id (ObjectId): Novo corte (inclusivo).
+        """
+        position = {'$lte': cutoff_id}
+        if after_id:
+            position['$gt'] = after_id
+
+        now = datetime.now()
+        cursor = await self.collection.aggregate([
+            {'$match': {'_id': position}},
+            {'$group': {'_id': {'guild_id': '$guild_id', 'user_id': '$user_id'},
+                        'xp': {'$sum': '$xp'}, 'coins': {'$sum': '$coins'}}},
+            {'$set': {'guild_id': '$_id.guild_id', 'user_id': '$_id.user_id', 'until_id': cutoff_id, 'taken_at': now}},
+            {'$merge': {
+                'into': self.snapshots.name,
+                'on': '_id',
+                'whenMatched': [
+                    {'$set': {
+                        'xp': {'$cond': [{'$lt': ['$until_id', '$$new.until_id']}, {'$add': ['$xp', '$$new.xp']}, '$xp']},
+                        'coins': {'$cond': [{'$lt': ['$until_id', '$$new.until_id']}, {'$add': ['$coins', '$$new.coins']}, '$coins']},
+                        'taken_at': {'$cond': [{'$lt': ['$until_id', '$$new.until_id']}, '$$new.taken_at', '$taken_at']},
+                        'until_id': {'$max': ['$until_id', '$$new.until_id']},
+                    }}
+                ],
+                'whenNotMatched': 'insert'
+            }}
+        ])
+        await cursor.to_list(length=None)
+
+    async def get_snapshots(self, user_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+        """
+        Busca os snapshots de um lote de usuários do servidor atual.
+
+        Args:
+            user_ids (List[int]): IDs dos usuários.
+
+        Returns:
+            Dict[int, Tuple[int, int]]: Mapa user_id -> (xp, moedas) do snapshot.
+        """
+        cursor = self.snapshots.find({'guild_id': current_guild_id(), 'user_id': {'$in': user_ids}},
+                                     {'user_id': 1, 'xp': 1, 'coins': 1})
+        return {doc['user_id']: (doc['xp'], doc['coins']) async for doc in cursor}
+
+    async def sum_after(self, user_ids: List[int], after_id: Optional[ObjectId]) -> Dict[int, Tuple[int, int]]:
+        """
+        Soma as entradas de um lote de usuários do servidor atual posteriores ao corte.
+
+        Args:
+            user_ids (List[int]): IDs dos usuários.
+            after_id (Optional[ObjectId]): Corte (exclusivo); None soma todo o histórico.
+
+        Returns:
+            Dict[int, Tuple[int, int]]: Mapa user_id -> (xp, moedas) somados após o corte.
+        """
+        match: Dict = {'guild_id': current_guild_id(), 'user_id': {'$in': user_ids}}
+        if after_id:
+            match['_id'] = {'$gt': after_id}
+
+        cursor = await self.collection.aggregate([
+            {'$match': match},
+            {'$group': {'_id': '$user_id', 'xp': {'$sum': '$xp'}, 'coins': {'$sum': '$coins'}}}
+        ])
+        return {doc['_id']: (doc['xp'], doc['coins']) async for doc in cursor}
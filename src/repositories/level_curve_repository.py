@@ -0,0 +1,50 @@
+from pymongo.database import Database
+from typing import Optional
+import logging
+
+from src.database.models.level_curve import ACTIVE_CURVE_ID, LevelCurveModel
+
+logger = logging.getLogger(__name__)
+
+
+class LevelCurveRepository:
+    """Curvas de XP dos níveis (coleção ``level_curves``)."""
+
+    def __init__(self, db: Database):
+        self.collection = db.level_curves
+
+    async def get(self, curve_id: str = ACTIVE_CURVE_ID) -> Optional[LevelCurveModel]:
+        """Busca uma curva.
+
+        Args:
+            curve_id (str): Identificador da curva (padrão: a curva em uso).
+
+        Erros de leitura são propagados: quem recarrega a curva precisa
+        distinguir "não existe" (volta para a curva padrão) de uma falha do banco
+        (mantém a curva atual).
+
+        Returns:
+            Optional[LevelCurveModel]: A curva ou None somente se ela não existir.
+        """
+        data = await self.collection.find_one({'_id': curve_id})
+        return LevelCurveModel(**data) if data else None
+
+    async def save(self, curve: LevelCurveModel) -> bool:
+        """Grava (upsert) uma curva.
+
+        Args:
+            curve (LevelCurveModel): Curva a ser gravada.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        try:
+            await self.collection.replace_one({'_id': curve.curve_id},
+                                              curve.model_dump(by_alias=True),
+                                              upsert=True)
+            logger.info('Curva de níveis %s gravada', curve.curve_id)
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar a curva de níveis {curve.curve_id}: {e}', exc_info=True)
+            return False
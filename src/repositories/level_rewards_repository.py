@@ -1,19 +1,35 @@
 from pymongo.database import Database
 from typing import Optional, List
 import logging
+from pymongo import ASCENDING
 from pymongo.errors import DuplicateKeyError
 
 
 from src.database.models.level_rewards import LevelRewardsModel
+from src.utils.guild_scope import current_guild_id
 
 
 logger = logging.getLogger(__name__)
 
 class LevelRewardsRepository:
+    """Cargos de recompensa por nível, separados por servidor (``current_guild_id()``)."""
 
     def __init__(self, db: Database):
         self.collection = db.level_rewards
 
+    async def ensure_indexes(self) -> None:
+        """Cria o índice único (guild_id, level_required) das recompensas (operação idempotente)."""
+        try:
+            await self.collection.create_index(
+                [('guild_id', ASCENDING), ('level_required', ASCENDING)],
+                unique=True,
+                name='guild_level_unique'
+            )
+            logger.info('Índices da coleção level_rewards garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices das recompensas de nível: {e}', exc_info=True)
+
     async def get_role_for_level(self, current_level: int) -> Optional[LevelRewardsModel]:
         """Busca a maior recompensa aplicável para o nível atual.
 
@@ -25,12 +41,12 @@ class LevelRewardsRepository:
         """
         try:
             result = await self.collection.find_one(
-                {'level_required': {'$lte': current_level}},
+                {'guild_id': current_guild_id(), 'level_required': {'$lte': current_level}},
                 sort=[('level_required', -1)]
             )
 
             if result:
-                logger.info(f"Nível atual: {current_level}, Maior recompensa {result['role_name']}")
+                logger.info("Nível atual: %s, Maior recompensa %s", current_level, result['role_name'])
                 return LevelRewardsModel(**result)
 
             logger.warning(f'Não foi possível identificar o modelo para o nível {current_level}.')
@@ -47,10 +63,8 @@ class LevelRewardsRepository:
         """
         try:
             cursor = self.collection.find(
-                {},
+                {'guild_id': current_guild_id()},
                 {'role_id': 1, '_id': 0}
-
-
             )
             docs = await cursor.to_list(length=None)
 
@@ -71,9 +85,12 @@ class LevelRewardsRepository:
             bool: True caso tenha criado, False caso contrário
         """
         try:
+            if reward_model.guild_id is None:
+                reward_model.guild_id = current_guild_id()
+
             data = reward_model.model_dump(by_alias=True, exclude_none=True)
             await self.collection.insert_one(data)
-            logger.info(f'Sucesso ao criar recompensa {reward_model.role_name}.')
+            logger.info('Sucesso ao criar recompensa %s.', reward_model.role_name)
             return True
         except DuplicateKeyError:
             logger.error(f'Erro ao criar a recompensa, pois ela já existe')
@@ -1,9 +1,13 @@
 from pymongo.database import Database
+from pymongo import ASCENDING, DESCENDING
 import logging
-from src.database.models.mission import MissionModel, MissionStatus, EvaluationRank, EvaluatorModel
+from src.database.models.mission import MissionModel, MissionStatus, EvaluationRank, EvaluatorModel, EvaluationModel
+from src.database.models.user import UserStatsModel
 from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+from src.utils.guild_scope import current_guild_id
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +16,36 @@ class MissionRepository:
     def __init__(self, db:Database):
         # Cria a conexão com a coleção missions
         self.collection = db.missions
+        # Avaliações ficam em uma coleção própria, chaveada por (mission_id, user_id)
+        self.evaluations = db.evaluations
+
+    async def ensure_indexes(self) -> None:
+        """Cria os índices das missões e avaliações (operação idempotente).
+
+        - missions.close_at (esparso): encerramentos automáticos vencidos.
+        - (mission_id, user_id) único: garante uma avaliação por membro na missão.
+        - (guild_id, user_id, evaluate_at): histórico de um membro no servidor por intervalo de tempo.
+        - evaluate_at: consultas por período.
+        """
+        try:
+            await self.collection.create_index([('close_at', ASCENDING)], sparse=True, name='close_at')
+            await self.evaluations.create_index(
+                [('mission_id', ASCENDING), ('user_id', ASCENDING)],
+                unique=True,
+                name='mission_user_unique'
+            )
+            await self.evaluations.create_index(
+                [('guild_id', ASCENDING), ('user_id', ASCENDING), ('evaluate_at', DESCENDING)],
+                name='guild_user_evaluate_at'
+            )
+            await self.evaluations.create_index(
+                [('evaluate_at', DESCENDING)],
+                name='evaluate_at'
+            )
+            logger.info('Índices das coleções missions e evaluations garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices de avaliações: {e}', exc_info=True)
 
     async def create(self, mission_model: MissionModel) -> bool:
         """Cria uma nova missão.
@@ -24,10 +58,13 @@ class MissionRepository:
         """
 
         try:
+            if mission_model.guild_id is None:
+                mission_model.guild_id = current_guild_id()
+
             mission_data = mission_model.model_dump(by_alias=True)
             await self.collection.insert_one(mission_data)
 
-            logger.info(f'Missão com o id:{mission_model.mission_id} criada pelo user {mission_model.creator_id}')
+            logger.info('Missão com o id:%s criada pelo user %s', mission_model.mission_id, mission_model.creator_id)
 
             return True
 
@@ -49,7 +86,8 @@ class MissionRepository:
             MissionModel | None: MissionModel se encontrado, None se não encontrado ou em caso de erro.
         """
         try:
-            mission_data = await self.collection.find_one({'_id': mission_id})
+            # As avaliações não são carregadas junto com a missão
+            mission_data = await self.collection.find_one({'_id': mission_id}, {'evaluators': 0})
 
             if not mission_data:
                 logger.info('Item não encontrado')
@@ -85,19 +123,91 @@ class MissionRepository:
             )
 
             if result.matched_count > 0:
-                logger.info(f'A missão com ID: {mission_id} foi definida como {update_data['status']}.')
+                logger.info('A missão com ID: %s foi definida como %s.', mission_id, update_data['status'])
                 return True
 
             logger.warning(f'Tentativa de atualizar uma missão inexistente: {mission_id}.')
             return False
 
         except Exception as e:
-            logger.info(f'Erro ao atualizar a missão com ID:{mission_id}: {e}')
+            logger.info('Erro ao atualizar a missão com ID:%s: %s', mission_id, e)
+            return False
+
+    async def schedule_close(self, mission_id: int, close_at: datetime) -> bool:
+        """Agenda o encerramento automático de uma missão ainda não fechada.
+
+        Args:
+            mission_id (int): ID da missão.
+            close_at (datetime): Momento (UTC) do encerramento.
+
+        Returns:
+            bool: True se agendou, False se a missão não existe, já está fechada ou em caso de erro.
+        """
+        try:
+            result = await self.collection.update_one(
+                {'_id': mission_id, 'status': {'$ne': MissionStatus.CLOSED}},
+                {'$set': {'close_at': close_at}}
+            )
+            return result.matched_count > 0
+
+        except Exception as e:
+            logger.error(f'Erro ao agendar o encerramento da missão {mission_id}: {e}', exc_info=True)
+            return False
+
+    async def close(self, mission_id: int) -> bool:
+        """Fecha a missão em uma única escrita condicional (só o primeiro a fechar recebe True).
+
+        Args:
+            mission_id (int): ID da missão.
+
+        Returns:
+            bool: True se a missão foi fechada agora, False se já estava fechada, não existe ou em caso de erro.
+        """
+        try:
+            result = await self.collection.update_one(
+                {'_id': mission_id, 'status': {'$ne': MissionStatus.CLOSED}},
+                {'$set': {'status': MissionStatus.CLOSED, 'completed_at': datetime.now()},
+                 '$unset': {'close_at': ''}}
+            )
+            return result.matched_count > 0
+
+        except Exception as e:
+            logger.error(f'Erro ao fechar a missão {mission_id}: {e}', exc_info=True)
             return False
 
+    async def get_due_closures(self, now: datetime, shards: int, shard_ids: List[int], limit: int = 100) -> List[int]:
+        """Lista as missões com encerramento vencido que pertencem aos shards dados.
+
+        Uma missão pertence ao shard ``mission_id % shards``.
+
+        Args:
+            now (datetime): Momento atual (UTC).
+            shards (int): Quantidade total de shards.
+            shard_ids (List[int]): Shards atendidos por este processo.
+            limit (int): Máximo de missões retornadas.
+
+        Returns:
+            List[int]: IDs das missões (lista vazia em caso de erro).
+        """
+        if not shard_ids:
+            return []
+        try:
+            query: Dict[str, Any] = {'close_at': {'$lte': now}}
+            if len(shard_ids) < shards:
+                query['$or'] = [{'_id': {'$mod': [shards, shard]}} for shard in shard_ids]
+            cursor = self.collection.find(query, {'_id': 1}, sort=[('close_at', ASCENDING)], limit=limit)
+            return [doc['_id'] async for doc in cursor]
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar os encerramentos vencidos: {e}', exc_info=True)
+            return []
+
     async def add_participant(self, mission_id:int, evaluator_model: EvaluatorModel) -> bool:
         """Adiciona um participante à missão, caso ainda não esteja.
 
+        A avaliação é gravada na coleção ``evaluations``; o upsert com ``$setOnInsert``
+        garante que uma avaliação já existente não seja sobrescrita.
+
         Args:
             mission_id (int): ID da missão na qual o usuário participará.
             evaluator_model (EvaluatorModel): Participante avaliado a ser inserido.
@@ -106,30 +216,32 @@ class MissionRepository:
             bool: True se foi adicionado (ou já existia), False se a missão não existe.
         """
         try:
-            evaluator_data = evaluator_model.model_dump()
-            result = await self.collection.update_one(
+            mission_exists = await self.collection.count_documents({'_id':mission_id}, limit=1)
+
+            if not mission_exists:
+                logger.warning(f'Tentativa de adicionar um participante a uma missão inexistente')
+                return False
+
+            evaluation_data = EvaluationModel(mission_id=mission_id,
+                                              guild_id=current_guild_id(),
+                                              **evaluator_model.model_dump()).model_dump()
+            result = await self.evaluations.update_one(
                 {
-                    '_id': mission_id,
-                    'evaluators.user_id': {'$ne': evaluator_model.user_id}
+                    'mission_id': mission_id,
+                    'user_id': evaluator_model.user_id
                 },
                 {
-                    '$push':{'evaluators': evaluator_data}
-                }
-
+                    '$setOnInsert': evaluation_data
+                },
+                upsert=True
             )
 
-            if result.modified_count > 0:
-                logger.info(f'O participante {evaluator_model.user_id} foi adicionado a missão {mission_id}')
+            if result.upserted_id is not None:
+                logger.info('O participante %s foi adicionado a missão %s', evaluator_model.user_id, mission_id)
                 return True
 
-            mission_exists = await self.collection.count_documents({'_id':mission_id}, limit=1)
-
-            if mission_exists:
-                logger.info(f'O participante {evaluator_model.user_id} já estava participando da missão.')
-                return True
-
-            logging.warning(f'Tentativa de adicionar um participante a uma missão inexistente')
-            return False
+            logger.info('O participante %s já estava participando da missão.', evaluator_model.user_id)
+            return True
 
         except Exception as e:
             logger.error(f'Falha ao adcionar o participante {evaluator_model.user_id} a missão {mission_id}: {e}')
@@ -148,24 +260,27 @@ class MissionRepository:
         """
         try:
 
-            result = await self.collection.update_one(
-                {'_id':mission_id,
-                 'evaluators.user_id': evaluator_model.user_id
+            result = await self.evaluations.update_one(
+                {'mission_id':mission_id,
+                 'user_id': evaluator_model.user_id
                  },
             {
                 '$set':{
-                    'evaluators.$.level_at_time':evaluator_model.user_level_at_time,
-                    'evaluators.$.rank': evaluator_model.rank,
-                    'evaluators.$.coins_earned': evaluator_model.coins_earned,
-                    'evaluators.$.xp_earned': evaluator_model.xp_earned,
-                    'evaluators.$.evaluate_at': evaluator_model.evaluate_at
+                    'user_level_at_time':evaluator_model.user_level_at_time,
+                    'rank': evaluator_model.rank,
+                    'coins_earned': evaluator_model.coins_earned,
+                    'xp_earned': evaluator_model.xp_earned,
+                    'evaluate_at': evaluator_model.evaluate_at,
+                    'updated_at': evaluator_model.updated_at,
+                    'xp_multiplier': evaluator_model.xp_multiplier,
+                    'coin_multiplier': evaluator_model.coin_multiplier
 
                     }
                 }
             )
 
             if result.matched_count > 0:
-                logger.info(f'O usuário {evaluator_model.user_id} teve os dados atualizados com sucesso! Na missão {mission_id}, recebendo {evaluator_model.xp_earned}xp e {evaluator_model.coins_earned} moedas')
+                logger.info('O usuário %s teve os dados atualizados com sucesso! Na missão %s, recebendo %sxp e %s moedas', evaluator_model.user_id, mission_id, evaluator_model.xp_earned, evaluator_model.coins_earned)
                 return True
 
             logger.warning(f'Falha ao atualziar a avaliação do usuário {evaluator_model.user_id} na missão {mission_id}')
@@ -174,3 +289,123 @@ class MissionRepository:
         except Exception as e:
             logger.error(f'Erro ao tentar atualizar a avalição o usuário {evaluator_model.user_id} na missão {mission_id}: {e}')
             return False
+
+    async def get_evaluation(self, mission_id: int, user_id: int) -> Optional[EvaluationModel]:
+        """Busca a avaliação de um usuário em uma missão.
+
+        Args:
+            mission_id (int): ID da missão.
+            user_id (int): ID do usuário avaliado.
+
+        Returns:
+            Optional[EvaluationModel]: A avaliação encontrada; None se não existir ou em caso de erro.
+        """
+        try:
+            evaluation_data = await self.evaluations.find_one({'mission_id': mission_id, 'user_id': user_id})
+
+            if not evaluation_data:
+                return None
+
+            return EvaluationModel(**evaluation_data)
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar a avaliação do usuário {user_id} na missão {mission_id}: {e}', exc_info=True)
+            return None
+
+    async def get_mission_evaluations(self, mission_id: int) -> List[EvaluationModel]:
+        """Lista todas as avaliações de uma missão.
+
+        Args:
+            mission_id (int): ID da missão.
+
+        Returns:
+            List[EvaluationModel]: Avaliações da missão (lista vazia em caso de erro).
+        """
+        try:
+            cursor = self.evaluations.find({'mission_id': mission_id})
+            docs = await cursor.to_list(length=None)
+            return [EvaluationModel(**doc) for doc in docs]
+
+        except Exception as e:
+            logger.error(f'Erro ao listar as avaliações da missão {mission_id}: {e}', exc_info=True)
+            return []
+
+    async def get_user_evaluations(self,
+                                   user_id: int,
+                                   start: Optional[datetime] = None,
+                                   end: Optional[datetime] = None,
+                                   limit: int = 50) -> List[EvaluationModel]:
+        """Histórico de avaliações de um membro no servidor atual, da mais recente para a mais antiga.
+
+        Usa o índice (guild_id, user_id, evaluate_at), então é uma consulta por
+        intervalo sem varrer as missões.
+
+        Args:
+            user_id (int): ID do usuário avaliado.
+            start (Optional[datetime]): Início do intervalo (inclusivo).
+            end (Optional[datetime]): Fim do intervalo (exclusivo).
+            limit (int): Quantidade máxima de avaliações retornadas.
+
+        Returns:
+            List[EvaluationModel]: Avaliações encontradas (lista vazia em caso de erro).
+        """
+        query: Dict[str, Any] = {'guild_id': current_guild_id(), 'user_id': user_id}
+        period: Dict[str, datetime] = {}
+
+        if start:
+            period['$gte'] = start
+        if end:
+            period['$lt'] = end
+        if period:
+            query['evaluate_at'] = period
+
+        try:
+            cursor = self.evaluations.find(query, sort=[('evaluate_at', DESCENDING)], limit=limit)
+            docs = await cursor.to_list(length=limit)
+            return [EvaluationModel(**doc) for doc in docs]
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar o histórico de avaliações do usuário {user_id}: {e}', exc_info=True)
+            return []
+
+    async def aggregate_user_stats(self) -> Dict[int, UserStatsModel]:
+        """Recalcula os contadores de contribuição dos usuários do servidor atual a partir das avaliações.
+
+        Agrupa a coleção ``evaluations`` por (user_id, rank) no MongoDB e monta
+        os contadores em memória. Usado apenas pela reconstrução completa.
+
+        Returns:
+            Dict[int, UserStatsModel]: Contadores por ID de usuário (vazio em caso de erro).
+        """
+        pipeline = [
+            {'$match': {'guild_id': current_guild_id()}},
+            {'$group': {
+                '_id': {'user_id': '$user_id', 'rank': '$rank'},
+                'count': {'$sum': 1},
+                'xp': {'$sum': '$xp_earned'},
+                'coins': {'$sum': '$coins_earned'}
+            }}
+        ]
+
+        try:
+            stats_by_user: Dict[int, UserStatsModel] = {}
+            cursor = await self.evaluations.aggregate(pipeline)
+
+            async for row in cursor:
+                user_id = row['_id']['user_id']
+                rank = EvaluationRank.get_or_none(row['_id']['rank'] or '')
+                stats = stats_by_user.setdefault(user_id, UserStatsModel())
+
+                stats.missions_helped += row['count']
+                stats.mission_xp += row['xp']
+                stats.mission_coins += row['coins']
+
+                if rank:
+                    stats.rank_counts[rank.value] = stats.rank_counts.get(rank.value, 0) + row['count']
+                    stats.score_sum += rank.score * row['count']
+
+            return stats_by_user
+
+        except Exception as e:
+            logger.error(f'Erro ao agregar os contadores dos usuários: {e}', exc_info=True)
+            return {}
@@ -0,0 +1,259 @@
+from pymongo.database import Database
+from pymongo import ASCENDING
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Set
+
+from src.database.models.stats import StatsDailyModel
+from src.database.models.ledger import LedgerReason
+from src.utils.guild_scope import current_guild_id
+
+logger = logging.getLogger(__name__)
+
+# Formato usado como chave dos buckets diários
+DAY_FORMAT = '%Y-%m-%d'
+
+
+def day_key(moment: datetime) -> str:
+    """Converte um datetime na chave do bucket diário (AAAA-MM-DD)."""
+    return moment.strftime(DAY_FORMAT)
+
+
+def day_ranges(days: Set[str]) -> List[Dict[str, Any]]:
+    """Gera os intervalos [início, fim) de cada dia para usar em um $match.
+
+    Args:
+        days (Set[str]): Dias no formato AAAA-MM-DD.
+
+    Returns:
+        List[Dict[str, Any]]: Um filtro {'$gte': início, '$lt': fim} por dia.
+    """
+    ranges = []
+    for day in sorted(days):
+        start = datetime.strptime(day, DAY_FORMAT)
+        ranges.append({'$gte': start, '$lt': start + timedelta(days=1)})
+    return ranges
+
+
+class StatsRepository:
+    """
+    Repositório dos buckets diários de estatísticas (``stats_daily``).
+
+    Os buckets são calculados no próprio MongoDB a partir das coleções de
+    missões e avaliações e gravados com ``$merge``, então o bot só lê documentos
+    pequenos e pré-agregados. Cada bucket é chaveado por {guild_id, day}.
+    """
+    # Nome do documento de estado (watermark) do rollup diário
+    ROLLUP_NAME = 'stats_daily'
+
+    def __init__(self, db: Database):
+        """
+        Inicializa o repositório com a instância do banco de dados.
+
+        Args:
+            db (Database): Instância do banco de dados MongoDB.
+        """
+        self.collection = db.stats_daily
+        self.state = db.rollup_state
+        self.missions = db.missions
+        self.evaluations = db.evaluations
+        self.ledger = db.ledger
+
+    async def ensure_indexes(self) -> None:
+        """Cria os índices usados para descobrir o que mudou desde o último watermark e ler os buckets."""
+        try:
+            await self.missions.create_index([('created_at', ASCENDING)], name='created_at')
+            await self.missions.create_index([('completed_at', ASCENDING)], name='completed_at', sparse=True)
+            await self.evaluations.create_index([('updated_at', ASCENDING)], name='updated_at', sparse=True)
+            await self.collection.create_index([('guild_id', ASCENDING), ('day', ASCENDING)], name='guild_day')
+            await self.collection.create_index([('day', ASCENDING)], name='day')
+            logger.info('Índices do rollup diário garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices do rollup diário: {e}', exc_info=True)
+
+    async def get_watermark(self) -> Optional[datetime]:
+        """Busca até quando o rollup já processou as mudanças.
+
+        Erros de leitura são propagados: tratá-los como "nunca rodou" faria o
+        próximo ciclo recalcular todo o histórico.
+
+        Returns:
+            Optional[datetime]: O watermark salvo; None somente se o rollup nunca rodou.
+        """
+        state = await self.state.find_one({'_id': self.ROLLUP_NAME})
+        return state['watermark'] if state else None
+
+    async def set_watermark(self, watermark: datetime) -> bool:
+        """Salva o novo watermark do rollup.
+
+        Args:
+            watermark (datetime): Momento até onde as mudanças já foram processadas.
+
+        Returns:
+            bool: True se salvou, False caso contrário.
+        """
+        try:
+            await self.state.update_one(
+                {'_id': self.ROLLUP_NAME},
+                {'$set': {'watermark': watermark}},
+                upsert=True
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao salvar o watermark do rollup: {e}', exc_info=True)
+            return False
+
+    async def find_changed_days(self, since: Optional[datetime]) -> Set[str]:
+        """Descobre quais dias têm documentos criados/alterados desde o watermark.
+
+        Cada fonte é lida pelo campo que marca a mudança e agrupada pelo campo
+        que define o dia do bucket: uma avaliação ajustada hoje (``updated_at``)
+        recalcula o dia em que foi feita (``evaluate_at``).
+
+        Args:
+            since (Optional[datetime]): Watermark atual; None processa todo o histórico.
+
+        Returns:
+            Set[str]: Dias (AAAA-MM-DD) que precisam ser recalculados.
+        """
+        # (coleção, campo da mudança, campo do dia)
+        sources = [
+            (self.missions, 'created_at', 'created_at'),
+            (self.missions, 'completed_at', 'completed_at'),
+            (self.evaluations, 'evaluate_at', 'evaluate_at'),
+            (self.evaluations, 'updated_at', 'evaluate_at'),
+            (self.ledger, 'created_at', 'created_at'),
+        ]
+
+        days: Set[str] = set()
+        for collection, changed_field, day_field in sources:
+            match = {changed_field: {'$gte': since}} if since else {changed_field: {'$type': 'date'}}
+            if collection is self.ledger:
+                match['reason'] = LedgerReason.PURCHASE
+            pipeline = [
+                {'$match': match},
+                {'$group': {'_id': {'$dateToString': {'format': DAY_FORMAT, 'date': f'${day_field}'}}}}
+            ]
+            cursor = await collection.aggregate(pipeline)
+            days.update([doc['_id'] async for doc in cursor])
+
+        return days
+
+    async def rebuild_days(self, days: Set[str]) -> bool:
+        """Recalcula os buckets dos dias informados (de todos os servidores) e grava em ``stats_daily``.
+
+        Um único pipeline junta as quatro fontes (``$unionWith``), monta cada
+        bucket completo e o substitui com ``$merge``; nenhum bucket fica zerado
+        ou pela metade se o pipeline falhar. Buckets dos dias recalculados que
+        não foram reescritos (o servidor não tem mais dados no dia) são apagados depois.
+
+        Args:
+            days (Set[str]): Dias (AAAA-MM-DD) a recalcular.
+
+        Returns:
+            bool: True se os buckets foram gravados, False em caso de erro.
+        """
+        if not days:
+            return True
+
+        ranges = day_ranges(days)
+        now = datetime.now()
+
+        def in_days(field: str) -> Dict[str, Any]:
+            return {'$or': [{field: r} for r in ranges]}
+
+        def by_day(field: str) -> Dict[str, Any]:
+            return {'$dateToString': {'format': DAY_FORMAT, 'date': f'${field}'}}
+
+        def pairs(field: str) -> Dict[str, Any]:
+            # Pares {k, v} acumulados no $group final (ignora os documentos de outras fontes)
+            return {'$arrayToObject': {'$filter': {'input': f'${field}', 'cond': {'$ne': ['$$this', None]}}}}
+
+        pipeline = [
+            # Missões abertas por dia
+            {'$match': in_days('created_at')},
+            {'$project': {'_id': 0, 'guild_id': 1, 'day': by_day('created_at'), 'missions_opened': {'$literal': 1}}},
+
+            # Missões encerradas por dia
+            {'$unionWith': {'coll': self.missions.name, 'pipeline': [
+                {'$match': in_days('completed_at')},
+                {'$project': {'_id': 0, 'guild_id': 1, 'day': by_day('completed_at'), 'missions_closed': {'$literal': 1}}},
+            ]}},
+
+            # Distribuição de ranks e XP/moedas distribuídos, no dia da avaliação
+            {'$unionWith': {'coll': self.evaluations.name, 'pipeline': [
+                {'$match': in_days('evaluate_at')},
+                {'$group': {
+                    '_id': {'guild_id': '$guild_id', 'day': by_day('evaluate_at'), 'rank': '$rank'},
+                    'count': {'$sum': 1},
+                    'xp': {'$sum': '$xp_earned'},
+                    'coins': {'$sum': '$coins_earned'}
+                }},
+                {'$project': {'_id': 0, 'guild_id': '$_id.guild_id', 'day': '$_id.day',
+                              'rank_count': {'k': {'$ifNull': ['$_id.rank', 'E']}, 'v': '$count'},
+                              'xp_minted': '$xp', 'coins_minted': '$coins'}},
+            ]}},
+
+            # Compras por item a partir do ledger
+            {'$unionWith': {'coll': self.ledger.name, 'pipeline': [
+                {'$match': {'reason': LedgerReason.PURCHASE, **in_days('created_at')}},
+                {'$group': {
+                    '_id': {'guild_id': '$guild_id', 'day': by_day('created_at'), 'item_id': '$item_id'},
+                    'quantity': {'$sum': {'$ifNull': ['$quantity', 1]}}
+                }},
+                {'$project': {'_id': 0, 'guild_id': '$_id.guild_id', 'day': '$_id.day',
+                              'purchase': {'k': {'$toString': '$_id.item_id'}, 'v': '$quantity'}}},
+            ]}},
+
+            # Um bucket completo por {guild_id, day}
+            {'$group': {
+                '_id': {'guild_id': '$guild_id', 'day': '$day'},
+                'missions_opened': {'$sum': '$missions_opened'},
+                'missions_closed': {'$sum': '$missions_closed'},
+                'rank_counts': {'$push': '$rank_count'},
+                'xp_minted': {'$sum': '$xp_minted'},
+                'coins_minted': {'$sum': '$coins_minted'},
+                'purchases': {'$push': '$purchase'}
+            }},
+            {'$set': {'guild_id': '$_id.guild_id', 'day': '$_id.day', 'updated_at': now,
+                      'rank_counts': pairs('rank_counts'), 'purchases': pairs('purchases')}},
+            {'$merge': {'into': self.collection.name, 'on': '_id',
+                        'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ]
+
+        try:
+            await (await self.missions.aggregate(pipeline)).to_list(length=None)
+
+            # Buckets dos dias recalculados que o pipeline não reescreveu ficaram sem dados
+            await self.collection.delete_many({'day': {'$in': sorted(days)}, 'updated_at': {'$ne': now}})
+
+            logger.info(f'{len(days)} buckets diários recalculados')
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao recalcular os buckets diários: {e}', exc_info=True)
+            return False
+
+    async def get_daily(self, start: datetime, end: datetime) -> List[StatsDailyModel]:
+        """Lê os buckets pré-agregados de um período do servidor atual.
+
+        Args:
+            start (datetime): Primeiro dia do período (inclusivo).
+            end (datetime): Último dia do período (inclusivo).
+
+        Returns:
+            List[StatsDailyModel]: Buckets ordenados por dia (lista vazia em caso de erro).
+        """
+        try:
+            cursor = self.collection.find(
+                {'guild_id': current_guild_id(), 'day': {'$gte': day_key(start), '$lte': day_key(end)}},
+                sort=[('day', ASCENDING)]
+            )
+            docs = await cursor.to_list(length=None)
+            return [StatsDailyModel(**doc) for doc in docs]
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar os buckets diários: {e}', exc_info=True)
+            return []
@@ -0,0 +1,86 @@
+from pymongo.database import Database
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+from src.database.models.storefront import StorefrontModel
+
+logger = logging.getLogger(__name__)
+
+
+class StorefrontRepository:
+    """Vitrines da loja, uma por servidor (coleção ``storefronts``)."""
+
+    def __init__(self, db: Database):
+        self.collection = db.storefronts
+
+    async def get(self, guild_id: int) -> Optional[StorefrontModel]:
+        """Busca a vitrine de um servidor.
+
+        Args:
+            guild_id (int): ID do servidor.
+
+        Returns:
+            Optional[StorefrontModel]: A vitrine ou None se não existir (ou em caso de erro).
+        """
+        try:
+            data = await self.collection.find_one({'_id': guild_id})
+            return StorefrontModel(**data) if data else None
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar a vitrine do servidor {guild_id}: {e}', exc_info=True)
+            return None
+
+    async def get_due(self, rotated_before: datetime) -> List[StorefrontModel]:
+        """Lista as vitrines cuja última rotação é anterior ao momento dado.
+
+        Args:
+            rotated_before (datetime): Limite da última rotação.
+
+        Returns:
+            List[StorefrontModel]: Vitrines a rotacionar (lista vazia em caso de erro).
+        """
+        try:
+            cursor = self.collection.find({'$or': [{'rotated_at': {'$lte': rotated_before}},
+                                                   {'rotated_at': None}]})
+            return [StorefrontModel(**doc) async for doc in cursor]
+
+        except Exception as e:
+            logger.error(f'Erro ao buscar as vitrines a rotacionar: {e}', exc_info=True)
+            return []
+
+    async def save(self, storefront: StorefrontModel) -> bool:
+        """Grava (upsert) a vitrine de um servidor.
+
+        Args:
+            storefront (StorefrontModel): Vitrine a ser gravada.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        try:
+            await self.collection.replace_one({'_id': storefront.guild_id},
+                                              storefront.model_dump(by_alias=True),
+                                              upsert=True)
+            return True
+
+        except Exception as e:
+            logger.error(f'Erro ao gravar a vitrine do servidor {storefront.guild_id}: {e}', exc_info=True)
+            return False
+
+    async def delete(self, guild_id: int) -> bool:
+        """Remove a vitrine de um servidor (ex: a mensagem foi apagada).
+
+        Args:
+            guild_id (int): ID do servidor.
+
+        Returns:
+            bool: True se removeu, False caso contrário.
+        """
+        try:
+            result = await self.collection.delete_one({'_id': guild_id})
+            return result.deleted_count > 0
+
+        except Exception as e:
+            logger.error(f'Erro ao remover a vitrine do servidor {guild_id}: {e}', exc_info=True)
+            return False
@@ -1,10 +1,14 @@
 from pymongo.database import Database
 import logging
-from pymongo import ReturnDocument
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
 from pymongo.errors import DuplicateKeyError
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
 
-from src.database.models.user import UserModel, UserStatus
+from src.database.models.effects import TimedBuff
+from src.database.models.user import UserModel, UserStatus, UserStatsModel
+from src.database.models.ledger import LedgerEntryModel, LedgerReason
+from src.utils.guild_scope import current_guild_id
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +19,53 @@ class UserRepository:
     Este repositório encapsula as interações com o banco de dados relacionadas
     a usuários, oferecendo métodos para criação, consulta, atualização de
     status, manipulação de inventário e gerenciamento de cargos (roles).
+
+    Os documentos são chaveados por (guild_id, user_id); o servidor vem de
+    ``current_guild_id()``, definido pelo Cog/evento que iniciou a operação.
     """
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, ledger=None):
         """
         Inicializa o repositório com a instância do banco de dados.
 
         Args:
             db (Database): Instância do banco de dados MongoDB.
+            ledger: Buffer do ledger de economia (LedgerService). Quando informado,
+                toda alteração de XP/moedas gera uma entrada no ledger.
         """
         # Conexão com a coleção User
         self.collection = db.users
+        self.ledger = ledger
+
+    @staticmethod
+    def _key(user_id: int) -> Dict[str, Any]:
+        """Filtro do perfil do usuário no servidor atual."""
+        return {'guild_id': current_guild_id(), 'user_id': user_id}
+
+    @staticmethod
+    def _prune_buffs(now: Optional[datetime] = None) -> Dict[str, Any]:
+        """``$pull`` dos buffs vencidos, anexado às escritas do usuário (limpeza oportunista)."""
+        return {'buffs': {'expires_at': {'$lte': now or datetime.now()}}}
+
+    async def ensure_indexes(self) -> None:
+        """Cria o índice único (guild_id, user_id) da coleção de usuários (operação idempotente).
+
+        Bancos anteriores ao multi-servidor precisam rodar antes o
+        ``scripts/migrate_guild_tenancy.py``, que preenche os dois campos.
+        """
+        try:
+            await self.collection.create_index(
+                [('guild_id', ASCENDING), ('user_id', ASCENDING)],
+                unique=True,
+                name='guild_user_unique'
+            )
+            # Só usuários com buffs têm o campo: a varredura não passa pelos demais
+            await self.collection.create_index([('buffs_expire_at', ASCENDING)],
+                                               sparse=True,
+                                               name='buffs_expire_at')
+            logger.info('Índices da coleção users garantidos.')
+
+        except Exception as e:
+            logger.error(f'Erro ao criar os índices de usuários: {e}', exc_info=True)
 
     async def create(self, user_model:UserModel) -> bool:
         """
@@ -38,11 +79,15 @@ class UserRepository:
         """
 
         try:
-            user_data = user_model.model_dump(by_alias=True)
+            if user_model.guild_id is None:
+                user_model.guild_id = current_guild_id()
+
+            # buffs_expire_at só existe enquanto há buffs ($min não substitui um null)
+            user_data = user_model.model_dump(by_alias=True, exclude={'buffs_expire_at'})
             await self.collection.insert_one(user_data)
 
 
-            logger.info(f'Usuário cadastrado: {user_model.username} | ID: {user_model.user_id}')
+            logger.info('Usuário cadastrado: %s | ID: %s', user_model.username, user_model.user_id)
             return True
 
         except DuplicateKeyError:
@@ -54,6 +99,88 @@ class UserRepository:
             return False
 
 
+    async def register_members(self, users: List[UserModel]) -> Optional[Dict[int, List[int]]]:
+        """Cadastra ou reativa vários membros do servidor atual em uma escrita.
+
+        Cada membro vira um upsert: quem já existe só volta a ficar ativo e
+        quem não existe é criado a partir do modelo. Os cargos guardados são
+        lidos só para quem retornou (uma leitura a mais, apenas se houver).
+
+        Args:
+            users (List[UserModel]): Membros que entraram (um por user_id).
+
+        Returns:
+            Optional[Dict[int, List[int]]]: user_id -> cargos guardados de quem retornou
+                (os ausentes foram criados agora), ou None em caso de erro.
+        """
+        try:
+            operations = []
+            for user in users:
+                # buffs_expire_at só existe enquanto há buffs ($min não substitui um null)
+                data = user.model_dump(by_alias=True, exclude={'user_id', 'guild_id', 'status', 'buffs_expire_at'})
+                operations.append(UpdateOne(self._key(user.user_id),
+                                            {'$set': {'status': UserStatus.ACTIVE}, '$setOnInsert': data},
+                                            upsert=True))
+
+            result = await self.collection.bulk_write(operations, ordered=False)
+            returning = [user.user_id for index, user in enumerate(users) if index not in result.upserted_ids]
+            logger.info('%s membros cadastrados e %s reativados', len(users) - len(returning), len(returning))
+
+            if not returning:
+                return {}
+
+            cursor = self.collection.find({'guild_id': current_guild_id(), 'user_id': {'$in': returning}},
+                                          {'user_id': 1, 'role_ids': 1})
+            return {doc['user_id']: doc.get('role_ids', []) async for doc in cursor}
+
+        except Exception as e:
+            logger.error(f'Erro ao cadastrar {len(users)} membros em lote: {e}', exc_info=True)
+            return None
+
+    @staticmethod
+    def _departure(role_ids: List[int]) -> Dict[str, Any]:
+        """Update da saída: inativa e guarda os cargos na mesma escrita."""
+        update: Dict[str, Any] = {'$set': {'status': UserStatus.INACTIVE}}
+        if role_ids:
+            update['$addToSet'] = {'role_ids': {'$each': role_ids}}
+        return update
+
+    async def record_departures(self,
+                                departures: Dict[int, List[int]],
+                                new_users: Optional[Dict[int, UserModel]] = None) -> Optional[int]:
+        """Registra a saída de vários membros do servidor atual em uma escrita.
+
+        Cada saída é um único update (status inativo + ``$addToSet`` dos cargos).
+        Quem entrou e saiu antes de ser cadastrado vem em ``new_users`` e é
+        criado já inativo, com os cargos guardados.
+
+        Args:
+            departures (Dict[int, List[int]]): user_id -> cargos que o membro tinha.
+            new_users (Optional[Dict[int, UserModel]]): Modelos dos membros ainda não cadastrados.
+
+        Returns:
+            Optional[int]: Quantidade de usuários atualizados/criados, ou None em caso de erro.
+        """
+        new_users = new_users or {}
+        try:
+            operations = []
+            for user_id, role_ids in departures.items():
+                update = self._departure(role_ids)
+                new_user = new_users.get(user_id)
+                if new_user is not None:
+                    # Campos do $set/$addToSet não podem se repetir no $setOnInsert
+                    exclude = {'user_id', 'guild_id', 'status', 'buffs_expire_at'} | ({'role_ids'} if role_ids else set())
+                    update['$setOnInsert'] = new_user.model_dump(by_alias=True, exclude=exclude)
+                operations.append(UpdateOne(self._key(user_id), update, upsert=new_user is not None))
+
+            result = await self.collection.bulk_write(operations, ordered=False)
+            logger.info('Saída de %s membros registrada', result.matched_count + result.upserted_count)
+            return result.matched_count + result.upserted_count
+
+        except Exception as e:
+            logger.error(f'Erro ao registrar a saída de {len(departures)} membros: {e}', exc_info=True)
+            return None
+
     async def update_status(self, user_id: int, status: UserStatus) -> bool:
         """
         Atualiza o status de um usuário.
@@ -68,11 +195,11 @@ class UserRepository:
 
         try:
             result = await self.collection.update_one(
-                {'_id': user_id},
+                self._key(user_id),
                 {'$set': {'status': status}}
             )
             if result.matched_count >0:
-                logger.info(f'Status do user {user_id} atualizado para {status}')
+                logger.info('Status do user %s atualizado para %s', user_id, status)
                 return True
 
             # Se chegou aqui, o usuário não existe.
@@ -83,7 +210,13 @@ class UserRepository:
             logger.error(f'Falha ao atualizar os status do user {user_id}: {e}')
             return False
 
-    async def add_xp_coins(self, user_id:int, xp:int, coins:int) -> Optional[UserModel]:
+    async def add_xp_coins(self,
+                           user_id:int,
+                           xp:int,
+                           coins:int,
+                           stats_inc: Optional[Dict[str, int]] = None,
+                           reason: LedgerReason = LedgerReason.ADMIN,
+                           reference: Optional[Dict[str, int]] = None) -> Optional[UserModel]:
         """
         Adiciona XP e moedas ao usuário pelo ID.
 
@@ -91,25 +224,39 @@ class UserRepository:
             user_id: ID do usuário
             xp: Valor de XP a ser adicionado
             coins: Valor de moedas a ser adicionado
+            stats_inc: Incrementos extras nos contadores (ex: {'stats.missions_helped': 1}),
+                aplicados no mesmo $inc do saldo.
+            reason: Motivo registrado no ledger.
+            reference: Origem registrada no ledger (ex: {'mission_id': 1}, {'item_id': 2, 'quantity': 1}).
         Returns:
             Optional[UserModel]: O usuário atualizado se encontrado; None se o usuário não existir ou em caso de erro.
         """
-        # Se xp e moedas forem 0, apenas retorna o UserModel pelo ID.
-        if not xp and not coins:
+        # Se xp, moedas e contadores forem 0, apenas retorna o UserModel pelo ID.
+        if not xp and not coins and not stats_inc:
             return await self.get_by_id(user_id)
         try:
+            increments = {'xp': xp, 'coins': coins}
+            if stats_inc:
+                increments.update(stats_inc)
+
             result = await self.collection.find_one_and_update(
-                {'_id': user_id},
+                self._key(user_id),
                 {
-                    '$inc': {
-                    'xp':xp,
-                    'coins':coins
-                    }
+                    '$inc': increments,
+                    '$pull': self._prune_buffs()
                 },
                 return_document=ReturnDocument.AFTER
             )
             if result:
-                logger.info(f'XP e moedas incrementadas para user {user_id}')
+                logger.info('XP e moedas incrementadas para user %s', user_id)
+
+                if self.ledger is not None and (xp or coins):
+                    self.ledger.record(LedgerEntryModel(user_id=user_id,
+                                                        guild_id=result.get('guild_id'),
+                                                        xp=xp,
+                                                        coins=coins,
+                                                        reason=reason,
+                                                        **(reference or {})))
                 return UserModel(**result)
 
             logger.warning(f'Falha ao incrementar: Usuário {user_id} não encontrado.')
@@ -130,10 +277,10 @@ class UserRepository:
             Optional[UserModel]: O usuário encontrado; None se não encontrado ou em caso de erro.
         """
         try:
-            user_data = await self.collection.find_one({'_id': user_id})
+            user_data = await self.collection.find_one(self._key(user_id))
 
             if not user_data:
-                logger.info(f'Usuário {user_id} não encontrado')
+                logger.info('Usuário %s não encontrado', user_id)
                 return None
             return UserModel(**user_data)
 
@@ -141,13 +288,14 @@ class UserRepository:
             logger.error(f'Erro ao buscar usuário {user_id}: {e}', exc_info=True)
             return None
 
-    async def equip_item(self, user_id: int, item_id: int) -> bool:
+    async def equip_item(self, user_id: int, item_id: int, multipliers: Tuple[float, float]) -> bool:
         """
-        Equipa um item no usuário.
+        Equipa um item no usuário, gravando junto os multiplicadores do item.
 
         Args:
             user_id (int): ID do usuário.
             item_id (int): ID do item a ser equipado.
+            multipliers (Tuple[float, float]): (XP, moedas) compilados do item (``ItemModel.multipliers``).
         Returns:
             bool: True se a operação foi concluída (inclusive se o item já estava equipado);
                   False se o usuário não existir ou não possuir o item.
@@ -156,22 +304,23 @@ class UserRepository:
         try:
             result = await self.collection.update_one(
                 {
-                    '_id': user_id,
-                    f'inventory.{item_id}': {'$gt': 0}  #
+                    **self._key(user_id),
+                    f'inventory.{item_id}': {'$gt': 0}
                 },
-                {'$set': {'equipped_item_id': item_id}}
+                {'$set': {'equipped_item_id': item_id,
+                          'xp_multiplier': multipliers[0],
+                          'coin_multiplier': multipliers[1]}}
             )
 
             if result.matched_count == 0:
-                logger.info(f'Falha: Usuário {user_id} não possui o item {item_id} ou não existe.')
+                logger.info('Falha: Usuário %s não possui o item %s ou não existe.', user_id, item_id)
                 return False
 
             # Se encontrou (matched > 0), é sucesso, mesmo que já estivesse equipado.
             if result.modified_count > 0:
-                logger.info(
-                    f'Usuário {user_id} equipou item {item_id}' )
+                logger.info('Usuário %s equipou item %s', user_id, item_id)
             else:
-                logger.info(f"Usuário {user_id} já estava com o item {item_id} equipado.")
+                logger.info("Usuário %s já estava com o item %s equipado.", user_id, item_id)
 
             return True
 
@@ -196,21 +345,21 @@ class UserRepository:
         try:
             # Remove o item equipado
             result = await self.collection.update_one(
-                {'_id': user_id},
-                {'$unset': {'equipped_item_id': ""}}
+                self._key(user_id),
+                {'$unset': {'equipped_item_id': ""}, '$set': {'xp_multiplier': 1.0, 'coin_multiplier': 1.0}}
             )
 
             # Se matched_count == 0, o usuário não existe.
             if result.matched_count == 0:
-                logger.info(f'Falha usuário {user_id} não encontrado para desequipar.')
+                logger.info('Falha usuário %s não encontrado para desequipar.', user_id)
                 return False
 
             if result.modified_count > 0:
-                logger.info(f'Usuário {user_id} desequipou o item com sucesso.')
+                logger.info('Usuário %s desequipou o item com sucesso.', user_id)
 
             else:
                 # Se modified_count == 0, ele já não tinha nada equipado.
-                logger.info(f'Usuário {user_id} já não tinha item equipados.')
+                logger.info('Usuário %s já não tinha item equipados.', user_id)
 
             return True
 
@@ -218,6 +367,29 @@ class UserRepository:
             logger.error(f'Erro ao desequipar item de {user_id}: {e}', exc_info=True)
             return False
 
+    async def sync_equipped_multipliers(self, item_id: int, multipliers: Tuple[float, float]) -> int:
+        """Regrava os multiplicadores de todos que estão com o item equipado (em todos os servidores).
+
+        Usado quando os efeitos passivos de um item mudam (scripts/seed_items.py).
+
+        Args:
+            item_id (int): ID do item.
+            multipliers (Tuple[float, float]): (XP, moedas) compilados do item.
+
+        Returns:
+            int: Quantidade de usuários atualizados (0 em caso de erro).
+        """
+        try:
+            result = await self.collection.update_many(
+                {'equipped_item_id': item_id},
+                {'$set': {'xp_multiplier': multipliers[0], 'coin_multiplier': multipliers[1]}}
+            )
+            return result.modified_count
+
+        except Exception as e:
+            logger.error(f'Erro ao sincronizar os multiplicadores do item {item_id}: {e}', exc_info=True)
+            return 0
+
     async def add_item_to_inventory(self, user_id: int, item_id: int, quantity: int) -> bool:
         """
         Adiciona item(s) ao inventário do usuário.
@@ -240,12 +412,12 @@ class UserRepository:
         try:
             # Adiciona ao inventário
             result = await self.collection.update_one(
-                {'_id': user_id},
+                self._key(user_id),
                 {'$inc': {f'inventory.{item_id}': quantity}}
             )
 
             if result.modified_count > 0:
-                logger.info(f'Usuário {user_id} recebeu {quantity}x item {item_id}')
+                logger.info('Usuário %s recebeu %sx item %s', user_id, quantity, item_id)
                 return True
 
             logger.warning(f'Falha ao adicionar item ao inventário do usuário {user_id}')
@@ -255,6 +427,121 @@ class UserRepository:
             logger.error(f'Erro ao adicionar item {item_id} ao inventário do usuário {user_id}: {e}', exc_info=True)
             return False
 
+    async def consume_item(self,
+                           user_id: int,
+                           item_id: int,
+                           quantity: int,
+                           xp: int = 0,
+                           coins: int = 0,
+                           role_id: Optional[int] = None,
+                           buff: Optional[TimedBuff] = None) -> Optional[UserModel]:
+        """
+        Consome ``quantity`` unidades do item e aplica os efeitos em uma única escrita.
+
+        O filtro exige o estoque no inventário, então usos concorrentes nunca
+        deixam a quantidade negativa: quem chega depois não encontra o documento.
+
+        Args:
+            user_id (int): ID do usuário.
+            item_id (int): ID do item consumido.
+            quantity (int): Unidades consumidas (deve ser positiva).
+            xp (int): XP somado de todas as unidades.
+            coins (int): Moedas somadas de todas as unidades.
+            role_id (Optional[int]): Cargo concedido, guardado para restauração.
+            buff (Optional[TimedBuff]): Bônus temporário concedido.
+
+        Returns:
+            Optional[UserModel]: O usuário atualizado; None se não possui as unidades (ou em caso de erro).
+        """
+        if quantity <= 0:
+            logger.warning(f'Tentativa de consumir quantidade inválida ({quantity}) do usuário {user_id}')
+            return None
+
+        update: Dict[str, Any] = {'$inc': {f'inventory.{item_id}': -quantity, 'xp': xp, 'coins': coins}}
+        if role_id is not None:
+            update['$addToSet'] = {'role_ids': role_id}
+        if buff is not None:
+            # $push e $pull não podem alterar o mesmo array: os vencidos saem na próxima escrita
+            update['$push'] = {'buffs': buff.model_dump()}
+            update['$min'] = {'buffs_expire_at': buff.expires_at}
+        else:
+            update['$pull'] = self._prune_buffs()
+
+        try:
+            result = await self.collection.find_one_and_update(
+                {**self._key(user_id), f'inventory.{item_id}': {'$gte': quantity}},
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+            if not result:
+                logger.info('Usuário %s não possui %sx item %s para usar', user_id, quantity, item_id)
+                return None
+
+            logger.info('Usuário %s usou %sx o item %s', user_id, quantity, item_id)
+            if self.ledger is not None and (xp or coins):
+                self.ledger.record(LedgerEntryModel(user_id=user_id,
+                                                    guild_id=result.get('guild_id'),
+                                                    xp=xp,
+                                                    coins=coins,
+                                                    reason=LedgerReason.ITEM_USE,
+                                                    item_id=item_id,
+                                                    quantity=quantity))
+
+            user = UserModel(**result)
+
+            # Última unidade: remove a chave (condicionada a 0, caso outra compra tenha chegado no meio)
+            if user.inventory.get(item_id, 0) <= 0:
+                await self.collection.update_one({**self._key(user_id), f'inventory.{item_id}': 0},
+                                                 {'$unset': {f'inventory.{item_id}': ''}})
+                user.inventory.pop(item_id, None)
+
+            return user
+
+        except Exception as e:
+            logger.error(f'Erro ao consumir o item {item_id} do usuário {user_id}: {e}', exc_info=True)
+            return None
+
+    async def sweep_expired_buffs(self, now: Optional[datetime] = None, limit: int = 500) -> int:
+        """Remove os buffs vencidos de usuários sem escritas recentes (em todos os servidores).
+
+        Usa o índice de ``buffs_expire_at``; cada usuário é regravado só se os
+        buffs não mudaram desde a leitura (um buff novo fica para a próxima
+        varredura, já que ``buffs_expire_at`` continua vencido).
+
+        Args:
+            now (Optional[datetime]): Momento de corte (padrão: agora).
+            limit (int): Máximo de usuários por chamada.
+
+        Returns:
+            int: Quantidade de usuários limpos (0 em caso de erro).
+        """
+        now = now or datetime.now()
+        try:
+            operations: List[UpdateOne] = []
+            cursor = self.collection.find({'buffs_expire_at': {'$lte': now}},
+                                          {'_id': 1, 'buffs': 1}).limit(limit)
+            async for doc in cursor:
+                buffs = doc.get('buffs', [])
+                remaining = [buff['expires_at'] for buff in buffs if buff['expires_at'] > now]
+
+                update: Dict[str, Any] = {'$pull': self._prune_buffs(now)}
+                if remaining:
+                    update['$set'] = {'buffs_expire_at': min(remaining)}
+                else:
+                    update['$unset'] = {'buffs_expire_at': ''}
+                operations.append(UpdateOne({'_id': doc['_id'], 'buffs': buffs}, update))
+
+            if not operations:
+                return 0
+
+            result = await self.collection.bulk_write(operations, ordered=False)
+            logger.info('Buffs vencidos removidos de %s usuários', result.modified_count)
+            return result.modified_count
+
+        except Exception as e:
+            logger.error(f'Erro na varredura de buffs vencidos: {e}', exc_info=True)
+            return 0
+
     async def remove_item_from_inventory(self, user_id: int, item_id: int, quantity: int = 1) -> bool:
         """
         Remove item(s) do inventário do usuário.
@@ -296,10 +583,10 @@ class UserRepository:
                 operation = {'$inc': {f'inventory.{item_id}': -quantity}}
 
             # Executamos a operação escolhida
-            result = await self.collection.update_one({'_id': user_id}, operation)
+            result = await self.collection.update_one(self._key(user_id), operation)
 
             if result.modified_count > 0:
-                logger.info(f'Usuário {user_id}:removeu {quantity}x o item {item_id} ')
+                logger.info('Usuário %s:removeu %sx o item %s ', user_id, quantity, item_id)
                 return True
 
             logger.warning(f'Falha ao remover item do inventário do usuário {user_id}')
@@ -323,15 +610,15 @@ class UserRepository:
         try:
             # Adiciona o role caso o usuário não tenha
             result = await self.collection.update_one(
-                {'_id': user_id},
+                self._key(user_id),
                 {'$addToSet': {'role_ids': role_id}}
             )
             # Se a operação foi realizada
             if result.modified_count > 0:
-                logger.info(f'O cargo {role_id} foi adicionado ao usuário {user_id}')
+                logger.info('O cargo %s foi adicionado ao usuário %s', role_id, user_id)
             else:
                 # Se não modificou, o cargo já existia
-                logger.info(f'Usuário {user_id} já possuía o cargo {role_id}.')
+                logger.info('Usuário %s já possuía o cargo %s.', user_id, role_id)
 
             # Retorna True se o comando foi processado com sucesso pelo banco
             return result.acknowledged
@@ -355,18 +642,60 @@ class UserRepository:
         try:
             # Remove a role
             result =  await self.collection.update_one(
-                {'_id': user_id},
+                self._key(user_id),
                 {'$pull': {'role_ids': role_id}}
             )
 
             if result.modified_count > 0:
-                logger.info(f'Role {role_id} removida com sucesso do usuário {user_id}')
+                logger.info('Role %s removida com sucesso do usuário %s', role_id, user_id)
                 return True
 
-            logger.info(f'Usuário {user_id} não possuía o cargo {role_id} para ser removido!')
+            logger.info('Usuário %s não possuía o cargo %s para ser removido!', user_id, role_id)
             return False
 
         except Exception as e:
             logger.error(f'Erro ao remover role: {e} do usuário {user_id}', exc_info=True)
             return False
 
+    async def replace_stats(self, stats_by_user: Dict[int, UserStatsModel], batch_size: int = 1000) -> int:
+        """
+        Sobrescreve os contadores de contribuição (usado pela reconstrução completa).
+
+        Usuários do servidor atual que não aparecem em ``stats_by_user`` e tinham
+        contadores têm os valores zerados.
+
+        Args:
+            stats_by_user (Dict[int, UserStatsModel]): Contadores recalculados por usuário.
+            batch_size (int): Quantidade de operações por bulk_write.
+
+        Returns:
+            int: Quantidade de usuários atualizados.
+        """
+        updated = 0
+        try:
+            operations = []
+            for user_id, stats in stats_by_user.items():
+                operations.append(UpdateOne(self._key(user_id), {'$set': {'stats': stats.model_dump()}}))
+
+                if len(operations) >= batch_size:
+                    result = await self.collection.bulk_write(operations, ordered=False)
+                    updated += result.modified_count
+                    operations = []
+
+            if operations:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+
+            # Quem não tem nenhuma avaliação volta para os contadores zerados
+            result = await self.collection.update_many(
+                {'guild_id': current_guild_id(), 'user_id': {'$nin': list(stats_by_user)}, 'stats.missions_helped': {'$gt': 0}},
+                {'$set': {'stats': UserStatsModel().model_dump()}}
+            )
+            updated += result.modified_count
+
+            logger.info('Contadores de %s usuários reconstruídos', updated)
+            return updated
+
+        except Exception as e:
+            logger.error(f'Erro ao reconstruir os contadores dos usuários: {e}', exc_info=True)
+            return updated
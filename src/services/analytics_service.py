@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from src.repositories.stats_repository import StatsRepository
+from src.database.models.stats import StatsDailyModel
+
+logger = logging.getLogger(__name__)
+
+# Sobreposição aplicada ao watermark: documentos gravados com um horário
+# ligeiramente anterior ao fim do rollup anterior ainda são reprocessados.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class AnalyticsService:
+    """Rollup incremental das métricas diárias e leitura dos buckets pré-agregados."""
+    def __init__(self, stats_repo: StatsRepository):
+        """Inicializa o serviço de estatísticas.
+
+        Args:
+            stats_repo (StatsRepository): Repositório dos buckets diários.
+        """
+        self.stats_repo = stats_repo
+
+    async def run_rollup(self) -> int:
+        """Processa somente o que mudou desde o último watermark.
+
+        Descobre os dias afetados por missões/avaliações alteradas desde o
+        watermark, recalcula apenas esses buckets e avança o watermark.
+
+        Returns:
+            int: Quantidade de dias recalculados (0 se nada mudou ou em caso de erro).
+        """
+        started_at = datetime.now()
+
+        try:
+            watermark = await self.stats_repo.get_watermark()
+        except Exception as e:
+            # Sem o watermark não dá para saber o que mudou: pula o ciclo em vez de recalcular tudo
+            logger.error(f'Erro ao buscar o watermark do rollup: {e}', exc_info=True)
+            return 0
+
+        try:
+            changed_days = await self.stats_repo.find_changed_days(watermark)
+        except Exception as e:
+            logger.error(f'Erro ao buscar os dias alterados desde {watermark}: {e}', exc_info=True)
+            return 0
+
+        if changed_days and not await self.stats_repo.rebuild_days(changed_days):
+            # Mantém o watermark antigo para tentar de novo no próximo ciclo
+            return 0
+
+        await self.stats_repo.set_watermark(started_at - WATERMARK_OVERLAP)
+
+        logger.info(f'Rollup diário concluído: {len(changed_days)} dia(s) recalculado(s) desde {watermark}')
+        return len(changed_days)
+
+    async def get_daily_stats(self, days: int) -> List[StatsDailyModel]:
+        """Retorna os buckets dos últimos ``days`` dias (incluindo hoje).
+
+        Args:
+            days (int): Quantidade de dias a exibir.
+
+        Returns:
+            List[StatsDailyModel]: Buckets ordenados do mais antigo para o mais recente.
+        """
+        today = datetime.now()
+        start = today - timedelta(days=max(days, 1) - 1)
+        return await self.stats_repo.get_daily(start, today)
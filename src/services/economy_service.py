@@ -1,23 +1,31 @@
 import logging
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple, Union
 
 from src.repositories.user_repository import UserRepository
 from src.repositories.item_repository import ItemRepository
+from src.services.leveling_service import LevelingService
+from src.database.models.effects import compile_timed_boost, compile_use_effect
 from src.database.models.item import ItemType
+from src.database.models.ledger import LedgerReason
 
 logger = logging.getLogger(__name__)
 
 class EconomyService:
-    """Regras de economia: compras e manipulação de itens equipáveis."""
-    def __init__(self, user_repo: UserRepository, item_repo: ItemRepository):
+    """Regras de economia: compras, itens equipáveis e uso de consumíveis."""
+    def __init__(self,
+                 user_repo: UserRepository,
+                 item_repo: ItemRepository,
+                 leveling_service: Optional[LevelingService] = None):
         """Inicializa o serviço de economia.
 
         Args:
             user_repo (UserRepository): Repositório de usuários.
             item_repo (ItemRepository): Repositório de itens.
+            leveling_service (Optional[LevelingService]): Nível e cargos após usar um item.
         """
         self.user_repo = user_repo
         self.item_repo = item_repo
+        self.leveling_service = leveling_service
 
     async def buy_item(self, user_id: int, item_id: int, item_quantity: int) -> Tuple[bool, str]:
         """Processa a compra de um item.
@@ -51,7 +59,9 @@ class EconomyService:
         # Desconta as moedas
         new_balance = await self.user_repo.add_xp_coins(user_id=user_id,
                                                         xp=0,
-                                                        coins=-total_price
+                                                        coins=-total_price,
+                                                        reason=LedgerReason.PURCHASE,
+                                                        reference={'item_id': item_id, 'quantity': item_quantity}
                                                         )
 
         if not new_balance:
@@ -75,7 +85,6 @@ class EconomyService:
         """
 
         user = await self.user_repo.get_by_id(user_id)
-        item = await self.item_repo.get_by_id(item_id)
         if not user:
             return False, f"Usuário não encontrado."
 
@@ -93,8 +102,8 @@ class EconomyService:
             return False, f"O item '{item.name}' não pode ser equipado (Tipo: {item.item_type.value})."
 
 
-        # Equipa o item
-        await self.user_repo.equip_item(user_id, item_id)
+        # Equipa o item; os multiplicadores ficam no usuário para o cálculo de bônus não buscar o item
+        await self.user_repo.equip_item(user_id, item_id, item.multipliers)
 
         return True, "Item equipado com sucesso!"
 
@@ -114,9 +123,64 @@ class EconomyService:
         await self.user_repo.unequip_item(user_id)
         return True, "Item desequipado com sucesso!"
 
+    async def use_item(self, user_id: int, item_id: int, quantity: int, guild) -> Tuple[bool, Union[Dict[str, Any], str]]:
+        """Usa ``quantity`` unidades de um item consumível.
 
+        Os efeitos das unidades são somados e aplicados junto com a baixa no
+        inventário em uma única escrita; o nível é deduzido do XP retornado por
+        ela, sem reler o usuário.
 
+        Args:
+            user_id (int): ID do usuário.
+            item_id (int): ID do item a ser usado.
+            quantity (int): Unidades usadas de uma vez.
+            guild: Servidor do Discord (cargos do item e de nível).
+
+        Returns:
+            Tuple[bool, Union[Dict[str, Any], str]]: (True, dados do uso) ou (False, mensagem de erro).
+        """
+        if quantity <= 0:
+            return False, "A quantidade precisa ser maior que zero."
 
+        item = await self.item_repo.get_by_id(item_id)
+        if not item:
+            return False, "Item não existe no banco de dados."
 
+        if item.effect is None or item.item_type == ItemType.EQUIPPABLE:
+            return False, f"O item '{item.name}' não pode ser usado (Tipo: {item.item_type.value})."
 
+        xp, coins, role_id = compile_use_effect(item.effect, quantity)
+        if role_id is not None and quantity > 1:
+            return False, f"O cargo do item '{item.name}' é concedido uma única vez, use 1 unidade."
 
+        buff = compile_timed_boost(item.effect, quantity, item_id) if item.effect.type == 'timed_boost' else None
+        user = await self.user_repo.consume_item(user_id, item_id, quantity,
+                                                 xp=xp, coins=coins, role_id=role_id, buff=buff)
+        if not user:
+            return False, f"Você não possui {quantity}x {item.name}."
+
+        current_level, level_up = None, False
+        if self.leveling_service is not None:
+            if role_id is not None:
+                await self.leveling_service.grant_item_role(user_id, role_id, guild)
+
+            current_level = self.leveling_service.calculate_level(user.xp)
+            old_level = self.leveling_service.calculate_level(max(0, user.xp - xp))
+            if current_level != old_level:
+                level_up = current_level > old_level
+                try:
+                    await self.leveling_service.sync_roles(user_id, current_level, guild)
+                except Exception as e:
+                    logger.error(f'Erro ao sincronizar os cargos após usar item: {e}')
+
+        logger.info(f"User {user_id} usou {item.name} - {quantity}X (+{xp} XP, +{coins} moedas)")
+        return True, {
+            'item': item.name,
+            'quantity': quantity,
+            'xp': xp,
+            'coins': coins,
+            'role_id': role_id,
+            'buff': buff.model_dump() if buff else None,
+            'level': current_level,
+            'level_up': level_up
+        }
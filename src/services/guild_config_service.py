@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.app.config import GUILD_ID, MISSION_CHANNEL_ID, MOD_LOG_CHANNEL_ID
+from src.database.models.guild_config import GuildConfigModel
+from src.repositories.guild_config_repository import GuildConfigRepository
+
+logger = logging.getLogger(__name__)
+
+
+class GuildConfigService:
+    """Configuração dos servidores mantida em memória.
+
+    Os documentos de ``guild_configs`` são poucos (um por servidor) e lidos a
+    cada mensagem/comando de missão, então ficam todos em um dicionário
+    carregado no boot e atualizado a cada alteração feita pelo bot.
+    """
+
+    def __init__(self, config_repo: GuildConfigRepository):
+        """Inicializa o serviço de configuração.
+
+        Args:
+            config_repo (GuildConfigRepository): Repositório das configurações.
+        """
+        self.config_repo = config_repo
+        self._configs: Dict[int, GuildConfigModel] = {}
+
+    async def load(self) -> int:
+        """Carrega todas as configurações do banco para a memória.
+
+        O servidor principal (GUILD_ID) usa os canais do .env enquanto não
+        tiver documento próprio.
+
+        Returns:
+            int: Quantidade de servidores configurados.
+        """
+        configs = {config.guild_id: config for config in await self.config_repo.get_all()}
+
+        if GUILD_ID is not None and GUILD_ID not in configs:
+            configs[GUILD_ID] = GuildConfigModel(guild_id=GUILD_ID,
+                                                 mission_channel_id=MISSION_CHANNEL_ID,
+                                                 mod_log_channel_id=MOD_LOG_CHANNEL_ID)
+
+        self._configs = configs
+        logger.info('Configuração de %d servidor(es) carregada', len(configs))
+        return len(configs)
+
+    def get(self, guild_id: Optional[int]) -> GuildConfigModel:
+        """Retorna a configuração do servidor (sem acesso ao banco).
+
+        Args:
+            guild_id (Optional[int]): ID do servidor.
+
+        Returns:
+            GuildConfigModel: A configuração; servidores sem configuração recebem uma vazia.
+        """
+        config = self._configs.get(guild_id)
+        if config is None:
+            return GuildConfigModel(guild_id=guild_id or 0)
+        return config
+
+    async def update(self,
+                     guild_id: int,
+                     mission_channel_id: Optional[int] = None,
+                     mod_log_channel_id: Optional[int] = None) -> Optional[GuildConfigModel]:
+        """Altera os canais de um servidor, gravando no banco e na memória.
+
+        Args:
+            guild_id (int): ID do servidor.
+            mission_channel_id (Optional[int]): Novo canal de missões (None mantém o atual).
+            mod_log_channel_id (Optional[int]): Novo canal da moderação (None mantém o atual).
+
+        Returns:
+            Optional[GuildConfigModel]: A configuração gravada ou None em caso de erro.
+        """
+        changes = {'updated_at': datetime.now()}
+        if mission_channel_id is not None:
+            changes['mission_channel_id'] = mission_channel_id
+        if mod_log_channel_id is not None:
+            changes['mod_log_channel_id'] = mod_log_channel_id
+
+        config = self.get(guild_id).model_copy(update={'guild_id': guild_id, **changes})
+
+        if not await self.config_repo.save(config):
+            return None
+
+        self._configs[guild_id] = config
+        return config
+
+    def guild_ids(self) -> List[int]:
+        """IDs dos servidores configurados."""
+        return list(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from src.database.models.idempotency import IdempotencyStatus
+from src.repositories.idempotency_repository import IdempotencyRepository
+
+logger = logging.getLogger(__name__)
+
+# Janela padrão de deduplicação (segundos)
+DEFAULT_IDEMPOTENCY_TTL = 24 * 60 * 60
+# Validade da reserva enquanto a ação executa (segundos); um processo que cai no meio libera a chave nesse prazo
+PENDING_LEASE = 60
+# Resposta para uma duplicata enquanto a primeira execução ainda não terminou em outro processo
+IN_PROGRESS_MESSAGE = 'Esta ação já está sendo processada, aguarde um instante.'
+
+
+def idempotency_key(action: str, *parts: Any) -> str:
+    """Monta a chave de idempotência de uma ação ('avaliar:<guild>:<missão>:<usuário>').
+
+    Args:
+        action (str): Nome da ação.
+        *parts (Any): Quem executa e o alvo (ou o ID da interação).
+
+    Returns:
+        str: A chave.
+    """
+    return ':'.join([action, *(str(part) for part in parts)])
+
+
+class IdempotencyService:
+    """Executa ações com efeitos colaterais uma única vez por chave.
+
+    Duplicatas (retentativas do Discord, cliques repetidos) recebem o
+    resultado da primeira execução sem chamar o serviço de novo:
+
+    - no mesmo processo, pelo cache local (resultado pronto) ou aguardando a
+      execução em andamento;
+    - entre processos, pela coleção ``idempotency_keys`` (TTL).
+
+    Só resultados de sucesso ficam guardados; uma falha libera a chave para
+    a ação ser tentada de novo.
+    """
+
+    def __init__(self, idempotency_repo: IdempotencyRepository, maxsize: int = 1024):
+        """
+        Args:
+            idempotency_repo (IdempotencyRepository): Repositório das chaves.
+            maxsize (int): Quantidade máxima de resultados no cache local.
+        """
+        self.idempotency_repo = idempotency_repo
+        self.maxsize = maxsize
+        self._local: 'OrderedDict[str, Tuple[float, Tuple[bool, Any]]]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.executions = 0
+
+    async def run(self,
+                  key: str,
+                  action: Callable[[], Awaitable[Tuple[bool, Any]]],
+                  ttl: float = DEFAULT_IDEMPOTENCY_TTL) -> Tuple[bool, Any]:
+        """Executa ``action`` se a chave ainda não foi usada dentro da janela.
+
+        Args:
+            key (str): Chave da ação (ver ``idempotency_key``).
+            action (Callable[[], Awaitable[Tuple[bool, Any]]]): Chamada ao serviço, no formato (sucesso, dados).
+            ttl (float): Janela de deduplicação (segundos).
+
+        Returns:
+            Tuple[bool, Any]: O resultado da ação (ou o guardado da primeira execução).
+        """
+        cached = self._get_local(key)
+        if cached is not None:
+            self.local_hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.local_hits += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            outcome = await self._run_claimed(key, action, ttl)
+            future.set_result(outcome)
+            return outcome
+
+        except BaseException as e:
+            future.set_exception(e)
+            # Marca a exceção como lida: quem aguardava recebe a mesma exceção
+            future.exception()
+            raise
+
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _run_claimed(self, key: str, action: Callable[[], Awaitable[Tuple[bool, Any]]],
+                           ttl: float) -> Tuple[bool, Any]:
+        claimed, record = await self.idempotency_repo.claim(key, min(ttl, PENDING_LEASE))
+
+        if not claimed:
+            if record is not None and record.status == IdempotencyStatus.DONE:
+                self.remote_hits += 1
+                outcome = (record.success, record.data)
+                self._remember(key, outcome, ttl)
+                return outcome
+            logger.info(f'Ação duplicada ainda em andamento: {key}')
+            return False, IN_PROGRESS_MESSAGE
+
+        self.executions += 1
+        try:
+            success, data = await action()
+        except BaseException:
+            await self.idempotency_repo.release(key)
+            raise
+
+        if success:
+            await self.idempotency_repo.complete(key, success, data, ttl)
+            self._remember(key, (success, data), ttl)
+        else:
+            await self.idempotency_repo.release(key)
+        return success, data
+
+    def _get_local(self, key: str) -> Tuple[bool, Any] | None:
+        cached = self._local.get(key)
+        if cached is None:
+            return None
+
+        expires_at, outcome = cached
+        if time.monotonic() >= expires_at:
+            del self._local[key]
+            return None
+
+        self._local.move_to_end(key)
+        return outcome
+
+    def _remember(self, key: str, outcome: Tuple[bool, Any], ttl: float) -> None:
+        self._local[key] = (time.monotonic() + ttl, outcome)
+        self._local.move_to_end(key)
+        if len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Dict, Any
+
+from bson import ObjectId
+
+from src.database.models.ledger import LedgerEntryModel
+from src.repositories.ledger_repository import LedgerRepository
+from src.utils.origin import set_origin
+from src.utils.guild_scope import scoped_guild
+
+logger = logging.getLogger(__name__)
+
+# Entradas acumuladas antes de forçar um insert_many
+LEDGER_BATCH_SIZE = 200
+# Intervalo máximo (segundos) que uma entrada fica no buffer
+LEDGER_FLUSH_INTERVAL = 5
+# Entradas mantidas no buffer enquanto o banco está fora; acima disso as mais antigas são descartadas
+LEDGER_MAX_PENDING = 10_000
+# Intervalo entre snapshots periódicos (tarefa única entre os processos, ver src.bot.jobs)
+SNAPSHOT_INTERVAL = timedelta(hours=6)
+# Margem do corte do snapshot: entradas ainda no buffer ficam para o próximo corte
+# (uma entrada que fica no buffer mais que isso é gravada atrás do corte e aparece na reconciliação)
+SNAPSHOT_LAG = timedelta(minutes=10)
+
+
+class LedgerService:
+    """Buffer do ledger de economia, snapshots por usuário e reconciliação com os saldos.
+
+    O buffer é de cada processo; os snapshots são uma tarefa única, agendada
+    pelo JobRegistry no processo que detém a lease 'ledger_snapshots'.
+    """
+    def __init__(self, ledger_repo: LedgerRepository, batch_size: int = LEDGER_BATCH_SIZE,
+                 flush_interval: float = LEDGER_FLUSH_INTERVAL, max_pending: int = LEDGER_MAX_PENDING):
+        """Inicializa o serviço do ledger.
+
+        Args:
+            ledger_repo (LedgerRepository): Repositório do ledger.
+            batch_size (int): Tamanho do lote que dispara um flush imediato.
+            flush_interval (float): Intervalo (segundos) do flush periódico.
+            max_pending (int): Limite de entradas no buffer (as mais antigas são descartadas).
+        """
+        self.ledger_repo = ledger_repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+
+        self._buffer: List[LedgerEntryModel] = []
+        self._flush_lock = asyncio.Lock()
+        self._pending_flushes: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+
+    def record(self, entry: LedgerEntryModel) -> None:
+        """Adiciona uma entrada ao buffer (sem I/O no caminho da requisição).
+
+        Quando o buffer atinge o tamanho do lote, um flush é agendado em segundo plano.
+        Se o banco ficar fora até o buffer passar de ``max_pending``, as entradas
+        mais antigas são descartadas (e a divergência aparece na reconciliação).
+
+        Args:
+            entry (LedgerEntryModel): Alteração de saldo a registrar.
+        """
+        self._buffer.append(entry)
+        self._trim()
+
+        if len(self._buffer) >= self.batch_size:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                # Sem loop rodando (ex: scripts síncronos); o próximo flush grava o lote
+                return
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
+
+    def _trim(self) -> None:
+        """Descarta as entradas mais antigas que passam do limite do buffer."""
+        excess = len(self._buffer) - self.max_pending
+        if excess > 0:
+            del self._buffer[:excess]
+            self.dropped += excess
+            logger.error(f'Buffer do ledger cheio: {excess} entradas descartadas ({self.dropped} no total)')
+
+    @property
+    def pending(self) -> int:
+        """Quantidade de entradas aguardando gravação."""
+        return len(self._buffer)
+
+    async def flush(self) -> int:
+        """Grava o buffer atual com um único insert_many.
+
+        Em caso de falha as entradas voltam para o início do buffer, preservando a
+        ordem; o reenvio não duplica as que chegaram a ser gravadas (ver
+        ``LedgerRepository.insert_many``).
+
+        Returns:
+            int: Quantidade de entradas gravadas.
+        """
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+
+            batch, self._buffer = self._buffer, []
+
+            if await self.ledger_repo.insert_many(batch):
+                return len(batch)
+
+            self._buffer[:0] = batch
+            self._trim()
+            logger.warning(f'{len(batch)} entradas do ledger mantidas no buffer para nova tentativa')
+            return 0
+
+    def start(self) -> None:
+        """Inicia o flush periódico em segundo plano."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Para o worker e grava o que ainda estiver no buffer."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        set_origin('tarefa:ledger')
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f'Erro no worker do ledger: {e}', exc_info=True)
+
+    async def take_snapshots(self, fence: Optional[int] = None) -> Optional[ObjectId]:
+        """Acumula nos snapshots as entradas até o novo corte.
+
+        O corte é registrado como pendente antes do merge; se o processo cair no
+        meio, a próxima execução reaplica o mesmo corte sem contar nada duas vezes.
+
+        Args:
+            fence (Optional[int]): Fencing token da lease; um processo que perdeu a
+                lease não consegue mais gravar o estado dos snapshots.
+
+        Returns:
+            Optional[ObjectId]: O corte aplicado, ou None se o estado foi recusado pelo fencing token.
+        """
+        cutoff_id, pending_id = await self.ledger_repo.get_snapshot_state()
+
+        if not pending_id:
+            # O ObjectId usa o relógio em UTC
+            pending_id = ObjectId.from_datetime(datetime.now(timezone.utc) - SNAPSHOT_LAG)
+            if not await self.ledger_repo.set_pending_cutoff(pending_id, fence):
+                return None
+
+        await self.ledger_repo.merge_into_snapshots(cutoff_id, pending_id)
+        if not await self.ledger_repo.commit_cutoff(pending_id, fence):
+            return None
+
+        logger.info(f'Snapshots do ledger atualizados até {pending_id.generation_time}')
+        return pending_id
+
+    async def verify(self, users_collection, batch_size: int = 1000) -> Dict[str, Any]:
+        """Compara o saldo do ledger (snapshot + entradas após o corte) com ``users.xp``/``coins``.
+
+        Os usuários são lidos servidor a servidor, em páginas pelo ``user_id``;
+        cada página custa uma leitura de snapshots e uma agregação das entradas
+        posteriores ao corte.
+
+        Args:
+            users_collection: Coleção ``users``.
+            batch_size (int): Usuários por página.
+
+        Returns:
+            Dict[str, Any]: {'checked': int, 'mismatches': [{'guild_id', 'user_id', 'xp', 'coins', 'ledger_xp', 'ledger_coins'}]}.
+        """
+        await self.flush()
+        cutoff_id, _ = await self.ledger_repo.get_snapshot_state()
+
+        checked = 0
+        mismatches = []
+
+        for guild_id in await users_collection.distinct('guild_id'):
+            last_id = None
+
+            with scoped_guild(guild_id):
+                while True:
+                    query: Dict[str, Any] = {'guild_id': guild_id}
+                    if last_id is not None:
+                        query['user_id'] = {'$gt': last_id}
+                    cursor = users_collection.find(query, {'user_id': 1, 'xp': 1, 'coins': 1},
+                                                   sort=[('user_id', 1)], limit=batch_size)
+                    users = await cursor.to_list(length=batch_size)
+
+                    if not users:
+                        break
+
+                    user_ids = [user['user_id'] for user in users]
+                    snapshots = await self.ledger_repo.get_snapshots(user_ids)
+                    tails = await self.ledger_repo.sum_after(user_ids, cutoff_id)
+
+                    for user in users:
+                        snap_xp, snap_coins = snapshots.get(user['user_id'], (0, 0))
+                        tail_xp, tail_coins = tails.get(user['user_id'], (0, 0))
+                        ledger_xp, ledger_coins = snap_xp + tail_xp, snap_coins + tail_coins
+
+                        if ledger_xp != user.get('xp', 0) or ledger_coins != user.get('coins', 0):
+                            mismatches.append({
+                                'guild_id': guild_id,
+                                'user_id': user['user_id'],
+                                'xp': user.get('xp', 0),
+                                'coins': user.get('coins', 0),
+                                'ledger_xp': ledger_xp,
+                                'ledger_coins': ledger_coins
+                            })
+
+                    checked += len(users)
+                    last_id = user_ids[-1]
+
+        logger.info(f'Reconciliação do ledger: {checked} usuários verificados, {len(mismatches)} divergências')
+        return {'checked': checked, 'mismatches': mismatches}
@@ -0,0 +1,280 @@
+import logging
+import math
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.database.models.level_curve import LevelCurveKind, LevelCurveModel
+
+logger = logging.getLogger(__name__)
+
+# XP do nível 1 da curva padrão (nível L custa BASE_XP_FACTOR * L²)
+BASE_XP_FACTOR = 150
+# Nível máximo pré-calculado na tabela
+DEFAULT_MAX_LEVEL = 1000
+
+
+def level_for_xp(total_xp: int, factor: int) -> int:
+    """Nível exato para o XP: o maior ``L`` com ``factor * L² <= total_xp``.
+
+    Usa só aritmética inteira (``math.isqrt``); a raiz em float erra o nível
+    perto dos quadrados perfeitos quando o XP é alto.
+
+    Args:
+        total_xp (int): XP acumulado.
+        factor (int): XP do nível 1 (``BASE_XP_FACTOR``).
+
+    Returns:
+        int: O nível (0 para XP negativo).
+    """
+    if total_xp <= 0:
+        return 0
+    # L² <= xp / factor  <=>  L² <= xp // factor, pois L² é inteiro
+    return math.isqrt(int(total_xp) // factor)
+
+
+class LevelCurve(ABC):
+    """XP total necessário para alcançar cada nível (``threshold(0) == 0``)."""
+
+    # Curvas com inversa exata continuam valendo acima do nível máximo da tabela
+    unbounded = False
+
+    @abstractmethod
+    def threshold(self, level: int) -> int:
+        """XP total em que o nível começa."""
+
+
+class QuadraticCurve(LevelCurve):
+    """Curva padrão: o nível L começa em ``factor * L²``."""
+
+    unbounded = True
+
+    def __init__(self, factor: int = BASE_XP_FACTOR):
+        self.factor = factor
+
+    def threshold(self, level: int) -> int:
+        return self.factor * level * level
+
+    def level_for(self, total_xp: int) -> int:
+        return level_for_xp(total_xp, self.factor)
+
+
+class PiecewiseCurve(LevelCurve):
+    """Interpolação linear entre pontos (nível, XP total); depois do último, segue a última inclinação."""
+
+    def __init__(self, points: Sequence[Tuple[int, int]]):
+        if len(points) < 2 or tuple(points[0]) != (0, 0):
+            raise ValueError('A curva por trechos precisa começar em (0, 0) e ter ao menos 2 pontos')
+        if any(current[0] <= previous[0] for previous, current in zip(points, points[1:])):
+            raise ValueError('Os níveis da curva por trechos precisam ser crescentes e sem repetição')
+        self.levels = [level for level, _ in points]
+        self.xps = [xp for _, xp in points]
+
+    def threshold(self, level: int) -> int:
+        i = min(max(bisect_right(self.levels, level) - 1, 0), len(self.levels) - 2)
+        start_level, end_level = self.levels[i], self.levels[i + 1]
+        start_xp, end_xp = self.xps[i], self.xps[i + 1]
+        return start_xp + (end_xp - start_xp) * (level - start_level) // (end_level - start_level)
+
+
+class ExponentialTailCurve(LevelCurve):
+    """Quadrática até ``tail_start``; depois, cada nível custa ``growth`` vezes o anterior."""
+
+    def __init__(self, factor: int, tail_start: int, growth: float):
+        if tail_start < 1 or growth <= 1:
+            raise ValueError('A cauda exponencial precisa de tail_start >= 1 e growth > 1')
+        self.base = QuadraticCurve(factor)
+        self.tail_start = tail_start
+        self.growth = growth
+
+    def threshold(self, level: int) -> int:
+        if level <= self.tail_start:
+            return self.base.threshold(level)
+        # Custo do último nível quadrático, multiplicado por growth a cada nível da cauda (soma geométrica)
+        last_cost = self.base.threshold(self.tail_start) - self.base.threshold(self.tail_start - 1)
+        steps = level - self.tail_start
+        tail = last_cost * self.growth * (self.growth ** steps - 1) / (self.growth - 1)
+        return self.base.threshold(self.tail_start) + int(tail)
+
+
+def build_curve(model: LevelCurveModel) -> LevelCurve:
+    """Monta a curva descrita no documento.
+
+    Args:
+        model (LevelCurveModel): Configuração da curva.
+
+    Returns:
+        LevelCurve: A curva.
+
+    Raises:
+        ValueError: Se a configuração é inválida.
+    """
+    if model.kind == LevelCurveKind.QUADRATIC:
+        return QuadraticCurve(model.factor)
+    if model.kind == LevelCurveKind.PIECEWISE:
+        return PiecewiseCurve(model.points)
+    if model.tail_start is None or model.tail_growth is None:
+        raise ValueError('A cauda exponencial precisa de tail_start e tail_growth')
+    return ExponentialTailCurve(model.factor, model.tail_start, model.tail_growth)
+
+
+@dataclass
+class LevelBatch:
+    """Nível e progresso de uma coluna de XP, um vetor por campo de ``LevelTable.progress``.
+
+    Os vetores são do mesmo tipo da entrada: ``numpy.ndarray`` (int64) para
+    arrays NumPy e ``array('q')`` para o resto.
+    """
+    current_level: Any
+    relative_xp: Any
+    needed_xp: Any
+    percentage: Any
+    xp_floor: Any
+    xp_ceiling: Any
+
+    def __len__(self) -> int:
+        return len(self.current_level)
+
+
+class LevelTable:
+    """Limiares de XP da curva pré-calculados até ``max_level``.
+
+    O nível sai de um ``bisect`` na tabela e piso/teto/porcentagem são
+    leituras diretas dela. Acima do nível máximo, a curva quadrática continua
+    exata (inversa por ``isqrt``); as demais param no nível máximo.
+    """
+
+    def __init__(self, curve: LevelCurve, max_level: int = DEFAULT_MAX_LEVEL):
+        """
+        Args:
+            curve (LevelCurve): Curva de XP.
+            max_level (int): Último nível pré-calculado.
+
+        Raises:
+            ValueError: Se os limiares não começam em 0 ou não são estritamente crescentes.
+        """
+        self.curve = curve
+        self.max_level = max_level
+        # Um limiar a mais: o teto do nível máximo
+        self.thresholds: List[int] = [int(curve.threshold(level)) for level in range(max_level + 2)]
+
+        if self.thresholds[0] != 0:
+            raise ValueError('O nível 0 precisa começar em 0 XP')
+        if any(b <= a for a, b in zip(self.thresholds, self.thresholds[1:])):
+            raise ValueError('Os limiares de XP precisam ser estritamente crescentes')
+
+    def threshold(self, level: int) -> int:
+        """XP total em que o nível começa."""
+        if 0 <= level < len(self.thresholds):
+            return self.thresholds[level]
+        return int(self.curve.threshold(level))
+
+    def level_for(self, total_xp: int) -> int:
+        """Nível correspondente ao XP (0 para XP negativo)."""
+        if total_xp < self.thresholds[self.max_level]:
+            return max(bisect_right(self.thresholds, total_xp) - 1, 0)
+        if self.curve.unbounded:
+            return self.curve.level_for(total_xp)
+        return self.max_level
+
+    def progress(self, total_xp: int) -> Dict[str, int]:
+        """Piso, teto e porcentagem do nível atual.
+
+        Args:
+            total_xp (int): XP acumulado (negativo conta como 0).
+
+        Returns:
+            Dict[str, int]: current_level, relative_xp, needed_xp, percentage, xp_floor e xp_ceiling.
+        """
+        thresholds = self.thresholds
+        if total_xp < 0:
+            total_xp = 0
+        if total_xp < thresholds[self.max_level]:
+            # Caminho comum: nível, piso e teto saem da tabela sem chamadas extras
+            level = bisect_right(thresholds, total_xp) - 1
+            xp_floor, xp_ceiling = thresholds[level], thresholds[level + 1]
+        else:
+            level = self.level_for(total_xp)
+            xp_floor, xp_ceiling = self.threshold(level), self.threshold(level + 1)
+        needed_xp = xp_ceiling - xp_floor
+        relative_xp = total_xp - xp_floor
+
+        return {
+            "current_level": level,
+            "relative_xp": relative_xp,
+            "needed_xp": needed_xp,
+            # No nível máximo de uma curva limitada o XP pode passar do teto
+            "percentage": min(relative_xp * 100 // needed_xp, 100),
+            "xp_floor": xp_floor,
+            "xp_ceiling": xp_ceiling
+        }
+
+    def batch(self, xp_column) -> LevelBatch:
+        """Nível e progresso de uma coluna inteira de XP.
+
+        Args:
+            xp_column: XP dos usuários (``numpy.ndarray``, ``array('q')`` ou qualquer sequência de int).
+
+        Returns:
+            LevelBatch: Vetores na ordem da entrada.
+        """
+        is_numpy = hasattr(xp_column, 'dtype') and hasattr(xp_column, 'ndim')
+        if isinstance(self.curve, QuadraticCurve):
+            factor = self.curve.factor
+            return _quadratic_numpy(xp_column, factor) if is_numpy else _quadratic_array(xp_column, factor)
+        return self._batch_numpy(xp_column) if is_numpy else self._batch_array(xp_column)
+
+    def _batch_array(self, xp_column: Sequence[int]) -> LevelBatch:
+        rows = [self.progress(xp) for xp in xp_column]
+        return LevelBatch(**{key: array('q', [row[key] for row in rows]) for key in LevelBatch.__annotations__})
+
+    def _batch_numpy(self, xp_column) -> LevelBatch:
+        import numpy as np  # só chega aqui quem já passou um array NumPy
+
+        thresholds = np.asarray(self.thresholds, dtype=np.int64)
+        xp = np.maximum(np.asarray(xp_column, dtype=np.int64), 0)
+        levels = np.minimum(np.searchsorted(thresholds, xp, side='right') - 1, self.max_level)
+
+        xp_floor = thresholds[levels]
+        xp_ceiling = thresholds[levels + 1]
+        relative_xp = xp - xp_floor
+        needed_xp = xp_ceiling - xp_floor
+        return LevelBatch(current_level=levels, relative_xp=relative_xp, needed_xp=needed_xp,
+                          percentage=np.minimum(relative_xp * 100 // needed_xp, 100),
+                          xp_floor=xp_floor, xp_ceiling=xp_ceiling)
+
+
+def _quadratic_numpy(xp_column, factor: int) -> LevelBatch:
+    import numpy as np  # só chega aqui quem já passou um array NumPy
+
+    xp = np.maximum(np.asarray(xp_column, dtype=np.int64), 0)
+    quotient = xp // factor
+    levels = np.sqrt(quotient.astype(np.float64)).astype(np.int64)
+    # A raiz em float pode errar por 1 perto dos quadrados perfeitos: corrige nos dois sentidos
+    levels -= levels * levels > quotient
+    levels += (levels + 1) * (levels + 1) <= quotient
+
+    xp_floor = factor * levels * levels
+    xp_ceiling = factor * (levels + 1) * (levels + 1)
+    relative_xp = xp - xp_floor
+    needed_xp = xp_ceiling - xp_floor
+    return LevelBatch(current_level=levels, relative_xp=relative_xp, needed_xp=needed_xp,
+                      percentage=relative_xp * 100 // needed_xp, xp_floor=xp_floor, xp_ceiling=xp_ceiling)
+
+
+def _quadratic_array(xp_column: Sequence[int], factor: int) -> LevelBatch:
+    isqrt = math.isqrt
+    xp = [value if value > 0 else 0 for value in xp_column]
+    levels = [isqrt(value // factor) for value in xp]
+    xp_floor = [factor * level * level for level in levels]
+    needed_xp = [factor * (2 * level + 1) for level in levels]
+    relative_xp = [value - floor for value, floor in zip(xp, xp_floor)]
+
+    return LevelBatch(current_level=array('q', levels),
+                      relative_xp=array('q', relative_xp),
+                      needed_xp=array('q', needed_xp),
+                      percentage=array('q', [rel * 100 // need for rel, need in zip(relative_xp, needed_xp)]),
+                      xp_floor=array('q', xp_floor),
+                      xp_ceiling=array('q', [floor + need for floor, need in zip(xp_floor, needed_xp)]))
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from src.database.models.level_curve import LevelCurveModel
+from src.repositories.level_curve_repository import LevelCurveRepository
+from src.services.level_curve import LevelCurve, LevelTable, QuadraticCurve, build_curve
+from src.utils.origin import set_origin
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (s) entre releituras da curva em uso (cada processo relê a sua)
+CURVE_RELOAD_INTERVAL = 60
+
+
+class LevelCurveService:
+    """Mantém em memória a tabela de limiares da curva de XP em uso.
+
+    A tabela é lida de forma síncrona por ``LevelingService`` (nível, piso,
+    teto). Cada processo relê o documento da curva a cada
+    ``CURVE_RELOAD_INTERVAL`` e só reconstrói a tabela quando ``updated_at``
+    muda; uma configuração inválida ou uma falha de leitura é ignorada e a
+    tabela anterior continua. Só sem documento no banco vale a curva quadrática padrão.
+    """
+
+    def __init__(self,
+                 curve_repo: Optional[LevelCurveRepository] = None,
+                 default_curve: Optional[LevelCurve] = None,
+                 reload_interval: float = CURVE_RELOAD_INTERVAL):
+        """
+        Args:
+            curve_repo (Optional[LevelCurveRepository]): Repositório das curvas (None = só a curva padrão).
+            default_curve (Optional[LevelCurve]): Curva usada sem documento no banco (padrão: quadrática).
+            reload_interval (float): Intervalo (s) entre releituras.
+        """
+        self.curve_repo = curve_repo
+        self.default_table = LevelTable(default_curve or QuadraticCurve())
+        self.table = self.default_table
+        self.reload_interval = reload_interval
+        # updated_at da última versão lida (válida ou não), para não reprocessá-la
+        self._seen_at: Optional[datetime] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def reload(self) -> bool:
+        """Relê a curva em uso e reconstrói a tabela se ela mudou.
+
+        Returns:
+            bool: True se a tabela foi trocada.
+
+        Raises:
+            Exception: Erros de leitura do banco, com a tabela atual mantida.
+        """
+        if self.curve_repo is None:
+            return False
+
+        model = await self.curve_repo.get()
+        if model is None:
+            if self.table is self.default_table:
+                return False
+            # Documento removido: volta para a curva padrão
+            self.table, self._seen_at = self.default_table, None
+            logger.info('Curva de níveis removida do banco; usando a curva padrão')
+            return True
+
+        if self._seen_at is not None and model.updated_at == self._seen_at:
+            return False
+        self._seen_at = model.updated_at
+        return self.apply(model)
+
+    def apply(self, model: LevelCurveModel) -> bool:
+        """Troca a tabela pela da curva informada (sem gravar no banco).
+
+        Args:
+            model (LevelCurveModel): Configuração da curva.
+
+        Returns:
+            bool: True se a curva é válida e passou a valer.
+        """
+        try:
+            table = LevelTable(build_curve(model), model.max_level)
+        except (ValueError, ArithmeticError) as e:
+            logger.error(f'Curva de níveis {model.curve_id} inválida, mantendo a atual: {e}')
+            return False
+
+        self.table = table
+        logger.info(f'Curva de níveis {model.kind.value} carregada (temporada: {model.season or "-"}, '
+                    f'nível máximo {model.max_level})')
+        return True
+
+    def start(self) -> None:
+        """Inicia a releitura periódica em segundo plano."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Para a releitura periódica."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        set_origin('tarefa:curva_niveis')
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f'Erro ao recarregar a curva de níveis: {e}', exc_info=True)
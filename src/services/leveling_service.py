@@ -1,10 +1,13 @@
 import logging
-from typing import Tuple
+from typing import Tuple, Optional, Dict
 
-from src.database.models.user import UserModel
-from src.repositories.item_repository import ItemRepository
+from src.bot.rest import RestScheduler, run_rest
+from src.bot.members import MemberResolver
+from src.database.models.ledger import LedgerReason
 from src.repositories.user_repository import UserRepository
 from src.repositories.level_rewards_repository import LevelRewardsRepository
+from src.services.level_curve import LevelBatch, LevelTable
+from src.services.level_curve_service import LevelCurveService
 
 logger  = logging.getLogger(__name__)
 
@@ -14,21 +17,29 @@ class LevelingService:
     def __init__(self,
                  user_repo: UserRepository,
                  rewards_repo: LevelRewardsRepository,
-                 item_repo: ItemRepository
+                 rest_scheduler: Optional[RestScheduler] = None,
+                 member_resolver: Optional[MemberResolver] = None,
+                 curves: Optional[LevelCurveService] = None
                  ):
         """Inicializa o serviço de nivelamento.
 
         Args:
             user_repo (UserRepository): Repositório de usuários.
             rewards_repo (LevelRewardsRepository): Repositório de recompensas por nível (cargos).
-            item_repo (ItemRepository): Repositório de itens para bônus passivos.
+            rest_scheduler (Optional[RestScheduler]): Scheduler das chamadas REST (edição de cargos).
+            member_resolver (Optional[MemberResolver]): Busca membros fora do cache do discord.py.
+            curves (Optional[LevelCurveService]): Curva de XP em uso (padrão: quadrática fixa).
         """
         self.user_repo = user_repo
         self.rewards_repo = rewards_repo
-        self.item_repo = item_repo
+        self.rest_scheduler = rest_scheduler
+        self.member_resolver = member_resolver or MemberResolver(rest_scheduler)
+        self.curves = curves or LevelCurveService()
 
-    # Constante de da dificuldade
-    BASE_XP_FACTOR = 150
+    @property
+    def table(self) -> LevelTable:
+        """Tabela de limiares da curva em uso (trocada pela recarga da curva)."""
+        return self.curves.table
 
     def calculate_level(self, total_xp: int) -> int:
         """Calcula o nível atual com base no XP.
@@ -40,13 +51,22 @@ class LevelingService:
             int: O nível do usuário.
         """
 
-        if total_xp < 0:
-            return 0
+        return self.table.level_for(total_xp)
 
-        # Regra de nível
-        level = int((total_xp / self.BASE_XP_FACTOR)**0.5)
+    def calculate_levels(self, xp_column) -> LevelBatch:
+        """Calcula nível e progresso de uma coluna inteira de XP em uma chamada.
 
-        return level
+        Para jobs sobre toda a coleção ``users`` (reconciliação, rankings,
+        rollups), sem criar um dicionário por usuário. Mesmo resultado de
+        ``get_user_progress`` aplicado a cada valor.
+
+        Args:
+            xp_column: XP dos usuários (``numpy.ndarray``, ``array('q')`` ou qualquer sequência de int).
+
+        Returns:
+            LevelBatch: Vetores de nível e progresso, na ordem da entrada.
+        """
+        return self.table.batch(xp_column)
 
     def xp_for_next_level(self, current_level: int) -> int:
         """Calcula o XP necessário para o próximo nível.
@@ -57,10 +77,7 @@ class LevelingService:
         Returns:
             int: A quantidade de XP necessária para o próximo nível.
         """
-
-        next_level = current_level + 1
-
-        return self.BASE_XP_FACTOR * (next_level ** 2)
+        return self.table.threshold(current_level + 1)
 
     def get_user_progress(self, total_xp: int) -> dict:
         """Calcula dados detalhados de progresso para exibição (barras, porcentagens).
@@ -80,28 +97,8 @@ class LevelingService:
                 - xp_floor (int): XP onde este nível começou
                 - xp_ceiling (int): XP onde este nível termina
         """
-        current_level = self.calculate_level(total_xp)
-
-        # Teto de XP do nível atual
-        xp_ceiling = self.xp_for_next_level(current_level)
-
-        # Piso (Fórmula inversa baseada no nível atual)
-        xp_floor = self.BASE_XP_FACTOR * (current_level ** 2)
-
-        # Calculos de progresso
-        xp_needed = xp_ceiling - xp_floor
-        xp_progress = total_xp - xp_floor
-
-        percentage = int((xp_progress / xp_needed) * 100)
-
-        return {
-            "current_level": current_level,
-            "relative_xp": xp_progress,
-            "needed_xp": xp_needed,
-            "percentage": percentage,
-            "xp_floor": xp_floor,
-            "xp_ceiling": xp_ceiling
-        }
+        # Piso e teto são leituras diretas da tabela pré-calculada da curva
+        return self.table.progress(total_xp)
 
     async def sync_roles(self, user_id:int, current_level:int, guild):
         """Sincroniza os cargos de nível do usuário conforme seu nível atual.
@@ -123,8 +120,8 @@ class LevelingService:
         # Lista de cargos
         all_rewards_ids = await self.rewards_repo.get_all_reward_role_ids()
 
-        # Pegamos o usuario pelo id
-        member = guild.get_member(user_id)
+        # Pegamos o usuario pelo id (cache do discord.py, LRU ou fetch_member)
+        member = await self.member_resolver.resolve(guild, user_id)
 
         if not member:
             logger.info(f'Não foi possível localizar o usuário {user_id}.')
@@ -152,7 +149,7 @@ class LevelingService:
         # Removemos as roles que não competem ao nível atual
         if roles_to_remove:
             try:
-                await member.remove_roles(*roles_to_remove)
+                await run_rest(self.rest_scheduler, 'member_roles', lambda: member.remove_roles(*roles_to_remove))
                 logger.info(f'Foram removidos {len(roles_to_remove)} cargos antigos de {member.name}')
             except Exception as e:
                 logger.error(f'Erro ao remover cargos antigos: {e}')
@@ -162,7 +159,7 @@ class LevelingService:
             role_obj = guild.get_role(target_role_id)
             if role_obj:
                 try:
-                    await member.add_roles(role_obj)
+                    await run_rest(self.rest_scheduler, 'member_roles', lambda: member.add_roles(role_obj))
                     logger.info(f'Cargo {target_reward.role_name} adicionado para {member.display_name}')
                     new_role_added = True  # Confirmamos que houve adição de cargo novo
                 except Exception as e:
@@ -170,43 +167,70 @@ class LevelingService:
             else:
                 logger.warning(f"Cargo ID {target_role_id} não encontrado!")
 
+        # Um membro buscado via REST não acompanha as edições: descarta a cópia do LRU
+        if roles_to_remove or new_role_added:
+            self.member_resolver.forget(guild.id, user_id)
+
         return new_role_added
 
-    async def calculate_bonus(self, user: UserModel, base_xp: int, base_coins) -> Tuple[int, int, str]:
-        """Calcula bônus de XP e moedas com base em itens equipados.
+    async def grant_item_role(self, user_id: int, role_id: int, guild) -> bool:
+        """Entrega no Discord o cargo concedido por um item (já gravado em ``role_ids``).
+
+        Args:
+            user_id (int): ID do usuário.
+            role_id (int): Cargo concedido.
+            guild: Servidor do Discord em que estamos.
+
+        Returns:
+            bool: True se o cargo foi adicionado (ou o membro já o tinha); False caso contrário.
+        """
+        role_obj = guild.get_role(role_id)
+        if not role_obj:
+            logger.warning(f"Cargo ID {role_id} não encontrado!")
+            return False
 
-        Verifica os efeitos passivos do item equipado pelo usuário e aplica multiplicadores
-        sobre os valores base de XP e moedas.
+        member = await self.member_resolver.resolve(guild, user_id)
+        if not member:
+            logger.info(f'Não foi possível localizar o usuário {user_id}.')
+            return False
+
+        if any(role.id == role_id for role in member.roles):
+            return True
+
+        try:
+            await run_rest(self.rest_scheduler, 'member_roles',
+                           lambda: member.add_roles(role_obj, reason='Cargo concedido por item'))
+            self.member_resolver.forget(guild.id, user_id)
+            logger.info(f'Cargo {role_obj.name} (item) adicionado para {member.display_name}')
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao adicionar o cargo do item: {e}")
+            return False
+
+    @staticmethod
+    def calculate_bonus(base_xp: int, base_coins: int,
+                        xp_multiplier: float = 1.0, coin_multiplier: float = 1.0) -> Tuple[int, int, str]:
+        """Aplica os multiplicadores do item equipado sobre os valores base (sem I/O).
+
+        Os multiplicadores vêm do usuário (gravados ao equipar) ou da avaliação
+        (gravados ao avaliar, para ajustes reproduzíveis).
 
         Args:
-            user (UserModel): Usuário que receberá os bônus.
             base_xp (int): XP base antes de bônus.
             base_coins (int): Moedas base antes de bônus.
+            xp_multiplier (float): Multiplicador de XP (1.0 = sem bônus).
+            coin_multiplier (float): Multiplicador de moedas (1.0 = sem bônus).
 
         Returns:
             Tuple[int, int, str]: (xp_final, moedas_finais, texto_descritivo_do_bônus).
         """
-        xp_multiplier = 1.0
-        coins_multiplier = 1.0
         bonus_text = ""
 
-
-        if user and user.equipped_item_id:
-            item = await self.item_repo.get_by_id(user.equipped_item_id)
-            # Verifica se o item existe e tem efeitos passivos
-            if item and item.passive_effects:
-                for effect in item.passive_effects:
-                    if effect.type == "xp_boost":
-                        xp_multiplier += effect.multiplier
-
-                    elif effect.type == "coin_boost":
-                        coins_multiplier += effect.multiplier
-
         # Calcula XP final
         final_xp = int(base_xp * xp_multiplier)
-        final_coins = int(base_coins * coins_multiplier)
+        final_coins = int(base_coins * coin_multiplier)
 
-        if xp_multiplier > 1.0 or coins_multiplier > 1.0:
+        if xp_multiplier > 1.0 or coin_multiplier > 1.0:
             xp_diff = final_xp - base_xp
             coins_diff = final_coins - base_coins
 
@@ -215,7 +239,14 @@ class LevelingService:
 
         return final_xp, final_coins, bonus_text
 
-    async def grant_reward(self, user_id: int, xp_amount:int, coins_amount: int, guild):
+    async def grant_reward(self,
+                           user_id: int,
+                           xp_amount:int,
+                           coins_amount: int,
+                           guild,
+                           stats_inc: Optional[Dict[str, int]] = None,
+                           reason: LedgerReason = LedgerReason.MISSION_REWARD,
+                           reference: Optional[Dict[str, int]] = None):
         """Aplica XP e moedas ao usuário e verifica nível/cargos.
 
         A operação é atômica no banco e, após atualizar o saldo, sincroniza os
@@ -226,6 +257,10 @@ class LevelingService:
             xp_amount (int): Quantidade de XP a adicionar.
             coins_amount (int): Quantidade de moedas a adicionar.
             guild: Objeto Guild onde os cargos serão sincronizados.
+            stats_inc (Optional[Dict[str, int]]): Incrementos dos contadores de contribuição,
+                gravados na mesma escrita do saldo.
+            reason (LedgerReason): Motivo registrado no ledger.
+            reference (Optional[Dict[str, int]]): Origem registrada no ledger (ex: {'mission_id': 1}).
 
         Returns:
             tuple[bool, int | None]: (level_up_ocorreu, nivel_atual) ou (False, None) em erro.
@@ -234,7 +269,10 @@ class LevelingService:
         # Atuzalziamo os dados do usuário
         updated_user = await self.user_repo.add_xp_coins(user_id=user_id,
                                            xp=xp_amount,
-                                           coins=coins_amount
+                                           coins=coins_amount,
+                                           stats_inc=stats_inc,
+                                           reason=reason,
+                                           reference=reference
                                            )
         # se ele não existir paramos aqui
         if not updated_user:
@@ -1,12 +1,13 @@
 import logging
-from typing import Dict, Tuple, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Tuple, Optional, Any
+from datetime import datetime, timedelta, timezone
 import asyncio
 
 from src.repositories.user_repository import UserRepository
 from src.repositories.missions_repository import MissionRepository
 from src.database.models.mission import MissionStatus, MissionModel, EvaluatorModel, EvaluationRank
 from src.services.leveling_service import LevelingService
+from src.database.models.ledger import LedgerReason
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,42 @@ RANK_REWARDS = {
 }
 
 
+def build_stats_increment(rank: EvaluationRank, xp: int, coins: int, previous: Optional[EvaluatorModel] = None) -> Dict[str, int]:
+    """Monta o $inc dos contadores de contribuição para uma avaliação.
+
+    Sem ``previous`` conta uma nova missão ajudada; com ``previous`` (ajuste)
+    retorna apenas a diferença entre a avaliação antiga e a nova.
+
+    Args:
+        rank (EvaluationRank): Rank recebido.
+        xp (int): XP final recebido na avaliação.
+        coins (int): Moedas finais recebidas na avaliação.
+        previous (Optional[EvaluatorModel]): Avaliação anterior, em caso de ajuste.
+
+    Returns:
+        Dict[str, int]: Campos com caminho pontuado e o valor a incrementar (somente os diferentes de zero).
+    """
+    delta: Dict[str, int] = {
+        'stats.missions_helped': 1,
+        f'stats.rank_counts.{rank.value}': 1,
+        'stats.score_sum': rank.score,
+        'stats.mission_xp': xp,
+        'stats.mission_coins': coins,
+    }
+
+    if previous:
+        delta['stats.missions_helped'] -= 1
+        delta['stats.mission_xp'] -= previous.xp_earned
+        delta['stats.mission_coins'] -= previous.coins_earned
+
+        if previous.rank:
+            old_rank_key = f'stats.rank_counts.{previous.rank.value}'
+            delta[old_rank_key] = delta.get(old_rank_key, 0) - 1
+            delta['stats.score_sum'] -= previous.rank.score
+
+    return {field: value for field, value in delta.items() if value}
+
+
 class MissionService:
     """Regras de negócio relacionadas às missões."""
     def __init__(self, mission_repo: MissionRepository, leveling_service: LevelingService, user_repo:UserRepository):
@@ -92,7 +129,7 @@ class MissionService:
             return False, 'Você não pode avaliar a si mesmo'
 
         # Verificamos se úsuario já foi avaliado
-        already_evaluated = any(evaluator.user_id == user_id for evaluator in mission.evaluators)
+        already_evaluated = await self.mission_repo.get_evaluation(mission_id, user_id)
         if already_evaluated:
             return False, 'Este usuário já foi avaliado'
 
@@ -107,18 +144,22 @@ class MissionService:
         if not base_rewards:
             return False, f'Selecione uma nota válida: {", ".join(RANK_REWARDS.keys())}'
 
-        # Calculo dos bonus
-        final_xp, final_coins, bonus_text = await self.leveling_service.calculate_bonus(
-            user,
+        # Calculo dos bonus (item equipado + buffs temporários ainda válidos)
+        xp_multiplier, coin_multiplier = user.effective_multipliers()
+        final_xp, final_coins, bonus_text = self.leveling_service.calculate_bonus(
             base_rewards["xp"],
-            base_rewards["coins"])
+            base_rewards["coins"],
+            xp_multiplier,
+            coin_multiplier)
 
 
         # Entrega as recompensas
         result, current_level = await self.leveling_service.grant_reward(user_id,
                                                  final_xp,
                                                  final_coins,
-                                                 guild)
+                                                 guild,
+                                                 stats_inc=build_stats_increment(rank_upper, final_xp, final_coins),
+                                                 reference={'mission_id': mission_id})
         if current_level is None:
             return False, 'Erro ao entregar recompensas.'
 
@@ -130,7 +171,9 @@ class MissionService:
             rank=rank_upper,
             xp_earned=final_xp,
             coins_earned=final_coins,
-            evaluate_at=datetime.now()
+            evaluate_at=datetime.now(),
+            xp_multiplier=xp_multiplier,
+            coin_multiplier=coin_multiplier
         )
 
         await self.mission_repo.add_participant(mission_id, new_evaluator)
@@ -149,33 +192,48 @@ class MissionService:
     async def close_mission(self, mission_id: int) -> bool:
         """Atualiza o status da missão no banco para CLOSED.
 
+        A escrita é condicional, então com vários processos (ou encerramento
+        manual e automático ao mesmo tempo) só um deles recebe True.
+
         Args:
             mission_id (int): ID da missão a ser fechada.
 
         Returns:
             bool: True se foi fechada agora, False caso contrário.
         """
+        just_closed = await self.mission_repo.close(mission_id)
+        if just_closed:
+            logger.info(f"Missão {mission_id} marcada como finalizada no banco.")
+        return just_closed
 
-        try:
-            # Verifica se já não está fechada (para evitar concorrência)
-            current = await self.mission_repo.get_by_id(mission_id)
-            if current and current.status == MissionStatus.CLOSED:
-                return False
+    async def schedule_close(self, mission_id: int, delay: float) -> bool:
+        """Agenda o encerramento automático da missão.
 
-            await self.mission_repo.update_status(
-                mission_id=mission_id,
-                new_status=MissionStatus.CLOSED,
-                completed_at=datetime.now()
-            )
+        O encerramento fica gravado na missão e é feito pela tarefa
+        'mission_auto_close' no processo dono do shard da missão, então
+        sobrevive a reinícios e não depende de quem recebeu o comando.
 
-            logger.info(f"Missão {mission_id} marcada como finalizada no banco.")
-            return True
+        Args:
+            mission_id (int): ID da missão.
+            delay (float): Segundos até o encerramento.
+
+        Returns:
+            bool: True se agendou, False caso contrário.
+        """
+        return await self.mission_repo.schedule_close(mission_id,
+                                                      datetime.now(timezone.utc) + timedelta(seconds=delay))
 
-        except Exception as e:
-            logger.error(f"Erro ao finalizar missão {mission_id}: {e}")
-            return False
+    async def get_due_closures(self, shards: int, shard_ids: List[int]) -> List[int]:
+        """IDs das missões com encerramento vencido nos shards deste processo.
 
+        Args:
+            shards (int): Quantidade total de shards.
+            shard_ids (List[int]): Shards atendidos por este processo.
 
+        Returns:
+            List[int]: IDs das missões a encerrar.
+        """
+        return await self.mission_repo.get_due_closures(datetime.now(timezone.utc), shards, shard_ids)
 
     async def report_evaluation(self, mission_id: int, reporter_id: int, reason: str) -> Tuple[bool, Optional[Dict[str, Any]]] | Tuple[bool, str]:
         """Reporta aos moderadores uma avaliação potencialmente injusta.
@@ -194,7 +252,7 @@ class MissionService:
             return False, "Missão não encontrada."
 
         # Verifica se o reclamante realmente participou
-        participant = next((e for e in mission.evaluators if e.user_id == reporter_id), None)
+        participant = await self.mission_repo.get_evaluation(mission_id, reporter_id)
         if not participant:
             return False, 'Você não foi avaliado nesta missão, então não pode reportar.'
 
@@ -229,8 +287,7 @@ class MissionService:
         if not mission: return False, "Missão não encontrada."
 
         # Busca o registro da avaliação antiga
-        # Usamos enumerate para saber o índice e atualizar no banco depois se precisar
-        old_eval = next((e for e in mission.evaluators if e.user_id == target_user_id), None)
+        old_eval = await self.mission_repo.get_evaluation(mission_id, target_user_id)
 
         if not old_eval:
             return False, "Este usuário não possui uma avaliação nesta missão para ser ajustada."
@@ -253,9 +310,15 @@ class MissionService:
         # Valores Novos (Base)
         new_base = RANK_REWARDS.get(new_rank_enum.value)
 
-        # Recalcula Bônus, ponto que o usário pode mudar os itens equipados, próxima versão adcionar os itens que o usuário tinha.
-        user = await self.user_repo.get_by_id(target_user_id)
-        final_new_xp, final_new_coins, _ = await self.leveling_service.calculate_bonus(user, new_base['xp'], new_base['coins'])
+        # Recalcula o bônus com os multiplicadores do item equipado na avaliação original
+        xp_multiplier, coin_multiplier = old_eval.xp_multiplier, old_eval.coin_multiplier
+        if xp_multiplier is None or coin_multiplier is None:
+            # Avaliações antigas não guardaram os multiplicadores: usa os do item equipado hoje
+            user = await self.user_repo.get_by_id(target_user_id)
+            xp_multiplier, coin_multiplier = user.effective_multipliers() if user else (1.0, 1.0)
+
+        final_new_xp, final_new_coins, _ = self.leveling_service.calculate_bonus(new_base['xp'], new_base['coins'],
+                                                                                 xp_multiplier, coin_multiplier)
 
         # Aplica a diferença entre os valores antigos e novos.
         # Ex: Ganhou 50 (C), devia ganhar 500 (S). Delta = 450.
@@ -268,14 +331,20 @@ class MissionService:
             user_id=target_user_id,
             xp_amount=xp_diff,
             coins_amount=coins_diff,
-            guild=guild
+            guild=guild,
+            stats_inc=build_stats_increment(new_rank_enum, final_new_xp, final_new_coins, previous=old_eval),
+            reason=LedgerReason.EVALUATION_ADJUSTMENT,
+            reference={'mission_id': mission_id}
         )
 
         # ATUALIZA O BANCO (Substitui o EvaluatorModel antigo pelo novo)
         old_eval.rank = new_rank_enum
         old_eval.xp_earned = final_new_xp
         old_eval.coins_earned = final_new_coins
-        old_eval.evaluate_at = datetime.now()
+        # evaluate_at continua sendo o dia da avaliação (bucket das estatísticas); o ajuste fica em updated_at
+        old_eval.updated_at = datetime.now()
+        old_eval.xp_multiplier = xp_multiplier
+        old_eval.coin_multiplier = coin_multiplier
 
 
         success = await self.mission_repo.update_evaluator(
@@ -0,0 +1,354 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import discord
+
+from src.bot.rest import Priority, RestScheduler, run_rest
+from src.database.models.user import UserModel, UserStatus
+from src.repositories.user_repository import UserRepository
+from src.utils.embeds import CodeSageEmbeds
+from src.utils.guild_scope import scoped_guild
+from src.utils.origin import set_origin
+from src.views.youtube_view import YoutubeView
+
+logger = logging.getLogger(__name__)
+
+# Entradas acumuladas antes de forçar o cadastro em lote
+ONBOARDING_BATCH_SIZE = 100
+# Intervalo máximo (segundos) que uma entrada espera pelo cadastro
+ONBOARDING_FLUSH_INTERVAL = 1.0
+# Workers que enviam as DMs e restauram os cargos (o ritmo fica com a rota 'dm' do RestScheduler)
+ONBOARDING_WORKERS = 4
+# A partir desta fila as boas-vindas por DM são puladas (cadastro e cargos continuam)
+ONBOARDING_MAX_BACKLOG = 500
+
+
+@dataclass
+class OnboardingJob:
+    """Etapas de REST de um membro já cadastrado: DM de boas-vindas e cargos guardados."""
+    member: discord.Member
+    returning: bool
+    roles: List[discord.Role] = field(default_factory=list)
+    send_dm: bool = True
+
+
+@dataclass
+class OnboardingBacklog:
+    """Filas de entrada/saída e contadores desde o início do processo."""
+    pending_registrations: int
+    pending_departures: int
+    queued_jobs: int
+    registered: int
+    welcomed: int
+    restored: int
+    dms_skipped: int
+    failures: int
+    departed: int = 0
+    # Saídas gravadas no último lote e no maior lote
+    last_departure_batch: int = 0
+    max_departure_batch: int = 0
+
+    @property
+    def total(self) -> int:
+        """Membros que ainda não passaram por todas as etapas."""
+        return self.pending_registrations + self.pending_departures + self.queued_jobs
+
+
+class OnboardingService:
+    """Fila de entrada e saída de membros: escritas em lote, DMs e cargos por um pool de workers.
+
+    ``enqueue`` só guarda o membro, então o evento do gateway retorna na hora
+    mesmo em uma rajada de entradas. O cadastro é um upsert em lote por
+    servidor (``UserRepository.register_members``); depois, cada membro vira
+    um job com a DM de boas-vindas e um único ``add_roles(*roles)`` para os
+    cargos guardados. Quando a fila passa de ``max_backlog`` as DMs são
+    puladas: a rajada atrasa só as boas-vindas, não o cadastro nem os cargos.
+
+    As saídas também são acumuladas e gravadas em lote, cada uma como um único
+    update (status inativo + ``$addToSet`` dos cargos). Em cada lote as saídas
+    são gravadas antes das entradas, então quem sai e volta termina ativo.
+    """
+
+    def __init__(self,
+                 user_repo: UserRepository,
+                 rest_scheduler: Optional[RestScheduler] = None,
+                 batch_size: int = ONBOARDING_BATCH_SIZE,
+                 flush_interval: float = ONBOARDING_FLUSH_INTERVAL,
+                 workers: int = ONBOARDING_WORKERS,
+                 max_backlog: int = ONBOARDING_MAX_BACKLOG):
+        """
+        Args:
+            user_repo (UserRepository): Repositório de usuários.
+            rest_scheduler (Optional[RestScheduler]): Scheduler das chamadas REST (DMs e cargos).
+            batch_size (int): Tamanho do lote que dispara um cadastro imediato.
+            flush_interval (float): Intervalo (segundos) do cadastro periódico.
+            workers (int): Quantidade de workers de DM/cargos.
+            max_backlog (int): Fila a partir da qual as DMs são puladas.
+        """
+        self.user_repo = user_repo
+        self.rest_scheduler = rest_scheduler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.workers = workers
+        self.max_backlog = max_backlog
+
+        # Um membro por (servidor, usuário): entrar e sair de novo antes do lote não duplica o cadastro
+        self._pending: Dict[Tuple[int, int], discord.Member] = {}
+        # Saídas pendentes: cargos que o membro tinha e, se ele nem chegou a ser cadastrado, o modelo novo
+        self._departures: Dict[Tuple[int, int], List[int]] = {}
+        self._departed_users: Dict[Tuple[int, int], UserModel] = {}
+        self._jobs: asyncio.Queue = asyncio.Queue()
+        self._flush_lock = asyncio.Lock()
+        self._pending_flushes: Set[asyncio.Task] = set()
+        self._tasks: List[asyncio.Task] = []
+
+        self.registered = 0
+        self.welcomed = 0
+        self.restored = 0
+        self.dms_skipped = 0
+        self.failures = 0
+        self.departed = 0
+        self.last_departure_batch = 0
+        self.max_departure_batch = 0
+
+    def enqueue(self, member: discord.Member) -> None:
+        """Coloca o membro na fila de cadastro (sem I/O no evento do gateway).
+
+        Args:
+            member (discord.Member): Membro que entrou no servidor.
+        """
+        self._pending[(member.guild.id, member.id)] = member
+        self._schedule_flush()
+
+    def enqueue_departure(self, guild_id: int, user_id: int, role_ids: List[int]) -> None:
+        """Coloca a saída do membro na fila (sem I/O no evento do gateway).
+
+        Args:
+            guild_id (int): Servidor de onde o membro saiu.
+            user_id (int): ID do membro.
+            role_ids (List[int]): Cargos que ele tinha, guardados para quando voltar.
+        """
+        key = (guild_id, user_id)
+
+        # Entrou e saiu antes do cadastro: é criado já inativo, sem boas-vindas
+        joined = self._pending.pop(key, None)
+        if joined is not None:
+            self._departed_users[key] = self._new_user(joined)
+
+        previous = self._departures.get(key, [])
+        self._departures[key] = previous + [role_id for role_id in role_ids if role_id not in previous]
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if len(self._pending) + len(self._departures) >= self.batch_size:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                return
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
+
+    def backlog(self) -> OnboardingBacklog:
+        """Tamanho atual da fila e contadores."""
+        return OnboardingBacklog(pending_registrations=len(self._pending),
+                                 pending_departures=len(self._departures),
+                                 queued_jobs=self._jobs.qsize(),
+                                 registered=self.registered,
+                                 welcomed=self.welcomed,
+                                 restored=self.restored,
+                                 dms_skipped=self.dms_skipped,
+                                 failures=self.failures,
+                                 departed=self.departed,
+                                 last_departure_batch=self.last_departure_batch,
+                                 max_departure_batch=self.max_departure_batch)
+
+    async def flush(self) -> int:
+        """Grava as saídas e as entradas pendentes (uma escrita em lote por servidor) e enfileira os jobs.
+
+        As saídas vão antes das entradas. Em caso de falha, os membros do
+        servidor voltam para a fila.
+
+        Returns:
+            int: Quantidade de membros gravados (saídas + entradas).
+        """
+        async with self._flush_lock:
+            if not self._pending and not self._departures:
+                return 0
+
+            departures, self._departures = self._departures, {}
+            departed_users, self._departed_users = self._departed_users, {}
+            batch, self._pending = self._pending, {}
+
+            total = 0
+            if departures:
+                total += await self._flush_departures(departures, departed_users)
+            if batch:
+                total += await self._flush_registrations(batch)
+            return total
+
+    async def _flush_departures(self,
+                                departures: Dict[Tuple[int, int], List[int]],
+                                departed_users: Dict[Tuple[int, int], UserModel]) -> int:
+        by_guild: Dict[int, Dict[int, List[int]]] = {}
+        for (guild_id, user_id), role_ids in departures.items():
+            by_guild.setdefault(guild_id, {})[user_id] = role_ids
+
+        processed = 0
+        for guild_id, guild_departures in by_guild.items():
+            new_users = {user_id: departed_users[(guild_id, user_id)]
+                         for user_id in guild_departures if (guild_id, user_id) in departed_users}
+            with scoped_guild(guild_id):
+                written = await self.user_repo.record_departures(guild_departures, new_users)
+
+            if written is None:
+                # Devolve para a fila, somando os cargos de uma saída mais nova do mesmo membro
+                for user_id, role_ids in guild_departures.items():
+                    key = (guild_id, user_id)
+                    newer = self._departures.get(key, [])
+                    self._departures[key] = role_ids + [role_id for role_id in newer if role_id not in role_ids]
+                    if user_id in new_users:
+                        self._departed_users.setdefault(key, new_users[user_id])
+                logger.warning(f'{len(guild_departures)} saídas do servidor {guild_id} mantidas na fila para nova tentativa')
+                continue
+
+            processed += len(guild_departures)
+
+        self.departed += processed
+        self.last_departure_batch = processed
+        self.max_departure_batch = max(self.max_departure_batch, processed)
+        return processed
+
+    async def _flush_registrations(self, batch: Dict[Tuple[int, int], discord.Member]) -> int:
+        by_guild: Dict[int, List[discord.Member]] = {}
+        for (guild_id, _), member in batch.items():
+            by_guild.setdefault(guild_id, []).append(member)
+
+        total = 0
+        for guild_id, members in by_guild.items():
+            with scoped_guild(guild_id):
+                returning = await self.user_repo.register_members([self._new_user(m) for m in members])
+
+            if returning is None:
+                # Entradas mais novas do mesmo membro têm prioridade sobre as devolvidas;
+                # se ele já saiu de novo, a saída pendente o cria inativo
+                for member in members:
+                    key = (guild_id, member.id)
+                    if key in self._departures:
+                        self._departed_users.setdefault(key, self._new_user(member))
+                    else:
+                        self._pending.setdefault(key, member)
+                logger.warning(f'{len(members)} entradas do servidor {guild_id} mantidas na fila para nova tentativa')
+                continue
+
+            total += len(members)
+            for member in members:
+                self._queue_job(member, returning.get(member.id))
+
+        self.registered += total
+        return total
+
+    @staticmethod
+    def _new_user(member: discord.Member) -> UserModel:
+        return UserModel(user_id=member.id,
+                         guild_id=member.guild.id,
+                         username=member.name,
+                         xp=0,
+                         coins=0,
+                         inventory={},
+                         equipped_item_id=None,
+                         status=UserStatus.ACTIVE,
+                         joined_at=datetime.now(),
+                         role_ids=[])
+
+    def _queue_job(self, member: discord.Member, role_ids: Optional[List[int]]) -> None:
+        roles = [role for role in map(member.guild.get_role, role_ids or []) if role is not None]
+        send_dm = self._jobs.qsize() < self.max_backlog
+
+        if not send_dm:
+            if self.dms_skipped == 0 or self.dms_skipped % 100 == 0:
+                logger.warning(f'Fila de entrada com {self._jobs.qsize()} membros: boas-vindas por DM puladas')
+            self.dms_skipped += 1
+            if not roles:
+                return
+
+        self._jobs.put_nowait(OnboardingJob(member=member, returning=role_ids is not None, roles=roles, send_dm=send_dm))
+
+    async def process(self, job: OnboardingJob) -> None:
+        """Envia a DM de boas-vindas e restaura os cargos guardados do membro.
+
+        Args:
+            job (OnboardingJob): Membro já cadastrado.
+        """
+        member = job.member
+        if job.send_dm:
+            if job.returning:
+                embed = CodeSageEmbeds.welcome_back_message(member=member)
+            else:
+                embed = CodeSageEmbeds.welcome_message(member=member)
+            try:
+                await run_rest(self.rest_scheduler, 'dm',
+                               lambda: member.send(embed=embed, view=YoutubeView()), Priority.EVENT)
+                self.welcomed += 1
+            except discord.Forbidden:
+                logger.debug('%s não aceita DMs; boas-vindas não enviadas', member.id)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f'Não foi possível enviar as boas-vindas para {member.id}: {e}')
+
+        if job.roles:
+            try:
+                # Restauração em lote: uma chamada para todos os cargos, com folga para os comandos
+                await run_rest(self.rest_scheduler, 'member_roles',
+                               lambda: member.add_roles(*job.roles, reason="Restaurando cargos antigos"),
+                               Priority.BULK)
+                self.restored += 1
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f'Não foi possível restaurar os cargos de {member.id}: {e}')
+
+    def start(self) -> None:
+        """Inicia o cadastro periódico e os workers de DM/cargos."""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks.append(loop.create_task(self._run_flush()))
+        self._tasks.extend(loop.create_task(self._run_worker()) for _ in range(self.workers))
+
+    async def close(self) -> None:
+        """Para os workers e grava as entradas/saídas ainda na fila (as DMs pendentes são descartadas)."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        await self.flush()
+        if self._jobs.qsize():
+            logger.info(f'{self._jobs.qsize()} boas-vindas/cargos pendentes descartados no encerramento')
+
+    async def _run_flush(self) -> None:
+        set_origin('tarefa:onboarding')
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f'Erro na gravação em lote de entradas/saídas de membros: {e}', exc_info=True)
+
+    async def _run_worker(self) -> None:
+        set_origin('tarefa:onboarding')
+        while True:
+            job = await self._jobs.get()
+            try:
+                with scoped_guild(job.member.guild.id):
+                    await self.process(job)
+            except Exception as e:
+                logger.error(f'Erro no worker de entrada de membros: {e}', exc_info=True)
+            finally:
+                self._jobs.task_done()
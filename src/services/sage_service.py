@@ -1,9 +1,12 @@
-from google import genai
-from google.genai import types
+import asyncio
 import logging
+from typing import TYPE_CHECKING, Optional
 
 from src.app.config import GEMINI_API_KEY
 
+if TYPE_CHECKING:
+    from google import genai
+
 logger = logging.getLogger(__name__)
 
 # Intruções para o estilo do personagem Code Sage
@@ -19,10 +22,29 @@ SAGE_SYSTEM_INSTRUCTION = (
 class SageService:
     """Cliente para gerar charadas do Code Sage via Google GenAI."""
     def __init__(self):
-        """Inicializa o cliente do serviço de IA com a chave de API configurada."""
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        """Inicializa o serviço; o cliente de IA só é criado no primeiro uso.
+
+        Importar o ``google.genai`` custa centenas de milissegundos, então ele
+        fica fora do caminho de inicialização do bot.
+        """
+        self._client: Optional['genai.Client'] = None
         self.model_id = 'gemini-3-flash-preview'
 
+    @property
+    def client(self) -> 'genai.Client':
+        """Cliente do Google GenAI, criado (e importado) sob demanda."""
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=GEMINI_API_KEY)
+        return self._client
+
+    async def warm_up(self) -> None:
+        """Cria o cliente em uma thread, para a primeira charada não travar o loop com o import."""
+        try:
+            await asyncio.to_thread(lambda: self.client)
+        except Exception as e:
+            logger.warning(f'Não foi possível preparar o cliente do Sábio: {e}')
+
     async def generate_riddle(self, title: str, description: str, image_bytes: bytes | None = None, difficulty: str = "difícil") -> str:
         """Gera uma charada enigmática para acompanhar a missão.
 
@@ -53,6 +75,8 @@ class SageService:
 
             )
 
+        from google.genai import types
+
         # Criamos uma lista para os conteúdos enviados
         contents = [prompt]
 
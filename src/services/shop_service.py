@@ -0,0 +1,131 @@
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.database.models.item import ItemModel
+from src.database.models.storefront import StorefrontModel
+from src.repositories.item_repository import ItemRepository
+from src.repositories.storefront_repository import StorefrontRepository
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de itens em cada rotação da vitrine
+SHOP_ROTATION_SIZE = 5
+# Intervalo entre rotações da vitrine de um servidor
+SHOP_ROTATION_INTERVAL = timedelta(hours=6)
+# Validade (s) do catálogo em memória; os itens só mudam pelo scripts/seed_items.py
+CATALOG_TTL = 600.0
+
+
+class ShopService:
+    """Catálogo em memória e rotação das vitrines da loja.
+
+    O catálogo inteiro é pequeno (dezenas de itens) e muda raramente, então
+    fica em memória; as rotações são sorteadas dele sem ir ao banco.
+    """
+
+    def __init__(self,
+                 item_repo: ItemRepository,
+                 storefront_repo: StorefrontRepository,
+                 rotation_size: int = SHOP_ROTATION_SIZE,
+                 catalog_ttl: float = CATALOG_TTL):
+        """Inicializa o serviço da loja.
+
+        Args:
+            item_repo (ItemRepository): Repositório de itens.
+            storefront_repo (StorefrontRepository): Repositório das vitrines.
+            rotation_size (int): Itens por rotação.
+            catalog_ttl (float): Validade (s) do catálogo em memória.
+        """
+        self.item_repo = item_repo
+        self.storefront_repo = storefront_repo
+        self.rotation_size = rotation_size
+        self.catalog_ttl = catalog_ttl
+        self._catalog: List[ItemModel] = []
+        self._catalog_loaded_at: Optional[float] = None
+
+    async def catalog(self) -> List[ItemModel]:
+        """Retorna o catálogo, recarregando do banco quando a cópia em memória vence.
+
+        Returns:
+            List[ItemModel]: Todos os itens cadastrados.
+        """
+        now = time.monotonic()
+        if self._catalog_loaded_at is None or now - self._catalog_loaded_at >= self.catalog_ttl:
+            items = await self.item_repo.get_all()
+            # Em caso de erro (lista vazia) mantém o catálogo anterior
+            if items or self._catalog_loaded_at is None:
+                self._catalog = items
+            self._catalog_loaded_at = now
+        return self._catalog
+
+    def invalidate_catalog(self) -> None:
+        """Força a releitura do catálogo na próxima consulta."""
+        self._catalog_loaded_at = None
+
+    async def pick_rotation(self, rng: random.Random = random) -> List[ItemModel]:
+        """Sorteia os itens de uma rotação a partir do catálogo em memória.
+
+        Args:
+            rng (random.Random): Gerador usado no sorteio (injeção em testes).
+
+        Returns:
+            List[ItemModel]: Até ``rotation_size`` itens distintos (vazia se não há catálogo).
+        """
+        items = await self.catalog()
+        return rng.sample(items, min(len(items), self.rotation_size))
+
+    async def open_storefront(self, guild_id: int, channel_id: int, message_id: int,
+                              items: List[ItemModel]) -> Optional[StorefrontModel]:
+        """Registra a mensagem de vitrine do servidor (substitui a anterior).
+
+        Args:
+            guild_id (int): ID do servidor.
+            channel_id (int): Canal da mensagem.
+            message_id (int): Mensagem publicada.
+            items (List[ItemModel]): Itens exibidos.
+
+        Returns:
+            Optional[StorefrontModel]: A vitrine gravada ou None em caso de erro.
+        """
+        storefront = StorefrontModel(guild_id=guild_id, channel_id=channel_id, message_id=message_id,
+                                     item_ids=[item.item_id for item in items], rotated_at=datetime.now())
+        if not await self.storefront_repo.save(storefront):
+            return None
+        logger.info(f'Vitrine do servidor {guild_id} publicada na mensagem {message_id}')
+        return storefront
+
+    async def get_storefront(self, guild_id: int) -> Optional[StorefrontModel]:
+        """Vitrine atual do servidor (None se nunca foi aberta)."""
+        return await self.storefront_repo.get(guild_id)
+
+    async def due_storefronts(self, interval: timedelta = SHOP_ROTATION_INTERVAL) -> List[StorefrontModel]:
+        """Vitrines cuja última rotação tem mais de ``interval``.
+
+        Args:
+            interval (timedelta): Intervalo entre rotações.
+
+        Returns:
+            List[StorefrontModel]: Vitrines a rotacionar.
+        """
+        return await self.storefront_repo.get_due(datetime.now() - interval)
+
+    async def record_rotation(self, storefront: StorefrontModel, items: List[ItemModel]) -> bool:
+        """Grava a rotação depois que a mensagem foi editada.
+
+        Args:
+            storefront (StorefrontModel): Vitrine rotacionada.
+            items (List[ItemModel]): Novos itens exibidos.
+
+        Returns:
+            bool: True se gravou, False em caso de erro.
+        """
+        rotated = storefront.model_copy(update={'item_ids': [item.item_id for item in items],
+                                                'rotated_at': datetime.now()})
+        return await self.storefront_repo.save(rotated)
+
+    async def remove_storefront(self, guild_id: int) -> bool:
+        """Esquece a vitrine do servidor (a mensagem não existe mais)."""
+        return await self.storefront_repo.delete(guild_id)
@@ -0,0 +1,51 @@
+import discord
+from discord.ext import commands
+
+# O núcleo (contextvar e helpers) fica em src.utils.origin, que não depende do discord.py
+from src.utils.origin import UNKNOWN_ORIGIN, command_origin, event_origin, get_origin, set_origin
+from src.utils.guild_scope import current_guild_id, guild_scope, scoped_guild, set_guild
+
+
+def interaction_origin(interaction: discord.Interaction) -> str:
+    """Monta o nome da origem de uma interação.
+
+    Args:
+        interaction (discord.Interaction): Interação recebida.
+
+    Returns:
+        str: '/comando', '/comando:autocomplete' ou 'componente:<custom_id>'.
+    """
+    command = interaction.command
+    if command is not None:
+        name = f'/{command.qualified_name}'
+        if interaction.type is discord.InteractionType.autocomplete:
+            return f'{name}:autocomplete'
+        return name
+
+    custom_id = (interaction.data or {}).get('custom_id')
+    if custom_id:
+        return f'componente:{custom_id}'
+
+    return f'interacao:{interaction.type.name}'
+
+
+def track_interaction(interaction: discord.Interaction) -> None:
+    """Define a origem e o servidor da interação para o restante da task.
+
+    Args:
+        interaction (discord.Interaction): Interação recebida.
+    """
+    set_origin(interaction_origin(interaction))
+    set_guild(interaction.guild_id)
+
+
+class TrackedCog(commands.Cog):
+    """Cog base que registra o slash command como origem (e o servidor) antes de executá-lo.
+
+    Autocompletes não passam pelo ``interaction_check`` do Cog, então devem
+    chamar ``track_interaction(interaction)`` por conta própria.
+    """
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        track_interaction(interaction)
+        return True
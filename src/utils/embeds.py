@@ -1,10 +1,19 @@
 import discord
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from discord.types import embed
 
 from src.database.models.mission import EvaluationRank
+from src.database.models.user import UserStatsModel
+from src.database.models.stats import StatsDailyModel
+from src.database.telemetry import OperationStats, SlowQuery
+from src.bot.tree import CommandTimings
+from src.bot.rest import RouteStats
+
+if TYPE_CHECKING:
+    # A fila de entrada usa os embeds de boas-vindas: importada só para a anotação
+    from src.services.onboarding_service import OnboardingBacklog
 
 def create_error_embed(title:str, message: str) -> discord.Embed:
     """Cria um embed padronizado de erro (vermelho).
@@ -196,6 +205,166 @@ class ShopEmbeds:
 
         return embed
 
+class StatsEmbeds:
+
+    @staticmethod
+    def daily_summary(buckets: list[StatsDailyModel], days: int) -> discord.Embed:
+        """Gera o embed com as métricas diárias pré-agregadas.
+
+        Args:
+            buckets (list[StatsDailyModel]): Buckets diários do período.
+            days (int): Quantidade de dias do período.
+
+        Returns:
+            discord.Embed: Embed com uma linha por dia e os totais do período.
+        """
+        embed = discord.Embed(title=f'📊 Estatísticas dos últimos {days} dia(s)',
+                              color=discord.Color.blurple()
+        )
+
+        if not buckets:
+            embed.description = 'Nenhum dado agregado para o período.'
+            return embed
+
+        lines = []
+        for bucket in buckets:
+            ranks = " ".join(f"{rank}:{count}" for rank, count in sorted(bucket.rank_counts.items()))
+            lines.append(f"`{bucket.day}` 📜 {bucket.missions_opened}↑ {bucket.missions_closed}↓ "
+                         f"| ✨ {bucket.xp_minted} XP | 💰 {bucket.coins_minted} | {ranks or '-'}")
+
+        # Mantém o embed dentro do limite de 4096 caracteres da descrição
+        embed.description = "\n".join(lines)[-4000:]
+
+        purchases: dict[str, int] = {}
+        for bucket in buckets:
+            for item_id, quantity in bucket.purchases.items():
+                purchases[item_id] = purchases.get(item_id, 0) + quantity
+
+        embed.add_field(name='Missões abertas', value=sum(b.missions_opened for b in buckets), inline=True)
+        embed.add_field(name='Missões encerradas', value=sum(b.missions_closed for b in buckets), inline=True)
+        embed.add_field(name='XP / Moedas distribuídos',
+                        value=f"{sum(b.xp_minted for b in buckets)} / {sum(b.coins_minted for b in buckets)}",
+                        inline=True)
+        if purchases:
+            top = sorted(purchases.items(), key=lambda entry: entry[1], reverse=True)[:5]
+            embed.add_field(name='Compras por item',
+                            value="\n".join(f"Item {item_id}: {quantity}" for item_id, quantity in top),
+                            inline=False)
+
+        return embed
+
+class TelemetryEmbeds:
+
+    @staticmethod
+    def mongo_top(rows: list[OperationStats], slow_queries: list[SlowQuery], order_by: str) -> discord.Embed:
+        """Gera o embed com os maiores ofensores de tempo no MongoDB.
+
+        Args:
+            rows (list[OperationStats]): Métricas por (origem, coleção, operação) já ordenadas.
+            slow_queries (list[SlowQuery]): Consultas lentas mais recentes.
+            order_by (str): Métrica usada na ordenação (exibida no título).
+
+        Returns:
+            discord.Embed: Embed com uma linha por ofensor e as últimas consultas lentas.
+        """
+        embed = discord.Embed(title=f'🩺 Telemetria do MongoDB (por {order_by})',
+                              color=discord.Color.dark_teal()
+        )
+
+        if not rows:
+            embed.description = 'Nenhum comando registrado ainda.'
+            return embed
+
+        lines = []
+        for row in rows:
+            failures = f' | ❌ {row.failures}' if row.failures else ''
+            lines.append(f"`{row.origin}` → `{row.collection}.{row.operation}` "
+                         f"| {row.count}x | total {row.total_ms:.0f} ms | p50 ≤{row.percentile(50):.0f} ms "
+                         f"| p99 ≤{row.percentile(99):.0f} ms | máx {row.max_ms:.0f} ms{failures}")
+
+        embed.description = "\n".join(lines)[:4000]
+
+        if slow_queries:
+            recent = [f"`{q.origin}` {q.collection}.{q.operation} {q.duration_ms:.0f} ms `{q.shape}`"
+                      for q in slow_queries[-5:]]
+            embed.add_field(name='Consultas lentas recentes', value="\n".join(recent)[:1024], inline=False)
+
+        return embed
+
+    @staticmethod
+    def interaction_latency(rows: list[CommandTimings], warn_threshold_ms: float, deadline_ms: float) -> discord.Embed:
+        """Gera o embed com a latência dos comandos em relação ao prazo do Discord.
+
+        Args:
+            rows (list[CommandTimings]): Métricas por comando, já ordenadas.
+            warn_threshold_ms (float): Limite a partir do qual uma invocação gera aviso.
+            deadline_ms (float): Prazo do Discord para a primeira resposta.
+
+        Returns:
+            discord.Embed: Embed com uma linha por comando/autocomplete.
+        """
+        embed = discord.Embed(title='⏱️ Latência dos comandos',
+                              description=f'Prazo: {deadline_ms:.0f} ms | aviso a partir de {warn_threshold_ms:.0f} ms',
+                              color=discord.Color.dark_teal()
+        )
+
+        if not rows:
+            embed.description += '\nNenhuma interação registrada ainda.'
+            return embed
+
+        lines = []
+        for row in rows[:20]:
+            outcomes = " ".join(f"{outcome}:{count}" for outcome, count in sorted(row.outcomes.items()))
+            alert = f' | ⚠️ {row.near_deadline}' if row.near_deadline else ''
+            lines.append(f"`{row.name}` ({row.kind}) {row.count}x | 1ª resp. p50 ≤{row.first_response.percentile(50):.0f} "
+                         f"p99 ≤{row.first_response.percentile(99):.0f} ms | handler p99 ≤{row.handler.percentile(99):.0f} ms "
+                         f"| {outcomes}{alert}")
+
+        embed.add_field(name='Comandos', value="\n".join(lines)[:1024], inline=False)
+        return embed
+
+    @staticmethod
+    def rest_routes(rows: list[tuple[RouteStats, float]],
+                    onboarding: Optional['OnboardingBacklog'] = None) -> discord.Embed:
+        """Gera o embed com o uso das rotas REST do Discord feitas pelo bot.
+
+        Args:
+            rows (list[tuple[RouteStats, float]]): Métricas por rota e a folga atual (0 a 1).
+            onboarding (Optional[OnboardingBacklog]): Fila de entrada de membros (DMs e cargos).
+
+        Returns:
+            discord.Embed: Embed com uma linha por rota lógica.
+        """
+        embed = discord.Embed(title='🚦 Rotas REST do Discord',
+                              color=discord.Color.dark_teal()
+        )
+
+        if onboarding is not None:
+            embed.add_field(name='Fila de entrada',
+                            value=(f"⏳ {onboarding.pending_registrations} a cadastrar | {onboarding.queued_jobs} DMs/cargos\n"
+                                   f"✅ {onboarding.registered} cadastrados | {onboarding.welcomed} DMs | "
+                                   f"{onboarding.restored} cargos restaurados\n"
+                                   f"⏭️ {onboarding.dms_skipped} DMs puladas | ❌ {onboarding.failures} falhas\n"
+                                   f"🚪 {onboarding.pending_departures} saídas na fila | {onboarding.departed} gravadas "
+                                   f"(último lote {onboarding.last_departure_batch}, maior {onboarding.max_departure_batch})"),
+                            inline=False)
+
+        if not rows:
+            embed.description = 'Nenhuma chamada registrada ainda.'
+            return embed
+
+        lines = []
+        for stats, headroom in rows:
+            priorities = " ".join(f"{name.lower()}:{count}" for name, count in sorted(stats.by_priority.items()))
+            limited = (f' | 🛑 429 x{stats.rate_limited} (máx {stats.retry_after_max:.1f}s)'
+                       if stats.rate_limited else '')
+            failures = f' | ❌ {stats.failures}' if stats.failures else ''
+            lines.append(f"`{stats.route}` {stats.count}x | folga {headroom:.0%} | fila p99 ≤{stats.queued.percentile(99):.0f} ms "
+                         f"| chamada p99 ≤{stats.latency.percentile(99):.0f} ms | {priorities}{limited}{failures}")
+
+        embed.description = "\n".join(lines)[:4000]
+        return embed
+
 class InventoryEmbeds:
 
     @staticmethod
@@ -229,10 +398,41 @@ class InventoryEmbeds:
 
         return embed
 
+    @staticmethod
+    def item_used(data: dict) -> discord.Embed:
+        """Gera o embed de confirmação do uso de um item.
+
+        Args:
+            data (dict): Retorno de ``EconomyService.use_item`` com
+                item, quantity, xp, coins, role_id, buff, level e level_up.
+
+        Returns:
+            discord.Embed: Embed com os efeitos aplicados.
+        """
+        embed = discord.Embed(title=f"🧪 {data['quantity']}x {data['item']} usado(s)!",
+                              color=discord.Color.green()
+        )
+        if data['xp']:
+            embed.add_field(name='XP', value=f"✨ **+{data['xp']}**", inline=True)
+        if data['coins']:
+            embed.add_field(name='Moedas', value=f"💰 **+{data['coins']}**", inline=True)
+        if data['role_id']:
+            embed.add_field(name='Cargo', value=f"<@&{data['role_id']}>", inline=True)
+        if data.get('buff'):
+            buff = data['buff']
+            label = 'XP' if buff['type'] == 'xp_boost' else 'Moedas'
+            embed.add_field(name='Bônus temporário',
+                            value=f"⏳ **+{int(buff['multiplier'] * 100)}% {label}** até {discord.utils.format_dt(buff['expires_at'], 'R')}",
+                            inline=False)
+        if data['level_up']:
+            embed.add_field(name='Level UP!', value=f"🏆 Agora você está no nível **{data['level']}**", inline=False)
+
+        return embed
+
 class UserEmbeds:
 
     @staticmethod
-    def view_profile(user_name:str, current_level:int, current_xp:int, xp_next_level:int, progress_percent: int,coin_balance:int, equipped_item_name:str) -> discord.Embed:
+    def view_profile(user_name:str, current_level:int, current_xp:int, xp_next_level:int, progress_percent: int,coin_balance:int, equipped_item_name:str, stats: Optional[UserStatsModel] = None) -> discord.Embed:
         """
         Gera o embed do perfil do usuário
 
@@ -244,6 +444,7 @@ class UserEmbeds:
             progress_percent (int): Progresso(%) par ao próximo nível.
             coin_balance (int): Moedas em caixa.
             equipped_item_name (str): Nome do item equipado
+            stats (Optional[UserStatsModel]): Contadores de contribuição em missões.
         Returns:
             discord.Embed: Embed com dados do inventário.
         """
@@ -258,6 +459,16 @@ class UserEmbeds:
         if equipped_item_name != "Nenhum item equipado":
             embed.add_field(name="Item equipado", value=f'⚔️ **{equipped_item_name}**', inline=False)
 
+        if stats and stats.missions_helped > 0:
+            # Rank médio arredondado a partir da soma das notas
+            average_rank = EvaluationRank.from_score(round(stats.score_sum / stats.missions_helped))
+            ranks_line = " ".join(f"{rank.value}: {stats.rank_counts.get(rank.value, 0)}" for rank in EvaluationRank)
+
+            embed.add_field(name="Missões ajudadas", value=f"📜 **{stats.missions_helped}**", inline=True)
+            embed.add_field(name="Rank médio", value=f"⭐ **{average_rank.value}**", inline=True)
+            embed.add_field(name="Ganhos em missões", value=f"{stats.mission_xp} XP | {stats.mission_coins} moedas", inline=False)
+            embed.add_field(name="Ranks recebidos", value=f"`{ranks_line}`", inline=False)
+
 
         return embed
 
@@ -309,7 +520,7 @@ class CodeSageEmbeds:
         )
 
         embed.set_footer(
-            text=f"Você é o membro nº {len(member.guild.members)} desta jornada.")
+            text=f"Você é o membro nº {member.guild.member_count} desta jornada.")
 
 
         return embed
@@ -355,7 +566,7 @@ class CodeSageEmbeds:
         )
 
         embed.set_footer(
-            text=f"A comunidade agora conta com {len(member.guild.members)} viajantes."
+            text=f"A comunidade agora conta com {member.guild.member_count} viajantes."
         )
 
         return embed
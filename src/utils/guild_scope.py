@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import ContextManager, Iterator, Optional
+
+from src.app.config import GUILD_ID
+
+# Servidor (guilda) ao qual pertencem as operações da task atual.
+# Segue o mesmo modelo do ``command_origin``: o Cog/evento define o valor no início
+# do handler e os repositórios o usam para montar as chaves (guild_id, user_id).
+# Sem valor definido não há servidor: ``current_guild_id`` falha em vez de cair no
+# GUILD_ID, para que uma task que esqueceu o escopo não leia/grave os dados do
+# servidor principal. Scripts de um servidor só usam ``main_guild_scope``.
+guild_scope: ContextVar[Optional[int]] = ContextVar('guild_scope', default=None)
+
+
+def set_guild(guild_id: Optional[int]) -> Token:
+    """Define o servidor das operações executadas a partir daqui na task atual.
+
+    Args:
+        guild_id (Optional[int]): ID do servidor (None remove o escopo).
+
+    Returns:
+        Token: Token para restaurar o valor anterior com ``guild_scope.reset``.
+    """
+    return guild_scope.set(guild_id)
+
+
+def current_guild_id() -> int:
+    """Retorna o servidor atual.
+
+    Raises:
+        LookupError: Se a task não definiu o servidor (``set_guild``/``scoped_guild``).
+    """
+    guild_id = guild_scope.get()
+    if guild_id is None:
+        raise LookupError('Nenhum servidor definido para a operação (use set_guild/scoped_guild)')
+    return guild_id
+
+
+@contextmanager
+def scoped_guild(guild_id: Optional[int]) -> Iterator[None]:
+    """Executa um bloco com outro servidor definido e restaura o anterior ao sair.
+
+    Usado por tarefas e scripts que percorrem vários servidores na mesma task.
+
+    Args:
+        guild_id (Optional[int]): ID do servidor.
+    """
+    token = guild_scope.set(guild_id)
+    try:
+        yield
+    finally:
+        guild_scope.reset(token)
+
+
+def main_guild_scope() -> ContextManager[None]:
+    """Escopo do servidor principal (GUILD_ID), para scripts de um servidor só.
+
+    O bot nunca usa o GUILD_ID implicitamente; scripts que operam sobre o
+    servidor principal precisam pedir isso explicitamente.
+
+    Raises:
+        LookupError: Se o GUILD_ID não está configurado.
+    """
+    if GUILD_ID is None:
+        raise LookupError('GUILD_ID não configurado')
+    return scoped_guild(GUILD_ID)
@@ -1,5 +1,5 @@
 import discord
-from src.app.config import MISSION_CHANNEL_ID
+from src.app.config import GUILD_ID
 from src.utils.embeds import create_error_embed
 
 async def is_mission_channel(interaction: discord.Interaction) -> bool:
@@ -9,8 +9,9 @@ async def is_mission_channel(interaction: discord.Interaction) -> bool:
     Args:
         interaction (discord.Interaction): Interação do comando.
     """
-    # Verifica se é Thread e se o pai é o canal de missões
-    if not isinstance(interaction.channel, discord.Thread) or interaction.channel.parent_id != MISSION_CHANNEL_ID:
+    # Verifica se é Thread e se o pai é o canal de missões do servidor
+    mission_channel_id = interaction.client.guild_configs.get(interaction.guild_id).mission_channel_id
+    if not isinstance(interaction.channel, discord.Thread) or interaction.channel.parent_id != mission_channel_id:
         wrong_channel_embed = create_error_embed(
             title='Você não pode usar esse comando aqui!',
             message='Esse comando só pode ser usado dentro de uma missão'
@@ -22,4 +23,30 @@ async def is_mission_channel(interaction: discord.Interaction) -> bool:
 
         return False
 
-    return True
\ No newline at end of file
+    return True
+
+async def is_bot_operator(interaction: discord.Interaction) -> bool:
+    """
+    Verifica se quem chamou pode ver as métricas do processo do bot.
+    Essas métricas são únicas para todos os servidores, então só o servidor
+    principal (GUILD_ID) e o dono do bot têm acesso.
+    Se não puder, já envia a mensagem de erro e retorna False.
+    Args:
+        interaction (discord.Interaction): Interação do comando.
+    """
+    if GUILD_ID is not None and interaction.guild_id == GUILD_ID:
+        return True
+
+    if await interaction.client.is_owner(interaction.user):
+        return True
+
+    forbidden_embed = create_error_embed(
+        title='Você não pode usar esse comando aqui!',
+        message='As métricas do bot só podem ser consultadas no servidor principal'
+    )
+    if not interaction.response.is_done():
+        await interaction.response.send_message(embed=forbidden_embed, ephemeral=True)
+    else:
+        await interaction.followup.send(embed=forbidden_embed, ephemeral=True)
+
+    return False
@@ -0,0 +1,62 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# Limites superiores (ms) padrão dos buckets; o último bucket é o excedente
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+@dataclass
+class LatencyHistogram:
+    """Histograma de latência com buckets fixos (memória constante por métrica).
+
+    Os percentis são estimados pelo limite superior do bucket, o que basta
+    para responder "ficou abaixo de X ms" sem guardar cada amostra.
+    """
+    bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS
+    buckets: List[int] = field(default_factory=list)
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def __post_init__(self):
+        if not self.buckets:
+            self.buckets = [0] * (len(self.bounds) + 1)
+
+    def observe(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.buckets[bisect_left(self.bounds, duration_ms)] += 1
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Estimativa do percentil (o bucket excedente usa o máximo observado)."""
+        if not self.count:
+            return 0.0
+        target = pct / 100 * self.count
+        cumulative = 0
+        for index, amount in enumerate(self.buckets):
+            cumulative += amount
+            if cumulative >= target:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def copy(self) -> 'LatencyHistogram':
+        return LatencyHistogram(self.bounds, list(self.buckets), self.count, self.total_ms, self.max_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação serializável (para exportação em JSON)."""
+        return {
+            'count': self.count,
+            'avg_ms': round(self.avg_ms, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'buckets': {('+inf' if i == len(self.bounds) else f'le_{self.bounds[i]:g}'): amount
+                        for i, amount in enumerate(self.buckets)},
+        }
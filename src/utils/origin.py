@@ -0,0 +1,32 @@
+from contextvars import ContextVar, Token
+
+# Origem usada quando nada definiu o contexto (ex: chamadas feitas no setup_hook)
+UNKNOWN_ORIGIN = 'desconhecido'
+
+# Comando, evento ou tarefa que está executando na task atual.
+# O discord.py despacha cada interação/evento em uma task própria, então o valor
+# definido no início do handler acompanha todas as chamadas ao banco feitas por ele.
+# Fica fora de ``src.utils.context`` para que banco, ledger e scripts não importem o discord.py.
+command_origin: ContextVar[str] = ContextVar('command_origin', default=UNKNOWN_ORIGIN)
+
+
+def set_origin(origin: str) -> Token:
+    """Define a origem das operações executadas a partir daqui na task atual.
+
+    Args:
+        origin (str): Nome da origem (ex: '/avaliar', 'evento:on_member_join').
+
+    Returns:
+        Token: Token para restaurar o valor anterior com ``command_origin.reset``.
+    """
+    return command_origin.set(origin)
+
+
+def get_origin() -> str:
+    """Retorna a origem atual (ou ``UNKNOWN_ORIGIN``)."""
+    return command_origin.get()
+
+
+def event_origin(event_name: str) -> str:
+    """Nome da origem de um evento do gateway (ex: 'evento:on_member_join')."""
+    return f'evento:{event_name}'
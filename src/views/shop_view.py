@@ -1,9 +1,57 @@
 import discord
 from discord import ui
+from typing import Dict, List, Optional, Tuple
 
 from src.utils.embeds import create_info_embed, create_error_embed
 from src.services.economy_service import EconomyService
+from src.services.idempotency_service import idempotency_key
 from src.database.models.item import ItemModel, ItemType
+from src.utils.context import set_origin, set_guild
+
+# Janela (s) em que a mesma compra do mesmo membro é tratada como clique repetido
+PURCHASE_DEDUP_WINDOW = 10
+
+# custom_id fixo do menu: o ShopView registrado no boot (bot.add_view) atende
+# as vitrines publicadas antes do reinício
+SHOP_SELECT_CUSTOM_ID = 'loja:comprar'
+
+_ITEM_EMOJIS = {
+    ItemType.CONSUMABLE: '🧪',
+    ItemType.EQUIPPABLE: '🛡️',
+    ItemType.ROLE: '📜',
+}
+
+# SelectOption de cada item, reaproveitada entre rotações enquanto o item não mudar
+_option_cache: Dict[int, Tuple[Tuple, discord.SelectOption]] = {}
+
+
+def item_option(item: ItemModel) -> discord.SelectOption:
+    """Retorna a opção do menu para o item, montada uma única vez por versão do item.
+
+    Args:
+        item (ItemModel): Item da loja.
+
+    Returns:
+        discord.SelectOption: Opção com nome, preço, descrição curta e emoji do tipo.
+    """
+    signature = (item.name, item.price, item.description, item.item_type)
+    cached = _option_cache.get(item.item_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    option = discord.SelectOption(
+        label=item.name,
+        description=f"💰 {item.price} | {item.description[:50]}",
+        value=str(item.item_id),
+        emoji=_ITEM_EMOJIS.get(item.item_type) or None
+    )
+    _option_cache[item.item_id] = (signature, option)
+    return option
+
+
+def build_options(items: List[ItemModel]) -> List[discord.SelectOption]:
+    """Lista de opções da vitrine (as opções de cada item vêm do cache)."""
+    return [item_option(item) for item in items]
 
 
 class ShopDropdown(ui.Select):
@@ -13,35 +61,18 @@ class ShopDropdown(ui.Select):
     Renderiza opções com nome, preço, breve descrição e um emoji indicando o tipo
     do item. Ao selecionar, aciona a compra via EconomyService.
     """
-    def __init__(self, items: list[ItemModel], economy_service: EconomyService):
+    def __init__(self, options: List[discord.SelectOption], economy_service: EconomyService):
         """
-        Inicializa o dropdown com uma lista de itens e o serviço de economia.
+        Inicializa o dropdown com as opções já montadas e o serviço de economia.
 
         Args:
-            items (list[ItemModel]): Itens disponíveis para compra.
+            options (List[discord.SelectOption]): Opções da rotação atual (vazia no view registrado no boot).
             economy_service (EconomyService): Serviço responsável por processar a compra.
         """
         self.economy_service = economy_service
 
-        options = []
-        for item in items:
-            emoji = ''
-            match item.item_type:
-                case ItemType.CONSUMABLE:
-                    emoji = '🧪'
-                case ItemType.EQUIPPABLE:
-                    emoji = '🛡️'
-                case ItemType.ROLE:
-                    emoji = '📜'
-
-            options.append(discord.SelectOption(
-                label=item.name,
-                description=f"💰 {item.price} | {item.description[:50]}",
-                value=str(item.item_id),
-                emoji=emoji
-            ))
-
         super().__init__(
+            custom_id=SHOP_SELECT_CUSTOM_ID,
             placeholder="Selecione um item para comprar...",
             min_values=1,
             max_values=1,
@@ -61,19 +92,25 @@ class ShopDropdown(ui.Select):
             - Lê o item selecionado.
             - Defer da resposta (ephemeral).
             - Chama EconomyService.buy_item e envia um embed de sucesso/erro.
+            - Cliques repetidos no mesmo item dentro de PURCHASE_DEDUP_WINDOW
+              recebem o resultado da primeira compra, sem comprar de novo.
         """
 
+        set_origin('componente:loja')
+        set_guild(interaction.guild_id)
+
         # self.values é uma lista de strings com os values selecionados.
         selected_item_id = int(self.values[0])
 
         await interaction.response.defer(ephemeral=True)
 
         # Chama a lógica de negócio
-        success, message = await self.economy_service.buy_item(
+        key = idempotency_key('loja', interaction.guild_id, interaction.user.id, selected_item_id)
+        success, message = await interaction.client.idempotency.run(key, lambda: self.economy_service.buy_item(
             user_id=interaction.user.id,
             item_id=selected_item_id,
             item_quantity=1
-        )
+        ), ttl=PURCHASE_DEDUP_WINDOW)
 
         if success:
             successful_purchase_embed = create_info_embed(title='Compra realizada!', message=message)
@@ -86,20 +123,18 @@ class ShopDropdown(ui.Select):
 
 class ShopView(ui.View):
     """
-    View que agrega o dropdown da loja.
+    View persistente que agrega o dropdown da loja.
 
-    Esta view é responsável por conter o componente ShopDropdown e manter o
-    timeout desativado (persistente) para que os botões continuem interativos
-    até serem manualmente removidos/desativados.
+    Sem timeout e com custom_id fixo: registrada com ``bot.add_view`` no boot,
+    continua atendendo as vitrines já publicadas depois de um reinício.
     """
-    def __init__(self, items, economy_service: EconomyService):
+    def __init__(self, economy_service: EconomyService, options: Optional[List[discord.SelectOption]] = None):
         """
-        Inicializa a view com os itens e o serviço de economia.
+        Inicializa a view com as opções e o serviço de economia.
 
         Args:
-            items (list[ItemModel]): Lista de itens disponíveis para compra.
             economy_service (EconomyService): Serviço utilizado pelo dropdown para efetuar compras.
+            options (Optional[List[discord.SelectOption]]): Opções da rotação (None no view registrado no boot).
         """
         super().__init__(timeout=None)
-        if items:
-            self.add_item(ShopDropdown(items, economy_service))
\ No newline at end of file
+        self.add_item(ShopDropdown(options or [], economy_service))
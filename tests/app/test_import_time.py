@@ -0,0 +1,61 @@
+"""Orçamento de tempo de import do ponto de entrada do bot.
+
+Roda ``python -X importtime`` em um processo novo e falha se o tempo acumulado
+passar do orçamento ou se módulos pesados voltarem a ser importados no boot.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Orçamento (ms) do import de src.app.main; sobrescreva com IMPORT_TIME_BUDGET_MS em máquinas lentas
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+
+# Importados só sob demanda (ver SageService.client e LevelingService.calculate_levels)
+DEFERRED_MODULES = ('google.genai', 'numpy')
+
+
+def import_times(statement: str) -> Dict[str, float]:
+    """Executa o import em um processo novo e retorna o tempo acumulado (ms) de cada módulo."""
+    env = {**os.environ,
+           'PYTHONPATH': os.pathsep.join([str(ROOT / 'src'), str(ROOT)]),
+           'MISSION_CHANNEL_ID': os.getenv('MISSION_CHANNEL_ID', '1'),
+           'MOD_LOG_CHANNEL_ID': os.getenv('MOD_LOG_CHANNEL_ID', '2')}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+@pytest.fixture(scope='module')
+def main_times() -> Dict[str, float]:
+    return import_times('import src.app.main')
+
+
+def test_entry_point_import_budget(main_times):
+    assert main_times['src.app.main'] <= IMPORT_TIME_BUDGET_MS, (
+        f"src.app.main levou {main_times['src.app.main']:.0f} ms para importar "
+        f"(orçamento {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+    )
+
+
+def test_heavy_modules_are_deferred(main_times):
+    assert not [name for name in main_times if name.startswith(DEFERRED_MODULES)]
+
+
+def test_database_layer_does_not_import_discord():
+    """Scripts (seeds, migrações) usam a camada de banco sem pagar pelo discord.py."""
+    times = import_times('import src.database.connection, src.services.ledger_service')
+    assert 'discord' not in times
@@ -0,0 +1,63 @@
+import json
+import logging
+import queue
+
+from src.app.logging_ import JsonLinesFormatter, NonBlockingQueueHandler, RateSampler
+from src.utils.context import command_origin, set_origin
+
+
+def make_record(name='src.repositories.user_repository', level=logging.INFO, msg='Usuário %s não encontrado',
+                args=(42,), created=1000.0):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.created = created
+    return record
+
+
+def test_sampler_limits_info_per_logger_and_second():
+    """Acima do limite as mensagens INFO são suprimidas e contadas; avisos sempre passam."""
+    sampler = RateSampler(max_per_second=2)
+
+    results = [sampler.filter(make_record()) for _ in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sampler.suppressed['src.repositories.user_repository'] == 3
+
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert sampler.filter(make_record(name='src.services.economy_service'))
+    assert sampler.filter(make_record(created=1001.0))
+
+
+def test_queue_handler_drops_when_full_without_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_queue_handler_merges_message_and_keeps_origin():
+    """A mensagem é montada no loop e a origem da task acompanha o registro."""
+    handler = NonBlockingQueueHandler(queue.Queue())
+    token = set_origin('/perfil')
+    try:
+        handler.handle(make_record())
+    finally:
+        command_origin.reset(token)
+    record = handler.queue.get_nowait()
+
+    assert record.msg == 'Usuário 42 não encontrado'
+    assert record.args is None
+    assert record.origin == '/perfil'
+
+
+def test_json_lines_formatter():
+    record = make_record()
+    record.origin = '/perfil'
+
+    payload = json.loads(JsonLinesFormatter().format(record))
+
+    assert payload['message'] == 'Usuário 42 não encontrado'
+    assert payload['level'] == 'INFO'
+    assert payload['logger'] == 'src.repositories.user_repository'
+    assert payload['origin'] == '/perfil'
@@ -0,0 +1,24 @@
+import pytest
+
+from benchmarks.harness import build_context, measure
+from benchmarks.hot_paths import HOT_PATHS
+
+pytestmark = pytest.mark.asyncio
+
+ITERATIONS = 20
+
+
+@pytest.fixture
+async def context():
+    """Guilda sintética pequena: o orçamento de comandos não depende do tamanho."""
+    return await build_context(users=1_000, missions=ITERATIONS * 2)
+
+
+@pytest.mark.parametrize('case', HOT_PATHS, ids=[case.name for case in HOT_PATHS])
+async def test_hot_path_within_round_trip_budget(context, case):
+    """Falha quando um caminho quente passa a enviar mais comandos ao banco que o orçamento."""
+    result = await measure(case, context, ITERATIONS)
+
+    assert result.within_budget, (
+        f'{case.name} enviou {result.max_commands} comandos (orçamento {case.budget}): {result.commands}'
+    )
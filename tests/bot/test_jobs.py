@@ -0,0 +1,79 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+
+from src.bot.jobs import JobRegistry
+from src.repositories.lease_repository import LeaseRepository
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def lease_repo() -> LeaseRepository:
+    return LeaseRepository(FakeDatabase())
+
+
+async def run(registry: JobRegistry) -> None:
+    await registry.heartbeat()
+    await asyncio.gather(*registry.run_pending())
+
+
+async def test_singleton_runs_in_a_single_process(lease_repo):
+    """Com dois processos só o dono da lease executa; ao parar, o outro assume com token maior."""
+    func_a, func_b = AsyncMock(), AsyncMock()
+    a = JobRegistry(lease_repo, owner='a', ttl=30)
+    b = JobRegistry(lease_repo, owner='b', ttl=30)
+    a.singleton('stats_rollup', 60, func_a)
+    b.singleton('stats_rollup', 60, func_b)
+
+    await run(a)
+    await run(b)
+
+    func_a.assert_awaited_once()
+    func_b.assert_not_awaited()
+
+    # Intervalo ainda não venceu: não roda de novo
+    await run(a)
+    func_a.assert_awaited_once()
+
+    first_token = func_a.await_args.args[0].token
+    await a.stop()
+    await run(b)
+
+    func_b.assert_awaited_once()
+    assert func_b.await_args.args[0].token > first_token
+
+
+async def test_sharded_job_splits_shards_between_processes(lease_repo):
+    """Um processo novo recebe sua parte dos shards na batida seguinte do dono atual."""
+    func_a, func_b = AsyncMock(), AsyncMock()
+    a = JobRegistry(lease_repo, owner='a', ttl=30)
+    b = JobRegistry(lease_repo, owner='b', ttl=30)
+    a.sharded('mission_auto_close', 4, 0, func_a)
+    b.sharded('mission_auto_close', 4, 0, func_b)
+
+    await run(a)
+    func_a.assert_awaited_once_with([0, 1, 2, 3])
+
+    # b entra, a devolve o excedente e b adquire os shards livres
+    await run(b)
+    await run(a)
+    await run(b)
+
+    shards_a = func_a.await_args.args[0]
+    shards_b = func_b.await_args.args[0]
+    assert len(shards_a) == len(shards_b) == 2
+    assert sorted(shards_a + shards_b) == [0, 1, 2, 3]
+
+
+async def test_failing_job_is_counted_and_keeps_the_lease(lease_repo):
+    registry = JobRegistry(lease_repo, owner='a', ttl=30)
+    registry.singleton('ledger_snapshots', 0, AsyncMock(side_effect=RuntimeError('falhou')))
+
+    await run(registry)
+    await run(registry)
+
+    job = registry.jobs['ledger_snapshots']
+    assert job.failures == 2
+    assert 0 in job.leases
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import discord
+
+from src.bot.members import MemberResolver, build_intents, build_member_cache_flags, should_chunk_guilds
+
+
+def test_build_intents_from_spec():
+    intents = build_intents('default,members,message_content,-typing')
+
+    assert intents.members and intents.message_content and intents.guilds
+    assert not intents.presences
+    assert not intents.typing
+    assert build_intents('all') == discord.Intents.all()
+
+    with pytest.raises(ValueError):
+        build_intents('default,membros')
+
+
+def test_member_cache_policies():
+    intents = build_intents('default,members')
+
+    assert build_member_cache_flags('full', intents).joined
+    assert not build_member_cache_flags('minimal', intents).joined
+    with pytest.raises(ValueError):
+        build_member_cache_flags('metade', intents)
+
+
+def test_chunking_follows_full_cache_unless_configured():
+    """Sem configuração, o cache completo baixa os membros (os cargos de quem sai ficam guardados)."""
+    intents = build_intents('default,members')
+
+    assert should_chunk_guilds('full', intents) is True
+    assert should_chunk_guilds('minimal', intents) is False
+    assert should_chunk_guilds('full', build_intents('default')) is False
+    assert should_chunk_guilds('full', intents, configured=False) is False
+
+
+def make_guild(cached=None, fetched=None):
+    guild = MagicMock()
+    guild.id = 1
+    guild.get_member.return_value = cached
+    guild.fetch_member = AsyncMock(return_value=fetched)
+    return guild
+
+
+@pytest.mark.asyncio
+async def test_resolver_prefers_discord_cache():
+    member = MagicMock()
+    guild = make_guild(cached=member)
+    resolver = MemberResolver()
+
+    assert await resolver.resolve(guild, 10) is member
+    guild.fetch_member.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_resolver_fetches_once_and_keeps_lru():
+    """Fora do cache do discord.py o membro é buscado uma vez e reaproveitado pelo LRU."""
+    member = MagicMock()
+    guild = make_guild(fetched=member)
+    resolver = MemberResolver(maxsize=1)
+
+    assert await resolver.resolve(guild, 10) is member
+    assert await resolver.resolve(guild, 10) is member
+    assert guild.fetch_member.await_count == 1
+
+    # Outro membro expulsa o primeiro do LRU (tamanho 1)
+    await resolver.resolve(guild, 11)
+    assert len(resolver) == 1
+    await resolver.resolve(guild, 10)
+    assert guild.fetch_member.await_count == 3
+
+    resolver.forget(1, 10)
+    assert len(resolver) == 0
+
+
+@pytest.mark.asyncio
+async def test_resolver_partitions_lru_per_guild():
+    """Um servidor movimentado não expulsa os membros em cache dos outros."""
+    quiet, busy = make_guild(fetched=MagicMock()), make_guild(fetched=MagicMock())
+    busy.id = 2
+    resolver = MemberResolver(maxsize=2)
+
+    await resolver.resolve(quiet, 10)
+    for user_id in range(100, 110):
+        await resolver.resolve(busy, user_id)
+
+    assert resolver.partition_sizes() == {1: 1, 2: 2}
+    await resolver.resolve(quiet, 10)
+    assert quiet.fetch_member.await_count == 1
+
+    resolver.forget_guild(2)
+    assert len(resolver) == 1
+
+
+@pytest.mark.asyncio
+async def test_resolver_returns_none_for_departed_member():
+    guild = make_guild()
+    guild.fetch_member.side_effect = discord.NotFound(MagicMock(status=404, reason='Not Found'), 'Unknown Member')
+    resolver = MemberResolver()
+
+    assert await resolver.resolve(guild, 10) is None
+    assert len(resolver) == 0
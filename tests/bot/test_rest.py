@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import discord
+
+from src.bot.rest import Priority, RestScheduler, priority_for_origin
+from src.utils.context import set_origin
+
+
+def test_priority_follows_origin():
+    assert priority_for_origin('/avaliar') is Priority.INTERACTION
+    assert priority_for_origin('componente:loja') is Priority.INTERACTION
+    assert priority_for_origin('evento:on_member_join') is Priority.EVENT
+    assert priority_for_origin('tarefa:rollup_diario') is Priority.BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_call_and_records_stats():
+    """A chamada roda na própria task e entra nas métricas com a prioridade da origem."""
+    scheduler = RestScheduler()
+    call = AsyncMock(return_value='ok')
+    set_origin('/avaliar')
+
+    assert await scheduler.submit('member_roles', call) == 'ok'
+
+    (stats, headroom), = scheduler.snapshot()
+    assert stats.route == 'member_roles'
+    assert stats.count == 1
+    assert stats.by_priority == {'INTERACTION': 1}
+    assert 0 < headroom < 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority():
+    """Com o orçamento esgotado, quem tem maior prioridade é atendido primeiro."""
+    scheduler = RestScheduler(budgets={'dm': (1, 0.05)})
+    order = []
+
+    async def call(name):
+        order.append(name)
+
+    await scheduler.submit('dm', lambda: call('primeiro'), Priority.EVENT)
+    await asyncio.gather(
+        scheduler.submit('dm', lambda: call('evento'), Priority.EVENT),
+        scheduler.submit('dm', lambda: call('interacao'), Priority.INTERACTION),
+    )
+
+    assert order == ['primeiro', 'interacao', 'evento']
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_log_penalizes_route():
+    """O aviso de 429 do discord.py é atribuído à rota em andamento e reduz o ritmo dela."""
+    scheduler = RestScheduler(budgets={'member_roles': (10, 10.0)})
+    log_filter = scheduler.install_log_filter()
+    http_logger = logging.getLogger('discord.http')
+
+    async def call():
+        http_logger.warning('We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.',
+                            'PUT', '/guilds/1/members/2/roles/3', 0.5)
+
+    try:
+        await scheduler.submit('member_roles', call, Priority.INTERACTION)
+    finally:
+        http_logger.removeFilter(log_filter)
+
+    bucket = scheduler.bucket('member_roles')
+    assert bucket.headroom() == 0.0
+    assert bucket.rate == pytest.approx(bucket.base_rate / 2)
+
+    (stats, _), = scheduler.snapshot()
+    assert stats.rate_limited == 1
+    assert stats.retry_after_max == 0.5
+
+
+@pytest.mark.asyncio
+async def test_http_429_is_counted_as_failure():
+    scheduler = RestScheduler()
+    response = MagicMock(status=429, reason='Too Many Requests')
+    call = AsyncMock(side_effect=discord.HTTPException(response, 'rate limited'))
+
+    with pytest.raises(discord.HTTPException):
+        await scheduler.submit('channel_message', call, Priority.EVENT)
+
+    (stats, _), = scheduler.snapshot()
+    assert stats.failures == 1
+    assert stats.rate_limited == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_jobs_wait_for_headroom():
+    """Jobs em lote só começam com metade do orçamento livre; interações usam o que sobrar."""
+    scheduler = RestScheduler(budgets={'member_roles': (4, 0.2)})
+    call = AsyncMock()
+
+    for _ in range(3):
+        await scheduler.submit('member_roles', call, Priority.INTERACTION)
+    assert scheduler.headroom('member_roles') < 0.5
+
+    await scheduler.submit('member_roles', call, Priority.BULK)
+
+    # A folga foi recuperada antes de o job consumir o token
+    assert scheduler.bucket('member_roles').tokens >= 0.9
+    assert call.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_logged_rate_limited_error_is_counted_once():
+    """O 429 que o discord.py loga antes de levantar RateLimited não é contado de novo pela exceção."""
+    scheduler = RestScheduler()
+    log_filter = scheduler.install_log_filter()
+    http_logger = logging.getLogger('discord.http')
+
+    async def call():
+        http_logger.warning('We are being rate limited. %s %s responded with 429. '
+                            'Timeout of %.2f was too long, erroring instead.', 'POST', '/users/@me/channels', 30.0)
+        raise discord.RateLimited(30.0)
+
+    try:
+        with pytest.raises(discord.RateLimited):
+            await scheduler.submit('dm', call, Priority.EVENT)
+    finally:
+        http_logger.removeFilter(log_filter)
+
+    (stats, _), = scheduler.snapshot()
+    assert stats.rate_limited == 1
+    assert stats.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_reset_during_call_does_not_fail_the_call():
+    """Zerar as métricas com uma chamada em andamento não transforma o sucesso em erro."""
+    scheduler = RestScheduler()
+
+    async def call():
+        scheduler.reset()
+        return 'enviada'
+
+    assert await scheduler.submit('channel_message', call, Priority.EVENT) == 'enviada'
+    (stats, _), = scheduler.snapshot()
+    assert stats.count == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_in_global_queue_returns_route_token():
+    """Cancelada esperando o limite global, a chamada devolve o token da rota."""
+    scheduler = RestScheduler(budgets={'dm': (2, 10.0)}, global_budget=(1, 10.0))
+    await scheduler.submit('channel_message', AsyncMock(), Priority.EVENT)
+    tokens = scheduler.bucket('dm').tokens
+
+    task = asyncio.create_task(scheduler.submit('dm', AsyncMock(), Priority.EVENT))
+    await asyncio.sleep(0.01)
+    assert scheduler.bucket('dm').tokens < tokens
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert scheduler.bucket('dm').tokens == pytest.approx(tokens, abs=0.01)
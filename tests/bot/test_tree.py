@@ -0,0 +1,152 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import discord
+from discord import app_commands
+from discord.enums import InteractionResponseType
+from discord.interactions import InteractionResponse
+
+from src.bot.tree import (
+    InstrumentedCommandTree,
+    InteractionMetrics,
+    TimedInteractionResponse,
+    OUTCOME_OK,
+    OUTCOME_NO_RESPONSE,
+    OUTCOME_ERROR,
+)
+from src.repositories.bot_state_repository import BotStateRepository
+from tests.fakes import FakeDatabase
+
+
+@pytest.fixture
+def tree():
+    client = discord.Client(intents=discord.Intents.none())
+    return InstrumentedCommandTree(client, metrics=InteractionMetrics(warn_ratio=0.5))
+
+
+def make_interaction(name='avaliar', interaction_type=discord.InteractionType.application_command):
+    interaction = MagicMock()
+    interaction.type = interaction_type
+    interaction.data = {'name': name, 'type': 1}
+    interaction.command = None
+    interaction.command_failed = False
+    return interaction
+
+
+def test_discord_internals_used_by_the_timing_hooks_exist():
+    """Os ganchos de tempo dependem de internos do discord.py (versão limitada no pyproject.toml)."""
+    assert callable(getattr(app_commands.CommandTree, '_call', None))
+    assert discord.Interaction.response.name == '_cs_response'
+    assert '_cs_response' in discord.Interaction.__slots__
+    assert '_response_type' in InteractionResponse.__slots__
+    assert InteractionResponse.is_done.__qualname__ == 'InteractionResponse.is_done'
+
+
+def test_timed_response_marks_first_response_only():
+    """Somente a primeira resposta (ex: defer) define o instante."""
+    response = TimedInteractionResponse(MagicMock())
+    assert response.first_response_at is None
+    assert not response.is_done()
+
+    response._response_type = InteractionResponseType.deferred_channel_message
+    first = response.first_response_at
+    response._response_type = InteractionResponseType.channel_message
+
+    assert first is not None
+    assert response.first_response_at == first
+    assert response.is_done()
+
+
+@pytest.mark.asyncio
+async def test_call_records_command_and_autocomplete(tree):
+    """Comando respondido e autocomplete sem resposta são agregados separadamente."""
+    async def fake_call(self, interaction):
+        if interaction.type is discord.InteractionType.application_command:
+            interaction._cs_response._response_type = InteractionResponseType.deferred_channel_message
+
+    with patch.object(app_commands.CommandTree, '_call', fake_call):
+        await tree._call(make_interaction())
+        await tree._call(make_interaction('equipar', discord.InteractionType.autocomplete))
+
+    rows = {(row.name, row.kind): row for row in tree.metrics.snapshot()}
+    assert rows[('/avaliar', 'comando')].outcomes == {OUTCOME_OK: 1}
+    assert rows[('/avaliar', 'comando')].first_response.count == 1
+    assert rows[('/equipar', 'autocomplete')].outcomes == {OUTCOME_NO_RESPONSE: 1}
+    assert rows[('/equipar', 'autocomplete')].first_response.count == 0
+
+
+@pytest.mark.asyncio
+async def test_call_records_errors_and_reraises(tree):
+    async def fake_call(self, interaction):
+        raise RuntimeError('boom')
+
+    with patch.object(app_commands.CommandTree, '_call', fake_call):
+        with pytest.raises(RuntimeError):
+            await tree._call(make_interaction())
+
+    assert tree.metrics.snapshot()[0].outcomes == {OUTCOME_ERROR: 1}
+
+
+def test_near_deadline_warning_and_export():
+    """Invocações acima da fração do prazo são contadas, logadas e exportáveis em JSON."""
+    metrics = InteractionMetrics(warn_ratio=0.5)
+
+    metrics.observe('/avaliar', 'comando', 100, 900, OUTCOME_OK)
+    with patch('src.bot.tree.logger') as logger:
+        metrics.observe('/avaliar', 'comando', 1600, 2000, OUTCOME_OK)
+
+    row = metrics.snapshot()[0]
+    assert row.near_deadline == 1
+    assert row.first_response.percentile(99) == 2000
+    logger.warning.assert_called_once()
+
+    exported = json.loads(json.dumps(metrics.export()))
+    assert exported['warn_threshold_ms'] == 1500
+    assert exported['commands'][0]['count'] == 2
+
+
+def add_command(tree, name='perfil', with_option=False):
+    if with_option:
+        async def callback(interaction: discord.Interaction, membro: discord.Member):
+            pass
+    else:
+        async def callback(interaction: discord.Interaction):
+            pass
+    tree.add_command(app_commands.Command(name=name, description='Teste', callback=callback))
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_is_stable_and_tracks_options(tree):
+    """A ordem de registro não muda o hash; uma opção nova muda."""
+    add_command(tree, 'perfil')
+    add_command(tree, 'avaliar')
+    first, count = await tree.fingerprint()
+
+    other = InstrumentedCommandTree(discord.Client(intents=discord.Intents.none()))
+    add_command(other, 'avaliar')
+    add_command(other, 'perfil')
+    assert (await other.fingerprint()) == (first, count)
+    assert count == 2
+
+    changed = InstrumentedCommandTree(discord.Client(intents=discord.Intents.none()))
+    add_command(changed, 'avaliar')
+    add_command(changed, 'perfil', with_option=True)
+    assert (await changed.fingerprint())[0] != first
+
+
+@pytest.mark.asyncio
+async def test_sync_if_changed_skips_unchanged_tree(tree):
+    """Só o primeiro sync (ou um forçado) chama a API do Discord."""
+    add_command(tree)
+    guild = discord.Object(id=123)
+    tree.copy_global_to(guild=guild)
+    state_repo = BotStateRepository(FakeDatabase())
+
+    with patch.object(tree, 'sync', AsyncMock()) as sync:
+        assert await tree.sync_if_changed(guild, state_repo)
+        assert not await tree.sync_if_changed(guild, state_repo)
+        assert await tree.sync_if_changed(guild, state_repo, force=True)
+
+    assert sync.await_count == 2
+    state = await state_repo.get_command_sync('command_tree:None:123')
+    assert state.command_count == 1
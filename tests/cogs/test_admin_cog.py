@@ -148,3 +148,63 @@ async def test_adjust_rank_success(mock_is_channel, cog, mock_bot, mock_interact
 
 
 
+
+
+@pytest.mark.asyncio
+@patch("src.utils.helpers.GUILD_ID", 1)
+async def test_mongo_telemetry_denied_outside_main_guild(cog, mock_bot, mock_interaction):
+    """O admin de outro servidor não vê nem zera a telemetria, que é de todos os servidores."""
+    mock_interaction.guild_id = 2
+    mock_interaction.client.is_owner = AsyncMock(return_value=False)
+    mock_interaction.response.is_done = MagicMock(return_value=False)
+    mock_interaction.response.send_message = AsyncMock()
+
+    await cog.mongo_telemetry.callback(cog, mock_interaction, zerar=True)
+
+    mock_interaction.response.send_message.assert_awaited_once()
+    mock_interaction.response.defer.assert_not_awaited()
+    mock_bot.mongo_telemetry.top.assert_not_called()
+    mock_bot.mongo_telemetry.reset.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.utils.helpers.GUILD_ID", 1)
+@patch("src.cogs.admin_cog.TelemetryEmbeds")
+async def test_mongo_telemetry_allowed_for_owner(mock_embeds, cog, mock_bot, mock_interaction):
+    """O dono do bot consulta a telemetria de qualquer servidor."""
+    mock_interaction.guild_id = 2
+    mock_interaction.client.is_owner = AsyncMock(return_value=True)
+
+    await cog.mongo_telemetry.callback(cog, mock_interaction, zerar=True)
+
+    mock_bot.mongo_telemetry.reset.assert_called_once()
+    mock_interaction.followup.send.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.utils.helpers.GUILD_ID", 1)
+async def test_rest_limits_denied_outside_main_guild(cog, mock_bot, mock_interaction):
+    """O admin de outro servidor não vê nem zera a contagem de 429 do processo."""
+    mock_interaction.guild_id = 2
+    mock_interaction.client.is_owner = AsyncMock(return_value=False)
+    mock_interaction.response.is_done = MagicMock(return_value=False)
+    mock_interaction.response.send_message = AsyncMock()
+
+    await cog.rest_limits.callback(cog, mock_interaction, zerar=True)
+
+    mock_interaction.response.send_message.assert_awaited_once()
+    mock_bot.rest_scheduler.snapshot.assert_not_called()
+    mock_bot.rest_scheduler.reset.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.utils.helpers.GUILD_ID", 1)
+@patch("src.cogs.admin_cog.TelemetryEmbeds")
+async def test_rest_limits_allowed_in_main_guild(mock_embeds, cog, mock_bot, mock_interaction):
+    """No servidor principal o admin vê e zera as métricas das rotas."""
+    mock_interaction.guild_id = 1
+
+    await cog.rest_limits.callback(cog, mock_interaction, zerar=True)
+
+    mock_bot.rest_scheduler.reset.assert_called_once()
+    mock_interaction.followup.send.assert_awaited_once()
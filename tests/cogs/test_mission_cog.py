@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+import discord
+
+from src.cogs.mission_cog import MissionCog
+from src.database.models.mission import EvaluationRank
+from src.repositories.idempotency_repository import IdempotencyRepository
+from src.services.idempotency_service import IdempotencyService
+from tests.fakes import FakeDatabase
+
+
+@pytest.fixture
+def mock_bot():
+    bot = MagicMock()
+    bot.idempotency = IdempotencyService(IdempotencyRepository(FakeDatabase()))
+    bot.mission_service.evaluate_user = AsyncMock(
+        return_value=(True, {'rank': EvaluationRank.E, 'xp': 10, 'coins': 5, 'bonus': ''}))
+    bot.mission_service.schedule_close = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def mock_interaction():
+    interaction = MagicMock(spec=discord.Interaction)
+    interaction.response.defer = AsyncMock()
+    interaction.followup.send = AsyncMock()
+    interaction.guild_id = 1
+    interaction.channel.id = 100
+    interaction.user.id = 200
+    return interaction
+
+
+@pytest.mark.asyncio
+async def test_reevaluating_with_another_rank_is_rejected(mock_bot, mock_interaction):
+    """A duplicata com outro rank não reaproveita as recompensas da primeira avaliação."""
+    cog = MissionCog(mock_bot)
+    member = MagicMock(spec=discord.Member)
+    member.id = 300
+
+    with patch('src.cogs.mission_cog.is_mission_channel', AsyncMock(return_value=True)), \
+            patch('src.cogs.mission_cog.MissionEmbeds.evaluation_success') as success_embed:
+        await cog.evaluate.callback(cog, mock_interaction, member, 'e')
+        await cog.evaluate.callback(cog, mock_interaction, member, 'S')
+
+    mock_bot.mission_service.evaluate_user.assert_awaited_once()
+    mock_bot.mission_service.schedule_close.assert_awaited_once()
+    success_embed.assert_called_once()
+    assert success_embed.call_args.kwargs['rank'] == EvaluationRank.E
+    assert mock_interaction.followup.send.await_args.kwargs['ephemeral'] is True
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from src.database.telemetry import MongoTelemetry, redact, filter_shape
+from src.utils.context import set_origin, get_origin, UNKNOWN_ORIGIN
+
+
+def started(request_id, command_name, command):
+    return SimpleNamespace(request_id=request_id, connection_id=('localhost', 27017),
+                           command_name=command_name, command=command)
+
+
+def finished(request_id, command_name, duration_ms, failure=None):
+    return SimpleNamespace(request_id=request_id, connection_id=('localhost', 27017),
+                           command_name=command_name, duration_micros=int(duration_ms * 1000), failure=failure)
+
+
+def test_redact_keeps_only_shape():
+    """Valores do filtro são removidos; campos, operadores e $or continuam."""
+    query = {'_id': 123, 'inventory.5': {'$gt': 0}, 'status': {'$in': ['ativo', 'banido']},
+             '$or': [{'a': 1}, {'b': {'$exists': True}}]}
+
+    assert redact(query) == {'_id': '?', 'inventory.5': {'$gt': '?'}, 'status': {'$in': '?'},
+                             '$or': [{'a': '?'}, {'b': {'$exists': '?'}}]}
+
+
+def test_filter_shape_per_command():
+    assert filter_shape('find', {'find': 'users', 'filter': {'_id': 1}}) == {'_id': '?'}
+    assert filter_shape('update', {'update': 'users', 'updates': [{'q': {'_id': 1}, 'u': {}}]}) == {'_id': '?'}
+    assert filter_shape('aggregate', {'aggregate': 'x', 'pipeline': [{'$match': {'day': 'a'}}]}) == {'day': '?'}
+    assert filter_shape('insert', {'insert': 'users', 'documents': []}) is None
+
+
+def test_commands_are_attributed_to_origin():
+    """Cada comando é contado na origem definida no contextvar quando começou."""
+    telemetry = MongoTelemetry(slow_query_ms=50)
+
+    async def handler(origin, request_id, duration):
+        set_origin(origin)
+        telemetry.started(started(request_id, 'find', {'find': 'users', 'filter': {'_id': request_id}}))
+        await asyncio.sleep(0)
+        telemetry.succeeded(finished(request_id, 'find', duration))
+
+    async def run():
+        # Cada handler roda na própria task, como o discord.py faz com interações
+        await asyncio.gather(handler('/perfil', 1, 3), handler('/avaliar', 2, 80), handler('/perfil', 3, 7))
+
+    asyncio.run(run())
+
+    by_origin = {(s.origin, s.collection, s.operation): s for s in telemetry.snapshot()}
+    profile = by_origin[('/perfil', 'users', 'find')]
+    assert profile.count == 2
+    assert profile.max_ms == 7
+    assert profile.percentile(50) == 5
+
+    assert telemetry.top(1)[0].origin == '/avaliar'
+    assert [q.origin for q in telemetry.slow_queries] == ['/avaliar']
+    assert telemetry.slow_queries[0].shape == {'_id': '?'}
+    assert get_origin() == UNKNOWN_ORIGIN
+
+
+def test_failures_and_ignored_commands():
+    telemetry = MongoTelemetry()
+
+    telemetry.started(started(1, 'ping', {'ping': 1}))
+    telemetry.succeeded(finished(1, 'ping', 1))
+    telemetry.started(started(2, 'findAndModify', {'findAndModify': 'users', 'query': {'_id': 1}}))
+    telemetry.failed(finished(2, 'findAndModify', 2, failure={'errmsg': 'boom'}))
+
+    rows = telemetry.snapshot()
+    assert len(rows) == 1
+    assert rows[0].failures == 1
+    assert rows[0].origin == UNKNOWN_ORIGIN
+
+    telemetry.reset()
+    assert telemetry.snapshot() == []
@@ -0,0 +1,3 @@
+from tests.fakes.mongo import FakeDatabase, FakeCollection, FakeCursor
+
+__all__ = ['FakeDatabase', 'FakeCollection', 'FakeCursor']
@@ -0,0 +1,988 @@
+"""
+Banco MongoDB em memória para testes e benchmarks.
+
+Implementa, de forma assíncrona, o subconjunto da API do driver usado pelos
+repositórios (``find_one``, ``find``, ``find_one_and_update``, ``update_one``,
+``update_many``, ``insert_one``, ``insert_many``, ``replace_one``,
+``delete_one``, ``delete_many``, ``count_documents``, ``bulk_write`` e
+``create_index``), com caminhos pontuados, operador posicional ``$`` e
+índices únicos.
+
+Os documentos passam por um ciclo ``bson.encode``/``bson.decode`` ao serem
+gravados, então chaves não-string, tipos não serializáveis e a perda de
+precisão de datas aparecem aqui como apareceriam no servidor.
+
+Cada comando enviado é contado em ``FakeDatabase.commands`` (e em
+``FakeCollection.commands``), o que permite medir quantas idas ao banco um
+fluxo faz sem subir um servidor.
+
+Exemplo:
+    db = FakeDatabase()
+    repo = UserRepository(db)
+    await repo.add_xp_coins(1, 10, 5)
+    assert db.commands['findAndModify'] == 1
+"""
+import copy
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import bson
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    InsertOneResult,
+    UpdateResult,
+)
+
+
+class _Missing:
+    """Marca um campo inexistente (diferente de ``None``)."""
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+# ---------------------------------------------------------------------------
+# Helpers de documento
+# ---------------------------------------------------------------------------
+
+def _freeze(value: Any) -> Any:
+    """Converte um valor em algo hashable (usado como chave de _id e de índices)."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _roundtrip(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Serializa e desserializa o documento como o servidor faria."""
+    return bson.decode(bson.encode(doc))
+
+
+def _get_path(doc: Any, path: str) -> Any:
+    """Lê um caminho pontuado sem expandir arrays (``a.0.b`` acessa índices)."""
+    current = doc
+    for part in path.split('.'):
+        if isinstance(current, dict):
+            if part not in current:
+                return MISSING
+            current = current[part]
+        elif isinstance(current, list) and part.isdigit():
+            index = int(part)
+            if index >= len(current):
+                return MISSING
+            current = current[index]
+        else:
+            return MISSING
+    return current
+
+
+def _resolve(value: Any, parts: List[str]) -> List[Any]:
+    """Retorna todos os valores candidatos de um caminho, expandindo arrays como o MongoDB."""
+    if not parts:
+        return [value]
+
+    head, rest = parts[0], parts[1:]
+
+    if isinstance(value, dict):
+        if head in value:
+            return _resolve(value[head], rest)
+        return [MISSING]
+
+    if isinstance(value, list):
+        found = []
+        if head.isdigit() and int(head) < len(value):
+            found.extend(_resolve(value[int(head)], rest))
+        for element in value:
+            if isinstance(element, dict):
+                found.extend(v for v in _resolve(element, parts) if v is not MISSING)
+        return found or [MISSING]
+
+    return [MISSING]
+
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any) -> None:
+    """Grava um valor em um caminho pontuado, criando os documentos intermediários."""
+    parts = path.split('.')
+    current: Any = doc
+
+    for part in parts[:-1]:
+        if isinstance(current, list) and part.isdigit():
+            index = int(part)
+            while len(current) <= index:
+                current.append(None)
+            if current[index] is None:
+                current[index] = {}
+            current = current[index]
+        elif isinstance(current, dict):
+            current = current.setdefault(part, {})
+        else:
+            raise WriteError(f"Cannot create field '{part}' in element {current!r}", 28)
+
+        if not isinstance(current, (dict, list)):
+            raise WriteError(f"Cannot create field in non-document value at '{path}'", 28)
+
+    last = parts[-1]
+    if isinstance(current, list) and last.isdigit():
+        index = int(last)
+        while len(current) <= index:
+            current.append(None)
+        current[index] = value
+    elif isinstance(current, dict):
+        current[last] = value
+    else:
+        raise WriteError(f"Cannot set field '{last}' in element {current!r}", 28)
+
+
+def _unset_path(doc: Dict[str, Any], path: str) -> None:
+    """Remove um campo pelo caminho pontuado (em arrays, o elemento vira ``None``)."""
+    parts = path.split('.')
+    parent = _get_path(doc, '.'.join(parts[:-1])) if len(parts) > 1 else doc
+    last = parts[-1]
+
+    if isinstance(parent, dict):
+        parent.pop(last, None)
+    elif isinstance(parent, list) and last.isdigit() and int(last) < len(parent):
+        parent[int(last)] = None
+
+
+# ---------------------------------------------------------------------------
+# Comparação e ordenação (ordem BSON simplificada)
+# ---------------------------------------------------------------------------
+
+def _type_rank(value: Any) -> int:
+    if value is MISSING or value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    rank = _type_rank(value)
+    if rank == 1:
+        return rank, 0
+    if rank in (4, 5, 10):
+        return rank, repr(value)
+    if rank == 9 and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return rank, value
+
+
+def _equal(a: Any, b: Any) -> bool:
+    if a is MISSING:
+        return b is None
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False
+    return a == b
+
+
+def _compare(a: Any, b: Any) -> Optional[int]:
+    """Compara dois valores do mesmo tipo BSON; None se os tipos forem diferentes."""
+    if a is MISSING or _type_rank(a) != _type_rank(b):
+        return None
+    ka, kb = _sort_key(a), _sort_key(b)
+    return (ka > kb) - (ka < kb)
+
+
+def _expand(values: Iterable[Any]) -> List[Any]:
+    """Valores candidatos mais os elementos de arrays (para igualdade e comparações)."""
+    expanded = []
+    for value in values:
+        expanded.append(value)
+        if isinstance(value, list):
+            expanded.extend(value)
+    return expanded
+
+
+# ---------------------------------------------------------------------------
+# Filtros
+# ---------------------------------------------------------------------------
+
+_TYPE_ALIASES = {
+    'double': lambda v: isinstance(v, float),
+    'string': lambda v: isinstance(v, str),
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'objectId': lambda v: isinstance(v, ObjectId),
+    'bool': lambda v: isinstance(v, bool),
+    'date': lambda v: isinstance(v, datetime),
+    'null': lambda v: v is None,
+    'int': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'long': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+_TYPE_CODES = {1: 'double', 2: 'string', 3: 'object', 4: 'array', 7: 'objectId',
+               8: 'bool', 9: 'date', 10: 'null', 16: 'int', 18: 'long'}
+
+
+def _is_operator_dict(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value) and all(k.startswith('$') for k in value)
+
+
+def match(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Verifica se o documento satisfaz o filtro."""
+    if not query:
+        return True
+
+    for key, condition in query.items():
+        if key == '$and':
+            if not all(match(doc, q) for q in condition):
+                return False
+        elif key == '$or':
+            if not any(match(doc, q) for q in condition):
+                return False
+        elif key == '$nor':
+            if any(match(doc, q) for q in condition):
+                return False
+        elif key.startswith('$'):
+            raise NotImplementedError(f'Operador {key} não suportado pelo FakeDatabase')
+        elif not _match_values(_resolve(doc, key.split('.')), condition):
+            return False
+
+    return True
+
+
+def _match_values(values: List[Any], condition: Any) -> bool:
+    if _is_operator_dict(condition):
+        return all(_match_operator(values, op, arg, condition) for op, arg in condition.items())
+    return _match_eq(values, condition)
+
+
+def _match_eq(values: List[Any], target: Any) -> bool:
+    if isinstance(target, re.Pattern):
+        return any(isinstance(v, str) and target.search(v) for v in _expand(values))
+    return any(_equal(v, target) for v in _expand(values))
+
+
+def _match_operator(values: List[Any], op: str, arg: Any, condition: Dict[str, Any]) -> bool:
+    if op == '$eq':
+        return _match_eq(values, arg)
+    if op == '$ne':
+        return not _match_eq(values, arg)
+    if op in ('$gt', '$gte', '$lt', '$lte'):
+        for value in _expand(values):
+            result = _compare(value, arg)
+            if result is None:
+                continue
+            if (op == '$gt' and result > 0) or (op == '$gte' and result >= 0) \
+                    or (op == '$lt' and result < 0) or (op == '$lte' and result <= 0):
+                return True
+        return False
+    if op == '$in':
+        return any(_match_eq(values, target) for target in arg)
+    if op == '$nin':
+        return not any(_match_eq(values, target) for target in arg)
+    if op == '$exists':
+        return any(v is not MISSING for v in values) == bool(arg)
+    if op == '$type':
+        aliases = arg if isinstance(arg, list) else [arg]
+        checks = [_TYPE_ALIASES[_TYPE_CODES.get(a, a)] for a in aliases]
+        return any(check(v) for v in _expand(values) if v is not MISSING for check in checks)
+    if op == '$size':
+        return any(isinstance(v, list) and len(v) == arg for v in values)
+    if op == '$all':
+        return all(_match_eq(values, target) for target in arg)
+    if op == '$elemMatch':
+        for value in values:
+            if not isinstance(value, list):
+                continue
+            for element in value:
+                if _is_operator_dict(arg):
+                    if _match_values([element], arg):
+                        return True
+                elif isinstance(element, dict) and match(element, arg):
+                    return True
+        return False
+    if op == '$not':
+        return not _match_values(values, arg)
+    if op == '$regex':
+        flags = re.IGNORECASE if 'i' in condition.get('$options', '') else 0
+        pattern = re.compile(arg, flags) if isinstance(arg, str) else arg
+        return any(isinstance(v, str) and pattern.search(v) for v in _expand(values))
+    if op == '$options':
+        return True
+    if op == '$mod':
+        divisor, remainder = arg
+        return any(isinstance(v, (int, float)) and not isinstance(v, bool) and v % divisor == remainder
+                   for v in _expand(values))
+
+    raise NotImplementedError(f'Operador {op} não suportado pelo FakeDatabase')
+
+
+# ---------------------------------------------------------------------------
+# Atualizações
+# ---------------------------------------------------------------------------
+
+def _positional_path(doc: Dict[str, Any], path: str, query: Dict[str, Any]) -> str:
+    """Substitui o ``$`` posicional pelo índice do primeiro elemento que casou com o filtro."""
+    if '.$' not in path or '.$[' in path:
+        return path
+
+    prefix, _, suffix = path.partition('.$')
+    array = _get_path(doc, prefix)
+
+    conditions = []
+    for key, condition in query.items():
+        if key == prefix:
+            conditions.append((None, condition))
+        elif key.startswith(prefix + '.'):
+            conditions.append((key[len(prefix) + 1:], condition))
+
+    if isinstance(array, list) and conditions:
+        for index, element in enumerate(array):
+            matched = True
+            for subpath, condition in conditions:
+                if subpath is None:
+                    if isinstance(condition, dict) and not _is_operator_dict(condition):
+                        matched = isinstance(element, dict) and match(element, condition)
+                    else:
+                        matched = _match_values([element], condition)
+                else:
+                    matched = match(element, {subpath: condition}) if isinstance(element, dict) else False
+                if not matched:
+                    break
+            if matched:
+                return f'{prefix}.{index}{suffix}'
+
+    raise WriteError('The positional operator did not find the match needed from the query.', 2)
+
+
+def _number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _array_at(doc: Dict[str, Any], path: str, op: str) -> List[Any]:
+    current = _get_path(doc, path)
+    if current is MISSING or current is None:
+        current = []
+        _set_path(doc, path, current)
+    if not isinstance(current, list):
+        raise WriteError(f"The field '{path}' must be an array for {op}", 2)
+    return current
+
+
+def _each(value: Any) -> List[Any]:
+    if isinstance(value, dict) and '$each' in value:
+        return list(value['$each'])
+    return [value]
+
+
+def _pull_matches(element: Any, condition: Any) -> bool:
+    if _is_operator_dict(condition):
+        return _match_values([element], condition)
+    if isinstance(condition, dict) and isinstance(element, dict) and condition:
+        return match(element, condition)
+    return _equal(element, condition)
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any], query: Dict[str, Any], is_insert: bool) -> None:
+    """Aplica os operadores de atualização no documento (in-place)."""
+    if not update or not all(key.startswith('$') for key in update):
+        raise ValueError('update only works with $ operators')
+
+    for op, fields in update.items():
+        if op == '$setOnInsert' and not is_insert:
+            continue
+
+        for raw_path, value in fields.items():
+            path = _positional_path(doc, raw_path, query)
+            if path == '_id' or path.startswith('_id.'):
+                if op != '$setOnInsert' and not (is_insert and op == '$set'):
+                    current = _get_path(doc, path)
+                    if current is MISSING or not _equal(current, value):
+                        raise WriteError("Performing an update on the path '_id' would modify the immutable field '_id'", 66)
+
+            if op in ('$set', '$setOnInsert'):
+                _set_path(doc, path, copy.deepcopy(value))
+
+            elif op == '$unset':
+                _unset_path(doc, path)
+
+            elif op in ('$inc', '$mul'):
+                if not _number(value):
+                    raise WriteError(f'Cannot {op} with non-numeric argument', 14)
+                current = _get_path(doc, path)
+                if current is MISSING:
+                    _set_path(doc, path, value if op == '$inc' else 0)
+                elif not _number(current):
+                    raise WriteError(f"Cannot apply {op} to a value of non-numeric type at '{path}'", 14)
+                else:
+                    _set_path(doc, path, current + value if op == '$inc' else current * value)
+
+            elif op in ('$min', '$max'):
+                current = _get_path(doc, path)
+                result = None if current is MISSING else _compare(value, current)
+                if current is MISSING or (result is not None and (result < 0 if op == '$min' else result > 0)):
+                    _set_path(doc, path, copy.deepcopy(value))
+
+            elif op == '$push':
+                array = _array_at(doc, path, op)
+                items = copy.deepcopy(_each(value))
+                position = value.get('$position') if isinstance(value, dict) else None
+                if position is None:
+                    array.extend(items)
+                else:
+                    array[position:position] = items
+                if isinstance(value, dict) and '$slice' in value:
+                    limit = value['$slice']
+                    array[:] = array[limit:] if limit < 0 else array[:limit]
+
+            elif op == '$addToSet':
+                array = _array_at(doc, path, op)
+                for item in _each(value):
+                    if not any(_equal(existing, item) for existing in array):
+                        array.append(copy.deepcopy(item))
+
+            elif op == '$pull':
+                array = _get_path(doc, path)
+                if isinstance(array, list):
+                    array[:] = [e for e in array if not _pull_matches(e, value)]
+
+            elif op == '$pullAll':
+                array = _get_path(doc, path)
+                if isinstance(array, list):
+                    array[:] = [e for e in array if not any(_equal(e, v) for v in value)]
+
+            elif op == '$currentDate':
+                _set_path(doc, path, datetime.now(timezone.utc))
+
+            else:
+                raise NotImplementedError(f'Operador de atualização {op} não suportado pelo FakeDatabase')
+
+
+def _upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta o documento base de um upsert a partir das igualdades do filtro."""
+    seed: Dict[str, Any] = {}
+
+    def collect(q: Dict[str, Any]) -> None:
+        for key, condition in q.items():
+            if key == '$and':
+                for sub in condition:
+                    collect(sub)
+            elif key.startswith('$'):
+                continue
+            elif _is_operator_dict(condition):
+                if '$eq' in condition:
+                    _set_path(seed, key, copy.deepcopy(condition['$eq']))
+            else:
+                _set_path(seed, key, copy.deepcopy(condition))
+
+    collect(query)
+    return seed
+
+
+def project(doc: Dict[str, Any], projection: Any) -> Dict[str, Any]:
+    """Aplica uma projeção simples (inclusão ou exclusão, com caminhos pontuados)."""
+    if not projection:
+        return doc
+
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+
+    include_id = bool(projection.get('_id', 1))
+    fields = {k: v for k, v in projection.items() if k != '_id'}
+    inclusion = any(bool(v) for v in fields.values())
+
+    if inclusion:
+        result: Dict[str, Any] = {}
+        if include_id and '_id' in doc:
+            result['_id'] = doc['_id']
+        for field, flag in fields.items():
+            if not flag:
+                continue
+            value = _get_path(doc, field)
+            if value is not MISSING:
+                _set_path(result, field, value)
+        return result
+
+    result = dict(doc)
+    for field in fields:
+        if '.' in field:
+            result = copy.deepcopy(result)
+            _unset_path(result, field)
+        else:
+            result.pop(field, None)
+    if not include_id:
+        result.pop('_id', None)
+    return result
+
+
+def _normalize_sort(sort: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if sort is None:
+        return []
+    if isinstance(sort, str):
+        return [(sort, direction if direction is not None else 1)]
+    if isinstance(sort, dict):
+        return list(sort.items())
+    return [(key, value) for key, value in sort]
+
+
+def _sort_docs(docs: List[Dict[str, Any]], sort: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    # Ordenação estável: aplica as chaves da menos para a mais significativa
+    for key, direction in reversed(sort):
+        docs.sort(key=lambda d, k=key: _sort_key(_get_path(d, k)), reverse=direction < 0)
+    return docs
+
+
+# ---------------------------------------------------------------------------
+# Cursor, coleção e banco
+# ---------------------------------------------------------------------------
+
+class FakeCursor:
+    """Cursor assíncrono: o comando ``find`` só é contado quando o cursor é consumido."""
+
+    def __init__(self, collection: 'FakeCollection', query: Optional[Dict[str, Any]],
+                 projection: Any = None, sort: Any = None, skip: int = 0, limit: int = 0):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _normalize_sort(sort)
+        self._skip = skip
+        self._limit = limit
+        self._results: Optional[List[Dict[str, Any]]] = None
+        self._position = 0
+
+    def sort(self, key_or_list: Any, direction: Optional[int] = None) -> 'FakeCursor':
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> 'FakeCursor':
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> 'FakeCursor':
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> 'FakeCursor':
+        return self
+
+    def _execute(self) -> List[Dict[str, Any]]:
+        if self._results is None:
+            self._collection._count('find')
+            docs = self._collection._matching(self._query)
+            docs = _sort_docs(docs, self._sort)
+            docs = docs[self._skip:]
+            if self._limit:
+                docs = docs[:abs(self._limit)]
+            self._results = [copy.deepcopy(project(d, self._projection)) for d in docs]
+        return self._results
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        results = self._execute()
+        end = len(results) if length is None else self._position + length
+        chunk = results[self._position:end]
+        self._position += len(chunk)
+        return chunk
+
+    def __aiter__(self) -> 'FakeCursor':
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        results = self._execute()
+        if self._position >= len(results):
+            raise StopAsyncIteration
+        self._position += 1
+        return results[self._position - 1]
+
+    async def close(self) -> None:
+        self._results = []
+
+
+class FakeCollection:
+    """Coleção em memória compatível com a API assíncrona do pymongo usada pelos repositórios."""
+
+    def __init__(self, database: 'FakeDatabase', name: str):
+        self.database = database
+        self.name = name
+        self.full_name = f'{database.name}.{name}'
+        self.commands: Counter = Counter()
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        # Para cada índice único: chave do índice -> _id do documento dono
+        self._unique: Dict[str, Dict[Any, Any]] = {}
+
+    # -- infraestrutura -----------------------------------------------------
+
+    def _count(self, command: str) -> None:
+        self.commands[command] += 1
+        self.database.commands[command] += 1
+
+    def _matching(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        query = query or {}
+        doc_id = query.get('_id', MISSING)
+
+        # Caminho rápido para buscas por _id exato
+        if doc_id is not MISSING and not isinstance(doc_id, dict):
+            doc = self._docs.get(_freeze(doc_id))
+            return [doc] if doc is not None and match(doc, query) else []
+
+        # Igualdade em todos os campos de um índice único (ex: guild_id + user_id)
+        for name, index in self._indexes.items():
+            if not index.get('unique') or index.get('sparse') or index.get('partialFilterExpression'):
+                continue
+            values = [query.get(field, MISSING) for field, _ in index['key']]
+            if any(v is MISSING or isinstance(v, (dict, list)) for v in values):
+                continue
+            owner = self._unique[name].get(_freeze(values), MISSING)
+            doc = self._docs.get(owner) if owner is not MISSING else None
+            return [doc] if doc is not None and match(doc, query) else []
+
+        return [doc for doc in self._docs.values() if match(doc, query)]
+
+    def _first(self, query: Optional[Dict[str, Any]], sort: Any = None) -> Optional[Dict[str, Any]]:
+        docs = self._matching(query)
+        if sort:
+            docs = _sort_docs(docs, _normalize_sort(sort))
+        return docs[0] if docs else None
+
+    def _index_key(self, index: Dict[str, Any], doc: Dict[str, Any]) -> Any:
+        partial = index.get('partialFilterExpression')
+        if partial and not match(doc, partial):
+            return MISSING
+        values = [_get_path(doc, field) for field, _ in index['key']]
+        if index.get('sparse') and all(v is MISSING for v in values):
+            return MISSING
+        return _freeze([None if v is MISSING else v for v in values])
+
+    def _check_unique(self, doc: Dict[str, Any], ignore_id: Any = MISSING) -> None:
+        doc_id = _freeze(doc['_id'])
+        if doc_id in self._docs and doc_id != ignore_id:
+            raise DuplicateKeyError(
+                f'E11000 duplicate key error collection: {self.full_name} index: _id_ dup key: {{ _id: {doc["_id"]!r} }}',
+                11000
+            )
+
+        for name, index in self._indexes.items():
+            if not index.get('unique'):
+                continue
+            key = self._index_key(index, doc)
+            owner = self._unique[name].get(key, MISSING) if key is not MISSING else MISSING
+            if owner is not MISSING and owner not in (doc_id, ignore_id):
+                raise DuplicateKeyError(f'E11000 duplicate key error collection: {self.full_name} index: {name}', 11000)
+
+    def _unindex(self, doc: Dict[str, Any]) -> None:
+        for name, entries in self._unique.items():
+            key = self._index_key(self._indexes[name], doc)
+            if key is not MISSING and entries.get(key) == _freeze(doc['_id']):
+                del entries[key]
+
+    def _store(self, doc: Dict[str, Any], previous_id: Any = MISSING) -> None:
+        stored = _roundtrip(doc)
+        self._check_unique(stored, ignore_id=previous_id)
+
+        if previous_id is not MISSING:
+            self._unindex(self._docs.pop(previous_id))
+
+        doc_id = _freeze(stored['_id'])
+        self._docs[doc_id] = stored
+        for name, entries in self._unique.items():
+            key = self._index_key(self._indexes[name], stored)
+            if key is not MISSING:
+                entries[key] = doc_id
+
+    def _insert(self, document: Dict[str, Any]) -> Any:
+        if '_id' not in document:
+            document['_id'] = ObjectId()
+        self._store(document)
+        return document['_id']
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool, multi: bool,
+                sort: Any = None) -> Tuple[int, int, Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Executa um update e retorna (matched, modified, upserted_id, antes, depois)."""
+        docs = self._matching(query)
+        if sort:
+            docs = _sort_docs(docs, _normalize_sort(sort))
+        if not multi:
+            docs = docs[:1]
+
+        if not docs:
+            if not upsert:
+                return 0, 0, None, None, None
+            new_doc = _upsert_seed(query)
+            apply_update(new_doc, update, query, is_insert=True)
+            upserted_id = self._insert(new_doc)
+            return 0, 0, upserted_id, None, self._docs[_freeze(upserted_id)]
+
+        modified = 0
+        before = after = None
+        for doc in docs:
+            original_id = _freeze(doc['_id'])
+            candidate = copy.deepcopy(doc)
+            apply_update(candidate, update, query, is_insert=False)
+            if before is None:
+                before = doc
+            if _roundtrip(candidate) != doc:
+                self._store(candidate, previous_id=original_id)
+                modified += 1
+            after = self._docs[_freeze(candidate['_id'])]
+        return len(docs), modified, None, before, after
+
+    def _replace(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool) -> Tuple[int, int, Any]:
+        if any(key.startswith('$') for key in replacement):
+            raise ValueError('replacement can not include $ operators')
+
+        doc = self._first(query)
+        if doc is None:
+            if not upsert:
+                return 0, 0, None
+            new_doc = _upsert_seed(query)
+            new_doc.update(copy.deepcopy(replacement))
+            return 0, 0, self._insert(new_doc)
+
+        new_doc = copy.deepcopy(replacement)
+        if '_id' in new_doc and not _equal(new_doc['_id'], doc['_id']):
+            raise WriteError("After applying the update, the (immutable) field '_id' was found to have been altered", 66)
+        new_doc['_id'] = doc['_id']
+        modified = int(_roundtrip(new_doc) != doc)
+        if modified:
+            self._store(new_doc, previous_id=_freeze(doc['_id']))
+        return 1, modified, None
+
+    def _delete(self, query: Dict[str, Any], multi: bool) -> int:
+        docs = self._matching(query)
+        if not multi:
+            docs = docs[:1]
+        for doc in docs:
+            self._unindex(self._docs.pop(_freeze(doc['_id'])))
+        return len(docs)
+
+    # -- API pública ----------------------------------------------------------
+
+    async def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None,
+                       sort: Any = None, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        self._count('find')
+        doc = self._first(filter, sort)
+        return copy.deepcopy(project(doc, projection)) if doc is not None else None
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Any = None, sort: Any = None,
+             skip: int = 0, limit: int = 0, **kwargs: Any) -> FakeCursor:
+        return FakeCursor(self, filter, projection, sort, skip, limit)
+
+    async def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], projection: Any = None,
+                                  sort: Any = None, upsert: bool = False, return_document: bool = False,
+                                  **kwargs: Any) -> Optional[Dict[str, Any]]:
+        self._count('findAndModify')
+        _, _, upserted_id, before, after = self._update(filter, update, upsert, multi=False, sort=sort)
+        doc = after if return_document else (None if upserted_id is not None else before)
+        return copy.deepcopy(project(doc, projection)) if doc is not None else None
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False,
+                         **kwargs: Any) -> UpdateResult:
+        self._count('update')
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert, multi=False)
+        return self._update_result(matched, modified, upserted_id)
+
+    async def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False,
+                          **kwargs: Any) -> UpdateResult:
+        self._count('update')
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert, multi=True)
+        return self._update_result(matched, modified, upserted_id)
+
+    async def replace_one(self, filter: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False,
+                          **kwargs: Any) -> UpdateResult:
+        self._count('update')
+        matched, modified, upserted_id = self._replace(filter, replacement, upsert)
+        return self._update_result(matched, modified, upserted_id)
+
+    @staticmethod
+    def _update_result(matched: int, modified: int, upserted_id: Any) -> UpdateResult:
+        raw: Dict[str, Any] = {'n': 1 if upserted_id is not None else matched, 'nModified': modified, 'ok': 1.0}
+        if upserted_id is not None:
+            raw['upserted'] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def insert_one(self, document: Dict[str, Any], **kwargs: Any) -> InsertOneResult:
+        self._count('insert')
+        return InsertOneResult(self._insert(document), True)
+
+    async def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True,
+                          **kwargs: Any) -> InsertManyResult:
+        self._count('insert')
+        documents = list(documents)
+        inserted_ids, errors = [], []
+
+        for index, document in enumerate(documents):
+            try:
+                inserted_ids.append(self._insert(document))
+            except DuplicateKeyError as e:
+                errors.append({'index': index, 'code': 11000, 'errmsg': str(e), 'op': document})
+                if ordered:
+                    break
+
+        if errors:
+            raise BulkWriteError({'writeErrors': errors, 'writeConcernErrors': [], 'nInserted': len(inserted_ids),
+                                  'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': []})
+        return InsertManyResult(inserted_ids, True)
+
+    async def delete_one(self, filter: Dict[str, Any], **kwargs: Any) -> DeleteResult:
+        self._count('delete')
+        return DeleteResult({'n': self._delete(filter, multi=False), 'ok': 1.0}, True)
+
+    async def delete_many(self, filter: Dict[str, Any], **kwargs: Any) -> DeleteResult:
+        self._count('delete')
+        return DeleteResult({'n': self._delete(filter, multi=True), 'ok': 1.0}, True)
+
+    async def count_documents(self, filter: Dict[str, Any], skip: int = 0, limit: int = 0,
+                              **kwargs: Any) -> int:
+        self._count('aggregate')
+        total = max(len(self._matching(filter)) - skip, 0)
+        return min(total, limit) if limit else total
+
+    async def estimated_document_count(self, **kwargs: Any) -> int:
+        self._count('count')
+        return len(self._docs)
+
+    async def distinct(self, key: str, filter: Optional[Dict[str, Any]] = None, **kwargs: Any) -> List[Any]:
+        self._count('distinct')
+        values: List[Any] = []
+        for doc in self._matching(filter):
+            for value in _expand(_resolve(doc, key.split('.'))):
+                if value is MISSING or isinstance(value, list):
+                    continue
+                if not any(_equal(value, v) for v in values):
+                    values.append(copy.deepcopy(value))
+        return values
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs: Any) -> BulkWriteResult:
+        self._count('bulkWrite')
+        result: Dict[str, Any] = {'writeErrors': [], 'writeConcernErrors': [], 'nInserted': 0, 'nUpserted': 0,
+                                  'nMatched': 0, 'nModified': 0, 'nRemoved': 0, 'upserted': []}
+
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result['nInserted'] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany)):
+                    matched, modified, upserted_id, _, _ = self._update(
+                        request._filter, request._doc, bool(request._upsert), multi=isinstance(request, UpdateMany)
+                    )
+                    result['nMatched'] += matched
+                    result['nModified'] += modified
+                    if upserted_id is not None:
+                        result['nUpserted'] += 1
+                        result['upserted'].append({'index': index, '_id': upserted_id})
+                elif isinstance(request, ReplaceOne):
+                    matched, modified, upserted_id = self._replace(request._filter, request._doc, bool(request._upsert))
+                    result['nMatched'] += matched
+                    result['nModified'] += modified
+                    if upserted_id is not None:
+                        result['nUpserted'] += 1
+                        result['upserted'].append({'index': index, '_id': upserted_id})
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    result['nRemoved'] += self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                else:
+                    raise TypeError(f'{request!r} is not a valid request')
+
+            except (DuplicateKeyError, WriteError) as e:
+                result['writeErrors'].append({'index': index, 'code': e.code, 'errmsg': str(e)})
+                if ordered:
+                    break
+
+        if result['writeErrors']:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    async def create_index(self, keys: Any, unique: bool = False, name: Optional[str] = None,
+                           **kwargs: Any) -> str:
+        self._count('createIndexes')
+        key = _normalize_sort(keys)
+        name = name or '_'.join(f'{field}_{direction}' for field, direction in key)
+        index = {'key': key, 'unique': unique, **kwargs}
+
+        if unique:
+            entries: Dict[Any, Any] = {}
+            for doc_id, doc in self._docs.items():
+                index_key = self._index_key(index, doc)
+                if index_key is MISSING:
+                    continue
+                if index_key in entries:
+                    raise DuplicateKeyError(f'E11000 duplicate key error collection: {self.full_name} index: {name}', 11000)
+                entries[index_key] = doc_id
+            self._unique[name] = entries
+
+        self._indexes[name] = index
+        return name
+
+    async def index_information(self) -> Dict[str, Dict[str, Any]]:
+        self._count('listIndexes')
+        info = {'_id_': {'key': [('_id', 1)]}}
+        info.update({name: copy.deepcopy(index) for name, index in self._indexes.items()})
+        return info
+
+    async def drop(self) -> None:
+        self._count('drop')
+        self._docs.clear()
+        self._indexes.clear()
+        self._unique.clear()
+
+    async def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> FakeCursor:
+        raise NotImplementedError('aggregate não é suportado pelo FakeDatabase; use mocks para pipelines')
+
+
+class FakeDatabase:
+    """Banco em memória. Coleções são criadas sob demanda, como no driver (``db.users``, ``db['users']``)."""
+
+    def __init__(self, name: str = 'test'):
+        self.name = name
+        self.commands: Counter = Counter()
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, **kwargs: Any) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+    async def list_collection_names(self) -> List[str]:
+        self.commands['listCollections'] += 1
+        return list(self._collections)
+
+    async def command(self, command: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.commands['command'] += 1
+        return {'ok': 1.0}
+
+    @property
+    def total_commands(self) -> int:
+        """Total de comandos enviados ao banco desde o último ``reset_commands``."""
+        return sum(self.commands.values())
+
+    def reset_commands(self) -> None:
+        """Zera os contadores de comandos do banco e de todas as coleções."""
+        self.commands.clear()
+        for collection in self._collections.values():
+            collection.commands.clear()
@@ -0,0 +1,71 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from src.repositories.lease_repository import LeaseRepository
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def repo() -> LeaseRepository:
+    repo = LeaseRepository(FakeDatabase())
+    await repo.ensure_indexes()
+    return repo
+
+
+async def expire(repo: LeaseRepository, name: str) -> None:
+    await repo.collection.update_one({'_id': name},
+                                     {'$set': {'expires_at': datetime.now(timezone.utc) - timedelta(seconds=1)}})
+
+
+async def test_only_one_owner_holds_a_valid_lease(repo):
+    token = await repo.acquire('stats_rollup', 'a', ttl=30)
+
+    assert token == 1
+    assert await repo.acquire('stats_rollup', 'b', ttl=30) is None
+    assert await repo.renew('stats_rollup', 'a', token, ttl=30) is True
+    assert (await repo.get('stats_rollup')).owner == 'a'
+
+
+async def test_expired_lease_is_taken_over_with_a_higher_token(repo):
+    """O dono antigo não consegue mais renovar nem liberar depois que outro assumiu."""
+    old_token = await repo.acquire('stats_rollup', 'a', ttl=30)
+    await expire(repo, 'stats_rollup')
+
+    new_token = await repo.acquire('stats_rollup', 'b', ttl=30)
+
+    assert new_token > old_token
+    assert await repo.renew('stats_rollup', 'a', old_token, ttl=30) is False
+    assert await repo.release('stats_rollup', 'a', old_token) is False
+    assert (await repo.get('stats_rollup')).token == new_token
+
+
+async def test_release_and_tokens_survive_purge(repo):
+    """O contador de tokens é separado das leases, então continua crescendo após a remoção."""
+    first = await repo.acquire('mission_auto_close:0', 'a', ttl=30)
+    assert await repo.release('mission_auto_close:0', 'a', first) is True
+
+    second = await repo.acquire('mission_auto_close:0', 'b', ttl=30)
+
+    assert second > first
+    assert [lease.name for lease in await repo.list_active('mission_auto_close:')] == ['mission_auto_close:0']
+
+
+async def test_takeover_between_upsert_and_token_discards_the_stale_acquisition(repo):
+    """Quem travou além do ttl entre as duas escritas não recebe um token para a lease de outro dono."""
+    original_update = repo.collection.update_one
+
+    async def stall_then_update(query, update, **kwargs):
+        if query.get('owner') == 'a' and '$set' in update and 'token' in update['$set']:
+            # 'a' travou: a lease venceu e 'b' assumiu antes de 'a' gravar o token
+            await expire(repo, 'stats_rollup')
+            assert await repo.acquire('stats_rollup', 'b', ttl=30) is not None
+        return await original_update(query, update, **kwargs)
+
+    repo.collection.update_one = stall_then_update
+
+    assert await repo.acquire('stats_rollup', 'a', ttl=30) is None
+    lease = await repo.get('stats_rollup')
+    assert lease.owner == 'b'
+    assert await repo.renew('stats_rollup', 'b', lease.token, ttl=30) is True
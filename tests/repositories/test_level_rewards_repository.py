@@ -2,10 +2,20 @@ import pytest
 
 from src.database.models.level_rewards import LevelRewardsModel
 from repositories.level_rewards_repository import LevelRewardsRepository
+from src.utils.guild_scope import guild_scope
 
 
 pytestmark = pytest.mark.asyncio
 
+GUILD_ID = 777
+
+
+@pytest.fixture(autouse=True)
+def guild():
+    token = guild_scope.set(GUILD_ID)
+    yield GUILD_ID
+    guild_scope.reset(token)
+
 @pytest.fixture
 def mock_db():
     """Fixture para criar um mock do banco de dados e da coleção."""
@@ -39,7 +49,7 @@ async def test_get_role_for_level(mock_db, sample_reward):
     assert result.level_required == 5
 
     mock_db.level_rewards.find_one.assert_awaited_with(
-        {"level_required": {"$lte": user_level}},
+        {"guild_id": GUILD_ID, "level_required": {"$lte": user_level}},
         sort=[("level_required", -1)]  #
     )
 
@@ -96,4 +106,5 @@ async def test_create_reward(mock_db, sample_reward):
     assert result is True
 
     expected_data = sample_reward.model_dump(by_alias=True)
+    assert expected_data['guild_id'] == GUILD_ID
     mock_db.level_rewards.insert_one.assert_awaited_with(expected_data)
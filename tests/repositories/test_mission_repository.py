@@ -4,10 +4,20 @@ from datetime import datetime
 from pymongo.errors import DuplicateKeyError
 
 from repositories.missions_repository import MissionRepository
-from src.database.models.mission import MissionModel, MissionStatus, EvaluationRank, EvaluatorModel
+from src.database.models.mission import MissionModel, MissionStatus, EvaluationRank, EvaluatorModel, EvaluationModel
+from src.utils.guild_scope import guild_scope
 
 pytestmark = pytest.mark.asyncio
 
+GUILD_ID = 777
+
+
+@pytest.fixture(autouse=True)
+def guild():
+    token = guild_scope.set(GUILD_ID)
+    yield GUILD_ID
+    guild_scope.reset(token)
+
 @pytest.fixture()
 def mock_db():
     """Fixture para criar um mock do banco de dados e da coleção
@@ -15,6 +25,7 @@ def mock_db():
     mock_collection = AsyncMock()
     mock_db = MagicMock()
     mock_db.missions = mock_collection
+    mock_db.evaluations = AsyncMock()
     return mock_db
 
 @pytest.fixture()
@@ -76,7 +87,7 @@ async def test_get_by_id_success(mock_db, sample_mission):
 
     assert isinstance(result, MissionModel)
     assert result.mission_id == sample_mission.mission_id
-    mock_db.missions.find_one.assert_awaited_with({'_id': sample_mission.mission_id})
+    mock_db.missions.find_one.assert_awaited_with({'_id': sample_mission.mission_id}, {'evaluators': 0})
 
 
 async def test_get_by_id_not_found(mock_db):
@@ -104,15 +115,13 @@ async def test_update_status_success(mock_db):
 async def test_add_participant_success(mock_db, sample_evaluator):
     """
     Testa registrar a nota de um usuário.
-    Verifica se o filtro composto e o operador posicional ($) estão corretos.
+    Verifica se a avaliação é gravada na coleção evaluations pela chave (mission_id, user_id).
     """
-    mock_db.missions.update_one.return_value = MagicMock(modified_count=1)
+    mock_db.missions.count_documents.return_value = 1
+    mock_db.evaluations.update_one.return_value = MagicMock(upserted_id='novo')
     repo = MissionRepository(db=mock_db)
 
     mission_id = 101
-    fixed_time = datetime.now()
-
-
 
     result = await repo.add_participant(
         mission_id=mission_id,
@@ -121,25 +130,37 @@ async def test_add_participant_success(mock_db, sample_evaluator):
 
     assert result is True
 
-    mock_db.missions.update_one.assert_awaited_with(
+    mock_db.evaluations.update_one.assert_awaited_with(
         {
-            "_id": mission_id,
-            "evaluators.user_id": {'$ne': 555}
+            "mission_id": mission_id,
+            "user_id": 555
         },
         {
-            "$push": {
-                # O Pydantic gera o dicionário perfeito para você comparar
-                'evaluators': sample_evaluator.model_dump()
-            }
-        }
+            "$setOnInsert": {'mission_id': mission_id, 'guild_id': GUILD_ID, **sample_evaluator.model_dump()}
+        },
+        upsert=True
     )
+    # A missão não recebe mais o avaliador embutido
+    mock_db.missions.update_one.assert_not_awaited()
+
+
+async def test_add_participant_already_evaluated(mock_db, sample_evaluator):
+    """
+    Testa que uma avaliação existente não é sobrescrita e ainda retorna True.
+    """
+    mock_db.missions.count_documents.return_value = 1
+    mock_db.evaluations.update_one.return_value = MagicMock(upserted_id=None)
+    repo = MissionRepository(db=mock_db)
+
+    result = await repo.add_participant(mission_id=101, evaluator_model=sample_evaluator)
+
+    assert result is True
 
 
 async def test_add_participant_mission_not_exist(mock_db, sample_evaluator):
     """
     Testa falha quando a missão não existe.
     """
-    mock_db.missions.update_one.return_value = MagicMock(modified_count=0)
     mock_db.missions.count_documents.return_value = 0
     repo = MissionRepository(db=mock_db)
 
@@ -152,12 +173,13 @@ async def test_add_participant_mission_not_exist(mock_db, sample_evaluator):
     )
 
     assert result is False
+    mock_db.evaluations.update_one.assert_not_awaited()
 
 async def test_update_evaluator_success(mock_db, sample_evaluator):
     """
     Testa o sucesso de uma atualização de uma pessoa avalaida na missão
     """
-    mock_db.missions.update_one.return_value = MagicMock(matched_count=1)
+    mock_db.evaluations.update_one.return_value = MagicMock(matched_count=1)
     repo = MissionRepository(db=mock_db)
 
     mission_id = 101
@@ -170,18 +192,21 @@ async def test_update_evaluator_success(mock_db, sample_evaluator):
 
     assert result is True
 
-    mock_db.missions.update_one.assert_awaited_with(
+    mock_db.evaluations.update_one.assert_awaited_with(
         {
-            "_id": mission_id,
-            "evaluators.user_id": sample_evaluator.user_id
+            "mission_id": mission_id,
+            "user_id": sample_evaluator.user_id
         },
         {
             "$set": {
-                'evaluators.$.level_at_time': sample_evaluator.user_level_at_time,
-                'evaluators.$.rank': sample_evaluator.rank,
-                'evaluators.$.coins_earned': sample_evaluator.coins_earned,
-                'evaluators.$.xp_earned': sample_evaluator.xp_earned,
-                'evaluators.$.evaluate_at': sample_evaluator.evaluate_at
+                'user_level_at_time': sample_evaluator.user_level_at_time,
+                'rank': sample_evaluator.rank,
+                'coins_earned': sample_evaluator.coins_earned,
+                'xp_earned': sample_evaluator.xp_earned,
+                'evaluate_at': sample_evaluator.evaluate_at,
+                'updated_at': sample_evaluator.updated_at,
+                'xp_multiplier': sample_evaluator.xp_multiplier,
+                'coin_multiplier': sample_evaluator.coin_multiplier
             }
         }
     )
@@ -190,7 +215,7 @@ async def test_update_evaluator_fail(mock_db, sample_evaluator):
     """
     Testa a falha de uma atualizazação de uma pessoa avalaida na missão
     """
-    mock_db.missions.update_one.return_value = MagicMock(matched_count=0)
+    mock_db.evaluations.update_one.return_value = MagicMock(matched_count=0)
     repo = MissionRepository(db=mock_db)
 
     mission_id = 107
@@ -203,3 +228,30 @@ async def test_update_evaluator_fail(mock_db, sample_evaluator):
 
     assert result is False
 
+
+async def test_get_evaluation_found(mock_db, sample_evaluator):
+    """Testa buscar a avaliação de um usuário pela chave (mission_id, user_id)."""
+    mock_db.evaluations.find_one.return_value = {'_id': 'abc', 'mission_id': 101, **sample_evaluator.model_dump()}
+    repo = MissionRepository(db=mock_db)
+
+    result = await repo.get_evaluation(101, sample_evaluator.user_id)
+
+    assert isinstance(result, EvaluationModel)
+    assert result.mission_id == 101
+    mock_db.evaluations.find_one.assert_awaited_with({'mission_id': 101, 'user_id': sample_evaluator.user_id})
+
+
+async def test_get_user_evaluations_range(mock_db, sample_evaluator):
+    """Testa o histórico do membro como consulta por intervalo no índice (guild_id, user_id, evaluate_at)."""
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{'mission_id': 101, **sample_evaluator.model_dump()}])
+    mock_db.evaluations.find = MagicMock(return_value=cursor)
+    repo = MissionRepository(db=mock_db)
+
+    start = datetime(2025, 1, 1)
+    result = await repo.get_user_evaluations(sample_evaluator.user_id, start=start, limit=10)
+
+    assert len(result) == 1
+    args, kwargs = mock_db.evaluations.find.call_args
+    assert args[0] == {'guild_id': GUILD_ID, 'user_id': sample_evaluator.user_id, 'evaluate_at': {'$gte': start}}
+    assert kwargs['limit'] == 10
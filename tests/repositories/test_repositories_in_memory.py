@@ -0,0 +1,290 @@
+"""Testes dos repositórios contra o banco em memória (sem mocks de coleção).
+
+Diferente dos testes com AsyncMock, aqui os operadores de atualização são de
+fato aplicados, então erros de caminho/operador aparecem no estado final.
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from src.database.models.user import UserModel, UserStatsModel
+from src.database.models.item import ItemModel, ItemType
+from src.database.models.effects import TimedBuff
+from src.database.models.mission import MissionModel, MissionStatus, EvaluationRank, EvaluatorModel
+from repositories.user_repository import UserRepository
+from repositories.item_repository import ItemRepository
+from repositories.missions_repository import MissionRepository
+from repositories.level_rewards_repository import LevelRewardsRepository
+from src.database.models.level_rewards import LevelRewardsModel
+from src.utils.guild_scope import scoped_guild
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+GUILD_ID = 777
+
+
+@pytest.fixture
+def db() -> FakeDatabase:
+    return FakeDatabase()
+
+
+@pytest.fixture(autouse=True)
+def guild():
+    """Os repositórios exigem um servidor definido (ver src.utils.guild_scope)."""
+    with scoped_guild(GUILD_ID):
+        yield
+
+
+def make_user(user_id: int, **kwargs) -> UserModel:
+    data = {'xp': 0, 'coins': 0, **kwargs}
+    return UserModel(_id=user_id, username=f'user{user_id}', joined_at=datetime(2025, 1, 1), **data)
+
+
+def make_evaluator(user_id: int, **kwargs) -> EvaluatorModel:
+    return EvaluatorModel(user_id=user_id, username=f'user{user_id}', user_level_at_time=1, **kwargs)
+
+
+async def test_user_inventory_and_roles_roundtrip(db):
+    """Inventário, cargos e item equipado passam pelos operadores reais."""
+    repo = UserRepository(db)
+    await repo.ensure_indexes()
+    assert await repo.create(make_user(1)) is True
+    assert await repo.create(make_user(1)) is False
+
+    assert await repo.add_item_to_inventory(1, 101, 3) is True
+    assert await repo.equip_item(1, 101, (1.0, 1.0)) is True
+    assert await repo.equip_item(1, 999, (1.0, 1.0)) is False
+    assert await repo.remove_item_from_inventory(1, 101, 2) is True
+    assert await repo.add_role(1, 77) is True
+    assert await repo.add_role(1, 77) is True
+    assert await repo.remove_role(1, 77) is True
+    assert await repo.remove_role(1, 77) is False
+
+    user = await repo.get_by_id(1)
+    assert user.inventory == {101: 1}
+    assert user.equipped_item_id == 101
+    assert user.role_ids == []
+
+    assert await repo.remove_item_from_inventory(1, 101, 1) is True
+    assert await repo.unequip_item(1) is True
+    user = await repo.get_by_id(1)
+    assert user.inventory == {}
+    assert user.equipped_item_id is None
+
+
+async def test_consume_item_is_guarded_by_stock(db):
+    """Usar N unidades baixa o estoque e soma os efeitos em uma escrita; sem estoque nada muda."""
+    repo = UserRepository(db)
+    await repo.ensure_indexes()
+    await repo.create(make_user(1, xp=10))
+    await repo.add_item_to_inventory(1, 11, 3)
+    db.reset_commands()
+
+    user = await repo.consume_item(1, 11, 2, xp=200, coins=5, role_id=77)
+    assert (user.xp, user.coins, user.inventory, user.role_ids) == (210, 5, {11: 1}, [77])
+    assert db.commands == {'findAndModify': 1}
+
+    assert await repo.consume_item(1, 11, 2, xp=200) is None
+    assert (await repo.get_by_id(1)).xp == 210
+
+    # A última unidade remove a chave do inventário
+    user = await repo.consume_item(1, 11, 1, xp=100)
+    assert user.xp == 310
+    assert user.inventory == {}
+    assert (await repo.get_by_id(1)).inventory == {}
+
+
+async def test_timed_buffs_expire_lazily_and_are_swept(db):
+    """Buffs vencidos são ignorados na leitura, saem na próxima escrita e a varredura limpa os inativos."""
+    repo = UserRepository(db)
+    await repo.ensure_indexes()
+    await repo.create(make_user(1))
+    await repo.create(make_user(2))
+    await repo.add_item_to_inventory(1, 13, 2)
+    await repo.add_item_to_inventory(2, 13, 1)
+
+    # Sem microssegundos: o banco guarda datas com precisão de milissegundos
+    now = datetime.now().replace(microsecond=0)
+    soon = TimedBuff(type='xp_boost', multiplier=0.5, expires_at=now + timedelta(minutes=1))
+    later = TimedBuff(type='coin_boost', multiplier=0.25, expires_at=now + timedelta(hours=2))
+    await repo.consume_item(1, 13, 1, buff=soon)
+    user = await repo.consume_item(1, 13, 1, buff=later)
+    await repo.consume_item(2, 13, 1, buff=soon)
+
+    assert user.buffs_expire_at == soon.expires_at
+    assert user.effective_multipliers(now) == (1.5, 1.25)
+    # Vencido: ignorado na leitura, sem escrita
+    assert user.effective_multipliers(now + timedelta(minutes=5)) == (1.0, 1.25)
+
+    # A varredura só pega quem tem buffs_expire_at vencido, e recalcula o próximo vencimento
+    assert await repo.sweep_expired_buffs(now=now + timedelta(minutes=5)) == 2
+    user = await repo.get_by_id(1)
+    assert [buff.type for buff in user.buffs] == ['coin_boost']
+    assert user.buffs_expire_at == later.expires_at
+    user = await repo.get_by_id(2)
+    assert user.buffs == [] and user.buffs_expire_at is None
+    assert await repo.sweep_expired_buffs(now=now + timedelta(minutes=5)) == 0
+
+    # Escrita comum remove os vencidos de passagem
+    await repo.add_item_to_inventory(2, 13, 1)
+    await repo.consume_item(2, 13, 1, buff=TimedBuff(type='xp_boost', multiplier=0.1,
+                                                     expires_at=now - timedelta(seconds=1)))
+    assert len((await repo.get_by_id(2)).buffs) == 1
+    user = await repo.add_xp_coins(2, 10, 0)
+    assert user.buffs == []
+
+
+async def test_add_xp_coins_increments_stats_in_one_command(db):
+    """Saldo e contadores são incrementados em um único findAndModify."""
+    repo = UserRepository(db)
+    await repo.create(make_user(1, xp=10, coins=5))
+    db.reset_commands()
+
+    user = await repo.add_xp_coins(1, 20, 3, stats_inc={'stats.missions_helped': 1, 'stats.rank_counts.A': 1})
+
+    assert user.xp == 30 and user.coins == 8
+    assert user.stats.missions_helped == 1
+    assert user.stats.rank_counts == {'A': 1}
+    assert db.commands == {'findAndModify': 1}
+    assert await repo.add_xp_coins(404, 1, 1) is None
+
+
+async def test_replace_stats_resets_users_without_evaluations(db):
+    """Quem não aparece na reconstrução volta para os contadores zerados."""
+    repo = UserRepository(db)
+    await repo.create(make_user(1))
+    await repo.create(make_user(2, stats=UserStatsModel(missions_helped=4)))
+
+    await repo.replace_stats({1: UserStatsModel(missions_helped=2, score_sum=8)})
+
+    assert (await repo.get_by_id(1)).stats.missions_helped == 2
+    assert (await repo.get_by_id(2)).stats.missions_helped == 0
+
+
+async def test_user_profiles_are_separate_per_guild(db):
+    """O mesmo usuário tem um perfil por servidor, chaveado por (guild_id, user_id)."""
+    ledger = []
+    repo = UserRepository(db, ledger=type('Ledger', (), {'record': staticmethod(ledger.append)})())
+    await repo.ensure_indexes()
+
+    with scoped_guild(1):
+        assert await repo.create(make_user(5, coins=10)) is True
+        await repo.add_xp_coins(5, 0, 90)
+    with scoped_guild(2):
+        assert await repo.create(make_user(5)) is True
+        assert (await repo.get_by_id(5)).coins == 0
+        assert await repo.create(make_user(5)) is False
+    with scoped_guild(1):
+        user = await repo.get_by_id(5)
+
+    assert (user.guild_id, user.user_id, user.coins) == (1, 5, 100)
+    assert [(entry.guild_id, entry.coins) for entry in ledger] == [(1, 90)]
+    assert await db.users.count_documents({'user_id': 5}) == 2
+
+
+async def test_level_rewards_are_scoped_per_guild(db):
+    """Cada servidor tem os próprios cargos por nível; o nível pode se repetir entre servidores."""
+    repo = LevelRewardsRepository(db)
+    await repo.ensure_indexes()
+
+    with scoped_guild(1):
+        assert await repo.create(LevelRewardsModel(level_required=1, role_id=11, role_name='Novato')) is True
+        assert await repo.create(LevelRewardsModel(level_required=1, role_id=12, role_name='Outro')) is False
+    with scoped_guild(2):
+        assert await repo.create(LevelRewardsModel(level_required=1, role_id=21, role_name='Iniciante')) is True
+        assert (await repo.get_role_for_level(3)).role_id == 21
+        assert await repo.get_all_reward_role_ids() == [21]
+
+
+async def test_mission_participants_are_unique_per_mission(db):
+    """add_participant não sobrescreve uma avaliação existente."""
+    repo = MissionRepository(db)
+    await repo.ensure_indexes()
+    await repo.create(MissionModel(_id=10, title='Teste', creator_id=1, created_at=datetime(2025, 1, 1)))
+
+    assert await repo.add_participant(10, make_evaluator(2)) is True
+    assert await repo.update_evaluator(10, make_evaluator(2, rank=EvaluationRank.S, xp_earned=50)) is True
+    assert await repo.add_participant(10, make_evaluator(2)) is True
+    assert await repo.add_participant(404, make_evaluator(2)) is False
+
+    evaluations = await repo.get_mission_evaluations(10)
+    assert len(evaluations) == 1
+    assert evaluations[0].rank == EvaluationRank.S
+    assert evaluations[0].xp_earned == 50
+
+    with pytest.raises(DuplicateKeyError):
+        await db.evaluations.insert_one({'mission_id': 10, 'user_id': 2})
+
+
+async def test_user_evaluations_sorted_and_filtered_by_period(db):
+    """Histórico do membro respeita intervalo, ordem decrescente e limite."""
+    repo = MissionRepository(db)
+    base = datetime(2025, 3, 1)
+    for mission_id in range(5):
+        await repo.create(MissionModel(_id=mission_id, title='M', creator_id=1, created_at=base))
+        await repo.add_participant(mission_id, make_evaluator(7, evaluate_at=base + timedelta(days=mission_id)))
+
+    history = await repo.get_user_evaluations(7, start=base + timedelta(days=1), end=base + timedelta(days=4), limit=2)
+
+    assert [e.mission_id for e in history] == [3, 2]
+
+
+async def test_mission_projection_excludes_legacy_evaluators(db):
+    """get_by_id não carrega o array legado de avaliadores."""
+    repo = MissionRepository(db)
+    await repo.create(MissionModel(_id=1, title='M', creator_id=1, created_at=datetime(2025, 1, 1),
+                                   evaluators=[make_evaluator(3)]))
+
+    mission = await repo.get_by_id(1)
+
+    assert mission.evaluators == []
+    assert await repo.update_status(1, MissionStatus.COMPLETED, datetime(2025, 1, 2)) is True
+    assert (await repo.get_by_id(1)).status == MissionStatus.COMPLETED
+
+
+async def test_item_repository_crud(db):
+    repo = ItemRepository(db)
+    item = ItemModel(_id=1, name='Espada', description='Afiada', price=100, item_type=ItemType.EQUIPPABLE)
+
+    assert await repo.create(item) is True
+    assert await repo.create(item) is False
+    assert await repo.update_price(1, 150) is True
+    assert (await repo.get_by_id(1)).price == 150
+
+
+async def test_fake_supports_positional_operator_and_bulk_write(db):
+    """O operador posicional e o bulk_write se comportam como no servidor."""
+    await db.missions.insert_one({'_id': 1, 'evaluators': [{'user_id': 1, 'xp': 0}, {'user_id': 2, 'xp': 0}]})
+
+    result = await db.missions.update_one({'_id': 1, 'evaluators.user_id': 2}, {'$inc': {'evaluators.$.xp': 5}})
+    doc = await db.missions.find_one({'_id': 1})
+
+    assert result.modified_count == 1
+    assert doc['evaluators'][1]['xp'] == 5
+
+    bulk = await db.users.bulk_write([
+        UpdateOne({'_id': 1}, {'$set': {'a': 1}}, upsert=True),
+        UpdateOne({'_id': 1}, {'$set': {'a': 1}}),
+    ])
+    assert (bulk.upserted_count, bulk.matched_count, bulk.modified_count) == (1, 1, 0)
+    assert db.commands['bulkWrite'] == 1
+
+
+async def test_scheduled_closures_are_split_by_shard_and_closed_once(db):
+    """Cada shard só enxerga as próprias missões vencidas e o fechamento é único."""
+    repo = MissionRepository(db)
+    now = datetime.now(timezone.utc)
+    for mission_id in (10, 11, 12, 13):
+        await repo.create(MissionModel(mission_id=mission_id, title='Missão', creator_id=1, created_at=datetime(2025, 1, 1)))
+        await repo.schedule_close(mission_id, now - timedelta(seconds=1))
+    await repo.schedule_close(14, now)  # inexistente
+
+    assert sorted(await repo.get_due_closures(now, 2, [0])) == [10, 12]
+    assert sorted(await repo.get_due_closures(now, 2, [0, 1])) == [10, 11, 12, 13]
+
+    assert await repo.close(10) is True
+    assert await repo.close(10) is False
+    assert await repo.schedule_close(10, now) is False
+    assert sorted(await repo.get_due_closures(now, 2, [0])) == [12]
@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime
+
+from src.repositories.stats_repository import StatsRepository, day_ranges, day_key
+from src.database.models.stats import StatsDailyModel
+from src.utils.guild_scope import scoped_guild
+
+
+@pytest.fixture
+def mock_db():
+    """Fixture com as coleções usadas pelo rollup."""
+    mock_db = MagicMock()
+    mock_db.stats_daily = AsyncMock()
+    mock_db.stats_daily.name = 'stats_daily'
+    mock_db.rollup_state = AsyncMock()
+    mock_db.missions = AsyncMock()
+    mock_db.evaluations = AsyncMock()
+    mock_db.ledger = AsyncMock()
+    return mock_db
+
+
+def test_day_ranges():
+    """Cada dia vira um intervalo [00:00, 00:00 do dia seguinte)."""
+    ranges = day_ranges({'2025-03-02', '2025-03-01'})
+
+    assert ranges == [
+        {'$gte': datetime(2025, 3, 1), '$lt': datetime(2025, 3, 2)},
+        {'$gte': datetime(2025, 3, 2), '$lt': datetime(2025, 3, 3)},
+    ]
+    assert day_key(datetime(2025, 3, 1, 23, 59)) == '2025-03-01'
+
+
+@pytest.mark.asyncio
+async def test_get_watermark_propagates_read_errors(mock_db):
+    """Um erro de leitura não é confundido com "o rollup nunca rodou" (None)."""
+    mock_db.rollup_state.find_one.side_effect = RuntimeError('timeout')
+    repo = StatsRepository(mock_db)
+
+    with pytest.raises(RuntimeError):
+        await repo.get_watermark()
+
+    mock_db.rollup_state.find_one.side_effect = None
+    mock_db.rollup_state.find_one.return_value = None
+    assert await repo.get_watermark() is None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_days_replaces_full_buckets(mock_db):
+    """Um único pipeline junta as fontes e substitui cada bucket inteiro; nada é zerado antes."""
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[])
+    mock_db.missions.aggregate = AsyncMock(return_value=cursor)
+    repo = StatsRepository(mock_db)
+
+    result = await repo.rebuild_days({'2025-03-01'})
+
+    assert result is True
+    mock_db.stats_daily.update_many.assert_not_awaited()
+    mock_db.missions.aggregate.assert_awaited_once()
+    mock_db.evaluations.aggregate.assert_not_awaited()
+
+    pipeline = mock_db.missions.aggregate.await_args.args[0]
+    assert pipeline[-1]['$merge']['into'] == 'stats_daily'
+    assert pipeline[-1]['$merge']['whenMatched'] == 'replace'
+    assert len([stage for stage in pipeline if '$unionWith' in stage]) == 3
+    # Cada servidor tem os próprios buckets
+    group_key = pipeline[-3]['$group']['_id']
+    assert group_key == {'guild_id': '$guild_id', 'day': '$day'}
+
+    # Buckets não reescritos dos dias recalculados são apagados só depois do merge
+    stale_filter = mock_db.stats_daily.delete_many.await_args.args[0]
+    assert stale_filter['day'] == {'$in': ['2025-03-01']}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_days_failure_keeps_buckets(mock_db):
+    """Se o pipeline falha, os buckets existentes ficam como estavam."""
+    mock_db.missions.aggregate = AsyncMock(side_effect=RuntimeError('timeout'))
+    repo = StatsRepository(mock_db)
+
+    assert await repo.rebuild_days({'2025-03-01'}) is False
+    mock_db.stats_daily.delete_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_adjusted_evaluation_marks_its_original_day(mock_db):
+    """Uma avaliação ajustada depois do watermark recalcula o dia em que foi feita."""
+    def aggregate_for(days):
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [{'_id': day} for day in days]
+        return cursor
+
+    empty = AsyncMock(side_effect=lambda pipeline: aggregate_for([]))
+    mock_db.missions.aggregate = empty
+    mock_db.ledger.aggregate = empty
+    mock_db.evaluations.aggregate = AsyncMock(side_effect=lambda pipeline: aggregate_for(
+        ['2025-03-01'] if 'updated_at' in pipeline[0]['$match'] else []))
+    repo = StatsRepository(mock_db)
+
+    assert await repo.find_changed_days(datetime(2025, 3, 5)) == {'2025-03-01'}
+    updated = [call.args[0] for call in mock_db.evaluations.aggregate.await_args_list
+               if 'updated_at' in call.args[0][0]['$match']][0]
+    assert updated[1]['$group']['_id']['$dateToString']['date'] == '$evaluate_at'
+
+
+@pytest.mark.asyncio
+async def test_rebuild_days_empty_does_nothing(mock_db):
+    """Sem dias alterados nenhuma agregação é executada."""
+    repo = StatsRepository(mock_db)
+
+    assert await repo.rebuild_days(set()) is True
+    mock_db.missions.aggregate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_daily_reads_buckets(mock_db):
+    """A leitura usa somente os buckets pré-agregados do servidor atual."""
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[
+        {'_id': {'guild_id': 7, 'day': '2025-03-01'}, 'guild_id': 7, 'day': '2025-03-01', 'missions_opened': 3}
+    ])
+    mock_db.stats_daily.find = MagicMock(return_value=cursor)
+    repo = StatsRepository(mock_db)
+
+    with scoped_guild(7):
+        result = await repo.get_daily(datetime(2025, 3, 1), datetime(2025, 3, 7))
+
+    assert result == [StatsDailyModel(guild_id=7, day='2025-03-01', missions_opened=3)]
+    query = mock_db.stats_daily.find.call_args.args[0]
+    assert query == {'guild_id': 7, 'day': {'$gte': '2025-03-01', '$lte': '2025-03-07'}}
@@ -1,14 +1,26 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import ANY, AsyncMock, MagicMock
 from datetime import datetime
 from pymongo.errors import DuplicateKeyError
 from pymongo import ReturnDocument
 
 from src.database.models.user import UserModel, UserStatus
+from src.database.models.ledger import LedgerReason
 from repositories.user_repository import UserRepository
+from src.utils.guild_scope import guild_scope
 
 pytestmark = pytest.mark.asyncio
 
+# Servidor definido no contexto, como faria o TrackedCog
+GUILD_ID = 777
+
+
+@pytest.fixture(autouse=True)
+def guild():
+    token = guild_scope.set(GUILD_ID)
+    yield GUILD_ID
+    guild_scope.reset(token)
+
 
 @pytest.fixture
 def mock_db():
@@ -40,7 +52,8 @@ async def test_create_user_success(mock_db, sample_user):
     result = await user_repo.create(user_model=sample_user)
 
     assert result is True
-    expected_data = sample_user.model_dump(by_alias=True)
+    expected_data = sample_user.model_dump(by_alias=True, exclude={'buffs_expire_at'})
+    assert expected_data['guild_id'] == GUILD_ID
     mock_db.users.insert_one.assert_awaited_with(expected_data)
 
 
@@ -61,7 +74,7 @@ async def test_get_by_id_success(mock_db, sample_user):
     assert isinstance(result, UserModel)
     assert result.user_id == sample_user.user_id
     # 2. USA `assert_awaited_with` para corrotinas
-    mock_db.users.find_one.assert_awaited_with({'_id': sample_user.user_id})
+    mock_db.users.find_one.assert_awaited_with({'guild_id': GUILD_ID, 'user_id': sample_user.user_id})
 
 
 async def test_get_by_id_not_found(mock_db):
@@ -82,7 +95,7 @@ async def test_update_status(mock_db, status_to_set):
 
     assert result is True
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': 12345},
+        {'guild_id': GUILD_ID, 'user_id': 12345},
         {'$set': {'status': status_to_set}}
     )
 
@@ -116,8 +129,8 @@ async def test_add_xp_coins(mock_db, sample_user, user_id, xp, coins):
 
         assert isinstance(result, UserModel)  # O repositório retorna o objeto, não True
         mock_db.users.find_one_and_update.assert_awaited_with(
-            {'_id': user_id},
-            {'$inc': {'xp': xp, 'coins': coins}},
+            {'guild_id': GUILD_ID, 'user_id': user_id},
+            {'$inc': {'xp': xp, 'coins': coins}, '$pull': {'buffs': {'expires_at': {'$lte': ANY}}}},
             return_document=ReturnDocument.AFTER
         )
 
@@ -153,7 +166,7 @@ async def test_add_item_to_inventory(mock_db, user_id, item_id, quantity):
     # Senão, verificamos se o DB FOI chamado com os argumentos corretos.
     else:
         mock_db.users.update_one.assert_awaited_with(
-            {'_id': user_id},
+            {'guild_id': GUILD_ID, 'user_id': user_id},
             {'$inc': {f'inventory.{item_id}': quantity}}
         )
 
@@ -166,15 +179,16 @@ async def test_equip_item_success(mock_db):
     user_repo = UserRepository(db=mock_db)
 
     # Passamos os IDs
-    result = await user_repo.equip_item(user_id=12345, item_id=101)
+    result = await user_repo.equip_item(user_id=12345, item_id=101, multipliers=(1.2, 1.0))
 
     assert result is True
     mock_db.users.update_one.assert_awaited_with(
         {
-            '_id': 12345,
+            'guild_id': GUILD_ID,
+            'user_id': 12345,
             'inventory.101': {'$gt': 0}
         },
-        {'$set': {'equipped_item_id': 101}}
+        {'$set': {'equipped_item_id': 101, 'xp_multiplier': 1.2, 'coin_multiplier': 1.0}}
     )
 
 
@@ -188,7 +202,7 @@ async def test_equip_item_already_equipped(mock_db):
     user_repo = UserRepository(db=mock_db)
 
 
-    result = await user_repo.equip_item(user_id=12345, item_id=101)
+    result = await user_repo.equip_item(user_id=12345, item_id=101, multipliers=(1.0, 1.0))
 
 
     assert result is True
@@ -209,7 +223,7 @@ async def test_remove_all_item_from_inventory(mock_db, sample_user):
     assert result is True
 
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': sample_user.user_id},
+        {'guild_id': GUILD_ID, 'user_id': sample_user.user_id},
         {'$unset': {f'inventory.{101}': ''}}
     )
 
@@ -232,7 +246,7 @@ async def test_remove_item_from_inventory(mock_db, sample_user):
 
     assert result is True
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': sample_user.user_id},
+        {'guild_id': GUILD_ID, 'user_id': sample_user.user_id},
         {'$inc': {f'inventory.{101}': -quantity_to_remove}} # <-- Expect -1 here
     )
 
@@ -245,7 +259,7 @@ async def test_equip_item_failure_not_owned_or_no_user(mock_db):
     mock_db.users.update_one.return_value = MagicMock(matched_count=0)
     user_repo = UserRepository(db=mock_db)
 
-    result = await user_repo.equip_item(user_id=12345, item_id=999) # Item que não tem
+    result = await user_repo.equip_item(user_id=12345, item_id=999, multipliers=(1.0, 1.0)) # Item que não tem
 
     assert result is False
 
@@ -263,8 +277,8 @@ async def test_unequip_item_success(mock_db):
 
     # Verifica a query atômica com $unset
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': 12345},
-        {'$unset': {'equipped_item_id': ""}}
+        {'guild_id': GUILD_ID, 'user_id': 12345},
+        {'$unset': {'equipped_item_id': ""}, '$set': {'xp_multiplier': 1.0, 'coin_multiplier': 1.0}}
     )
 
 async def test_unequip_item_idempotent(mock_db):
@@ -289,7 +303,7 @@ async def test_add_role(mock_db, sample_user):
 
     assert result is True
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': sample_user.user_id},
+        {'guild_id': GUILD_ID, 'user_id': sample_user.user_id},
         {'$addToSet': {'role_ids': 1}}
     )
 
@@ -304,6 +318,40 @@ async def test_remove_role(mock_db, sample_user):
 
     assert result is True
     mock_db.users.update_one.assert_awaited_with(
-        {'_id': sample_user.user_id},
+        {'guild_id': GUILD_ID, 'user_id': sample_user.user_id},
         {'$pull': {'role_ids': 1}}
-    )
\ No newline at end of file
+    )
+
+
+async def test_add_xp_coins_with_stats_increment(mock_db, sample_user):
+    """Testa se os contadores vão no mesmo $inc do saldo."""
+    mock_db.users.find_one_and_update.return_value = sample_user.model_dump(by_alias=True)
+    user_repo = UserRepository(db=mock_db)
+
+    stats_inc = {'stats.missions_helped': 1, 'stats.rank_counts.A': 1}
+    result = await user_repo.add_xp_coins(user_id=1, xp=0, coins=0, stats_inc=stats_inc)
+
+    assert isinstance(result, UserModel)
+    mock_db.users.find_one_and_update.assert_awaited_with(
+        {'guild_id': GUILD_ID, 'user_id': 1},
+        {'$inc': {'xp': 0, 'coins': 0, 'stats.missions_helped': 1, 'stats.rank_counts.A': 1},
+         '$pull': {'buffs': {'expires_at': {'$lte': ANY}}}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def test_add_xp_coins_records_ledger_entry(mock_db, sample_user):
+    """Toda alteração de saldo aplicada gera uma entrada no ledger com motivo e origem."""
+    mock_db.users.find_one_and_update.return_value = sample_user.model_dump(by_alias=True)
+    ledger = MagicMock()
+    user_repo = UserRepository(db=mock_db, ledger=ledger)
+
+    await user_repo.add_xp_coins(user_id=1, xp=0, coins=-50,
+                                 reason=LedgerReason.PURCHASE,
+                                 reference={'item_id': 7, 'quantity': 1})
+
+    ledger.record.assert_called_once()
+    entry = ledger.record.call_args.args[0]
+    assert (entry.user_id, entry.xp, entry.coins) == (1, 0, -50)
+    assert entry.reason == LedgerReason.PURCHASE
+    assert entry.item_id == 7
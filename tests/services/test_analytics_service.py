@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from datetime import datetime
+
+from src.services.analytics_service import AnalyticsService, WATERMARK_OVERLAP
+
+
+@pytest.fixture
+def mock_stats_repo():
+    repo = MagicMock()
+    repo.get_watermark = AsyncMock(return_value=datetime(2025, 1, 10, 12, 0))
+    repo.find_changed_days = AsyncMock(return_value={'2025-01-10', '2025-01-11'})
+    repo.rebuild_days = AsyncMock(return_value=True)
+    repo.set_watermark = AsyncMock(return_value=True)
+    repo.get_daily = AsyncMock(return_value=[])
+    return repo
+
+
+@pytest.fixture
+def service(mock_stats_repo):
+    return AnalyticsService(mock_stats_repo)
+
+
+@pytest.mark.asyncio
+async def test_run_rollup_processes_only_changed_days(service, mock_stats_repo):
+    """Somente os dias alterados desde o watermark são recalculados e o watermark avança."""
+    before = datetime.now()
+
+    processed = await service.run_rollup()
+
+    assert processed == 2
+    mock_stats_repo.find_changed_days.assert_awaited_once_with(datetime(2025, 1, 10, 12, 0))
+    mock_stats_repo.rebuild_days.assert_awaited_once_with({'2025-01-10', '2025-01-11'})
+
+    new_watermark = mock_stats_repo.set_watermark.await_args.args[0]
+    assert new_watermark >= before - WATERMARK_OVERLAP
+
+
+@pytest.mark.asyncio
+async def test_run_rollup_keeps_watermark_on_failure(service, mock_stats_repo):
+    """Se o recálculo falhar o watermark não avança (tenta de novo no próximo ciclo)."""
+    mock_stats_repo.rebuild_days.return_value = False
+
+    processed = await service.run_rollup()
+
+    assert processed == 0
+    mock_stats_repo.set_watermark.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_rollup_nothing_changed(service, mock_stats_repo):
+    """Sem mudanças nenhum pipeline roda, mas o watermark avança."""
+    mock_stats_repo.find_changed_days.return_value = set()
+
+    processed = await service.run_rollup()
+
+    assert processed == 0
+    mock_stats_repo.rebuild_days.assert_not_awaited()
+    mock_stats_repo.set_watermark.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_run_rollup_skips_cycle_when_watermark_read_fails(service, mock_stats_repo):
+    """Uma falha ao ler o watermark pula o ciclo em vez de recalcular todo o histórico."""
+    mock_stats_repo.get_watermark.side_effect = RuntimeError('timeout')
+
+    processed = await service.run_rollup()
+
+    assert processed == 0
+    mock_stats_repo.find_changed_days.assert_not_awaited()
+    mock_stats_repo.rebuild_days.assert_not_awaited()
+    mock_stats_repo.set_watermark.assert_not_awaited()
@@ -3,6 +3,8 @@ from unittest.mock import MagicMock, AsyncMock
 from src.services.economy_service import EconomyService
 from src.database.models.user import UserModel, UserStatus
 from src.database.models.item import ItemModel, ItemType
+from src.database.models.effects import AddXpEffect, GiveRoleEffect, TimedBoostEffect
+from src.database.models.ledger import LedgerReason
 import datetime
 
 
@@ -75,7 +77,9 @@ async def test_buy_item_success(service, mock_user_repo, mock_item_repo):
     assert success is True
     assert "com sucesso" in msg
     # Verifica se descontou o valor correto (-50)
-    mock_user_repo.add_xp_coins.assert_awaited_with(user_id=1, xp=0, coins=-50)
+    mock_user_repo.add_xp_coins.assert_awaited_with(user_id=1, xp=0, coins=-50,
+                                                    reason=LedgerReason.PURCHASE,
+                                                    reference={'item_id': 101, 'quantity': 1})
     # Verifica se adicionou ao inventário
     mock_user_repo.add_item_to_inventory.assert_awaited_with(1, 101, 1)
 
@@ -144,7 +148,7 @@ async def test_equip_item_success(service, mock_user_repo,mock_item_repo):
 
     # ASSERT
     assert success is True
-    mock_user_repo.equip_item.assert_awaited_with(1, 101)
+    mock_user_repo.equip_item.assert_awaited_with(1, 101, equippable_item.multipliers)
 
 
 @pytest.mark.asyncio
@@ -213,4 +217,113 @@ async def test_equip_item_fail_not_equippable(service, mock_user_repo, mock_item
     assert success is False
     assert "não pode ser equipado" in msg
     # Garante que NÃO chamou o método de salvar no banco
-    mock_user_repo.equip_item.assert_not_called()
\ No newline at end of file
+    mock_user_repo.equip_item.assert_not_called()
+
+
+@pytest.fixture
+def mock_leveling():
+    leveling = MagicMock()
+    # Regra real de nível: floor(sqrt(xp / 150))
+    leveling.calculate_level = MagicMock(side_effect=lambda xp: int((xp / 150) ** 0.5))
+    leveling.sync_roles = AsyncMock(return_value=True)
+    leveling.grant_item_role = AsyncMock(return_value=True)
+    return leveling
+
+
+@pytest.fixture
+def service_with_leveling(mock_user_repo, mock_item_repo, mock_leveling):
+    mock_user_repo.consume_item = AsyncMock()
+    return EconomyService(mock_user_repo, mock_item_repo, mock_leveling)
+
+
+def create_xp_potion(amount=100):
+    return ItemModel(_id=11, name="Café", description="XP", price=300,
+                     item_type=ItemType.CONSUMABLE,
+                     effect=AddXpEffect(type='add_xp', amount=amount))
+
+
+@pytest.mark.asyncio
+async def test_use_item_applies_summed_effect_in_one_write(service_with_leveling, mock_user_repo,
+                                                           mock_item_repo, mock_leveling):
+    """Cenário: usa 3 poções de XP; o XP é somado e o nível vem do documento retornado."""
+    mock_item_repo.get_by_id.return_value = create_xp_potion(100)
+    # 200 XP antes (nível 1) + 300 = 500 XP (nível 1): sem troca de nível
+    mock_user_repo.consume_item.return_value = create_fake_user(inventory={11: 2})
+    mock_user_repo.consume_item.return_value.xp = 500
+
+    success, data = await service_with_leveling.use_item(user_id=1, item_id=11, quantity=3, guild=MagicMock())
+
+    assert success is True
+    assert data['xp'] == 300 and data['quantity'] == 3
+    assert data['level'] == 1 and data['level_up'] is False
+    mock_user_repo.consume_item.assert_awaited_once_with(1, 11, 3, xp=300, coins=0, role_id=None, buff=None)
+    mock_user_repo.get_by_id.assert_not_awaited()
+    mock_leveling.sync_roles.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_use_item_level_up_syncs_roles(service_with_leveling, mock_user_repo, mock_item_repo, mock_leveling):
+    """Cenário: o XP do item passa de nível; os cargos de nível são sincronizados."""
+    mock_item_repo.get_by_id.return_value = create_xp_potion(500)
+    user = create_fake_user()
+    user.xp = 600  # 100 -> 600 XP: nível 0 -> 2
+    mock_user_repo.consume_item.return_value = user
+
+    success, data = await service_with_leveling.use_item(user_id=1, item_id=11, quantity=1, guild="guild")
+
+    assert success is True
+    assert data['level'] == 2 and data['level_up'] is True
+    mock_leveling.sync_roles.assert_awaited_once_with(1, 2, "guild")
+
+
+@pytest.mark.asyncio
+async def test_use_item_role_effect(service_with_leveling, mock_user_repo, mock_item_repo, mock_leveling):
+    """Cenário: item de cargo grava o cargo e o entrega no Discord; só 1 unidade por vez."""
+    mock_item_repo.get_by_id.return_value = ItemModel(_id=20, name="Título", description="Cargo", price=10,
+                                                      item_type=ItemType.ROLE,
+                                                      effect=GiveRoleEffect(type='role_effect', role_id=77))
+    mock_user_repo.consume_item.return_value = create_fake_user()
+
+    success, msg = await service_with_leveling.use_item(user_id=1, item_id=20, quantity=2, guild="guild")
+    assert success is False
+    mock_user_repo.consume_item.assert_not_awaited()
+
+    success, data = await service_with_leveling.use_item(user_id=1, item_id=20, quantity=1, guild="guild")
+    assert success is True
+    mock_user_repo.consume_item.assert_awaited_once_with(1, 20, 1, xp=0, coins=0, role_id=77, buff=None)
+    mock_leveling.grant_item_role.assert_awaited_once_with(1, 77, "guild")
+
+
+@pytest.mark.asyncio
+async def test_use_item_fail_without_stock_or_effect(service_with_leveling, mock_user_repo, mock_item_repo):
+    """Cenário: sem unidades suficientes ou item sem efeito ativo."""
+    mock_item_repo.get_by_id.return_value = create_xp_potion()
+    mock_user_repo.consume_item.return_value = None
+
+    success, msg = await service_with_leveling.use_item(user_id=1, item_id=11, quantity=5, guild=MagicMock())
+    assert success is False
+    assert "não possui" in msg
+
+    mock_item_repo.get_by_id.return_value = create_fake_item(item_id=101, price=50)
+    success, msg = await service_with_leveling.use_item(user_id=1, item_id=101, quantity=1, guild=MagicMock())
+    assert success is False
+    assert "não pode ser usado" in msg
+
+
+@pytest.mark.asyncio
+async def test_use_item_timed_boost_stacks_duration(service_with_leveling, mock_user_repo, mock_item_repo):
+    """Cenário: 2 poções temporárias viram um único buff com o dobro da duração."""
+    mock_item_repo.get_by_id.return_value = ItemModel(
+        _id=13, name="Poção", description="Buff", price=900, item_type=ItemType.CONSUMABLE,
+        effect=TimedBoostEffect(type='timed_boost', boost='xp_boost', multiplier=0.5, duration_minutes=60))
+    mock_user_repo.consume_item.return_value = create_fake_user()
+
+    before = datetime.datetime.now()
+    success, data = await service_with_leveling.use_item(user_id=1, item_id=13, quantity=2, guild=MagicMock())
+
+    assert success is True
+    buff = mock_user_repo.consume_item.await_args.kwargs['buff']
+    assert buff.type == 'xp_boost' and buff.multiplier == 0.5 and buff.item_id == 13
+    assert buff.expires_at - before >= datetime.timedelta(minutes=120)
+    assert data['buff']['expires_at'] == buff.expires_at
+    assert data['xp'] == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from src.database.models.guild_config import GuildConfigModel
+from src.repositories.guild_config_repository import GuildConfigRepository
+from src.services.guild_config_service import GuildConfigService
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def db() -> FakeDatabase:
+    return FakeDatabase()
+
+
+async def test_load_keeps_configs_in_memory(db):
+    """Depois do load, get não vai ao banco."""
+    await GuildConfigRepository(db).save(GuildConfigModel(guild_id=1, mission_channel_id=10))
+    service = GuildConfigService(GuildConfigRepository(db))
+
+    await service.load()
+    db.reset_commands()
+
+    assert service.get(1).mission_channel_id == 10
+    assert service.get(2).mission_channel_id is None
+    assert db.total_commands == 0
+
+
+async def test_update_persists_and_keeps_other_channels(db):
+    """Atualizar um canal grava no banco e mantém o outro canal já configurado."""
+    service = GuildConfigService(GuildConfigRepository(db))
+    await service.update(5, mission_channel_id=50)
+    await service.update(5, mod_log_channel_id=51)
+
+    reloaded = GuildConfigService(GuildConfigRepository(db))
+    await reloaded.load()
+
+    config = reloaded.get(5)
+    assert (config.mission_channel_id, config.mod_log_channel_id) == (50, 51)
+    assert 5 in reloaded.guild_ids()
@@ -0,0 +1,88 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+
+from src.repositories.idempotency_repository import IdempotencyRepository
+from src.services.idempotency_service import IdempotencyService, IN_PROGRESS_MESSAGE, idempotency_key
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def db() -> FakeDatabase:
+    return FakeDatabase()
+
+
+@pytest.fixture
+def service(db) -> IdempotencyService:
+    return IdempotencyService(IdempotencyRepository(db))
+
+
+KEY = idempotency_key('avaliar', 777, 10, 20)
+
+
+async def test_duplicate_returns_cached_outcome_without_calling_the_service(service):
+    action = AsyncMock(return_value=(True, {'xp': 50, 'coins': 125}))
+
+    first = await service.run(KEY, action)
+    second = await service.run(KEY, action)
+
+    assert first == second == (True, {'xp': 50, 'coins': 125})
+    action.assert_awaited_once()
+    assert service.local_hits == 1
+
+
+async def test_concurrent_double_click_runs_once(service):
+    """O segundo clique aguarda a execução em andamento no mesmo processo."""
+    async def buy():
+        await asyncio.sleep(0)
+        return True, 'Compra realizada'
+    action = AsyncMock(side_effect=buy)
+
+    results = await asyncio.gather(service.run(KEY, action), service.run(KEY, action))
+
+    assert results == [(True, 'Compra realizada')] * 2
+    action.assert_awaited_once()
+
+
+async def test_other_process_gets_the_stored_outcome(db, service):
+    other = IdempotencyService(IdempotencyRepository(db))
+    await service.run(KEY, AsyncMock(return_value=(True, {'rank': 'S'})))
+    action = AsyncMock()
+
+    assert await other.run(KEY, action) == (True, {'rank': 'S'})
+    action.assert_not_awaited()
+    assert other.remote_hits == 1
+
+
+async def test_pending_key_in_other_process_is_reported_as_in_progress(db, service):
+    await IdempotencyRepository(db).claim(KEY, lease=60)
+    action = AsyncMock()
+
+    assert await service.run(KEY, action) == (False, IN_PROGRESS_MESSAGE)
+    action.assert_not_awaited()
+
+
+async def test_failures_and_expired_windows_allow_a_new_attempt(service):
+    failing = AsyncMock(return_value=(False, 'Saldo insuficiente'))
+    assert await service.run(KEY, failing) == (False, 'Saldo insuficiente')
+
+    action = AsyncMock(return_value=(True, 'ok'))
+    assert await service.run(KEY, action, ttl=0) == (True, 'ok')
+    assert await service.run(KEY, action, ttl=0) == (True, 'ok')
+
+    assert action.await_count == 2
+
+
+async def test_abandoned_claim_is_taken_over_after_the_lease(db, service):
+    """Uma reserva de um processo que caiu vence com a lease, não com a janela inteira."""
+    await IdempotencyRepository(db).claim(KEY, lease=0)
+    action = AsyncMock(return_value=(True, 'ok'))
+
+    assert await service.run(KEY, action) == (True, 'ok')
+    action.assert_awaited_once()
+
+    # Concluída, a chave vale pela janela de deduplicação
+    record = await db.idempotency_keys.find_one({'_id': KEY})
+    assert (record['expires_at'] - record['created_at']).total_seconds() > 60 * 60
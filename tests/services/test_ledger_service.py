@@ -0,0 +1,142 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+
+from src.services.ledger_service import LedgerService
+from src.database.models.ledger import LedgerEntryModel, LedgerReason
+
+
+@pytest.fixture
+def mock_ledger_repo():
+    repo = MagicMock()
+    repo.insert_many = AsyncMock(return_value=True)
+    repo.get_snapshot_state = AsyncMock(return_value=(None, None))
+    repo.set_pending_cutoff = AsyncMock()
+    repo.merge_into_snapshots = AsyncMock()
+    repo.commit_cutoff = AsyncMock()
+    repo.get_snapshots = AsyncMock(return_value={})
+    repo.sum_after = AsyncMock(return_value={})
+    return repo
+
+
+def make_entry(user_id=1, coins=10):
+    return LedgerEntryModel(user_id=user_id, coins=coins, reason=LedgerReason.MISSION_REWARD)
+
+
+@pytest.mark.asyncio
+async def test_record_is_buffered_until_flush(mock_ledger_repo):
+    """Registrar não faz I/O; o flush grava tudo com um único insert_many."""
+    service = LedgerService(mock_ledger_repo, batch_size=10)
+
+    for _ in range(3):
+        service.record(make_entry())
+
+    mock_ledger_repo.insert_many.assert_not_awaited()
+    assert service.pending == 3
+
+    written = await service.flush()
+
+    assert written == 3
+    mock_ledger_repo.insert_many.assert_awaited_once()
+    assert len(mock_ledger_repo.insert_many.await_args.args[0]) == 3
+    assert service.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_triggers_flush(mock_ledger_repo):
+    """Ao atingir o tamanho do lote um flush é agendado automaticamente."""
+    service = LedgerService(mock_ledger_repo, batch_size=2)
+
+    service.record(make_entry())
+    service.record(make_entry())
+    await asyncio.sleep(0)
+
+    mock_ledger_repo.insert_many.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_entries(mock_ledger_repo):
+    """Se o insert falhar as entradas continuam no buffer, na mesma ordem."""
+    mock_ledger_repo.insert_many.return_value = False
+    service = LedgerService(mock_ledger_repo, batch_size=10)
+    first, second = make_entry(user_id=1), make_entry(user_id=2)
+    service.record(first)
+    service.record(second)
+
+    assert await service.flush() == 0
+    assert service._buffer == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_take_snapshots_reuses_pending_cutoff(mock_ledger_repo):
+    """Um snapshot interrompido é retomado com o mesmo corte."""
+    pending = MagicMock()
+    mock_ledger_repo.get_snapshot_state.return_value = ('corte_antigo', pending)
+    service = LedgerService(mock_ledger_repo)
+
+    cutoff = await service.take_snapshots()
+
+    assert cutoff is pending
+    mock_ledger_repo.set_pending_cutoff.assert_not_awaited()
+    mock_ledger_repo.merge_into_snapshots.assert_awaited_once_with('corte_antigo', pending)
+    mock_ledger_repo.commit_cutoff.assert_awaited_once_with(pending, None)
+
+
+@pytest.mark.asyncio
+async def test_verify_reports_mismatches(mock_ledger_repo):
+    """Saldo do ledger = snapshot + entradas após o corte, comparado com users."""
+    mock_ledger_repo.get_snapshots.return_value = {1: (100, 50), 2: (10, 10)}
+    mock_ledger_repo.sum_after.return_value = {1: (20, 5)}
+
+    first_page = MagicMock()
+    first_page.to_list = AsyncMock(return_value=[
+        {'user_id': 1, 'xp': 120, 'coins': 55},  # confere
+        {'user_id': 2, 'xp': 10, 'coins': 99},  # diverge
+    ])
+    empty_page = MagicMock()
+    empty_page.to_list = AsyncMock(return_value=[])
+    users = MagicMock()
+    users.find = MagicMock(side_effect=[first_page, empty_page])
+    users.distinct = AsyncMock(return_value=[10])
+
+    service = LedgerService(mock_ledger_repo)
+    report = await service.verify(users)
+
+    assert report['checked'] == 2
+    assert report['mismatches'] == [
+        {'guild_id': 10, 'user_id': 2, 'xp': 10, 'coins': 99, 'ledger_xp': 10, 'ledger_coins': 10}
+    ]
+    assert users.find.call_args_list[1].args[0] == {'guild_id': 10, 'user_id': {'$gt': 2}}
+
+
+@pytest.mark.asyncio
+async def test_retry_after_partial_write_does_not_duplicate():
+    """Reenviar um lote já gravado em parte não duplica as entradas (o _id vem do registro)."""
+    from src.repositories.ledger_repository import LedgerRepository
+    from tests.fakes import FakeDatabase
+
+    db = FakeDatabase()
+    repo = LedgerRepository(db)
+    first, second = make_entry(user_id=1), make_entry(user_id=2)
+
+    # Simula um lote que chegou ao banco só em parte
+    await db.ledger.insert_one(first.model_dump(by_alias=True, exclude_none=True))
+
+    service = LedgerService(repo, batch_size=10)
+    service.record(first)
+    service.record(second)
+
+    assert await service.flush() == 2
+    assert await db.ledger.count_documents({}) == 2
+    assert service.pending == 0
+
+
+def test_buffer_drops_oldest_entries_over_limit(mock_ledger_repo):
+    service = LedgerService(mock_ledger_repo, batch_size=100, max_pending=2)
+    entries = [make_entry(user_id=user_id) for user_id in (1, 2, 3)]
+
+    for entry in entries:
+        service.record(entry)
+
+    assert service._buffer == entries[1:]
+    assert service.dropped == 1
@@ -0,0 +1,134 @@
+import pytest
+import random
+from array import array
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from src.database.models.level_curve import LevelCurveKind, LevelCurveModel
+from src.repositories.level_curve_repository import LevelCurveRepository
+from src.services.level_curve import (ExponentialTailCurve, LevelTable, PiecewiseCurve, QuadraticCurve,
+                                      level_for_xp)
+from src.services.level_curve_service import LevelCurveService
+from tests.fakes import FakeDatabase
+
+
+def test_quadratic_table_matches_exact_formula():
+    """Dentro e acima da tabela, o nível é o mesmo da fórmula inteira."""
+    table = LevelTable(QuadraticCurve(150), max_level=50)
+    rng = random.Random(3)
+    samples = [0, 149, 150, -10] + [rng.randrange(0, 10**12) for _ in range(500)]
+    for level in (1, 49, 50, 51, 10**6):
+        threshold = 150 * level * level
+        samples += [threshold - 1, threshold, threshold + 1]
+
+    for xp in samples:
+        assert table.level_for(xp) == level_for_xp(xp, 150), xp
+
+
+def test_progress_reads_floor_and_ceiling_from_table():
+    table = LevelTable(QuadraticCurve(100))
+
+    assert table.progress(250) == {"current_level": 1, "relative_xp": 150, "needed_xp": 300,
+                                   "percentage": 50, "xp_floor": 100, "xp_ceiling": 400}
+    assert table.progress(-5)["current_level"] == 0
+
+
+def test_piecewise_curve_interpolates_and_caps_at_max_level():
+    table = LevelTable(PiecewiseCurve([(0, 0), (10, 1000), (20, 5000)]), max_level=30)
+
+    assert table.threshold(5) == 500
+    assert table.threshold(15) == 3000
+    # Depois do último ponto segue a última inclinação (400 por nível)
+    assert table.threshold(25) == 7000
+    assert table.level_for(2999) == 14
+    assert table.level_for(10**9) == 30
+    assert table.progress(10**9)["percentage"] == 100
+
+
+def test_exponential_tail_grows_geometrically():
+    table = LevelTable(ExponentialTailCurve(100, tail_start=10, growth=2.0), max_level=20)
+
+    # Quadrática até o nível 10; o nível 10 custou 1900, então o 11 custa 3800 e o 12, 7600
+    assert table.threshold(10) == 10_000
+    assert table.threshold(11) == 13_800
+    assert table.threshold(12) == 21_400
+    assert table.level_for(13_799) == 10
+    assert table.level_for(13_800) == 11
+
+
+def test_batch_matches_scalar_for_non_quadratic_curve():
+    table = LevelTable(PiecewiseCurve([(0, 0), (5, 100), (50, 90_000)]), max_level=60)
+    samples = [-1, 0, 99, 100, 101] + [random.Random(5).randrange(0, 200_000) for _ in range(300)]
+
+    batch = table.batch(array('q', samples))
+
+    for i, xp in enumerate(samples):
+        progress = table.progress(xp)
+        for key, value in progress.items():
+            assert getattr(batch, key)[i] == value, (xp, key)
+
+
+def test_invalid_thresholds_are_rejected():
+    with pytest.raises(ValueError):
+        LevelTable(PiecewiseCurve([(0, 0), (10, 1000), (20, 1000)]), max_level=30)
+    with pytest.raises(ValueError):
+        PiecewiseCurve([(1, 0), (10, 1000)])
+    with pytest.raises(ValueError):
+        PiecewiseCurve([(0, 0), (0, 100)])
+    with pytest.raises(ValueError):
+        PiecewiseCurve([(0, 0), (10, 1000), (5, 2000)])
+
+
+def test_apply_keeps_table_for_repeated_levels():
+    """Níveis repetidos nos pontos não derrubam a carga da curva (antes: ZeroDivisionError)."""
+    service = LevelCurveService()
+    table = service.table
+
+    assert service.apply(LevelCurveModel(kind=LevelCurveKind.PIECEWISE, points=[(0, 0), (0, 100)])) is False
+    assert service.table is table
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_table_only_when_curve_changes():
+    """A recarga reconstrói a tabela quando updated_at muda e ignora curvas inválidas."""
+    db = FakeDatabase()
+    repo = LevelCurveRepository(db)
+    service = LevelCurveService(repo)
+    default_table = service.table
+
+    assert await service.reload() is False
+    assert service.table is default_table
+
+    changed_at = datetime.now().replace(microsecond=0)
+    await repo.save(LevelCurveModel(kind=LevelCurveKind.QUADRATIC, factor=100, updated_at=changed_at))
+    assert await service.reload() is True
+    assert service.table.level_for(100) == 1
+    assert await service.reload() is False
+
+    # Curva inválida: mantém a tabela anterior
+    loaded_table = service.table
+    await repo.save(LevelCurveModel(kind=LevelCurveKind.PIECEWISE, points=[(0, 0), (10, 0)],
+                                    updated_at=changed_at + timedelta(minutes=1)))
+    assert await service.reload() is False
+    assert service.table is loaded_table
+
+    await db.level_curves.delete_one({'_id': 'ativa'})
+    assert await service.reload() is True
+    assert service.table is default_table
+
+
+@pytest.mark.asyncio
+async def test_reload_keeps_table_when_read_fails():
+    """Uma falha do banco na recarga mantém a curva atual (não volta para a padrão)."""
+    db = FakeDatabase()
+    repo = LevelCurveRepository(db)
+    service = LevelCurveService(repo)
+    await repo.save(LevelCurveModel(kind=LevelCurveKind.QUADRATIC, factor=100, updated_at=datetime.now()))
+    assert await service.reload() is True
+    loaded_table = service.table
+
+    with patch.object(db.level_curves, 'find_one', AsyncMock(side_effect=RuntimeError('timeout'))):
+        with pytest.raises(RuntimeError):
+            await service.reload()
+
+    assert service.table is loaded_table
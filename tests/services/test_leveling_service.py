@@ -1,8 +1,12 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 import datetime
+import random
+from array import array
 
 from src.services.leveling_service import LevelingService
+from src.services.level_curve import QuadraticCurve
+from src.services.level_curve_service import LevelCurveService
 from src.database.models.user import UserModel
 from src.database.models.item import ItemModel, ItemType
 from src.database.models.level_rewards import LevelRewardsModel
@@ -16,13 +20,6 @@ def mock_user_repo():
     return repo
 
 
-@pytest.fixture
-def mock_item_repo():
-    repo = MagicMock()
-    repo.get_by_id = AsyncMock()
-    return repo
-
-
 @pytest.fixture
 def mock_rewards_repo():
     repo = MagicMock()
@@ -31,12 +28,14 @@ def mock_rewards_repo():
     return repo
 
 
+FACTOR = 100
+
+
 @pytest.fixture
-def service(mock_user_repo, mock_rewards_repo, mock_item_repo):
-    svc = LevelingService(mock_user_repo, mock_rewards_repo, mock_item_repo)
-    # Define o fator base para facilitar a matemática dos testes (100 xp = lvl 1)
-    svc.BASE_XP_FACTOR = 100
-    return svc
+def service(mock_user_repo, mock_rewards_repo):
+    # Curva quadrática com fator 100 para facilitar a matemática dos testes (100 xp = lvl 1)
+    return LevelingService(mock_user_repo, mock_rewards_repo,
+                           curves=LevelCurveService(default_curve=QuadraticCurve(FACTOR)))
 
 
 @pytest.fixture
@@ -61,7 +60,7 @@ def mock_member():
 
 
 def test_calculate_level_logic(service):
-    # Com BASE_XP_FACTOR = 100
+    # Com fator 100
     assert service.calculate_level(0) == 0
     assert service.calculate_level(99) == 0
     assert service.calculate_level(100) == 1
@@ -69,6 +68,54 @@ def test_calculate_level_logic(service):
     assert service.calculate_level(350) == 1
 
 
+def test_calculate_level_exact_at_high_xp(service):
+    """Nos quadrados perfeitos de XP alto a raiz em float erra; a versão inteira não."""
+    for level in (10**6, 3 * 10**7 + 1, 94_906_265, 3_037_000_499):
+        threshold = FACTOR * level * level
+        assert service.calculate_level(threshold) == level
+        assert service.calculate_level(threshold - 1) == level - 1
+        assert service.calculate_level(threshold + 1) == level
+    assert service.calculate_level(-50) == 0
+
+
+def xp_samples(factor, seed=7, count=2000):
+    """Amostra com valores aleatórios e os vizinhos exatos de vários limiares de nível."""
+    rng = random.Random(seed)
+    samples = [0, 1, -5, factor - 1, factor]
+    samples += [rng.randrange(0, 10**12) for _ in range(count)]
+    for level in [rng.randrange(1, 3 * 10**7) for _ in range(count // 4)]:
+        threshold = factor * level * level
+        samples += [threshold - 1, threshold, threshold + 1]
+    return samples
+
+
+def assert_batch_matches_scalar(service, batch, samples):
+    assert len(batch) == len(samples)
+    for i, xp in enumerate(samples):
+        progress = service.get_user_progress(xp)
+        assert batch.current_level[i] == service.calculate_level(xp), xp
+        for key in ('relative_xp', 'needed_xp', 'percentage', 'xp_floor', 'xp_ceiling'):
+            assert getattr(batch, key)[i] == progress[key], (xp, key)
+
+
+def test_calculate_levels_matches_scalar_path(service):
+    """Propriedade: o lote (array('q')) dá o mesmo nível/progresso que a versão escalar."""
+    samples = xp_samples(FACTOR)
+    batch = service.calculate_levels(array('q', samples))
+
+    assert isinstance(batch.current_level, array)
+    assert_batch_matches_scalar(service, batch, samples)
+
+
+def test_calculate_levels_numpy_matches_scalar_path(service):
+    np = pytest.importorskip('numpy')
+    samples = xp_samples(FACTOR, seed=11)
+    batch = service.calculate_levels(np.array(samples, dtype=np.int64))
+
+    assert batch.current_level.dtype == np.int64
+    assert_batch_matches_scalar(service, batch, samples)
+
+
 
 @pytest.mark.asyncio
 async def test_grant_reward_no_change(service, mock_user_repo, mock_guild):
@@ -196,14 +243,11 @@ async def test_sync_roles_replace_old_role(service, mock_rewards_repo, mock_guil
     assert result is True
 
 
-@pytest.mark.asyncio
-async def test_calculate_bonus_with_xp_item(service, mock_item_repo):
-    """Testa se o cálculo de bônus aplica o multiplicador de XP corretamente."""
+def test_calculate_bonus_with_xp_item(service):
+    """Os efeitos passivos do item são compilados em multiplicadores e o bônus é calculado sem I/O."""
 
-    user = UserModel(_id=1, username="Test", coins=0, xp=0, equipped_item_id=99, joined_at=datetime.datetime.now())
-
-    # Mock do Item (Anel de +50% XP)
-    mock_item_repo.get_by_id.return_value = ItemModel(
+    # Anel de +50% XP
+    item = ItemModel(
         _id=99,
         name="Anel Sábio",
         price=100,
@@ -212,11 +256,11 @@ async def test_calculate_bonus_with_xp_item(service, mock_item_repo):
         passive_effects=[XpBoostPassive(type="xp_boost", multiplier=0.5)],
         effect=None
     )
+    assert item.multipliers == (1.5, 1.0)
 
-    base_xp = 100
-    base_coins = 100
-
-    final_xp, final_coins, text = await service.calculate_bonus(user, base_xp, base_coins)
+    final_xp, final_coins, text = service.calculate_bonus(100, 100, *item.multipliers)
 
     assert final_xp == 150  # 100 + 50%
-    assert final_coins == 100  # Sem bônus de moeda
\ No newline at end of file
+    assert final_coins == 100  # Sem bônus de moeda
+    assert '+50' in text
+    assert service.calculate_bonus(100, 100) == (100, 100, '')
@@ -1,10 +1,12 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock, ANY
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from src.services.mission_service import MissionService, RANK_REWARDS
+from src.services.mission_service import MissionService, RANK_REWARDS, build_stats_increment
 from src.database.models.mission import MissionModel, MissionStatus, EvaluatorModel, EvaluationRank
 from src.database.models.user import UserModel
+from src.database.models.effects import TimedBuff
+from src.database.models.ledger import LedgerReason
 
 
 @pytest.fixture
@@ -20,6 +22,7 @@ def mock_repos():
 @pytest.fixture
 def service(mock_repos):
     mock_repos["mission"].get_by_id = AsyncMock()
+    mock_repos["mission"].get_evaluation = AsyncMock(return_value=None)
     mock_repos["mission"].add_participant = AsyncMock()
     mock_repos["mission"].update_evaluator = AsyncMock()
     mock_repos["mission"].update_status = AsyncMock()
@@ -82,7 +85,7 @@ async def test_evaluate_user_success(service, mock_repos):
 
     # calculate_bonus retorna (xp, coins, texto)
     # Vamos simular que o bônus dobrou o XP base do rank S (50 -> 100)
-    mock_repos["leveling"].calculate_bonus = AsyncMock(
+    mock_repos["leveling"].calculate_bonus = MagicMock(
         return_value=(100, 250, "Bônus Ativo!")
     )
 
@@ -107,7 +110,15 @@ async def test_evaluate_user_success(service, mock_repos):
 
     # Verifica se grant_reward foi chamado com os valores finais (pós-bônus)
     mock_repos["leveling"].grant_reward.assert_awaited_with(
-        target_user_id, 100, 250, ANY
+        target_user_id, 100, 250, ANY,
+        stats_inc={
+            'stats.missions_helped': 1,
+            'stats.rank_counts.S': 1,
+            'stats.score_sum': 5,
+            'stats.mission_xp': 100,
+            'stats.mission_coins': 250,
+        },
+        reference={'mission_id': mission_id}
     )
 
     # Verifica se salvou no banco
@@ -118,6 +129,28 @@ async def test_evaluate_user_success(service, mock_repos):
     assert args[1].xp_earned == 100  # Garante que salvou o XP com bônus
 
 
+@pytest.mark.asyncio
+async def test_evaluate_user_applies_only_active_buffs(service, mock_repos):
+    """Buffs vencidos são ignorados; os válidos somam ao item e ficam gravados na avaliação."""
+    target_user = create_fake_user()
+    target_user.xp_multiplier = 1.1
+    target_user.buffs = [
+        TimedBuff(type='xp_boost', multiplier=0.5, expires_at=datetime.now() + timedelta(hours=1)),
+        TimedBuff(type='coin_boost', multiplier=0.5, expires_at=datetime.now() - timedelta(hours=1)),
+    ]
+    mock_repos["mission"].get_by_id.return_value = create_fake_mission(creator_id=1)
+    mock_repos["user"].get_by_id.return_value = target_user
+    mock_repos["leveling"].calculate_bonus = MagicMock(return_value=(80, 125, ""))
+    mock_repos["leveling"].grant_reward = AsyncMock(return_value=(False, 1))
+
+    success, _ = await service.evaluate_user(100, 1, 2, "S", MagicMock())
+
+    assert success is True
+    mock_repos["leveling"].calculate_bonus.assert_called_with(50, 125, pytest.approx(1.6), 1.0)
+    saved = mock_repos["mission"].add_participant.await_args.args[1]
+    assert (saved.xp_multiplier, saved.coin_multiplier) == (pytest.approx(1.6), 1.0)
+
+
 @pytest.mark.asyncio
 async def test_evaluate_user_fail_self_vote(service, mock_repos):
     """Testa a regra: Não pode avaliar a si mesmo."""
@@ -149,9 +182,10 @@ async def test_evaluate_user_fail_already_evaluated(service, mock_repos):
         coins_earned=10,
         evaluate_at=datetime.now()
     )
-    mission = create_fake_mission(creator_id=1, evaluators=[existing_eval])
+    mission = create_fake_mission(creator_id=1)
 
     mock_repos["mission"].get_by_id.return_value = mission
+    mock_repos["mission"].get_evaluation.return_value = existing_eval
     mock_repos["user"].get_by_id.return_value = create_fake_user(user_id=target_id)
 
     success, msg = await service.evaluate_user(100, author_id=1, user_id=target_id, rank="S", guild=MagicMock())
@@ -199,15 +233,18 @@ async def test_adjust_evaluation_success(service, mock_repos):
         rank=EvaluationRank.C,
         xp_earned=OLD_XP,
         coins_earned=OLD_COINS,
-        evaluate_at=datetime.now()
+        evaluate_at=datetime(2025, 3, 1, 12),
+        xp_multiplier=1.5,
+        coin_multiplier=1.0
     )
 
-    mock_repos["mission"].get_by_id.return_value = create_fake_mission(mission_id, evaluators=[old_eval])
+    mock_repos["mission"].get_by_id.return_value = create_fake_mission(mission_id)
+    mock_repos["mission"].get_evaluation.return_value = old_eval
     mock_repos["user"].get_by_id.return_value = create_fake_user(user_id=target_id)
 
     # Configura os métodos que fazem ações (Action Mocks)
     mock_repos["mission"].update_evaluator = AsyncMock(return_value=True)
-    mock_repos["leveling"].calculate_bonus = AsyncMock(return_value=(NEW_XP, NEW_COINS, ""))  # Retorna o Total Novo
+    mock_repos["leveling"].calculate_bonus = MagicMock(return_value=(NEW_XP, NEW_COINS, ""))  # Retorna o Total Novo
 
     success, data = await service.adjust_evaluation(mission_id, target_id, "S", MagicMock())
 
@@ -223,7 +260,17 @@ async def test_adjust_evaluation_success(service, mock_repos):
 
     # Valida se entregou apenas a DIFERENÇA (Delta) de prêmio
     mock_repos["leveling"].grant_reward.assert_awaited_with(
-        user_id=target_id, xp_amount=DELTA_XP, coins_amount=DELTA_COINS, guild=ANY
+        user_id=target_id, xp_amount=DELTA_XP, coins_amount=DELTA_COINS, guild=ANY,
+        # Contadores corrigidos pela diferença: sai um C, entra um S
+        stats_inc={
+            'stats.rank_counts.S': 1,
+            'stats.rank_counts.C': -1,
+            'stats.score_sum': 3,
+            'stats.mission_xp': DELTA_XP,
+            'stats.mission_coins': DELTA_COINS,
+        },
+        reason=LedgerReason.EVALUATION_ADJUSTMENT,
+        reference={'mission_id': mission_id}
     )
 
     # Valida se salvou no banco o valor TOTAL
@@ -233,6 +280,13 @@ async def test_adjust_evaluation_success(service, mock_repos):
     assert saved_eval.rank == EvaluationRank.S
     assert saved_eval.xp_earned == NEW_XP
     assert saved_eval.coins_earned == NEW_COINS
+    # A avaliação continua no dia original; o ajuste só marca updated_at
+    assert saved_eval.evaluate_at == datetime(2025, 3, 1, 12)
+    assert saved_eval.updated_at is not None
+
+    # O ajuste reaplica os multiplicadores gravados na avaliação, sem reler o usuário
+    mock_repos["leveling"].calculate_bonus.assert_called_with(50, 125, 1.5, 1.0)
+    mock_repos["user"].get_by_id.assert_not_awaited()
 
 @pytest.mark.asyncio
 async def test_report_evaluation_success(service, mock_repos):
@@ -243,9 +297,10 @@ async def test_report_evaluation_success(service, mock_repos):
         user_id=reporter_id, username="Rep", user_level_at_time=1, rank=EvaluationRank.B,
         xp_earned=10, coins_earned=10, evaluate_at=datetime.now()
     )
-    mission = create_fake_mission(evaluators=[participant])
+    mission = create_fake_mission()
 
     mock_repos["mission"].get_by_id.return_value = mission
+    mock_repos["mission"].get_evaluation.return_value = participant
 
     success, data = await service.report_evaluation(100, reporter_id, "Nota injusta")
 
@@ -257,10 +312,18 @@ async def test_report_evaluation_success(service, mock_repos):
 @pytest.mark.asyncio
 async def test_report_evaluation_fail_not_participant(service, mock_repos):
     """Testa reportar uma missão onde o usuário NÃO participou."""
-    mission = create_fake_mission(evaluators=[])  # Lista vazia
+    mission = create_fake_mission()
     mock_repos["mission"].get_by_id.return_value = mission
+    mock_repos["mission"].get_evaluation.return_value = None  # Sem avaliação
 
     success, msg = await service.report_evaluation(100, 999, "Reclamação")
 
     assert success is False
     assert "não foi avaliado" in msg
+
+
+def test_build_stats_increment_rank_e_counts_mission():
+    """Rank E não dá recompensa, mas ainda conta como missão ajudada."""
+    delta = build_stats_increment(EvaluationRank.E, xp=0, coins=0)
+
+    assert delta == {'stats.missions_helped': 1, 'stats.rank_counts.E': 1}
@@ -0,0 +1,207 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from src.database.models.user import UserStatus
+from src.repositories.user_repository import UserRepository
+from src.services.onboarding_service import OnboardingService
+from src.utils.guild_scope import scoped_guild
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+GUILD_ID = 10
+
+
+def make_guild(guild_id=GUILD_ID, role_ids=(1, 2, 3)):
+    roles = {role_id: SimpleNamespace(id=role_id, name=f'cargo{role_id}') for role_id in role_ids}
+    return SimpleNamespace(id=guild_id, member_count=100, get_role=roles.get)
+
+
+def make_member(user_id, guild):
+    member = MagicMock()
+    member.id = user_id
+    member.name = f'user{user_id}'
+    member.mention = f'<@{user_id}>'
+    member.guild = guild
+    member.send = AsyncMock()
+    member.add_roles = AsyncMock()
+    return member
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def user_repo(db):
+    return UserRepository(db)
+
+
+async def test_burst_is_registered_with_one_bulk_write(db, user_repo):
+    """Uma rajada de entradas custa uma escrita em lote, não um get + create por membro."""
+    guild = make_guild()
+    service = OnboardingService(user_repo, batch_size=1000)
+    for user_id in range(100, 150):
+        service.enqueue(make_member(user_id, guild))
+    assert service.backlog().pending_registrations == 50
+
+    db.reset_commands()
+    assert await service.flush() == 50
+
+    assert db.commands.get('bulkWrite') == 1
+    assert db.total_commands == 1
+    assert service.backlog().queued_jobs == 50
+    with scoped_guild(GUILD_ID):
+        user = await user_repo.get_by_id(120)
+    assert (user.username, user.status, user.xp) == ('user120', UserStatus.ACTIVE, 0)
+
+
+async def test_returning_member_gets_welcome_back_and_one_add_roles(db, user_repo):
+    guild = make_guild()
+    service = OnboardingService(user_repo)
+    service.enqueue(make_member(7, guild))
+    await service.flush()
+    service._jobs = asyncio.Queue()
+
+    with scoped_guild(GUILD_ID):
+        await user_repo.update_status(7, UserStatus.INACTIVE)
+        await user_repo.collection.update_one({'guild_id': GUILD_ID, 'user_id': 7},
+                                              {'$set': {'role_ids': [1, 3, 99], 'xp': 500}})
+
+    member = make_member(7, guild)
+    service.enqueue(member)
+    await service.flush()
+    job = service._jobs.get_nowait()
+
+    assert job.returning and [role.id for role in job.roles] == [1, 3]
+    await service.process(job)
+
+    embed = member.send.await_args.kwargs['embed']
+    assert embed.title.startswith('🔄')
+    member.add_roles.assert_awaited_once()
+    assert [role.id for role in member.add_roles.await_args.args] == [1, 3]
+    with scoped_guild(GUILD_ID):
+        user = await user_repo.get_by_id(7)
+    # O upsert só reativa: XP e cargos guardados continuam
+    assert (user.status, user.xp) == (UserStatus.ACTIVE, 500)
+
+
+async def test_backlog_over_limit_skips_dms_but_keeps_roles(db, user_repo):
+    guild = make_guild()
+    service = OnboardingService(user_repo, max_backlog=2)
+    for user_id in range(1, 5):
+        service.enqueue(make_member(user_id, guild))
+    await service.flush()
+
+    backlog = service.backlog()
+    assert (backlog.queued_jobs, backlog.dms_skipped) == (2, 2)
+
+    # Quem retorna com cargos continua na fila, só sem a DM
+    with scoped_guild(GUILD_ID):
+        await user_repo.collection.update_one({'guild_id': GUILD_ID, 'user_id': 4}, {'$set': {'role_ids': [2]}})
+    service.enqueue(make_member(4, guild))
+    await service.flush()
+    assert service._jobs.qsize() == 3
+    last = list(service._jobs._queue)[-1]
+    assert (last.send_dm, [role.id for role in last.roles]) == (False, [2])
+
+
+async def test_failed_registration_stays_queued():
+    repo = MagicMock()
+    repo.register_members = AsyncMock(side_effect=[None, {}])
+    service = OnboardingService(repo)
+    service.enqueue(make_member(1, make_guild()))
+
+    assert await service.flush() == 0
+    assert service.backlog().pending_registrations == 1
+    assert await service.flush() == 1
+    assert service.backlog().pending_registrations == 0
+
+
+async def test_closed_dms_do_not_count_as_failure(user_repo):
+    member = make_member(5, make_guild())
+    member.send = AsyncMock(side_effect=discord.Forbidden(MagicMock(status=403), 'Cannot send messages'))
+    service = OnboardingService(user_repo)
+    service.enqueue(member)
+    await service.flush()
+
+    await service.process(service._jobs.get_nowait())
+
+    assert (service.welcomed, service.failures) == (0, 0)
+    member.add_roles.assert_not_awaited()
+
+
+async def test_workers_drain_the_queue(user_repo):
+    members = [make_member(user_id, make_guild()) for user_id in range(20, 26)]
+    service = OnboardingService(user_repo, flush_interval=0.01, workers=3)
+    service.start()
+    for member in members:
+        service.enqueue(member)
+
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if service.welcomed == len(members):
+            break
+    await service.close()
+
+    assert service.welcomed == len(members)
+    assert all(member.send.await_count == 1 for member in members)
+
+
+async def test_departures_are_one_update_each_in_one_bulk_write(db, user_repo):
+    """Status e cargos de cada saída vão no mesmo update; a rajada inteira é um bulk_write."""
+    guild = make_guild()
+    service = OnboardingService(user_repo, batch_size=1000)
+    for user_id in range(1, 31):
+        service.enqueue(make_member(user_id, guild))
+    await service.flush()
+
+    for user_id in range(1, 31):
+        service.enqueue_departure(GUILD_ID, user_id, list(range(100, 110)))
+    db.reset_commands()
+    assert await service.flush() == 30
+
+    assert db.total_commands == 1 and db.commands.get('bulkWrite') == 1
+    backlog = service.backlog()
+    assert (backlog.departed, backlog.last_departure_batch, backlog.pending_departures) == (30, 30, 0)
+    with scoped_guild(GUILD_ID):
+        user = await user_repo.get_by_id(5)
+    assert user.status == UserStatus.INACTIVE and user.role_ids == list(range(100, 110))
+
+
+async def test_leave_and_rejoin_before_flush_ends_active_with_roles(user_repo):
+    guild = make_guild()
+    service = OnboardingService(user_repo)
+
+    # Entrou e saiu antes do cadastro: criado inativo, sem DM
+    service.enqueue(make_member(8, guild))
+    service.enqueue_departure(GUILD_ID, 8, [2])
+    await service.flush()
+    assert service.backlog().queued_jobs == 0
+    with scoped_guild(GUILD_ID):
+        user = await user_repo.get_by_id(8)
+    assert (user.status, user.role_ids) == (UserStatus.INACTIVE, [2])
+
+    # Saiu e voltou no mesmo lote: a saída é gravada antes e ele termina ativo, com os cargos restaurados
+    service.enqueue_departure(GUILD_ID, 8, [3])
+    service.enqueue(make_member(8, guild))
+    await service.flush()
+    with scoped_guild(GUILD_ID):
+        user = await user_repo.get_by_id(8)
+    job = service._jobs.get_nowait()
+    assert user.status == UserStatus.ACTIVE
+    assert job.returning and [role.id for role in job.roles] == [2, 3]
+
+
+async def test_departure_of_unknown_member_does_not_create_user(db, user_repo):
+    service = OnboardingService(user_repo)
+    service.enqueue_departure(GUILD_ID, 404, [1])
+
+    assert await service.flush() == 1
+    with scoped_guild(GUILD_ID):
+        assert await user_repo.get_by_id(404) is None
@@ -0,0 +1,61 @@
+import pytest
+import random
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from src.database.models.item import ItemModel, ItemType
+from src.repositories.storefront_repository import StorefrontRepository
+from src.services.shop_service import ShopService
+from tests.fakes import FakeDatabase
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_item(item_id: int) -> ItemModel:
+    return ItemModel(item_id=item_id, name=f'Item {item_id}', description='Descrição', price=10 * item_id,
+                     item_type=ItemType.CONSUMABLE)
+
+
+@pytest.fixture
+def item_repo():
+    repo = MagicMock()
+    repo.get_all = AsyncMock(return_value=[make_item(i) for i in range(1, 9)])
+    return repo
+
+
+@pytest.fixture
+def service(item_repo) -> ShopService:
+    return ShopService(item_repo, StorefrontRepository(FakeDatabase()), rotation_size=5)
+
+
+async def test_rotations_are_sampled_from_the_cached_catalog(service, item_repo):
+    first = await service.pick_rotation(random.Random(1))
+    second = await service.pick_rotation(random.Random(2))
+
+    assert len(first) == len(second) == 5
+    assert len({item.item_id for item in first}) == 5
+    item_repo.get_all.assert_awaited_once()
+
+    service.invalidate_catalog()
+    await service.pick_rotation()
+    assert item_repo.get_all.await_count == 2
+
+
+async def test_storefront_rotation_is_due_after_the_interval(service):
+    items = await service.pick_rotation()
+    storefront = await service.open_storefront(777, 10, 20, items)
+
+    assert await service.due_storefronts(timedelta(hours=6)) == []
+
+    # Última rotação antiga: a vitrine entra na lista e a nova rotação é gravada
+    old = storefront.model_copy(update={'rotated_at': datetime.now() - timedelta(hours=7)})
+    await service.storefront_repo.save(old)
+    due = await service.due_storefronts(timedelta(hours=6))
+    assert [s.guild_id for s in due] == [777]
+
+    new_items = [make_item(1)]
+    assert await service.record_rotation(due[0], new_items) is True
+    saved = await service.get_storefront(777)
+    assert saved.item_ids == [1]
+    assert saved.message_id == 20
+    assert await service.due_storefronts(timedelta(hours=6)) == []
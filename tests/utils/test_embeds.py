@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+import discord
+
+from src.database.models.mission import EvaluationRank
+from src.database.models.user import UserStatsModel
+from src.utils.embeds import CodeSageEmbeds, InventoryEmbeds, MissionEmbeds, ShopEmbeds, UserEmbeds
+
+# Limites do Discord para embeds (caracteres)
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_LIMIT = 2048
+FIELDS_LIMIT = 25
+TOTAL_LIMIT = 6000
+
+# Maiores valores esperados das partes dinâmicas
+LONG_NAME = 'N' * 200
+MENTION = f'<@{"9" * 20}>'
+BIG_NUMBER = 10 ** 19
+
+
+def assert_within_limits(embed: discord.Embed) -> None:
+    """Falha se o embed seria recusado pelo Discord por tamanho."""
+    assert len(embed.title or '') <= TITLE_LIMIT
+    assert len(embed.description or '') <= DESCRIPTION_LIMIT
+    assert len(embed.fields) <= FIELDS_LIMIT
+    for field in embed.fields:
+        assert len(field.name) <= FIELD_NAME_LIMIT
+        assert len(str(field.value)) <= FIELD_VALUE_LIMIT
+    assert len(embed.footer.text or '') <= FOOTER_LIMIT
+    assert len(embed) <= TOTAL_LIMIT
+
+
+def make_member():
+    return SimpleNamespace(mention=MENTION, display_name=LONG_NAME,
+                           display_avatar=SimpleNamespace(url='https://cdn/a.png'),
+                           guild=SimpleNamespace(member_count=BIG_NUMBER))
+
+
+@pytest.mark.parametrize('build', [
+    lambda: MissionEmbeds.evaluation_success(make_member(), EvaluationRank.S, BIG_NUMBER, BIG_NUMBER),
+    lambda: MissionEmbeds.mission_start('R' * 2000),
+    lambda: MissionEmbeds.mission_report(BIG_NUMBER, LONG_NAME, BIG_NUMBER, 'N' * 100, 'S', 'M' * 1000),
+    lambda: MissionEmbeds.admin_adjustment(make_member(), EvaluationRank.E, EvaluationRank.S,
+                                           -BIG_NUMBER, BIG_NUMBER),
+    MissionEmbeds.report_confirmation,
+    ShopEmbeds.create_showcase,
+    lambda: UserEmbeds.view_profile(LONG_NAME, BIG_NUMBER, BIG_NUMBER, BIG_NUMBER, 100, BIG_NUMBER, LONG_NAME,
+                                    UserStatsModel(missions_helped=BIG_NUMBER, score_sum=BIG_NUMBER * 5,
+                                                   mission_xp=BIG_NUMBER, mission_coins=BIG_NUMBER,
+                                                   rank_counts={rank.value: BIG_NUMBER for rank in EvaluationRank})),
+    lambda: InventoryEmbeds.view_inventory(LONG_NAME, LONG_NAME, [
+        {'name': 'I' * 50, 'qty': 99, 'type': 'consumable', 'description': 'D' * 100}] * 10),
+    lambda: InventoryEmbeds.item_used({'quantity': 99, 'item': LONG_NAME, 'xp': BIG_NUMBER, 'coins': BIG_NUMBER,
+                                       'role_id': BIG_NUMBER, 'level': BIG_NUMBER, 'level_up': True,
+                                       'buff': {'type': 'xp_boost', 'multiplier': 0.5,
+                                                'expires_at': datetime(2030, 1, 1)}}),
+    lambda: CodeSageEmbeds.welcome_message(make_member()),
+    lambda: CodeSageEmbeds.welcome_back_message(make_member()),
+])
+def test_embeds_fit_discord_limits_with_longest_inputs(build):
+    """Com as maiores entradas esperadas nenhum embed passa dos limites do Discord."""
+    assert_within_limits(build())
+
+
+def test_assert_within_limits_catches_long_field_values():
+    embed = discord.Embed(title='t')
+    embed.add_field(name='campo', value='x' * (FIELD_VALUE_LIMIT + 1))
+
+    with pytest.raises(AssertionError):
+        assert_within_limits(embed)
@@ -0,0 +1,26 @@
+import pytest
+
+from src.utils import guild_scope
+from src.utils.guild_scope import current_guild_id, main_guild_scope, scoped_guild
+
+
+def test_missing_scope_fails_instead_of_using_main_guild():
+    """Uma task que esqueceu o escopo não cai silenciosamente no GUILD_ID."""
+    with pytest.raises(LookupError):
+        current_guild_id()
+
+    with scoped_guild(7):
+        assert current_guild_id() == 7
+    with pytest.raises(LookupError):
+        current_guild_id()
+
+
+def test_main_guild_scope_is_explicit(monkeypatch):
+    monkeypatch.setattr(guild_scope, 'GUILD_ID', 42)
+
+    with main_guild_scope():
+        assert current_guild_id() == 42
+
+    monkeypatch.setattr(guild_scope, 'GUILD_ID', None)
+    with pytest.raises(LookupError):
+        main_guild_scope()
@@ -0,0 +1,26 @@
+import pytest
+
+from src.database.models.item import ItemModel, ItemType
+from src.views.shop_view import SHOP_SELECT_CUSTOM_ID, ShopView, build_options, item_option
+
+
+def make_item(item_id: int, price: int = 10) -> ItemModel:
+    return ItemModel(item_id=item_id, name=f'Item {item_id}', description='Descrição', price=price,
+                     item_type=ItemType.EQUIPPABLE)
+
+
+def test_item_options_are_built_once_per_item_version():
+    item = make_item(1)
+
+    assert item_option(item) is item_option(make_item(1))
+    assert item_option(make_item(1, price=99)) is not item_option(item)
+    assert [option.value for option in build_options([make_item(2), make_item(3)])] == ['2', '3']
+
+
+@pytest.mark.asyncio
+async def test_shop_view_is_persistent():
+    """Sem timeout e com custom_id fixo o view pode ser registrado com bot.add_view."""
+    view = ShopView(economy_service=None)
+
+    assert view.is_persistent()
+    assert view.children[0].custom_id == SHOP_SELECT_CUSTOM_ID